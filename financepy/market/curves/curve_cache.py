@@ -0,0 +1,156 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import OrderedDict
+
+import numpy as np
+
+from ...utils.date import Date, DateArray
+from ...utils.error import FinError
+from ...utils.helpers import times_from_dates
+
+###############################################################################
+
+
+class CurveCache():
+    """ Memo of the year fractions and curve values most recently computed
+    by a curve. Date conversions are kept per set of dates and day count and
+    curve values are kept per grid of times, each in a least recently used
+    store of bounded size. The curve values are dropped whenever the grid of
+    the curve differs from the grid they were computed on so that a rebuilt
+    or bumped curve never returns stale values. """
+
+    def __init__(self,
+                 max_size: int = 128):
+        """ Create an empty cache holding at most max_size time conversions
+        and max_size value grids. """
+
+        if max_size < 1:
+            raise FinError("Cache size must be at least one.")
+
+        self._max_size = max_size
+        self._times = OrderedDict()
+        self._values = OrderedDict()
+        self._grid_times = None
+        self._grid_values = None
+        self._hits = 0
+        self._misses = 0
+
+    ###########################################################################
+
+    def times(self,
+              dt: (Date, list, DateArray),
+              valuation_date: Date,
+              day_count_type=None):
+        """ Return the year fractions from the valuation date to the dates dt
+        as times_from_dates does, reusing an earlier conversion of the same
+        dates with the same day count. """
+
+        if isinstance(dt, Date):
+            dates_key = dt._excel_date
+        elif isinstance(dt, DateArray):
+            dates_key = dt._excel_date.tobytes()
+        elif isinstance(dt, list) and len(dt) > 0 and isinstance(dt[0], Date):
+            dates_key = tuple([d._excel_date for d in dt])
+        else:
+            return times_from_dates(dt, valuation_date, day_count_type)
+
+        key = (valuation_date._excel_date, day_count_type, dates_key)
+        times = self._lookup(self._times, key)
+
+        if times is None:
+            times = times_from_dates(dt, valuation_date, day_count_type)
+            self._store(self._times, key, times)
+
+        return times
+
+    ###########################################################################
+
+    def values(self,
+               t: (float, np.ndarray),
+               fn,
+               grid_times: np.ndarray,
+               grid_values: np.ndarray):
+        """ Return fn(t) for a curve function fn of time, reusing an earlier
+        value at the same times. The grid times and values of the curve are
+        compared with those of the cached values which are all dropped if the
+        curve has changed since they were computed. """
+
+        grid_times = np.asarray(grid_times)
+        grid_values = np.asarray(grid_values)
+
+        if self._grid_times is None or \
+                self._grid_times.shape != grid_times.shape or \
+                self._grid_values.shape != grid_values.shape or \
+                not np.array_equal(self._grid_times, grid_times) or \
+                not np.array_equal(self._grid_values, grid_values):
+
+            self._values.clear()
+            self._grid_times = grid_times.copy()
+            self._grid_values = grid_values.copy()
+
+        if isinstance(t, np.ndarray):
+            key = (t.shape, t.tobytes())
+        else:
+            key = t
+
+        values = self._lookup(self._values, key)
+
+        if values is None:
+            values = fn(t)
+            self._store(self._values, key, values)
+
+        return values
+
+    ###########################################################################
+
+    def _lookup(self, store, key):
+        """ Return the entry for key moving it to the most recently used end
+        of the store or None if there is no entry. """
+
+        value = store.get(key)
+
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            store.move_to_end(key)
+
+        return value
+
+    ###########################################################################
+
+    def _store(self, store, key, value):
+        """ Add an entry and drop the least recently used entry when the store
+        is full. """
+
+        store[key] = value
+
+        if len(store) > self._max_size:
+            store.popitem(last=False)
+
+    ###########################################################################
+
+    def clear(self):
+        """ Remove all entries and reset the hit and miss counters. """
+
+        self._times.clear()
+        self._values.clear()
+        self._grid_times = None
+        self._grid_values = None
+        self._hits = 0
+        self._misses = 0
+
+    ###########################################################################
+
+    def info(self):
+        """ Return the number of hits and misses and the number of cached time
+        conversions and value grids. """
+
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "times": len(self._times),
+                "values": len(self._values)}
+
+###############################################################################
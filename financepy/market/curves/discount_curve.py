@@ -6,8 +6,9 @@
 import numpy as np
 
 from .interpolator import Interpolator, InterpTypes, interpolate
+from .curve_cache import CurveCache
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -27,6 +28,9 @@ class DiscountCurve:
     a vector of times and discount factors and an interpolation scheme for
     interpolating between these fixed points. """
 
+    # Curves do not memoise their values unless enable_cache is called
+    _cache = None
+
     ###############################################################################
 
     def __init__(self,
@@ -146,8 +150,12 @@ class DiscountCurve:
         num_dates = len(dateList)
         zero_rates = []
 
-        times = times_from_dates(
-            dateList, self._valuation_date, day_count_type)
+        if self._cache is None:
+            times = times_from_dates(
+                dateList, self._valuation_date, day_count_type)
+        else:
+            times = self._cache.times(
+                dateList, self._valuation_date, day_count_type)
 
         for i in range(0, num_dates):
 
@@ -283,14 +291,19 @@ class DiscountCurve:
     ###############################################################################
 
     def df(self,
-           dt: (list, Date),
+           dt: (list, Date, DateArray),
            day_count=DayCountTypes.ACT_ACT_ISDA):
         """ Function to calculate a discount factor from a date or a
         vector of dates. The day count determines how dates get converted to 
-        years. I allow this to default to ACT_ACT_ISDA unless specified. """
+        years. I allow this to default to ACT_ACT_ISDA unless specified. A
+        DateArray is converted to times in one array call. """
 
-        times = times_from_dates(dt, self._valuation_date, day_count)
-        dfs = self._df(times)
+        if self._cache is None:
+            times = times_from_dates(dt, self._valuation_date, day_count)
+            dfs = self._df(times)
+        else:
+            times = self._cache.times(dt, self._valuation_date, day_count)
+            dfs = self._cache.values(times, self._df, self._times, self._dfs)
 
         if isinstance(dfs, float):
             return dfs
@@ -321,6 +334,36 @@ class DiscountCurve:
 
     ###############################################################################
 
+    def enable_cache(self,
+                     max_size: int = 128):
+        """ Memoise the conversion of dates to times and the discount factors
+        on each grid of times so that repeated calls to df, fwd and zero_rate
+        on the same dates are not recomputed. At most max_size entries of
+        each are kept. The cached discount factors are dropped automatically
+        when the curve is rebuilt or its discount factors change. """
+
+        self._cache = CurveCache(max_size)
+
+    ###############################################################################
+
+    def disable_cache(self):
+        """ Stop memoising and remove the cached values. """
+
+        self._cache = None
+
+    ###############################################################################
+
+    def cache_info(self):
+        """ Return a dictionary with the numbers of cache hits and misses and
+        of cached entries or None if the curve has no cache. """
+
+        if self._cache is None:
+            return None
+
+        return self._cache.info()
+
+    ###############################################################################
+
     def survival_prob(self,
                       dt: Date):
         """ This returns a survival probability to a specified date based on
@@ -343,6 +386,8 @@ class DiscountCurve:
 
         if isinstance(dts, Date):
             dtsPlusOneDays = [dts.add_days(1)]
+        elif isinstance(dts, DateArray):
+            dtsPlusOneDays = dts.add_days(1)
         else:
             dtsPlusOneDays = []
             for dt in dts:
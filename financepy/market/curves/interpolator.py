@@ -7,9 +7,6 @@ import numpy as np
 from ...utils.error import FinError
 from ...utils.global_vars import gSmall
 
-from scipy.interpolate import PchipInterpolator
-from scipy.interpolate import CubicSpline
-
 ###############################################################################
 
 from enum import Enum
@@ -28,6 +25,13 @@ class InterpTypes(Enum):
 
 # LINEAR_SWAP_RATES = 3
 
+# Schemes interpolated with piecewise cubics held as coefficient arrays
+gSplineInterpTypes = (InterpTypes.FINCUBIC_ZERO_RATES,
+                      InterpTypes.NATCUBIC_LOG_DISCOUNT,
+                      InterpTypes.NATCUBIC_ZERO_RATES,
+                      InterpTypes.PCHIP_ZERO_RATES,
+                      InterpTypes.PCHIP_LOG_DISCOUNT)
+
 ###############################################################################
 # TODO: GET RID OF THIS FUNCTION !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 ###############################################################################
@@ -78,12 +82,8 @@ def _uinterpolate(t, times, dfs, method):
     if t == times[0]:
         return dfs[0]
 
-    i = 0
-    while times[i] < t and i < num_points - 1:
-        i = i + 1
-
-    if t > times[i]:
-        i = num_points
+    # The first grid point at or after t or num_points if t is beyond them
+    i = np.searchsorted(times, t)
 
     yvalue = 0.0
 
@@ -190,6 +190,279 @@ def _vinterpolate(xValues,
 
     return yvalues
 
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _cubic_spline_coeffs(x, y, right_bc):
+    """ Fit a cubic spline through the points (x, y) with a zero second
+    derivative at the left end. At the right end the second derivative is
+    zero if right_bc is 2 (natural spline) and the first derivative is zero
+    if right_bc is 1. The spline second derivatives solve a tridiagonal
+    system. Returns the coefficients of each piece, highest power first, in
+    a contiguous array with one row per interval. """
+
+    n = x.size
+    h = x[1:] - x[:-1]
+    m = (y[1:] - y[:-1]) / h
+
+    # Tridiagonal system for the second derivatives
+    a = np.zeros(n)
+    b = np.ones(n)
+    c = np.zeros(n)
+    d = np.zeros(n)
+
+    for i in range(1, n - 1):
+        a[i] = h[i - 1]
+        b[i] = 2.0 * (h[i - 1] + h[i])
+        c[i] = h[i]
+        d[i] = 6.0 * (m[i] - m[i - 1])
+
+    if right_bc == 1:
+        a[n - 1] = h[n - 2]
+        b[n - 1] = 2.0 * h[n - 2]
+        d[n - 1] = -6.0 * m[n - 2]
+
+    # Thomas algorithm
+    for i in range(1, n):
+        w = a[i] / b[i - 1]
+        b[i] = b[i] - w * c[i - 1]
+        d[i] = d[i] - w * d[i - 1]
+
+    M = np.zeros(n)
+    M[n - 1] = d[n - 1] / b[n - 1]
+    for i in range(n - 2, -1, -1):
+        M[i] = (d[i] - c[i] * M[i + 1]) / b[i]
+
+    coeffs = np.empty((n - 1, 4))
+    for i in range(0, n - 1):
+        coeffs[i, 0] = (M[i + 1] - M[i]) / (6.0 * h[i])
+        coeffs[i, 1] = 0.5 * M[i]
+        coeffs[i, 2] = m[i] - h[i] * (2.0 * M[i] + M[i + 1]) / 6.0
+        coeffs[i, 3] = y[i]
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(float64(float64, float64, float64, float64),
+      fastmath=True, cache=True, nogil=True)
+def _pchip_edge_slope(h0, h1, m0, m1):
+    """ Three point estimate of the PCHIP slope at an end point which is
+    then limited so that the interpolant stays shape preserving. """
+
+    d = ((2.0 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+
+    if np.sign(d) != np.sign(m0):
+        d = 0.0
+    elif np.sign(m0) != np.sign(m1) and np.abs(d) > 3.0 * np.abs(m0):
+        d = 3.0 * m0
+
+    return d
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:]),
+      fastmath=True, cache=True, nogil=True)
+def _pchip_coeffs(x, y):
+    """ Fit a monotone piecewise cubic Hermite interpolant through the points
+    (x, y) using the Fritsch-Butland slopes at the interior points and the
+    three point end slopes used by the SciPy PchipInterpolator. Returns the
+    coefficients of each piece, highest power first, in a contiguous array
+    with one row per interval. """
+
+    n = x.size
+    h = x[1:] - x[:-1]
+    m = (y[1:] - y[:-1]) / h
+    dk = np.zeros(n)
+
+    if n == 2:
+        dk[0] = m[0]
+        dk[1] = m[0]
+    else:
+        for i in range(1, n - 1):
+            if np.sign(m[i]) != np.sign(m[i - 1]) or m[i] == 0.0 \
+                    or m[i - 1] == 0.0:
+                dk[i] = 0.0
+            else:
+                w1 = 2.0 * h[i] + h[i - 1]
+                w2 = h[i] + 2.0 * h[i - 1]
+                dk[i] = (w1 + w2) / (w1 / m[i - 1] + w2 / m[i])
+
+        dk[0] = _pchip_edge_slope(h[0], h[1], m[0], m[1])
+        dk[n - 1] = _pchip_edge_slope(h[n - 2], h[n - 3], m[n - 2], m[n - 3])
+
+    coeffs = np.empty((n - 1, 4))
+    for i in range(0, n - 1):
+        tt = (dk[i] + dk[i + 1] - 2.0 * m[i]) / h[i]
+        coeffs[i, 0] = tt / h[i]
+        coeffs[i, 1] = (m[i] - dk[i]) / h[i] - tt
+        coeffs[i, 2] = dk[i]
+        coeffs[i, 3] = y[i]
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:, :], int64),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolate_spline(t, breaks, coeffs, method):
+    """ Return the discount factors at times t from a piecewise cubic fitted
+    to either the log discount factors or the zero rates at the breaks. The
+    interval is found by binary search and times outside the breaks are
+    extrapolated using the end pieces. """
+
+    n = t.size
+    num_pieces = coeffs.shape[0]
+    log_discount = method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value or \
+        method == InterpTypes.PCHIP_LOG_DISCOUNT.value
+
+    out = np.empty(n)
+
+    for j in range(0, n):
+
+        i = np.searchsorted(breaks, t[j], side='right') - 1
+
+        if i < 0:
+            i = 0
+        elif i > num_pieces - 1:
+            i = num_pieces - 1
+
+        dx = t[j] - breaks[i]
+        v = ((coeffs[i, 0] * dx + coeffs[i, 1]) * dx + coeffs[i, 2]) * dx \
+            + coeffs[i, 3]
+
+        if log_discount:
+            out[j] = np.exp(v)
+        else:
+            out[j] = np.exp(-t[j] * v)
+
+    return out
+
+
+###############################################################################
+
+
+@njit(float64(float64, float64[:], float64[:], int64, int64[:], float64[:]),
+      fastmath=True, cache=True, nogil=True)
+def _uinterpolate_partials(t, times, dfs, method, indices, partials):
+    """ Return the interpolated value at time t as _uinterpolate does for the
+    schemes it supports and also return the partial derivatives of this
+    value with respect to the grid values. The value depends on at most three
+    grid points whose indices and partial derivatives are written into the
+    arrays indices and partials. Unused entries have a partial of zero. """
+
+    small = 1e-10
+    num_points = times.size
+
+    for j in range(0, 3):
+        indices[j] = 0
+        partials[j] = 0.0
+
+    if t == times[0] or num_points == 1:
+        partials[0] = 1.0
+        return dfs[0]
+
+    # The first grid point at or after t or num_points if t is beyond them
+    i = np.searchsorted(times, t)
+
+    yvalue = 0.0
+
+    if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        if i == 1:
+            r1 = -np.log(dfs[i]) / times[i]
+            r2 = -np.log(dfs[i]) / times[i]
+            dt = times[i] - times[i - 1]
+            w = ((times[i] - t) + (t - times[i - 1])) / dt
+            rvalue = ((times[i] - t) * r1 + (t - times[i - 1]) * r2) / dt
+            yvalue = np.exp(-rvalue * t)
+            indices[0] = i
+            partials[0] = yvalue * t * w / (dfs[i] * times[i])
+        elif i < num_points:
+            r1 = -np.log(dfs[i - 1]) / times[i - 1]
+            r2 = -np.log(dfs[i]) / times[i]
+            dt = times[i] - times[i - 1]
+            rvalue = ((times[i] - t) * r1 + (t - times[i - 1]) * r2) / dt
+            yvalue = np.exp(-rvalue * t)
+            indices[0] = i - 1
+            partials[0] = yvalue * t * (times[i] - t) / dt \
+                / (dfs[i - 1] * times[i - 1])
+            indices[1] = i
+            partials[1] = yvalue * t * (t - times[i - 1]) / dt \
+                / (dfs[i] * times[i])
+        else:
+            r1 = -np.log(dfs[i - 1]) / times[i - 1]
+            r2 = -np.log(dfs[i - 1]) / times[i - 1]
+            dt = times[i - 1] - times[i - 2]
+            w = ((times[i - 1] - t) + (t - times[i - 2])) / dt
+            rvalue = ((times[i - 1] - t) * r1 + (t - times[i - 2]) * r2) / dt
+            yvalue = np.exp(-rvalue * t)
+            indices[0] = i - 1
+            partials[0] = yvalue * t * w / (dfs[i - 1] * times[i - 1])
+
+    elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+        if i < num_points:
+            j1 = i - 1
+            j2 = i
+        else:
+            j1 = i - 2
+            j2 = i - 1
+
+        rt1 = -np.log(dfs[j1])
+        rt2 = -np.log(dfs[j2])
+        dt = times[j2] - times[j1]
+        rtvalue = ((times[j2] - t) * rt1 + (t - times[j1]) * rt2) / dt
+        yvalue = np.exp(-rtvalue)
+        indices[0] = j1
+        partials[0] = yvalue * (times[j2] - t) / dt / dfs[j1]
+        indices[1] = j2
+        partials[1] = yvalue * (t - times[j1]) / dt / dfs[j2]
+
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+        if i == 1:
+            y2 = -np.log(dfs[i] + small)
+            yvalue = t * y2 / (times[i] + small)
+            yvalue = np.exp(-yvalue)
+            indices[0] = i
+            partials[0] = yvalue * t / (times[i] + small) / (dfs[i] + small)
+        elif i < num_points:
+            dt1 = times[i - 1] - times[i - 2]
+            dt = times[i] - times[i - 1]
+            fwd1 = -np.log(dfs[i - 1] / dfs[i - 2]) / dt1
+            fwd2 = -np.log(dfs[i] / dfs[i - 1]) / dt
+            w1 = (times[i] - t) / dt
+            w2 = (t - times[i - 1]) / dt
+            fwd = ((times[i] - t) * fwd1 + (t - times[i - 1]) * fwd2) / dt
+            h = t - times[i - 1]
+            yvalue = dfs[i - 1] * np.exp(-fwd * h)
+            indices[0] = i - 2
+            partials[0] = -yvalue * h * w1 / (dfs[i - 2] * dt1)
+            indices[1] = i - 1
+            partials[1] = yvalue * (1.0 + h * (w1 / dt1 - w2 / dt)) \
+                / dfs[i - 1]
+            indices[2] = i
+            partials[2] = yvalue * h * w2 / (dfs[i] * dt)
+        else:
+            dt1 = times[i - 1] - times[i - 2]
+            fwd = -np.log(dfs[i - 1] / dfs[i - 2]) / dt1
+            h = t - times[i - 1]
+            yvalue = dfs[i - 1] * np.exp(-fwd * h)
+            indices[0] = i - 2
+            partials[0] = -yvalue * h / (dfs[i - 2] * dt1)
+            indices[1] = i - 1
+            partials[1] = yvalue * (1.0 + h / dt1) / dfs[i - 1]
+
+    else:
+        raise FinError("Interpolation scheme has no analytic partials.")
+
+    return yvalue
 
 ###############################################################################
 
@@ -200,7 +473,8 @@ class Interpolator():
                  interpolatorType: InterpTypes):
 
         self._interp_type = interpolatorType
-        self._interp_fn = None
+        self._breaks = None
+        self._coeffs = None
         self._times = None
         self._dfs = None
         self._refit_curve = False
@@ -210,73 +484,48 @@ class Interpolator():
     def fit(self,
             times: np.ndarray,
             dfs: np.ndarray):
+        """ Fit the interpolator to the discount factors at the grid times.
+        The spline schemes precompute the cubic coefficients of each interval
+        so that later interpolation is a binary search and a polynomial. """
 
         self._times = times
         self._dfs = dfs
 
-        if len(times) == 1:
+        if self._interp_type not in gSplineInterpTypes:
             return
 
-        if self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
+        times = np.asarray(times, dtype=np.float64)
+        dfs = np.asarray(dfs, dtype=np.float64)
 
-            logDfs = np.log(self._dfs)
-            self._interp_fn = PchipInterpolator(self._times, logDfs)
+        if self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT or \
+                self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
 
-        elif self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
+            values = np.log(dfs)
 
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
-
-            if self._times[0] == 0.0:
-                zero_rates[0] = zero_rates[1]
-
-            self._interp_fn = PchipInterpolator(self._times, zero_rates)
-
-        # if self._interp_type == InterpTypes.FINCUBIC_LOG_DISCOUNT:
-
-        #     """ Second derivatives at left is zero and first derivative at
-        #     right is clamped to zero. """
-        #     logDfs = np.log(self._dfs)
-        #     self._interp_fn = CubicSpline(self._times, logDfs,
-        #                                  bc_type=((2, 0.0), (1, 0.0)))
-
-        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
+        else:
 
-            """ Second derivatives at left is zero and first derivative at
-            right is clamped to zero. """
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
+            zero_rates = -np.log(dfs) / (times + gSmall)
 
-            if self._times[0] == 0.0:
+            if times[0] == 0.0 and len(times) > 1:
                 zero_rates[0] = zero_rates[1]
 
-            self._interp_fn = CubicSpline(self._times, zero_rates,
-                                          bc_type=((2, 0.0), (1, 0.0)))
+            values = zero_rates
 
-        elif self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
+        self._breaks = np.ascontiguousarray(times)
 
-            """ Second derivatives are clamped to zero at end points """
-            logDfs = np.log(self._dfs)
-            self._interp_fn = CubicSpline(self._times, logDfs,
-                                          bc_type='natural')
-
-        elif self._interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
-
-            """ Second derivatives are clamped to zero at end points """
-            gSmallVector = np.ones(len(self._times)) * gSmall
-            zero_rates = -np.log(self._dfs) / (self._times + gSmallVector)
-
-            if self._times[0] == 0.0:
-                zero_rates[0] = zero_rates[1]
-
-            self._interp_fn = CubicSpline(self._times, zero_rates,
-                                          bc_type='natural')
-
-    #        elif self._interp_type  == InterpTypes.LINEAR_LOG_DISCOUNT:
-    #
-    #            logDfs = np.log(self._dfs)
-    #            self._interp_fn = interp1d(self._times, logDfs,
-    #                                      fill_value="extrapolate")
+        if len(times) == 1:
+            self._coeffs = np.zeros((1, 4))
+            self._coeffs[0, 3] = values[0]
+        elif self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT or \
+                self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
+            self._coeffs = _pchip_coeffs(self._breaks, values)
+        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
+            # Second derivative at left is zero and first derivative at
+            # right is clamped to zero
+            self._coeffs = _cubic_spline_coeffs(self._breaks, values, 1)
+        else:
+            # Second derivatives are clamped to zero at end points
+            self._coeffs = _cubic_spline_coeffs(self._breaks, values, 2)
 
     ###########################################################################
 
@@ -306,38 +555,15 @@ class Interpolator():
                 print(t)
                 raise FinError("Interpolate times must all be >= 0")
 
-            tvec = t
+            tvec = t.astype(np.float64, copy=False)
 
         else:
             raise FinError("t is not a recognized type")
 
-        if self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        # if self._interp_type == InterpTypes.FINCUBIC_LOG_DISCOUNT:
-
-        #     out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
+        if self._interp_type in gSplineInterpTypes:
 
-        #        elif self._interp_type == InterpTypes.LINEAR_LOG_DISCOUNT:
-        #
-        #            out = np.exp(self._interp_fn(tvec))
+            out = _vinterpolate_spline(tvec, self._breaks, self._coeffs,
+                                       self._interp_type.value)
 
         else:
 
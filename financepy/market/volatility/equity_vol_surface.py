@@ -6,7 +6,7 @@ import numpy as np
 from scipy.optimize import minimize
 
 import matplotlib.pyplot as plt
-from numba import njit, float64, int64
+from numba import njit, prange, float64, int64
 
 from ...utils.error import FinError
 from ...utils.date import Date
@@ -14,14 +14,18 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.global_types import OptionTypes
 from ...models.option_implied_dbn import option_implied_dbn
 from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.helpers import times_from_dates
 from ...market.curves.discount_curve import DiscountCurve
 
 from ...models.volatility_fns import VolFunctionTypes
 from ...models.volatility_fns import vol_function_clark
+from ...models.volatility_fns import vol_function_clark_grad
 from ...models.volatility_fns import vol_function_bloomberg
 from ...models.volatility_fns import vol_function_svi
+from ...models.volatility_fns import vol_function_svi_grad
 from ...models.volatility_fns import vol_function_ssvi
 from ...models.sabr import vol_function_sabr
+from ...models.sabr import vol_function_sabr_grad
 from ...models.sabr import vol_function_sabr_beta_one
 from ...models.sabr import vol_function_sabr_beta_half
 
@@ -164,6 +168,247 @@ def vol_function(vol_function_type_value, params, f, k, t):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _vol_function_grad(vol_function_type_value, params, f, k, t, grad):
+    """ Return the volatility of vol_function and write its derivatives with
+    respect to the parameters into grad. These are analytical for the Clark,
+    SVI and SABR functions and central differences for the others. """
+
+    if vol_function_type_value == VolFunctionTypes.CLARK.value or \
+            vol_function_type_value == VolFunctionTypes.CLARK5.value:
+        return vol_function_clark_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFunctionTypes.SVI.value:
+        return vol_function_svi_grad(params, f, k, t, grad)
+    elif vol_function_type_value == VolFunctionTypes.SABR.value:
+        return vol_function_sabr_grad(params, f, k, t, grad)
+
+    h = 1e-6
+    bumped = params.copy()
+
+    for i in range(0, len(params)):
+        bumped[i] = params[i] + h
+        vol_up = vol_function(vol_function_type_value, bumped, f, k, t)
+        bumped[i] = params[i] - h
+        vol_down = vol_function(vol_function_type_value, bumped, f, k, t)
+        bumped[i] = params[i]
+        grad[i] = (vol_up - vol_down) / (2.0 * h)
+
+    return vol_function(vol_function_type_value, params, f, k, t)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _valid_parameters(vol_type_value, params):
+    """ Return False if the parameters are outside the region where the
+    volatility function is defined, such as a correlation beyond +/-1 or a
+    negative vol of vol. """
+
+    if vol_type_value == VolFunctionTypes.SABR.value:
+        return params[0] > 0.0 and abs(params[2]) < 1.0 and params[3] >= 0.0
+    elif vol_type_value == VolFunctionTypes.SABR_BETA_ONE.value or \
+            vol_type_value == VolFunctionTypes.SABR_BETA_HALF.value:
+        return params[0] > 0.0 and abs(params[1]) < 1.0 and params[2] >= 0.0
+    elif vol_type_value == VolFunctionTypes.BBG.value:
+        return 0.25 * params[0] + 0.5 * params[1] + params[2] > 0.0
+
+    return True
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _lm_residuals(vol_type_value, params, f, t, strikes, mkt_vols,
+                  resid, jac, grad):
+    """ Fill the vector of fitted minus market vols and its Jacobian with
+    respect to the parameters and return the sum of squared vol errors. If
+    the volatility is not positive at one of the strikes the parameters are
+    not acceptable and the error is infinite. """
+
+    cost = 0.0
+
+    for j in range(0, len(strikes)):
+        vol = _vol_function_grad(vol_type_value, params, f, strikes[j], t,
+                                 grad)
+
+        if vol <= 0.0:
+            return np.inf
+
+        resid[j] = vol - mkt_vols[j]
+        jac[j, :] = grad
+        cost += resid[j]**2
+
+    return cost
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _solve_linear(a, b):
+    """ Solve the small linear system a x = b by Gaussian elimination with
+    partial pivoting. The inputs are overwritten. """
+
+    n = len(b)
+
+    for i in range(0, n):
+
+        pivot = i
+        for j in range(i + 1, n):
+            if abs(a[j, i]) > abs(a[pivot, i]):
+                pivot = j
+
+        if pivot != i:
+            for j in range(0, n):
+                a[i, j], a[pivot, j] = a[pivot, j], a[i, j]
+            b[i], b[pivot] = b[pivot], b[i]
+
+        for j in range(i + 1, n):
+            factor = a[j, i] / a[i, i]
+            for l in range(i, n):
+                a[j, l] -= factor * a[i, l]
+            b[j] -= factor * b[i]
+
+    x = np.zeros(n)
+    for i in range(n - 1, -1, -1):
+        tot = b[i]
+        for j in range(i + 1, n):
+            tot -= a[i, j] * x[j]
+        x[i] = tot / a[i, i]
+
+    return x
+
+###############################################################################
+# Not fastmath as steps to parameters where the volatility is not defined give
+# a NaN cost and must be rejected
+###############################################################################
+
+
+@njit(cache=True)
+def _lm_fit_slice(vol_type_value, x_init, f, t, strikes, mkt_vols, tol,
+                  max_iterations):
+    """ Fit the parameters of the volatility function at one expiry to the
+    market vols by Levenberg-Marquardt using the analytical Jacobian. The
+    objective is the sum of squared vol errors as in _obj. Returns the
+    parameters and the objective. """
+
+    num_params = len(x_init)
+    num_strikes = len(strikes)
+
+    params = x_init.copy()
+    resid = np.zeros(num_strikes)
+    jac = np.zeros((num_strikes, num_params))
+    new_resid = np.zeros(num_strikes)
+    new_jac = np.zeros((num_strikes, num_params))
+    grad = np.zeros(num_params)
+
+    cost = _lm_residuals(vol_type_value, params, f, t, strikes, mkt_vols,
+                         resid, jac, grad)
+
+    lam = 1e-3
+
+    for _ in range(0, max_iterations):
+
+        jtj = np.dot(jac.T, jac)
+        jtr = np.dot(jac.T, resid)
+
+        for i in range(0, num_params):
+            jtj[i, i] += lam * max(jtj[i, i], 1e-12)
+
+        step = _solve_linear(jtj, -jtr)
+        new_params = params + step
+
+        if _valid_parameters(vol_type_value, new_params):
+            new_cost = _lm_residuals(vol_type_value, new_params, f, t,
+                                     strikes, mkt_vols, new_resid, new_jac,
+                                     grad)
+        else:
+            new_cost = np.inf
+
+        if new_cost < cost:
+
+            small_step = np.max(np.abs(step)) <= \
+                tol * (np.max(np.abs(params)) + tol)
+            small_gain = cost - new_cost <= tol * cost
+
+            params = new_params
+            cost = new_cost
+            resid, new_resid = new_resid, resid
+            jac, new_jac = new_jac, jac
+            lam = max(lam / 3.0, 1e-12)
+
+            if small_step or small_gain:
+                break
+
+        else:
+
+            lam = lam * 4.0
+
+            if lam > 1e12:
+                break
+
+    return params, cost
+
+###############################################################################
+
+
+@njit(parallel=True, cache=True)
+def _calibrate_slices_lm(vol_type_value, x_inits, forwards, texps, strikes,
+                         volatility_grid, tol, max_iterations):
+    """ Calibrate every expiry slice of the surface independently and in
+    parallel by Levenberg-Marquardt. Slice i starts from row i of x_inits.
+    Returns the parameters with one row per expiry and the objective of each
+    slice. """
+
+    num_expiries = x_inits.shape[0]
+    params = np.zeros(x_inits.shape)
+    costs = np.zeros(num_expiries)
+
+    for i in prange(num_expiries):
+        p, cost = _lm_fit_slice(vol_type_value, x_inits[i], forwards[i],
+                                texps[i], strikes, volatility_grid[i], tol,
+                                max_iterations)
+        params[i, :] = p
+        costs[i] = cost
+
+    return params, costs
+
+###############################################################################
+
+
+def _initial_parameters(vol_function_type, num_parameters, f, t, strikes,
+                        mkt_vols):
+    """ Return a starting point for the parameters of one expiry slice that
+    does not depend on the other slices. It matches the at-the-money forward
+    vol interpolated from the market vols and sets the smile terms to give a
+    gentle skew. """
+
+    atm_vol = np.interp(np.log(f), np.log(strikes), mkt_vols)
+    x_init = np.zeros(num_parameters)
+
+    if vol_function_type in (VolFunctionTypes.CLARK, VolFunctionTypes.CLARK5):
+        x_init[0] = np.log(atm_vol)
+    elif vol_function_type == VolFunctionTypes.SVI:
+        # Match a parabola in the total variance near the money
+        sigma = 0.10
+        x = np.log(f / strikes)
+        c2, c1, c0 = np.polyfit(x, mkt_vols * mkt_vols * t, 2)
+        b = max(2.0 * sigma * c2, abs(c1) / 0.90, 1e-4 * t)
+        rho = c1 / b
+        x_init[:] = [max(c0 - b * sigma, 0.0), b, rho, 0.0, sigma]
+    elif vol_function_type == VolFunctionTypes.SABR:
+        x_init[:] = [atm_vol * np.sqrt(f), 0.5, 0.0, 0.5]
+    elif vol_function_type == VolFunctionTypes.SABR_BETA_ONE:
+        x_init[:] = [atm_vol, 0.0, 0.5]
+    elif vol_function_type == VolFunctionTypes.SABR_BETA_HALF:
+        x_init[:] = [atm_vol * np.sqrt(f), 0.0, 0.5]
+    elif vol_function_type == VolFunctionTypes.BBG:
+        x_init[:] = [0.0, 0.0, atm_vol]
+
+    return x_init
+
+###############################################################################
+
+
 @njit(cache=True, fastmath=True)
 def _delta_fit(k, *args):
     """ This is the objective function used in the determination of the
@@ -219,6 +464,61 @@ def _solver_for_smile_strike(s, t, r, q,
     return K
 
 ###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _vol_from_strikes_times(vol_type_value, parameters, fwds, texps, strikes,
+                            times):
+    """ Interpolate the volatility at each pair of strike and time to expiry
+    as in volatility_from_strike_date but in parallel over the pairs.
+    The bracketing expiries are found by binary search and the variance is
+    interpolated linearly in time with a flat vol before the first and after
+    the last expiry. A negative variance gives a NaN volatility. """
+
+    num_curves = len(texps)
+    num_points = len(strikes)
+    upper = np.searchsorted(texps, times)
+    vols = np.zeros(num_points)
+
+    for i in prange(num_points):
+
+        t = times[i]
+        k = strikes[i]
+        index1 = upper[i]
+
+        if num_curves == 1 or index1 == 0:
+            index0 = 0
+            index1 = 0
+        elif index1 >= num_curves:
+            index0 = num_curves - 1
+            index1 = num_curves - 1
+        else:
+            index0 = index1 - 1
+
+        t0 = texps[index0]
+        vol0 = vol_function(vol_type_value, parameters[index0],
+                            fwds[index0], k, t0)
+
+        if index1 == index0:
+            vols[i] = vol0
+            continue
+
+        t1 = texps[index1]
+        vol1 = vol_function(vol_type_value, parameters[index1],
+                            fwds[index1], k, t1)
+
+        vart0 = vol0 * vol0 * t0
+        vart1 = vol1 * vol1 * t1
+        vart = ((t - t0) * vart1 + (t1 - t) * vart0) / (t1 - t0)
+
+        if vart < 0.0:
+            vols[i] = np.nan
+        else:
+            vols[i] = np.sqrt(vart / t)
+
+    return vols
+
+###############################################################################
 # Unable to cache function and if I remove njit it complains about pickle
 ###############################################################################
 
@@ -273,6 +573,32 @@ class EquityVolSurface:
 
         self._build_vol_surface(finSolverType=finSolverType)
 
+###############################################################################
+
+    def _volatility_array(self, K, expiry_date):
+        """ Return an array of volatilities for an array of strikes and a
+        list or DateArray of expiry dates. Either one can be a single value
+        which is then used with every value of the other. """
+
+        texp = times_from_dates(expiry_date, self._valuation_date)
+
+        strikes, times = np.broadcast_arrays(np.asarray(K, dtype=np.float64),
+                                             np.asarray(texp,
+                                                        dtype=np.float64))
+
+        vols = _vol_from_strikes_times(self._volatility_function_type.value,
+                                       self._parameters,
+                                       np.asarray(self._F0T,
+                                                  dtype=np.float64),
+                                       self._texp,
+                                       np.ravel(strikes),
+                                       np.ravel(times))
+
+        if np.any(np.isnan(vols)):
+            raise FinError("Negative variance.")
+
+        return vols.reshape(strikes.shape)
+
 ###############################################################################
 
     def volatility_from_strike_date(self, K, expiry_date):
@@ -284,7 +610,14 @@ class EquityVolSurface:
         overriden by a provided delta convention. The resulting volatilities
         are then determined for each bracketing expiry time and linear
         interpolation is done in variance space and then converted back to a
-        lognormal volatility."""
+        lognormal volatility.
+        The strike can also be an array and the expiry date a list or a
+        DateArray of dates, with one of them possibly a single value. Then
+        the bracketing is done by binary search in one compiled call and an
+        array of volatilities is returned."""
+
+        if not isinstance(expiry_date, Date) or np.ndim(K) > 0:
+            return self._volatility_array(K, expiry_date)
 
         texp = (expiry_date - self._valuation_date) / gDaysInYear
 
@@ -635,6 +968,36 @@ class EquityVolSurface:
 
         vol_type_value = self._volatility_function_type.value
 
+        if finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+
+            if self._volatility_function_type == VolFunctionTypes.SSVI:
+                raise FinError("Levenberg-Marquardt calibration is not "
+                               "available for the SSVI vol function.")
+
+            strikes = np.array(self._strikes, dtype=np.float64)
+            volatility_grid = np.array(self._volatility_grid,
+                                       dtype=np.float64)
+
+            x_inits = np.zeros([numExpiryDates, num_parameters])
+
+            for i in range(0, numExpiryDates):
+                x_inits[i] = _initial_parameters(self._volatility_function_type,
+                                                 num_parameters,
+                                                 self._F0T[i],
+                                                 self._texp[i],
+                                                 strikes,
+                                                 volatility_grid[i])
+
+            self._parameters, _ = _calibrate_slices_lm(vol_type_value,
+                                                       x_inits,
+                                                       self._F0T,
+                                                       self._texp,
+                                                       strikes,
+                                                       volatility_grid,
+                                                       1e-10,
+                                                       500)
+            return
+
         x_inits = []
         x_init = np.zeros(num_parameters)
         x_inits.append(x_init)
@@ -0,0 +1,492 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ...utils.error import FinError
+from ...utils.math import N, nprime
+from ...utils.helpers import check_argument_types, label_to_string
+from ...models.volatility_fns import VolFunctionTypes
+from ...models.volatility_fns import vol_function_clark
+from ...models.volatility_fns import vol_function_bloomberg
+from ...models.volatility_fns import vol_function_svi
+from ...models.sabr import vol_function_sabr
+from ...models.sabr import vol_function_sabr_beta_one
+from ...models.sabr import vol_function_sabr_beta_half
+from ...models.process_simulator import interpolate_local_vol
+from .equity_vol_surface import EquityVolSurface
+from .fx_vol_surface import FXVolSurface
+from .fx_vol_surface_plus import FXVolSurfacePlus
+
+###############################################################################
+# Smallest time used in Dupire's formula as the implied variance vanishes at
+# time zero
+###############################################################################
+
+T_MIN = 1e-6
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _smile_vol(vol_type_value, params, f, k, t):
+    """ Volatility of one parametric smile slice at strike k. """
+
+    if vol_type_value == VolFunctionTypes.CLARK.value or \
+            vol_type_value == VolFunctionTypes.CLARK5.value:
+        return vol_function_clark(params, f, k, t)
+    elif vol_type_value == VolFunctionTypes.SABR.value:
+        return vol_function_sabr(params, f, k, t)
+    elif vol_type_value == VolFunctionTypes.SABR_BETA_ONE.value:
+        return vol_function_sabr_beta_one(params, f, k, t)
+    elif vol_type_value == VolFunctionTypes.SABR_BETA_HALF.value:
+        return vol_function_sabr_beta_half(params, f, k, t)
+    elif vol_type_value == VolFunctionTypes.BBG.value:
+        return vol_function_bloomberg(params, f, k, t)
+    elif vol_type_value == VolFunctionTypes.SVI.value:
+        return vol_function_svi(params, f, k, t)
+    else:
+        return 0.0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _smile_derivatives(vol_type_value, params, f, k, t):
+    """ Return the volatility of one parametric smile slice at strike k and
+    its first and second derivatives with respect to the log of the strike.
+    These are analytical for the Clark and SVI functions and central
+    differences of the parametric function for the others. """
+
+    x = np.log(f / k)
+
+    if vol_type_value == VolFunctionTypes.CLARK.value or \
+            vol_type_value == VolFunctionTypes.CLARK5.value:
+
+        # log(vol) is a polynomial in N(x / (sigma0 sqrt(t))) - 0.5
+        s = np.exp(params[0]) * np.sqrt(t)
+        arg = x / s
+        delta = N(arg) - 0.50
+        ddelta = nprime(arg) / s
+        d2delta = -arg * nprime(arg) / (s * s)
+
+        g = 0.0
+        g1 = 0.0
+        g2 = 0.0
+        for i in range(0, len(params)):
+            g += params[i] * delta**i
+            if i > 0:
+                g1 += i * params[i] * delta**(i - 1)
+            if i > 1:
+                g2 += i * (i - 1) * params[i] * delta**(i - 2)
+
+        vol = np.exp(g)
+        dlogvol = g1 * ddelta
+        d2logvol = g2 * ddelta * ddelta + g1 * d2delta
+
+        return vol, -vol * dlogvol, vol * (dlogvol * dlogvol + d2logvol)
+
+    elif vol_type_value == VolFunctionTypes.SVI.value:
+
+        a = params[0]
+        b = params[1]
+        rho = params[2]
+        m = params[3]
+        sigma = params[4]
+
+        root = np.sqrt((x - m)**2 + sigma * sigma)
+        vart = a + b * (rho * (x - m) + root)
+
+        if vart <= 0.0:
+            return 0.0, 0.0, 0.0
+
+        dvart = b * (rho + (x - m) / root)
+        d2vart = b * sigma * sigma / root**3
+
+        vol = np.sqrt(vart / t)
+        dvol = dvart / (2.0 * t * vol)
+        d2vol = d2vart / (2.0 * t * vol) - dvart**2 / (4.0 * t * t * vol**3)
+
+        return vol, -dvol, d2vol
+
+    h = 1e-4
+    vol = _smile_vol(vol_type_value, params, f, k, t)
+    vol_up = _smile_vol(vol_type_value, params, f, k * np.exp(h), t)
+    vol_down = _smile_vol(vol_type_value, params, f, k * np.exp(-h), t)
+
+    dvol = (vol_up - vol_down) / (2.0 * h)
+    d2vol = (vol_up - 2.0 * vol + vol_down) / (h * h)
+
+    return vol, dvol, d2vol
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _gap_derivatives(k, strikes, gaps):
+    """ Return the gap added to the smile of an FXVolSurfacePlus slice at
+    strike k and its first and second derivatives with respect to the log of
+    the strike. The gap is linear in the strike between the smile strikes and
+    zero outside them. """
+
+    if len(strikes) == 1:
+        return 0.0, 0.0, 0.0
+
+    if k <= strikes[0] or k >= strikes[-1]:
+        return 0.0, 0.0, 0.0
+
+    index = np.searchsorted(strikes, k)
+    k0 = strikes[index - 1]
+    k1 = strikes[index]
+    slope = (gaps[index] - gaps[index - 1]) / (k1 - k0)
+    gap = gaps[index - 1] + (k - k0) * slope
+
+    return gap, k * slope, k * slope
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _slice_total_variance(vol_type_value, params, smile_strikes, gaps, f,
+                          k, t, tw):
+    """ Return the volatility of a smile slice with expiry t at strike k and
+    the total variance vol * vol * tw with its first and second derivatives
+    with respect to the log of the strike. """
+
+    vol, dvol, d2vol = _smile_derivatives(vol_type_value, params, f, k, t)
+    gap, dgap, d2gap = _gap_derivatives(k, smile_strikes, gaps)
+
+    vol += gap
+    dvol += dgap
+    d2vol += d2gap
+
+    w = vol * vol * tw
+    dw = 2.0 * vol * dvol * tw
+    d2w = 2.0 * (dvol * dvol + vol * d2vol) * tw
+
+    return vol, w, dw, d2w
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _log_forward(t, texps, log_fwds, log_spot):
+    """ Return the log of the forward at time t and the drift of the forward
+    at t. The log forward is linear in time between the expiry dates of the
+    slices, starting from the spot, and keeps the last drift after the last
+    expiry. """
+
+    num_curves = len(texps)
+    index = np.searchsorted(texps, t)
+
+    if index == 0:
+        t0 = 0.0
+        x0 = log_spot
+        t1 = texps[0]
+        x1 = log_fwds[0]
+    elif index < num_curves:
+        t0 = texps[index - 1]
+        x0 = log_fwds[index - 1]
+        t1 = texps[index]
+        x1 = log_fwds[index]
+    elif num_curves == 1:
+        t0 = 0.0
+        x0 = log_spot
+        t1 = texps[0]
+        x1 = log_fwds[0]
+    else:
+        t0 = texps[num_curves - 2]
+        x0 = log_fwds[num_curves - 2]
+        t1 = texps[num_curves - 1]
+        x1 = log_fwds[num_curves - 1]
+
+    mu = (x1 - x0) / (t1 - t0)
+    return x0 + mu * (t - t0), mu
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _build_local_vols(vol_type_value, parameters, smile_strikes, gaps, fwds,
+                      texps, log_spot, times, log_spots):
+    """ Calculate Dupire's local volatility on a grid of times and log stock
+    prices from the total implied variance w(k, T) of the surface where k is
+    the log of the strike over the forward. In time the total variance is
+    linear between the slices at each strike, and the implied vol is flat
+    before the first and after the last slice as in the surface lookups. The
+    strike derivatives come from the parametric slices. Where the surface
+    has arbitrage and Dupire's formula has no positive solution the implied
+    variance is used instead, and where the implied variance is not positive
+    the local vol of the nearest strike is used. """
+
+    num_times = len(times)
+    num_spots = len(log_spots)
+    num_curves = len(texps)
+    log_fwds = np.log(fwds)
+    upper = np.searchsorted(texps, times)
+    vols = np.zeros((num_times, num_spots))
+
+    for i in prange(num_times):
+
+        T = max(times[i], T_MIN)
+        log_fwd, mu = _log_forward(T, texps, log_fwds, log_spot)
+
+        index1 = upper[i]
+
+        if num_curves == 1 or index1 == 0:
+            index0 = 0
+            index1 = 0
+        elif index1 >= num_curves:
+            index0 = num_curves - 1
+            index1 = num_curves - 1
+        else:
+            index0 = index1 - 1
+
+        t0 = texps[index0]
+        t1 = texps[index1]
+
+        for j in range(0, num_spots):
+
+            K = np.exp(log_spots[j])
+            y = log_spots[j] - log_fwd
+
+            if index0 == index1:
+
+                vol, w, dw, d2w = \
+                    _slice_total_variance(vol_type_value, parameters[index0],
+                                          smile_strikes[index0], gaps[index0],
+                                          fwds[index0], K, t0, T)
+                dwdT = vol * vol
+
+            else:
+
+                _, w0, dw0, d2w0 = \
+                    _slice_total_variance(vol_type_value, parameters[index0],
+                                          smile_strikes[index0], gaps[index0],
+                                          fwds[index0], K, t0, t0)
+
+                _, w1, dw1, d2w1 = \
+                    _slice_total_variance(vol_type_value, parameters[index1],
+                                          smile_strikes[index1], gaps[index1],
+                                          fwds[index1], K, t1, t1)
+
+                a = (T - t0) / (t1 - t0)
+                w = (1.0 - a) * w0 + a * w1
+                dw = (1.0 - a) * dw0 + a * dw1
+                d2w = (1.0 - a) * d2w0 + a * d2w1
+                dwdT = (w1 - w0) / (t1 - t0)
+
+            if w <= 0.0:
+                continue
+
+            # The time derivative at a fixed strike is converted to one at a
+            # fixed log-moneyness as the forward moves with the drift
+            num = dwdT + mu * dw
+            den = 1.0 - y * dw / w \
+                + 0.25 * (-0.25 - 1.0 / w + y * y / (w * w)) * dw * dw \
+                + 0.5 * d2w
+
+            if num > 0.0 and den > 0.0:
+                vols[i, j] = np.sqrt(num / den)
+            else:
+                vols[i, j] = np.sqrt(w / T)
+
+        # Where the slices give no positive variance, as in the wings of an
+        # SVI fit with |rho| > 1, the local vol of the nearest strike is used
+        last = 0.0
+        for j in range(0, num_spots):
+            if vols[i, j] > 0.0:
+                last = vols[i, j]
+            else:
+                vols[i, j] = last
+
+        last = 0.0
+        for j in range(num_spots - 1, -1, -1):
+            if vols[i, j] > 0.0:
+                last = vols[i, j]
+            elif last > 0.0:
+                vols[i, j] = last
+
+    return vols
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _local_vols(times, log_spots, dt, x_min, dx, vols):
+    """ Interpolate the grid of local volatilities at each pair of time and
+    log stock price in parallel. """
+
+    num_points = len(times)
+    out = np.zeros(num_points)
+
+    for i in prange(num_points):
+        out[i] = interpolate_local_vol(times[i], log_spots[i], dt, x_min, dx,
+                                       vols)
+
+    return out
+
+###############################################################################
+
+
+class LocalVolSurface():
+    """ Dupire local volatility surface implied by a calibrated equity or FX
+    volatility surface. The local volatility is computed once on a uniform
+    grid of times and log stock prices using the parametric smile of each
+    expiry slice and is then interpolated bilinearly so that Monte-Carlo and
+    PDE engines can look it up cheaply. The forward of the underlying grows
+    at the drift implied by the forwards of the slices. Paths can be
+    generated with FinProcessSimulator using ProcessTypes.LOCAL_VOL and the
+    model parameters (stock_price, local_vol_surface, scheme). """
+
+    def __init__(self,
+                 vol_surface: (EquityVolSurface, FXVolSurface,
+                               FXVolSurfacePlus),
+                 num_time_steps: int = 100,
+                 num_spot_steps: int = 200,
+                 num_std_devs: float = 5.0):
+        """ Create the local volatility grid from a calibrated vol surface.
+        The grid has num_time_steps equal steps from today to the last expiry
+        date of the surface and num_spot_steps equal steps in the log of the
+        stock price that cover num_std_devs standard deviations of the at the
+        money volatility either side of the spot. """
+
+        check_argument_types(self.__init__, locals())
+
+        if num_time_steps < 1 or num_spot_steps < 1:
+            raise FinError("Number of grid steps must be at least one.")
+
+        if num_std_devs <= 0.0:
+            raise FinError("Number of standard deviations must be positive.")
+
+        vol_type = vol_surface._volatility_function_type
+
+        if vol_type == VolFunctionTypes.SSVI:
+            raise FinError("Local volatility is not available for SSVI.")
+
+        if isinstance(vol_surface, EquityVolSurface):
+            spot = vol_surface._stock_price
+        else:
+            spot = vol_surface._spot_fx_rate
+
+        texps = np.array(vol_surface._texp, dtype=np.float64)
+        fwds = np.array(vol_surface._F0T, dtype=np.float64)
+        parameters = np.array(vol_surface._parameters, dtype=np.float64)
+        num_curves = len(texps)
+
+        if isinstance(vol_surface, FXVolSurfacePlus):
+            smile_strikes = np.array(vol_surface._strikes, dtype=np.float64)
+            gaps = np.array(vol_surface._gaps, dtype=np.float64)
+        else:
+            smile_strikes = np.zeros((num_curves, 1))
+            gaps = np.zeros((num_curves, 1))
+
+        # The spot grid covers the largest at the money variance
+        max_var = 0.0
+        for i in range(0, num_curves):
+            vol, _, _, _ = _slice_total_variance(vol_type.value,
+                                                 parameters[i],
+                                                 smile_strikes[i], gaps[i],
+                                                 fwds[i], fwds[i], texps[i],
+                                                 texps[i])
+            max_var = max(max_var, vol * vol * texps[i])
+
+        width = num_std_devs * np.sqrt(max_var)
+        log_spot = np.log(spot)
+        x_min = log_spot - width
+        dx = 2.0 * width / num_spot_steps
+        log_spots = x_min + np.arange(0, num_spot_steps + 1) * dx
+
+        dt = texps[-1] / num_time_steps
+        times = np.arange(0, num_time_steps + 1) * dt
+
+        self._valuation_date = vol_surface._valuation_date
+        self._spot = spot
+        self._volatility_function_type = vol_type
+        self._texp = texps
+        self._log_fwds = np.log(fwds)
+        self._times = times
+        self._log_spots = log_spots
+        self._dt = dt
+        self._x_min = x_min
+        self._dx = dx
+
+        self._vols = _build_local_vols(vol_type.value, parameters,
+                                       smile_strikes, gaps, fwds, texps,
+                                       log_spot, times, log_spots)
+
+    ###########################################################################
+
+    def local_volatility(self,
+                         t,
+                         stock_price):
+        """ Return the local volatility at a time in years and a stock price
+        by bilinear interpolation of the grid in time and the log of the
+        stock price. The inputs can be numbers or arrays of the same shape,
+        or one of them a number, in which case an array is returned. The
+        volatility is flat outside the grid. """
+
+        if np.ndim(t) == 0 and np.ndim(stock_price) == 0:
+            return interpolate_local_vol(float(t), np.log(stock_price),
+                                         self._dt, self._x_min, self._dx,
+                                         self._vols)
+
+        times, spots = np.broadcast_arrays(np.asarray(t, dtype=np.float64),
+                                           np.asarray(stock_price,
+                                                      dtype=np.float64))
+
+        vols = _local_vols(np.ravel(times), np.log(np.ravel(spots)),
+                           self._dt, self._x_min, self._dx, self._vols)
+
+        return vols.reshape(times.shape)
+
+    ###########################################################################
+
+    def drift(self,
+              t):
+        """ Return the drift of the forward of the underlying at a time in
+        years, which is the difference between the interest rate and the
+        dividend yield or foreign interest rate. """
+
+        _, mu = _log_forward(float(t), self._texp, self._log_fwds,
+                             np.log(self._spot))
+        return mu
+
+    ###########################################################################
+
+    def _log_forward(self,
+                     times):
+        """ Return an array of the log of the forward at an array of times. """
+
+        log_spot = np.log(self._spot)
+        x = np.zeros(len(times))
+
+        for i in range(0, len(times)):
+            x[i], _ = _log_forward(times[i], self._texp, self._log_fwds,
+                                   log_spot)
+
+        return x
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUATION DATE", self._valuation_date)
+        s += label_to_string("SPOT", self._spot)
+        s += label_to_string("VOL FUNCTION", self._volatility_function_type)
+        s += label_to_string("NUM TIMES", len(self._times))
+        s += label_to_string("NUM SPOTS", len(self._log_spots))
+        s += label_to_string("MAX TIME", self._times[-1])
+        s += label_to_string("MIN SPOT", np.exp(self._log_spots[0]))
+        s += label_to_string("MAX SPOT", np.exp(self._log_spots[-1]), "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -6,7 +6,7 @@ import numpy as np
 from scipy.optimize import minimize
 
 import matplotlib.pyplot as plt
-from numba import jit, njit, float64, int64
+from numba import jit, njit, prange, float64, int64
 
 from ...utils.error import FinError
 from ...utils.date import Date
@@ -17,6 +17,7 @@ from ...models.option_implied_dbn import option_implied_dbn
 from ...products.fx.fx_mkt_conventions import FinFXATMMethod
 from ...products.fx.fx_mkt_conventions import FinFXDeltaMethod
 from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.helpers import times_from_dates
 from ...market.curves.discount_curve import DiscountCurve
 
 from ...models.black_scholes import BlackScholes
@@ -383,6 +384,61 @@ def vol_function(vol_function_type_value, params, f, k, t):
 ###############################################################################
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _vol_from_strikes_times(vol_type_value, parameters, fwds, texps, strikes,
+                            times):
+    """ Interpolate the volatility at each pair of strike and time to expiry
+    as in volatility_from_strike_date but in parallel over the pairs.
+    The bracketing expiries are found by binary search and the variance is
+    interpolated linearly in time with a flat vol before the first and after
+    the last expiry. A negative variance gives a NaN volatility. """
+
+    num_curves = len(texps)
+    num_points = len(strikes)
+    upper = np.searchsorted(texps, times)
+    vols = np.zeros(num_points)
+
+    for i in prange(num_points):
+
+        t = times[i]
+        k = strikes[i]
+        index1 = upper[i]
+
+        if num_curves == 1 or index1 == 0:
+            index0 = 0
+            index1 = 0
+        elif index1 >= num_curves:
+            index0 = num_curves - 1
+            index1 = num_curves - 1
+        else:
+            index0 = index1 - 1
+
+        t0 = texps[index0]
+        vol0 = vol_function(vol_type_value, parameters[index0],
+                            fwds[index0], k, t0)
+
+        if index1 == index0:
+            vols[i] = vol0
+            continue
+
+        t1 = texps[index1]
+        vol1 = vol_function(vol_type_value, parameters[index1],
+                            fwds[index1], k, t1)
+
+        vart0 = vol0 * vol0 * t0
+        vart1 = vol1 * vol1 * t1
+        vart = ((t - t0) * vart1 + (t1 - t) * vart0) / (t1 - t0)
+
+        if vart < 0.0:
+            vols[i] = np.nan
+        else:
+            vols[i] = np.sqrt(vart / t)
+
+    return vols
+
+###############################################################################
+
+
 class SwaptionVolSurface():
     """ Class to perform a calibration of a chosen parametrised surface to the
     prices of swaptions at different expiry dates and swap tenors. There is a 
@@ -435,6 +491,32 @@ class SwaptionVolSurface():
 
         self._build_vol_surface(finSolverType=finSolverType)
 
+###############################################################################
+
+    def _volatility_array(self, K, expiry_date):
+        """ Return an array of volatilities for an array of strikes and a
+        list or DateArray of expiry dates. Either one can be a single value
+        which is then used with every value of the other. """
+
+        texp = times_from_dates(expiry_date, self._valuation_date)
+
+        strikes, times = np.broadcast_arrays(np.asarray(K, dtype=np.float64),
+                                             np.asarray(texp,
+                                                        dtype=np.float64))
+
+        vols = _vol_from_strikes_times(self._volatility_function_type.value,
+                                       self._parameters,
+                                       np.asarray(self._fwd_swap_rates,
+                                                  dtype=np.float64),
+                                       self._texp,
+                                       np.ravel(strikes),
+                                       np.ravel(times))
+
+        if np.any(np.isnan(vols)):
+            raise FinError("Negative variance.")
+
+        return vols.reshape(strikes.shape)
+
 ###############################################################################
 
     def volatility_from_strike_date(self, K, expiry_date):
@@ -446,7 +528,14 @@ class SwaptionVolSurface():
         overriden by a provided delta convention. The resulting volatilities 
         are then determined for each bracketing expiry time and linear 
         interpolation is done in variance space and then converted back to a 
-        lognormal volatility."""
+        lognormal volatility.
+        The strike can also be an array and the expiry date a list or a
+        DateArray of dates, with one of them possibly a single value. Then
+        the bracketing is done by binary search in one compiled call and an
+        array of volatilities is returned."""
+
+        if not isinstance(expiry_date, Date) or np.ndim(K) > 0:
+            return self._volatility_array(K, expiry_date)
 
         texp = (expiry_date - self._valuation_date) / gDaysInYear
 
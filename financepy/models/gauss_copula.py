@@ -2,15 +2,115 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: Use Numba to speed this up more.
-
 import numpy as np
+from numba import njit, prange
 
 from ..utils.math import N
-from ..utils.helpers import uniform_to_default_time
+from ..utils.error import FinError
+from ..models.sobol import get_gaussian_sobol, sArr
 
 ###############################################################################
-# TODO:
+
+
+def _survival_matrix(issuer_curves):
+    """ Stack the survival curves of the issuers into two matrices of times
+    and survival probabilities with one row per issuer. Rows of curves with
+    fewer points are padded with the last point of the curve. The number of
+    points of each curve is also returned. """
+
+    num_credits = len(issuer_curves)
+    num_points = np.array([len(c._times) for c in issuer_curves],
+                          dtype=np.int64)
+
+    max_points = np.max(num_points)
+    times = np.zeros((num_credits, max_points))
+    values = np.zeros((num_credits, max_points))
+
+    for iCredit in range(0, num_credits):
+        n = num_points[iCredit]
+        times[iCredit, 0:n] = issuer_curves[iCredit]._times
+        values[iCredit, 0:n] = issuer_curves[iCredit]._values
+        times[iCredit, n:] = times[iCredit, n - 1]
+        values[iCredit, n:] = values[iCredit, n - 1]
+
+    return times, values, num_points
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _uniform_to_default_time(u, t, v, log_v, num_points):
+    """ Map a uniform random variable to a default time given the first
+    num_points points of a survival probability curve and their logs. This
+    finds the bracketing interval by bisection and otherwise returns the same
+    default time as uniform_to_default_time in the helpers module. """
+
+    if u == 0.0:
+        return 99999.0
+
+    if u == 1.0:
+        return 0.0
+
+    # Find the first point with a survival probability below u
+    lo = 0
+    hi = num_points
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if v[mid] < u:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    if lo == 0 or lo == num_points:
+        # No bracketing interval so use the first and last points
+        i1 = num_points - 1
+        i2 = 0
+    else:
+        i1 = lo - 1
+        i2 = lo
+
+    log_u = np.log(u)
+    tau = (t[i1] * (log_v[i2] - log_u) + t[i2] * (log_u - log_v[i1])) \
+        / (log_v[i2] - log_v[i1])
+    return tau
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _default_times_from_gaussians(g, times, values, num_points, antithetic):
+    """ Convert a matrix of correlated Gaussian random variables with one row
+    per credit and one column per trial into default times in parallel over
+    the trials using u = 1 - N(g). If antithetic is set the default times
+    implied by 1-u are appended as a second block of columns. """
+
+    num_credits = g.shape[0]
+    num_trials = g.shape[1]
+    log_values = np.log(values)
+
+    if antithetic:
+        tau = np.empty((num_credits, 2 * num_trials))
+    else:
+        tau = np.empty((num_credits, num_trials))
+
+    for iTrial in prange(num_trials):
+        for iCredit in range(0, num_credits):
+            n = num_points[iCredit]
+            u1 = 1.0 - N(g[iCredit, iTrial])
+            tau[iCredit, iTrial] = \
+                _uniform_to_default_time(u1, times[iCredit], values[iCredit],
+                                         log_values[iCredit], n)
+
+            if antithetic:
+                u2 = 1.0 - u1
+                tau[iCredit, num_trials + iTrial] = \
+                    _uniform_to_default_time(u2, times[iCredit],
+                                             values[iCredit],
+                                             log_values[iCredit], n)
+
+    return tau
+
 ###############################################################################
 
 
@@ -19,7 +119,9 @@ def default_times_gc(issuer_curves,
                      num_trials,
                      seed):
     """ Generate a matrix of default times by credit and trial using a
-    Gaussian copula model using a full rank correlation matrix. """
+    Gaussian copula model using a full rank correlation matrix. The default
+    times implied by the antithetic draws are in the second num_trials
+    columns. """
 
     np.random.seed(seed)
     num_credits = len(issuer_curves)
@@ -27,21 +129,61 @@ def default_times_gc(issuer_curves,
     c = np.linalg.cholesky(correlationMatrix)
     y = np.dot(c, x)
 
-    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+    times, values, num_points = _survival_matrix(issuer_curves)
+    corrTimes = _default_times_from_gaussians(y, times, values, num_points,
+                                              True)
+    return corrTimes
 
-    for iCredit in range(0, num_credits):
-        issuer_curve = issuer_curves[iCredit]
-        for iTrial in range(0, num_trials):
-            g = y[iCredit, iTrial]
-            u1 = 1.0 - N(g)
-            u2 = 1.0 - u1
-            times = issuer_curve._times
-            values = issuer_curve._values
-            t1 = uniform_to_default_time(u1, times, values)
-            t2 = uniform_to_default_time(u2, times, values)
-            corrTimes[iCredit, iTrial] = t1
-            corrTimes[iCredit, num_trials + iTrial] = t2
+###############################################################################
 
-    return corrTimes
 
-##########################################################################
+def default_times_gc_chunks(issuer_curves,
+                            correlationMatrix,
+                            num_trials,
+                            seed,
+                            chunk_size: int = 10000,
+                            use_sobol: bool = False,
+                            antithetic: bool = True):
+    """ Generator of the default times of a Gaussian copula model that
+    returns the trials in chunks of at most chunk_size draws so that the
+    memory used stays bounded when the number of trials is large. Each chunk
+    is a matrix of default times by credit and trial. If antithetic is set
+    the default times implied by the antithetic draws of a chunk follow its
+    own draws so a chunk has twice as many columns as draws. The draws are
+    either pseudo random numbers from the seed or points of a Sobol sequence
+    which continues from one chunk to the next and ignores the seed. """
+
+    num_credits = len(issuer_curves)
+
+    if num_trials < 1:
+        raise FinError("Number of trials must be at least one.")
+
+    if chunk_size < 1:
+        raise FinError("Chunk size must be at least one.")
+
+    if use_sobol and num_credits > len(sArr) + 1:
+        raise FinError("Too many credits for the Sobol sequence.")
+
+    c = np.linalg.cholesky(correlationMatrix)
+    times, values, num_points = _survival_matrix(issuer_curves)
+
+    np.random.seed(seed)
+    start = 0
+
+    while start < num_trials:
+
+        n = min(chunk_size, num_trials - start)
+
+        if use_sobol:
+            x = get_gaussian_sobol(n, num_credits, start).T
+        else:
+            x = np.random.normal(0.0, 1.0, size=(num_credits, n))
+
+        y = np.dot(c, x)
+
+        yield _default_times_from_gaussians(y, times, values, num_points,
+                                            antithetic)
+
+        start += n
+
+###############################################################################
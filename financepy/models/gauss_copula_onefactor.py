@@ -2,16 +2,17 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from numba import njit, float64, int64
+from numba import njit, prange, float64, int64
 import numpy as np
 
 ##########################################################################
 
-from ..utils.math import norminvcdf, N, INVROOT2PI
+from ..utils.math import norminvcdf, N, n_vect, INVROOT2PI
 from ..utils.error import FinError
 from .loss_dbn_builder import indep_loss_dbn_recursion_gcd
 from .loss_dbn_builder import indep_loss_dbn_heterogeneous_adj_binomial
 from .loss_dbn_builder import portfolio_gcd
+from .gauss_copula_lhp import tr_surv_prob_lhp
 
 ###############################################################################
 
@@ -391,3 +392,500 @@ def tranche_surv_prob_adj_binomial(k1,
     return q
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def base_tranche_surv_probs(strikes,
+                            survival_probabilities,
+                            recovery_rates,
+                            beta,
+                            num_integration_steps,
+                            model):
+    """ Get the survival probabilities of the base tranches [0, K] for a
+    ladder of strikes K in the one-factor GC model with the same beta for all
+    credits. The loss distribution or its conditional moments are calculated
+    once and shared by all of the strikes. The model is 1 for the full
+    recursion, 2 for the adjusted binomial, 3 for the Gaussian fit and 4 for
+    the large homogeneous portfolio. For each strike this returns the value
+    of the tranche survival probability function of the same model. """
+
+    num_credits = len(survival_probabilities)
+    num_strikes = len(strikes)
+
+    beta_vector = np.zeros(num_credits)
+    for iCredit in range(0, num_credits):
+        beta_vector[iCredit] = beta
+
+    default_probs = np.zeros(num_credits)
+    for iCredit in range(0, num_credits):
+        default_probs[iCredit] = 1.0 - survival_probabilities[iCredit]
+
+    trancheEL = np.zeros(num_strikes)
+
+    if model == 1:
+
+        commonRecoveryFlag = 1
+
+        lossAmounts = np.zeros(num_credits)
+        for iCredit in range(0, num_credits):
+            lossAmounts[iCredit] = (1.0 - recovery_rates[iCredit]) / num_credits
+            if lossAmounts[iCredit] != lossAmounts[0]:
+                commonRecoveryFlag = 0
+
+        if beta > 0.8:
+            num_integration_steps *= 2
+
+        if commonRecoveryFlag == 1:
+            gcd = lossAmounts[0]
+        else:
+            gcd = portfolio_gcd(lossAmounts)
+
+        lossUnits = np.zeros(num_credits)
+        numLossUnits = 1.0
+
+        for iCredit in range(0, num_credits):
+            lossUnits[iCredit] = lossAmounts[iCredit] / gcd
+            numLossUnits = numLossUnits + lossUnits[iCredit]
+
+        lossDbn = loss_dbn_recursion_gcd(num_credits,
+                                         default_probs,
+                                         lossUnits,
+                                         beta_vector,
+                                         num_integration_steps)
+
+        for iStrike in range(0, num_strikes):
+            k = strikes[iStrike]
+            for iLossUnit in range(0, int(numLossUnits)):
+                loss = iLossUnit * gcd
+                trancheLoss = min(loss, k) - min(loss, 0.0)
+                trancheEL[iStrike] += trancheLoss * lossDbn[iLossUnit]
+
+    elif model == 2:
+
+        totalLoss = 0.0
+        for iCredit in range(0, num_credits):
+            totalLoss += (1.0 - recovery_rates[iCredit])
+        totalLoss /= num_credits
+
+        avgLoss = totalLoss / num_credits
+
+        loss_ratio = np.zeros(num_credits)
+        for iCredit in range(0, num_credits):
+            loss_ratio[iCredit] = (
+                1.0 - recovery_rates[iCredit]) / num_credits / avgLoss
+
+        lossDbn = loss_dbn_hetero_adj_binomial(num_credits,
+                                               default_probs,
+                                               loss_ratio,
+                                               beta_vector,
+                                               num_integration_steps)
+
+        for iStrike in range(0, num_strikes):
+            k = strikes[iStrike]
+            for iLossUnit in range(0, num_credits + 1):
+                loss = iLossUnit * avgLoss
+                trancheLoss = min(loss, k) - min(loss, 0.0)
+                trancheEL[iStrike] += trancheLoss * lossDbn[iLossUnit]
+
+    elif model == 3:
+
+        dz = 2.0 * abs(minZ) / num_integration_steps
+        z = minZ
+
+        thresholds = np.zeros(num_credits)
+        losses = np.zeros(num_credits)
+
+        for iCredit in range(0, num_credits):
+            thresholds[iCredit] = norminvcdf(default_probs[iCredit])
+            losses[iCredit] = (1.0 - recovery_rates[iCredit]) / num_credits
+
+        denom = np.sqrt(1.0 - beta * beta)
+
+        for _ in range(0, num_integration_steps):
+
+            mu = 0.0
+            var = 0.0
+
+            for iCredit in range(0, num_credits):
+                argz = (thresholds[iCredit] - beta * z) / denom
+                condprob = N(argz)
+                mu += condprob * losses[iCredit]
+                var += (losses[iCredit]**2) * condprob * (1.0 - condprob)
+
+            sigma = np.sqrt(var)
+            gaussWt = np.exp(-(z**2) / 2.0)
+
+            for iStrike in range(0, num_strikes):
+                k = strikes[iStrike]
+                if k > 0.0:
+                    el = gauss_approx_tranche_loss(0.0, k, mu, sigma)
+                    trancheEL[iStrike] += el * gaussWt
+
+            z += dz
+
+        for iStrike in range(0, num_strikes):
+            trancheEL[iStrike] *= INVROOT2PI * dz
+
+    elif model == 4:
+
+        q = np.zeros(num_strikes)
+        for iStrike in range(0, num_strikes):
+            q[iStrike] = tr_surv_prob_lhp(0.0, strikes[iStrike], num_credits,
+                                          survival_probabilities,
+                                          recovery_rates, beta)
+        return q
+
+    else:
+        raise FinError("Unknown loss distribution model.")
+
+    q = np.zeros(num_strikes)
+    for iStrike in range(0, num_strikes):
+        k = strikes[iStrike]
+        if k > 0.0:
+            q[iStrike] = 1.0 - trancheEL[iStrike] / k
+
+    return q
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _quadrature_nodes(num_integration_steps):
+    """ The market factor values and weights of the quadrature used by all of
+    the loss distribution builders. The factor values are generated in the
+    same way as in the serial builders so that the results agree. """
+
+    dz = 2.0 * abs(minZ) / num_integration_steps
+    z = np.zeros(num_integration_steps)
+    wts = np.zeros(num_integration_steps)
+
+    zz = minZ
+    for iStep in range(0, num_integration_steps):
+        z[iStep] = zz
+        wts[iStep] = np.exp(-(zz*zz)/2.0) * INVROOT2PI * dz
+        zz += dz
+
+    return z, wts
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cond_default_probs(thresholds, beta_vector, z):
+    """ Default probabilities of the credits conditional on the value z of
+    the market factor. """
+
+    num_credits = len(thresholds)
+    condDefaultProbs = np.zeros(num_credits)
+
+    for iCredit in range(0, num_credits):
+        beta = beta_vector[iCredit]
+        denom = np.sqrt(1.0 - beta * beta)
+        argz = (thresholds[iCredit] - beta * z) / denom
+        condDefaultProbs[iCredit] = N(argz)
+
+    return condDefaultProbs
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def loss_dbn_recursion_gcd_parallel(num_credits,
+                                    default_probs,
+                                    lossUnits,
+                                    beta_vector,
+                                    num_integration_steps):
+    """ Full construction of the loss distribution of a portfolio of credits
+    where losses have been calculate as number of units based on the GCD. The
+    conditional loss distributions at the quadrature nodes of the market
+    factor are built in parallel. Agrees with loss_dbn_recursion_gcd. """
+
+    if len(default_probs) != num_credits:
+        raise FinError("Default probability length must equal num credits.")
+
+    if len(lossUnits) != num_credits:
+        raise FinError("Loss units length must equal num credits.")
+
+    if len(beta_vector) != num_credits:
+        raise FinError("Beta vector length must equal num credits.")
+
+    numLossUnits = 1
+    for i in range(0, len(lossUnits)):
+        numLossUnits += int(lossUnits[i])
+
+    thresholds = np.zeros(num_credits)
+    for iCredit in range(0, int(num_credits)):
+        thresholds[iCredit] = norminvcdf(default_probs[iCredit])
+
+    z, wts = _quadrature_nodes(num_integration_steps)
+    condDbns = np.zeros((num_integration_steps, numLossUnits))
+
+    for iStep in prange(num_integration_steps):
+        condDefaultProbs = _cond_default_probs(thresholds, beta_vector,
+                                               z[iStep])
+        condDbns[iStep] = indep_loss_dbn_recursion_gcd(num_credits,
+                                                       condDefaultProbs,
+                                                       lossUnits)
+
+    uncondLossDbn = np.zeros(numLossUnits)
+    for iStep in range(0, num_integration_steps):
+        for iLossUnit in range(0, numLossUnits):
+            uncondLossDbn[iLossUnit] += condDbns[iStep, iLossUnit] * wts[iStep]
+
+    return uncondLossDbn
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def loss_dbn_hetero_adj_binomial_parallel(num_credits,
+                                          default_probs,
+                                          loss_ratio,
+                                          beta_vector,
+                                          num_integration_steps):
+    """ Get the portfolio loss distribution using the adjusted binomial
+    approximation to the conditional loss distribution with the conditional
+    distributions at the quadrature nodes built in parallel. Agrees with
+    loss_dbn_hetero_adj_binomial. """
+
+    numLossUnits = num_credits + 1
+
+    thresholds = np.zeros(num_credits)
+    for iCredit in range(0, num_credits):
+        thresholds[iCredit] = norminvcdf(default_probs[iCredit])
+
+    z, wts = _quadrature_nodes(num_integration_steps)
+    condDbns = np.zeros((num_integration_steps, numLossUnits))
+
+    for iStep in prange(num_integration_steps):
+        condDefaultProbs = _cond_default_probs(thresholds, beta_vector,
+                                               z[iStep])
+        condDbns[iStep] = \
+            indep_loss_dbn_heterogeneous_adj_binomial(num_credits,
+                                                      condDefaultProbs,
+                                                      loss_ratio)
+
+    uncondLossDbn = np.zeros(numLossUnits)
+    for iStep in range(0, num_integration_steps):
+        for iLossUnit in range(0, numLossUnits):
+            uncondLossDbn[iLossUnit] += condDbns[iStep, iLossUnit] * wts[iStep]
+
+    return uncondLossDbn
+
+###############################################################################
+
+
+def loss_dbn_fft(num_credits,
+                 default_probs,
+                 lossUnits,
+                 beta_vector,
+                 num_integration_steps):
+    """ Loss distribution of a heterogeneous portfolio of credits with losses
+    in integer units based on the GCD. The conditional distribution at each
+    quadrature node is the product of the generating functions of the credit
+    losses. These are multiplied in pairs using fast Fourier transforms so
+    the cost grows as N log(N)^2 rather than as N^2 for the recursion which
+    makes it suited to portfolios of thousands of credits. All nodes are
+    handled together in each step. The result agrees with the recursion to
+    within the round-off of the transforms. """
+
+    default_probs = np.asarray(default_probs, dtype=np.float64)
+    beta_vector = np.asarray(beta_vector, dtype=np.float64)
+    lossUnits = np.asarray(lossUnits, dtype=np.float64)
+
+    if len(default_probs) != num_credits:
+        raise FinError("Default probability length must equal num credits.")
+
+    if len(lossUnits) != num_credits:
+        raise FinError("Loss units length must equal num credits.")
+
+    if len(beta_vector) != num_credits:
+        raise FinError("Beta vector length must equal num credits.")
+
+    small = 1e-10
+    units = (lossUnits + small).astype(np.int64)
+    numLossUnits = 1 + int(np.sum(lossUnits.astype(np.int64)))
+
+    thresholds = np.array([norminvcdf(p) for p in default_probs])
+    z, wts = _quadrature_nodes(num_integration_steps)
+
+    denom = np.sqrt(1.0 - beta_vector * beta_vector)
+    argz = (thresholds[None, :] - beta_vector[None, :] * z[:, None]) / denom
+    condDefaultProbs = n_vect(argz)
+
+    # One polynomial per credit and quadrature node
+    maxUnit = np.max(units)
+    polys = np.zeros((num_integration_steps, num_credits, maxUnit + 1))
+    polys[:, :, 0] = 1.0 - condDefaultProbs
+    polys[:, np.arange(num_credits), units] += condDefaultProbs
+
+    while polys.shape[1] > 1:
+
+        if polys.shape[1] % 2 == 1:
+            one = np.zeros((num_integration_steps, 1, polys.shape[2]))
+            one[:, :, 0] = 1.0
+            polys = np.concatenate((polys, one), axis=1)
+
+        length = 2 * polys.shape[2] - 1
+        num_fft = 1 << int(np.ceil(np.log2(length)))
+
+        fa = np.fft.rfft(polys[:, 0::2, :], num_fft, axis=2)
+        fb = np.fft.rfft(polys[:, 1::2, :], num_fft, axis=2)
+        polys = np.fft.irfft(fa * fb, num_fft, axis=2)[:, :, 0:length]
+
+        # The highest powers of merged polynomials may never be reached
+        polys = polys[:, :, 0:min(length, numLossUnits)]
+
+    condDbns = np.zeros((num_integration_steps, numLossUnits))
+    n = min(polys.shape[2], numLossUnits)
+    condDbns[:, 0:n] = polys[:, 0, 0:n]
+    condDbns = np.maximum(condDbns, 0.0)
+
+    uncondLossDbn = np.dot(wts, condDbns)
+    return uncondLossDbn
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cumulant_fn(theta, probs, units):
+    """ Cumulant generating function of the loss in units of a portfolio of
+    independent credits and its first two derivatives. """
+
+    k0 = 0.0
+    k1 = 0.0
+    k2 = 0.0
+
+    for iCredit in range(0, len(probs)):
+        p = probs[iCredit]
+        a = theta * units[iCredit]
+        if a > 0.0:
+            e = np.exp(-a)
+            h = p + (1.0 - p) * e
+            k0 += a + np.log(h)
+            q = p / h
+        else:
+            e = np.exp(a)
+            h = 1.0 - p + p * e
+            k0 += np.log(h)
+            q = p * e / h
+
+        k1 += q * units[iCredit]
+        k2 += q * (1.0 - q) * units[iCredit] * units[iCredit]
+
+    return k0, k1, k2
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _saddle_point_tail_prob(k, probs, units, maxLoss):
+    """ Lugannani-Rice saddle point approximation with the lattice continuity
+    correction of Daniels to the probability that the loss of a portfolio of
+    independent credits is at least k units. """
+
+    if k <= 0:
+        return 1.0
+
+    if k > maxLoss:
+        return 0.0
+
+    x = k - 0.5
+
+    # Newton iteration for the saddle point safeguarded by bisection
+    theta = 0.0
+    lo = -1e10
+    hi = 1e10
+
+    for _ in range(0, 100):
+        k0, k1, k2 = _cumulant_fn(theta, probs, units)
+        f = k1 - x
+
+        if abs(f) < 1e-10:
+            break
+
+        if f > 0.0:
+            hi = theta
+        else:
+            lo = theta
+
+        step = f / max(k2, 1e-300)
+        thetaNew = theta - step
+
+        if thetaNew <= lo or thetaNew >= hi:
+            if lo > -1e10 and hi < 1e10:
+                thetaNew = 0.5 * (lo + hi)
+            else:
+                thetaNew = theta - 2.0 * np.sign(f)
+
+        theta = thetaNew
+
+    k0, k1, k2 = _cumulant_fn(theta, probs, units)
+
+    w2 = 2.0 * (theta * x - k0)
+    if abs(theta) < 1e-6 or w2 <= 0.0:
+        # Limit at the mean using the third cumulant
+        k3 = 0.0
+        for iCredit in range(0, len(probs)):
+            p = probs[iCredit]
+            k3 += p * (1.0 - p) * (1.0 - 2.0 * p) * units[iCredit]**3
+        return 0.5 - k3 / (6.0 * max(k2, 1e-300)**1.5) * INVROOT2PI
+
+    w = np.sign(theta) * np.sqrt(w2)
+    u = 2.0 * np.sinh(0.5 * theta) * np.sqrt(k2)
+    tailProb = 1.0 - N(w) - np.exp(-0.5 * w * w) * INVROOT2PI * \
+        (1.0 / w - 1.0 / u)
+
+    return min(max(tailProb, 0.0), 1.0)
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def loss_cdf_saddle_point(loss_levels,
+                          default_probs,
+                          lossUnits,
+                          beta_vector,
+                          num_integration_steps):
+    """ Probability that the loss of a portfolio of credits is at most each
+    of the loss levels where the loss levels and credit losses are in integer
+    units based on the GCD. The conditional probabilities at each quadrature
+    node are found with a saddle point approximation in parallel over the
+    nodes. The cost grows with the number of credits times the number of
+    loss levels and not with the number of loss units so this is suited to
+    very large portfolios when the distribution is needed at a few levels
+    such as tranche attachment points. """
+
+    num_credits = len(default_probs)
+    num_levels = len(loss_levels)
+
+    small = 1e-10
+    units = np.zeros(num_credits)
+    maxLoss = 0
+    for iCredit in range(0, num_credits):
+        units[iCredit] = (int)(lossUnits[iCredit] + small)
+        maxLoss += int(units[iCredit])
+
+    thresholds = np.zeros(num_credits)
+    for iCredit in range(0, num_credits):
+        thresholds[iCredit] = norminvcdf(default_probs[iCredit])
+
+    z, wts = _quadrature_nodes(num_integration_steps)
+    condCdfs = np.zeros((num_integration_steps, num_levels))
+
+    for iStep in prange(num_integration_steps):
+        condDefaultProbs = _cond_default_probs(thresholds, beta_vector,
+                                               z[iStep])
+        for iLevel in range(0, num_levels):
+            k = int(np.floor(loss_levels[iLevel] + small)) + 1
+            condCdfs[iStep, iLevel] = 1.0 - \
+                _saddle_point_tail_prob(k, condDefaultProbs, units, maxLoss)
+
+    uncondCdf = np.zeros(num_levels)
+    for iStep in range(0, num_integration_steps):
+        for iLevel in range(0, num_levels):
+            uncondCdf[iLevel] += condCdfs[iStep, iLevel] * wts[iStep]
+
+    return uncondCdf
+
+###############################################################################
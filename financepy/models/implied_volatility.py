@@ -0,0 +1,424 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from enum import Enum
+from math import erfc
+
+import numpy as np
+from numba import njit, prange
+
+from ..utils.error import FinError
+from ..utils.global_types import OptionTypes
+from ..utils.math import norminvcdf
+
+###############################################################################
+# Batch implied volatility solvers for the Black and Bachelier models. Each
+# price is mapped to the normalised price of an out of the money option which
+# is inverted with third order Householder steps started from the two branch
+# initial guess of Jaeckel's "By Implication" (2006). These steps are kept
+# inside a bracket of the root. Failures are reported per option.
+###############################################################################
+
+INV_ROOT2 = 0.7071067811865475
+INV_ROOT2PI = 0.3989422804014327
+TINY = 1e-300
+
+###############################################################################
+
+
+class ImpliedVolStatus(Enum):
+    CONVERGED = 0
+    BELOW_INTRINSIC = 1
+    ABOVE_MAXIMUM = 2
+    NOT_CONVERGED = 3
+    INVALID_INPUTS = 4
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _norm_cdf(x):
+    """ Normal CDF to machine precision using the complementary error
+    function. """
+
+    return 0.5 * erfc(-x * INV_ROOT2)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _normalised_black_otm(x, s):
+    """ Undiscounted Black price of an out of the money call divided by the
+    square root of forward times strike where x = ln(F/K) <= 0 and s is the
+    total volatility sigma * sqrt(T). """
+
+    if s <= 0.0:
+        return 0.0
+
+    h = x / s
+    return np.exp(0.5 * x) * _norm_cdf(h + 0.5 * s) - \
+        np.exp(-0.5 * x) * _norm_cdf(h - 0.5 * s)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _householder_step(f, f1, h2, h3):
+    """ Third order Householder step for the root of f given its first
+    derivative f1 and the ratios h2 = f''/f' and h3 = f'''/f'. """
+
+    nu = -f / f1
+    return nu * (1.0 + 0.5 * h2 * nu) / (1.0 + nu * (h2 + h3 * nu / 6.0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _black_otm_total_vol(x, beta, tol, max_iterations):
+    """ Solve for the total volatility s of an out of the money call with
+    log-moneyness x <= 0 and normalised price beta. Returns s and the status
+    value. Below the inflection point s_c = sqrt(2|x|) the log of the price
+    is inverted as it is close to linear in 1/s there. """
+
+    b_max = np.exp(0.5 * x)
+
+    # Time values which underflow are treated as zero
+    if beta <= TINY:
+        return 0.0, ImpliedVolStatus.CONVERGED.value
+
+    if beta >= b_max:
+        return 0.0, ImpliedVolStatus.ABOVE_MAXIMUM.value
+
+    ax = -x
+    s_c = np.sqrt(2.0 * ax)
+
+    if ax == 0.0:
+        # At the money the price inverts in closed form
+        b_c = 0.0
+        s = 2.0 * norminvcdf(0.5 * (1.0 + beta))
+    else:
+        b_c = _normalised_black_otm(x, s_c)
+
+        if b_c <= 0.0:
+            return 0.0, ImpliedVolStatus.NOT_CONVERGED.value
+
+        if beta < b_c:
+            s = np.sqrt(2.0 * x * x / (ax - 4.0 * np.log(beta / b_c)))
+        else:
+            p = (b_max - beta) / (b_max - b_c) * _norm_cdf(-0.5 * s_c)
+            s = -2.0 * norminvcdf(p)
+
+    use_log = beta < b_c
+    lo = 0.0
+    hi = 0.0
+    has_hi = False
+
+    for _ in range(0, max_iterations):
+
+        b = _normalised_black_otm(x, s)
+
+        if b > beta:
+            hi = min(hi, s) if has_hi else s
+            has_hi = True
+        else:
+            lo = max(lo, s)
+
+        # Vega and the ratios of its derivatives to itself
+        b1 = INV_ROOT2PI * np.exp(-0.5 * (x * x / (s * s) + 0.25 * s * s))
+        h2 = x * x / (s * s * s) - 0.25 * s
+        h3 = h2 * h2 - 3.0 * x * x / (s * s * s * s) - 0.25
+
+        if use_log and b > 0.0 and b1 > 0.0:
+            g1 = b1 / b
+            g2 = g1 * h2 - g1 * g1
+            g3 = g1 * h3 - 3.0 * g1 * g1 * h2 + 2.0 * g1 * g1 * g1
+            ds = _householder_step(np.log(b / beta), g1, g2 / g1, g3 / g1)
+        elif b1 > 0.0:
+            ds = _householder_step(b - beta, b1, h2, h3)
+        else:
+            ds = -s
+
+        s_new = s + ds
+
+        if abs(ds) <= tol * max(s, 1.0):
+            return s_new, ImpliedVolStatus.CONVERGED.value
+
+        # Bisect or expand the bracket if the step leaves it
+        if s_new <= lo or (has_hi and s_new >= hi):
+            if has_hi:
+                s_new = 0.5 * (lo + hi)
+            else:
+                s_new = 2.0 * max(s, lo)
+
+        s = s_new
+
+    return s, ImpliedVolStatus.NOT_CONVERGED.value
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bachelier_otm_total_vol(x, beta, tol, max_iterations):
+    """ Solve for the total normal volatility s of an out of the money call
+    with moneyness x = F - K <= 0 and undiscounted price beta. Returns s and
+    the status value. Deep out of the money the log of the price is inverted
+    instead of the price. """
+
+    if beta <= TINY * max(-x, 1.0):
+        return 0.0, ImpliedVolStatus.CONVERGED.value
+
+    if x == 0.0:
+        return beta / INV_ROOT2PI, ImpliedVolStatus.CONVERGED.value
+
+    # The price divided by |x| is u(w) = phi(w)/w - N(-w) where w = |x|/s so
+    # the guess uses its expansion for small w or its asymptotic form
+    ax = -x
+    u = beta / ax
+
+    if u > 0.1:
+        w = INV_ROOT2PI / (u + 0.5)
+    else:
+        w = 2.0
+        for _ in range(0, 3):
+            w = np.sqrt(max(-2.0 * (np.log(beta) - np.log(ax * INV_ROOT2PI)
+                                    + 3.0 * np.log(w)), 1e-4))
+
+    s = ax / w
+    use_log = u < 0.1
+    lo = 0.0
+    hi = 0.0
+    has_hi = False
+
+    for _ in range(0, max_iterations):
+
+        h = x / s
+        b1 = INV_ROOT2PI * np.exp(-0.5 * h * h)
+        b = x * _norm_cdf(h) + s * b1
+
+        if b > beta:
+            hi = min(hi, s) if has_hi else s
+            has_hi = True
+        else:
+            lo = max(lo, s)
+
+        h2 = x * x / (s * s * s)
+        h3 = h2 * h2 - 3.0 * x * x / (s * s * s * s)
+
+        if use_log and b > 0.0 and b1 > 0.0:
+            g1 = b1 / b
+            g2 = g1 * h2 - g1 * g1
+            g3 = g1 * h3 - 3.0 * g1 * g1 * h2 + 2.0 * g1 * g1 * g1
+            ds = _householder_step(np.log(b / beta), g1, g2 / g1, g3 / g1)
+        elif b1 > 0.0:
+            ds = _householder_step(b - beta, b1, h2, h3)
+        else:
+            ds = -s
+
+        s_new = s + ds
+
+        if abs(ds) <= tol * max(s, ax):
+            return s_new, ImpliedVolStatus.CONVERGED.value
+
+        # Bisect or expand the bracket if the step leaves it
+        if s_new <= lo or (has_hi and s_new >= hi):
+            if has_hi:
+                s_new = 0.5 * (lo + hi)
+            else:
+                s_new = 2.0 * max(s, lo)
+
+        s = s_new
+
+    return s, ImpliedVolStatus.NOT_CONVERGED.value
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _implied_vols(prices, forwards, strikes, texps, dfs, option_type_values,
+                  normal, tol, max_iterations):
+    """ Solve for the Black or, if normal is set, the Bachelier volatility of
+    each option in parallel. Calls are flipped to puts and vice versa using
+    put-call parity so that the out of the money option is inverted. Returns
+    the volatilities and the status value of each option. Volatilities which
+    could not be found are NaN. """
+
+    num_opts = prices.size
+    vols = np.full(num_opts, np.nan)
+    status = np.zeros(num_opts, dtype=np.int64)
+
+    for i in prange(num_opts):
+
+        f = forwards[i]
+        k = strikes[i]
+        t = texps[i]
+        df = dfs[i]
+
+        if option_type_values[i] == OptionTypes.EUROPEAN_CALL.value:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        valid = t > 0.0 and df > 0.0 and prices[i] >= 0.0
+
+        if not normal:
+            valid = valid and f > 0.0 and k > 0.0
+
+        if not valid:
+            status[i] = ImpliedVolStatus.INVALID_INPUTS.value
+            continue
+
+        undiscounted = prices[i] / df
+
+        # Remove the intrinsic value of an in the money option
+        intrinsic = max(phi * (f - k), 0.0)
+        time_value = undiscounted - intrinsic
+
+        if time_value < 0.0:
+            status[i] = ImpliedVolStatus.BELOW_INTRINSIC.value
+            continue
+
+        if normal:
+            x = -abs(f - k)
+            s, st = _bachelier_otm_total_vol(x, time_value, tol,
+                                             max_iterations)
+        else:
+            root_fk = np.sqrt(f * k)
+            x = -abs(np.log(f / k))
+            s, st = _black_otm_total_vol(x, time_value / root_fk, tol,
+                                         max_iterations)
+
+        status[i] = st
+
+        if st == ImpliedVolStatus.CONVERGED.value or \
+                st == ImpliedVolStatus.NOT_CONVERGED.value:
+            vols[i] = s / np.sqrt(t)
+
+    return vols, status
+
+###############################################################################
+
+
+def _option_type_values(option_types):
+    """ Convert an option type, a list of option types or an array of option
+    type values into an array of European call and put values. """
+
+    if isinstance(option_types, OptionTypes):
+        values = np.array(option_types.value, dtype=np.int64)
+    elif isinstance(option_types, list):
+        values = np.array([opt.value for opt in option_types], dtype=np.int64)
+    else:
+        values = np.array(option_types, dtype=np.int64)
+
+    valid = (values == OptionTypes.EUROPEAN_CALL.value) | \
+        (values == OptionTypes.EUROPEAN_PUT.value)
+
+    if not np.all(valid):
+        raise FinError("Option types must be European calls or puts.")
+
+    return values
+
+###############################################################################
+
+
+def _solve_implied_vols(prices, forwards, strikes, texps, dfs, option_types,
+                        normal, tolerance, max_iterations):
+    """ Broadcast the inputs against each other, solve and reshape the
+    volatilities and the status values to the broadcast shape. """
+
+    if tolerance <= 0.0:
+        raise FinError("Tolerance must be positive.")
+
+    if max_iterations < 1:
+        raise FinError("Maximum number of iterations must be at least one.")
+
+    option_type_values = _option_type_values(option_types)
+
+    arrays = np.broadcast_arrays(np.asarray(prices, dtype=np.float64),
+                                 np.asarray(forwards, dtype=np.float64),
+                                 np.asarray(strikes, dtype=np.float64),
+                                 np.asarray(texps, dtype=np.float64),
+                                 np.asarray(dfs, dtype=np.float64),
+                                 option_type_values)
+
+    shape = arrays[0].shape
+    flat = [np.ascontiguousarray(a).ravel() for a in arrays]
+
+    vols, status = _implied_vols(flat[0], flat[1], flat[2], flat[3], flat[4],
+                                 flat[5], normal, float(tolerance),
+                                 int(max_iterations))
+
+    return vols.reshape(shape), status.reshape(shape)
+
+###############################################################################
+
+
+def black_implied_volatilities(prices,
+                               forwards,
+                               strikes,
+                               texps,
+                               dfs,
+                               option_types,
+                               tolerance: float = 1e-12,
+                               max_iterations: int = 20):
+    """ Solve for the Black (lognormal forward) implied volatilities of a
+    whole chain of European options at once. The prices, forwards, strikes,
+    times to expiry, discount factors to payment and option types are numbers
+    or arrays which broadcast against each other. The option types are one
+    OptionTypes, a list of them or an array of their values. Returns an array
+    of volatilities and an array of ImpliedVolStatus values. No error is
+    raised if an option cannot be solved. Its volatility is NaN and its
+    status says why, unless it merely failed to converge, in which case the
+    last iterate is returned. """
+
+    return _solve_implied_vols(prices, forwards, strikes, texps, dfs,
+                               option_types, False, tolerance, max_iterations)
+
+###############################################################################
+
+
+def bachelier_implied_volatilities(prices,
+                                   forwards,
+                                   strikes,
+                                   texps,
+                                   dfs,
+                                   option_types,
+                                   tolerance: float = 1e-12,
+                                   max_iterations: int = 20):
+    """ Solve for the Bachelier (normal) implied volatilities of a whole
+    chain of European options at once. The inputs and outputs are as for
+    black_implied_volatilities except that forwards and strikes may be zero
+    or negative. """
+
+    return _solve_implied_vols(prices, forwards, strikes, texps, dfs,
+                               option_types, True, tolerance, max_iterations)
+
+###############################################################################
+
+
+def bs_implied_volatilities(prices,
+                            stock_prices,
+                            strikes,
+                            texps,
+                            interest_rates,
+                            dividend_yields,
+                            option_types,
+                            tolerance: float = 1e-12,
+                            max_iterations: int = 20):
+    """ Solve for the Black-Scholes implied volatilities of a chain of
+    European options on a stock with continuously compounded interest rates
+    and dividend yields to expiry. This maps the inputs to forwards and
+    discount factors and calls black_implied_volatilities. """
+
+    texps = np.asarray(texps, dtype=np.float64)
+    r = np.asarray(interest_rates, dtype=np.float64)
+    q = np.asarray(dividend_yields, dtype=np.float64)
+
+    forwards = np.asarray(stock_prices, dtype=np.float64) * \
+        np.exp((r - q) * texps)
+    dfs = np.exp(-r * texps)
+
+    return black_implied_volatilities(prices, forwards, strikes, texps, dfs,
+                                      option_types, tolerance, max_iterations)
+
+###############################################################################
@@ -112,27 +112,27 @@ def indep_loss_dbn_recursion_gcd(num_credits,
     for i in range(0, len(lossUnits)):
         numLossUnits += int(lossUnits[i])
 
-    prevDbn = np.zeros(numLossUnits)
-    prevDbn[0] = 1.0
+    # The distribution is updated in place from the highest loss downwards
+    # and only up to the largest loss that can have occurred so far
+    dbn = np.zeros(numLossUnits)
+    dbn[0] = 1.0
 
     small = 1e-10
-    nextDbn = np.zeros(numLossUnits)
+    maxLossUnit = 0
 
     for iCredit in range(0, num_credits):
 
         p = condDefaultProbs[iCredit]
         loss = (int)(lossUnits[iCredit] + small)
+        maxLossUnit = min(maxLossUnit + loss, numLossUnits - 1)
 
-        for iLossUnit in range(0, loss):
-            nextDbn[iLossUnit] = prevDbn[iLossUnit] * (1.0 - p)
+        for iLossUnit in range(maxLossUnit, loss - 1, -1):
+            dbn[iLossUnit] = dbn[iLossUnit - loss] * \
+                p + dbn[iLossUnit] * (1.0 - p)
 
-        for iLossUnit in range(loss, numLossUnits):
-            nextDbn[iLossUnit] = prevDbn[iLossUnit - loss] * \
-                p + prevDbn[iLossUnit] * (1.0 - p)
+        for iLossUnit in range(0, min(loss, numLossUnits)):
+            dbn[iLossUnit] = dbn[iLossUnit] * (1.0 - p)
 
-        for iLossUnit in range(0, numLossUnits):
-            prevDbn[iLossUnit] = nextDbn[iLossUnit]
-
-    return nextDbn
+    return dbn
 
 ##########################################################################
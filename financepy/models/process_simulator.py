@@ -5,7 +5,7 @@
 from math import sqrt, exp, log
 from enum import Enum
 
-from numba import njit, float64, int64
+from numba import njit, prange, float64, int64
 import numpy as np
 
 from ..utils.error import FinError
@@ -21,6 +21,7 @@ class ProcessTypes(Enum):
     VASICEK = 4
     CEV = 5
     JUMP_DIFFUSION = 6
+    LOCAL_VOL = 7
 
 ###############################################################################
 
@@ -82,6 +83,25 @@ class FinProcessSimulator():
                                   r0, kappa, theta, sigma, scheme.value, seed)
             return paths
 
+        elif process_type == ProcessTypes.LOCAL_VOL:
+            (stock_price, local_vol_surface, scheme) = model_params
+            dt = 1.0 / numAnnSteps
+            num_time_steps = int(t / dt + 0.50)
+            times = np.arange(0, num_time_steps + 1) * dt
+            drifts = np.diff(local_vol_surface._log_forward(times)) / dt
+            paths = get_local_vol_paths(num_paths,
+                                        numAnnSteps,
+                                        t,
+                                        stock_price,
+                                        drifts,
+                                        local_vol_surface._dt,
+                                        local_vol_surface._x_min,
+                                        local_vol_surface._dx,
+                                        local_vol_surface._vols,
+                                        scheme.value,
+                                        seed)
+            return paths
+
         else:
             raise FinError("Unknown process" + str(process_type))
 
@@ -267,6 +287,97 @@ def get_gbm_paths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, see
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def interpolate_local_vol(t, x, dt, x_min, dx, vols):
+    """ Bilinear interpolation of a grid of local volatilities with one row
+    per time t_i = i * dt and one column per log stock price
+    x_j = x_min + j * dx. The grid spacing is uniform so the bracketing
+    points are found without a search. The volatility is flat outside the
+    grid. """
+
+    num_times, num_spots = vols.shape
+
+    u = t / dt
+    if u <= 0.0:
+        i = 0
+        a = 0.0
+    elif u >= num_times - 1:
+        i = num_times - 2
+        a = 1.0
+    else:
+        i = int(u)
+        a = u - i
+
+    u = (x - x_min) / dx
+    if u <= 0.0:
+        j = 0
+        b = 0.0
+    elif u >= num_spots - 1:
+        j = num_spots - 2
+        b = 1.0
+    else:
+        j = int(u)
+        b = u - j
+
+    v0 = (1.0 - b) * vols[i, j] + b * vols[i, j + 1]
+    v1 = (1.0 - b) * vols[i + 1, j] + b * vols[i + 1, j + 1]
+    return (1.0 - a) * v0 + a * v1
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def get_local_vol_paths(num_paths, numAnnSteps, t, stock_price, drifts,
+                        dt_grid, x_min, dx, vols, scheme, seed):
+    """ Simulate stock price paths in a local volatility model using an Euler
+    scheme in the log of the stock price. The drift of each time step is
+    given in drifts and the local volatility at the start of the step is
+    interpolated from a grid as in interpolate_local_vol. The random numbers
+    of each step are drawn together and the paths are then updated in
+    parallel. The FinGBMNumericalScheme sets if antithetic paths are added
+    below the others. """
+
+    np.random.seed(seed)
+    dt = 1.0 / numAnnSteps
+    num_time_steps = int(t / dt + 0.50)
+    sqrt_dt = sqrt(dt)
+
+    if scheme == FinGBMNumericalScheme.NORMAL.value:
+        antithetic = False
+        Sall = np.empty((num_paths, num_time_steps + 1))
+    elif scheme == FinGBMNumericalScheme.ANTITHETIC.value:
+        antithetic = True
+        Sall = np.empty((2 * num_paths, num_time_steps + 1))
+    else:
+        raise FinError("Unknown FinGBMNumericalScheme")
+
+    Sall[:, 0] = stock_price
+
+    for it in range(1, num_time_steps + 1):
+
+        t0 = (it - 1) * dt
+        mu = drifts[it - 1]
+        g1D = np.random.standard_normal(num_paths)
+
+        for ip in prange(num_paths):
+
+            s = Sall[ip, it - 1]
+            v = interpolate_local_vol(t0, log(s), dt_grid, x_min, dx, vols)
+            m = (mu - v * v / 2.0) * dt
+            Sall[ip, it] = s * exp(m + v * sqrt_dt * g1D[ip])
+
+            if antithetic:
+                s = Sall[ip + num_paths, it - 1]
+                v = interpolate_local_vol(t0, log(s), dt_grid, x_min, dx,
+                                          vols)
+                m = (mu - v * v / 2.0) * dt
+                Sall[ip + num_paths, it] = s * exp(m - v * sqrt_dt * g1D[ip])
+
+    return Sall
+
+###############################################################################
+
+
 class FinVasicekNumericalScheme(Enum):
     NORMAL = 1
     ANTITHETIC = 2
@@ -69,6 +69,95 @@ def vol_function_sabr(params, f, k, t):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def vol_function_sabr_grad(params, f, k, t, grad):
+    """ Return the volatility of vol_function_sabr and write its analytical
+    derivatives with respect to alpha, beta, rho and nu into grad. The terms
+    and their derivatives follow the same steps as vol_function_sabr. """
+
+    alpha = params[0]
+    beta = params[1]
+    rho = params[2]
+    nu = params[3]
+
+    if alpha < 1e-10:
+        alpha = 1e-10
+
+    if k <= 0:
+        raise FinError("Strike must be positive")
+
+    if f <= 0:
+        raise FinError("Forward must be positive")
+
+    logfk = np.log(f / k)
+    logfk2 = logfk * logfk
+    b1 = 1.0 - beta
+    d = (f*k)**(0.5 * b1)
+    d_beta = -0.5 * np.log(f*k) * d
+
+    a = b1**2 * alpha**2 / (24.0 * d * d)
+    a_alpha = 2.0 * a / alpha
+    a_beta = -2.0 * b1 * alpha**2 / (24.0 * d * d) - 2.0 * a * d_beta / d
+
+    b = 0.25 * rho * beta * nu * alpha / d
+    b_alpha = 0.25 * rho * beta * nu / d
+    b_beta = 0.25 * rho * nu * alpha / d - b * d_beta / d
+    b_rho = 0.25 * beta * nu * alpha / d
+    b_nu = 0.25 * rho * beta * alpha / d
+
+    c = (2.0 - 3.0*rho**2.0) * nu**2.0 / 24
+    c_rho = -0.25 * rho * nu * nu
+    c_nu = (2.0 - 3.0*rho**2.0) * nu / 12.0
+
+    num = 1.0 + (a + b + c) * t
+    num_alpha = (a_alpha + b_alpha) * t
+    num_beta = (a_beta + b_beta) * t
+    num_rho = (b_rho + c_rho) * t
+    num_nu = (b_nu + c_nu) * t
+
+    # Derivative of 1 + v + w with respect to b
+    den = 1.0 + b**2 * logfk2 / 24.0 + b**4 * logfk2**2 / 1920.0
+    den_b = 2.0 * b * logfk2 / 24.0 + 4.0 * b**3 * logfk2**2 / 1920.0
+
+    z = nu * d * logfk / alpha
+
+    if abs(z) > 1e-07:
+
+        root = np.sqrt(1.0 - 2.0*rho*z + z*z)
+        x = _x(rho, z)
+        x_z = 1.0 / root
+        x_rho = (-z / root - 1.0) / (root + z - rho) + 1.0 / (1.0 - rho)
+
+        x_alpha = -x_z * z / alpha
+        x_beta = x_z * nu * d_beta * logfk / alpha
+        x_nu = x_z * d * logfk / alpha
+
+        # As alpha * z / d = nu * log(f/k) the volatility simplifies
+        vz = nu * logfk * num / (den * x)
+
+        grad[0] = vz * (num_alpha / num - den_b * b_alpha / den - x_alpha / x)
+        grad[1] = vz * (num_beta / num - den_b * b_beta / den - x_beta / x)
+        grad[2] = vz * (num_rho / num - den_b * b_rho / den - x_rho / x)
+        grad[3] = vz * (num_nu / num - den_b * b_nu / den - x_nu / x) + \
+            logfk * num / (den * x)
+
+        return vz
+
+    else:
+
+        v0 = alpha * num / (d * den)
+
+        grad[0] = v0 * (num_alpha / num - den_b * b_alpha / den) + \
+            num / (d * den)
+        grad[1] = v0 * (num_beta / num - den_b * b_beta / den - d_beta / d)
+        grad[2] = v0 * (num_rho / num - den_b * b_rho / den)
+        grad[3] = v0 * (num_nu / num - den_b * b_nu / den)
+
+        return v0
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_sabr_beta_one(params, f, k, t):
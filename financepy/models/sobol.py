@@ -53,10 +53,11 @@ with np.load(path, mmap_mode='r') as f:
 
 
 @njit(cache=True)
-def get_gaussian_sobol(num_points, dimension):
+def get_gaussian_sobol(num_points, dimension, start=0):
     """ Sobol Gaussian quasi random points generator based on graycode order.
-    The generated points follow a normal distribution. """
-    points = get_uniform_sobol(num_points, dimension)
+    The generated points follow a normal distribution. The sequence can be
+    resumed at point number start so that it can be generated in blocks. """
+    points = get_uniform_sobol(num_points, dimension, start)
 
     for i in range(num_points):
         for j in range(dimension):
@@ -67,31 +68,35 @@ def get_gaussian_sobol(num_points, dimension):
 
 
 @njit(cache=True)
-def get_uniform_sobol(num_points, dimension):
+def get_uniform_sobol(num_points, dimension, start=0):
     """ Sobol uniform quasi random points generator based on graycode order. 
     This function returns a 2D Numpy array of values where the number of rows
     is the number of draws and the number of columns is the number of 
     dimensions of the random values. Each dimension has the same number of 
     random draws. Each column of random numbers is ordered so as not to
-    correlate, i.e be independent from any other column."""
+    correlate, i.e be independent from any other column. The first start
+    points of the sequence are skipped so that consecutive blocks of points
+    can be generated without holding the whole sequence in memory."""
 
     global sArr
     global aArr
     global m_i
 
     # ll = number of bits needed
-    ll = int(np.ceil(np.log(num_points+1)/np.log(2.0)))
+    ll = int(np.ceil(np.log(start+num_points+1)/np.log(2.0)))
 
-    # c[i] = index from the right of the first zero bit of i
+    # c[i] = index from the right of the first zero bit of start + i
     c = np.zeros(num_points, dtype=np.int64)
-    c[0] = 1
-    for i in range(1, num_points):
+    for i in range(0, num_points):
         c[i] = 1
-        value = i
+        value = start + i
         while value & 1:
             value >>= 1
             c[i] += 1
 
+    # graycode of the starting point which sets the first value of x
+    gray = start ^ (start >> 1)
+
     # points initialization
     points = np.zeros((num_points, dimension))
 
@@ -104,6 +109,10 @@ def get_uniform_sobol(num_points, dimension):
 
     #  Evalulate x[0] to x[N-1], scaled by 2**32
     x = np.zeros(num_points+1)
+    for i in range(1, ll+1):
+        if (gray >> (i-1)) & 1:
+            x[0] = int(x[0]) ^ int(v[i])
+
     for i in range(1, num_points+1):
         x[i] = int(x[i-1]) ^ int(v[c[i-1]])
         points[i-1, 0] = x[i]/(2**32)
@@ -134,6 +143,10 @@ def get_uniform_sobol(num_points, dimension):
 
         # Evalulate X[0] to X[N-1], scaled by pow(2,32)
         x = np.zeros(num_points+1)
+        for i in range(1, ll+1):
+            if (gray >> (i-1)) & 1:
+                x[0] = int(x[0]) ^ int(v[i])
+
         for i in range(1, num_points+1):
             x[i] = int(x[i-1]) ^ int(v[c[i-1]])
             points[i-1, j] = x[i]/(2**32)
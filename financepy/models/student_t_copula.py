@@ -2,11 +2,193 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from math import sqrt
 import numpy as np
-from scipy.stats import t as student
+from math import lgamma
+from numba import njit, prange
 
-from ..utils.helpers import uniform_to_default_time
+from ..utils.error import FinError
+from .gauss_copula import _survival_matrix, _uniform_to_default_time
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _beta_continued_fraction(a, b, x):
+    """ Evaluate the continued fraction of the regularised incomplete beta
+    function by the modified Lentz method. """
+
+    tiny = 1e-300
+    eps = 1e-15
+
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+
+    if abs(d) < tiny:
+        d = tiny
+
+    d = 1.0 / d
+    h = d
+
+    for m in range(1, 301):
+
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if abs(delta - 1.0) < eps:
+            break
+
+    return h
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _incomplete_beta(a, b, x, log_beta):
+    """ Regularised incomplete beta function I_x(a, b) given the log of the
+    beta function B(a, b). """
+
+    if x <= 0.0:
+        return 0.0
+
+    if x >= 1.0:
+        return 1.0
+
+    bt = np.exp(a * np.log(x) + b * np.log(1.0 - x) - log_beta)
+
+    if x < (a + 1.0) / (a + b + 2.0):
+        return bt * _beta_continued_fraction(a, b, x) / a
+    else:
+        return 1.0 - bt * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _student_t_cdf(x, dof, log_beta):
+    """ Cumulative distribution function of the Student-t distribution with
+    dof degrees of freedom given the log of the beta function B(dof/2, 1/2)
+    which is the same for every x. """
+
+    tail = 0.5 * _incomplete_beta(0.5 * dof, 0.5, dof / (dof + x * x),
+                                  log_beta)
+
+    if x > 0.0:
+        return 1.0 - tail
+    else:
+        return tail
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _default_times_from_student_t(y, w, dof, times, values, num_points,
+                                  antithetic):
+    """ Convert a matrix of correlated Gaussian random variables with one row
+    per credit and one column per trial into Student-t default times in
+    parallel over the trials. The Gaussians of trial j are divided by the
+    chi-square mixing variable w[j] and mapped to uniforms u by the Student-t
+    distribution function. If antithetic is set the default times implied by
+    1-u are appended as a second block of columns. """
+
+    num_credits = y.shape[0]
+    num_trials = y.shape[1]
+    log_values = np.log(values)
+    log_beta = lgamma(0.5 * dof) + lgamma(0.5) - lgamma(0.5 * dof + 0.5)
+
+    if antithetic:
+        tau = np.empty((num_credits, 2 * num_trials))
+    else:
+        tau = np.empty((num_credits, num_trials))
+
+    for iTrial in prange(num_trials):
+        for iCredit in range(0, num_credits):
+            n = num_points[iCredit]
+            u1 = _student_t_cdf(y[iCredit, iTrial] / w[iTrial], dof,
+                                log_beta)
+            tau[iCredit, iTrial] = \
+                _uniform_to_default_time(u1, times[iCredit], values[iCredit],
+                                         log_values[iCredit], n)
+
+            if antithetic:
+                u2 = 1.0 - u1
+                tau[iCredit, num_trials + iTrial] = \
+                    _uniform_to_default_time(u2, times[iCredit],
+                                             values[iCredit],
+                                             log_values[iCredit], n)
+
+    return tau
+
+###############################################################################
+
+
+def _chunk_generator(seed, chunk_index):
+    """ Return the random number generator of one chunk. Its stream depends
+    only on the seed and the chunk index so that chunks can be generated in
+    any order or on different workers. """
+
+    return np.random.default_rng(np.random.SeedSequence(seed,
+                                                        spawn_key=(chunk_index,)))
+
+###############################################################################
+
+
+def _check_inputs(num_trials, chunk_size, degreesOfFreedom):
+    """ Check the simulation sizes and the degrees of freedom. """
+
+    if num_trials < 1:
+        raise FinError("Number of trials must be at least one.")
+
+    if chunk_size < 1:
+        raise FinError("Chunk size must be at least one.")
+
+    if degreesOfFreedom <= 0.0:
+        raise FinError("Degrees of freedom must be positive.")
+
+###############################################################################
+
+
+def _student_t_chunk(c, times, values, num_points, dof, n, rng, antithetic):
+    """ Draw n trials of the Student-t copula with the Cholesky factor c of
+    the correlation matrix and return their default times. The draws are
+    taken from the generator rng or from the global NumPy stream if rng is
+    None. """
+
+    num_credits = c.shape[0]
+
+    if rng is None:
+        x = np.random.normal(0.0, 1.0, size=(num_credits, n))
+        chi2 = np.random.chisquare(dof, size=n)
+    else:
+        x = rng.standard_normal((num_credits, n))
+        chi2 = rng.chisquare(dof, size=n)
+
+    y = np.dot(c, x)
+    w = np.sqrt(chi2 / dof)
+
+    return _default_times_from_student_t(y, w, float(dof), times, values,
+                                         num_points, antithetic)
 
 ###############################################################################
 
@@ -19,30 +201,95 @@ class StudentTCopula():
                       degreesOfFreedom,
                       num_trials,
                       seed):
+        """ Generate a matrix of default times by credit and trial using a
+        Student-t copula model with a full rank correlation matrix. The
+        default times implied by the antithetic draws are in the second
+        num_trials columns. """
+
+        chunks = self.default_times_chunks(issuer_curves,
+                                           correlationMatrix,
+                                           degreesOfFreedom,
+                                           num_trials,
+                                           seed,
+                                           num_trials)
+
+        return next(chunks)
+
+###############################################################################
+
+    def default_times_chunks(self,
+                             issuer_curves,
+                             correlationMatrix,
+                             degreesOfFreedom,
+                             num_trials,
+                             seed,
+                             chunk_size: int = 10000,
+                             antithetic: bool = True,
+                             seed_per_chunk: bool = False):
+        """ Generator of the default times of a Student-t copula model that
+        returns the trials in chunks of at most chunk_size draws so that the
+        memory used stays bounded. Each chunk is a matrix of default times by
+        credit and trial laid out as in default_times_gc_chunks so it can be
+        passed to the same Monte-Carlo pricers. By default the draws continue
+        one random stream started from the seed. If seed_per_chunk is set
+        each chunk has its own stream derived from the seed and the chunk
+        index so that a chunk is the same whichever order or process it is
+        generated in. See default_times_chunk. """
+
+        _check_inputs(num_trials, chunk_size, degreesOfFreedom)
 
-        np.random.seed(seed)
-        num_credits = len(issuer_curves)
-        x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
         c = np.linalg.cholesky(correlationMatrix)
-        y = np.dot(c, x)
+        times, values, num_points = _survival_matrix(issuer_curves)
 
-        corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+        if not seed_per_chunk:
+            np.random.seed(seed)
 
-        for iTrial in range(0, num_trials):
-            chi2 = np.random.chisquare(degreesOfFreedom)
-            c = sqrt(chi2 / degreesOfFreedom)
-            for iCredit in range(0, num_credits):
-                issuer_curve = issuer_curves[iCredit]
-                g = y[iCredit, iTrial] / c
-                u1 = student.cdf(g, degreesOfFreedom)
-                u2 = 1.0 - u1
-                times = issuer_curve._times
-                values = issuer_curve._values
-                t1 = uniform_to_default_time(u1, times, values)
-                t2 = uniform_to_default_time(u2, times, values)
-                corrTimes[iCredit, iTrial] = t1
-                corrTimes[iCredit, iTrial + num_trials] = t2
-
-        return corrTimes
+        rng = None
+        chunk_index = 0
+        start = 0
+
+        while start < num_trials:
+
+            n = min(chunk_size, num_trials - start)
+
+            if seed_per_chunk:
+                rng = _chunk_generator(seed, chunk_index)
+
+            yield _student_t_chunk(c, times, values, num_points,
+                                   degreesOfFreedom, n, rng, antithetic)
+
+            chunk_index += 1
+            start += n
+
+###############################################################################
+
+    def default_times_chunk(self,
+                            issuer_curves,
+                            correlationMatrix,
+                            degreesOfFreedom,
+                            num_trials,
+                            seed,
+                            chunk_index: int,
+                            chunk_size: int = 10000,
+                            antithetic: bool = True):
+        """ Return the chunk at position chunk_index of the chunks generated
+        by default_times_chunks with seed_per_chunk set. This lets separate
+        workers each generate their own chunks of one simulation. """
+
+        _check_inputs(num_trials, chunk_size, degreesOfFreedom)
+
+        num_chunks = (num_trials + chunk_size - 1) // chunk_size
+
+        if chunk_index < 0 or chunk_index >= num_chunks:
+            raise FinError("Chunk index must be 0 to " + str(num_chunks - 1))
+
+        c = np.linalg.cholesky(correlationMatrix)
+        times, values, num_points = _survival_matrix(issuer_curves)
+        n = min(chunk_size, num_trials - chunk_index * chunk_size)
+
+        return _student_t_chunk(c, times, values, num_points,
+                                degreesOfFreedom, n,
+                                _chunk_generator(seed, chunk_index),
+                                antithetic)
 
 ###############################################################################
@@ -5,7 +5,7 @@
 import numpy as np
 from numba import njit, float64, jit
 
-from ..utils.math import N
+from ..utils.math import N, nprime
 from ..utils.error import FinError
 
 ###############################################################################
@@ -58,6 +58,36 @@ def vol_function_clark(params, f, k, t):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def vol_function_clark_grad(params, f, k, t, grad):
+    """ Return the volatility of vol_function_clark and write its analytical
+    derivatives with respect to each of the parameters into grad. """
+
+    x = np.log(f/k)
+    sigma0 = np.exp(params[0])
+    arg = x / (sigma0 * np.sqrt(t))
+    deltax = N(arg) - 0.50
+
+    logvol = 0.0
+    dlogvol = 0.0
+    for i in range(0, len(params)):
+        logvol += params[i] * (deltax ** i)
+        if i > 0:
+            dlogvol += i * params[i] * (deltax ** (i - 1))
+
+    vol = np.exp(logvol)
+
+    # The first parameter also scales the argument of the delta
+    grad[0] = vol * (1.0 - dlogvol * nprime(arg) * arg)
+
+    for i in range(1, len(params)):
+        grad[i] = vol * (deltax ** i)
+
+    return vol
+
+###############################################################################
+
+
 @njit(float64(float64[:], float64, float64, float64),
       fastmath=True, cache=True)
 def vol_function_bloomberg(params, f, k, t):
@@ -118,6 +148,42 @@ def vol_function_svi(params, f, k, t):
     return v
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def vol_function_svi_grad(params, f, k, t, grad):
+    """ Return the volatility of vol_function_svi and write its analytical
+    derivatives with respect to a, b, rho, m and sigma into grad. """
+
+    x = np.log(f/k)
+
+    a = params[0]
+    b = params[1]
+    rho = params[2]
+    m = params[3]
+    sigma = params[4]
+
+    root = np.sqrt((x-m)**2 + sigma*sigma)
+    vart = a + b*(rho*(x-m) + root)
+
+    # The total variance is negative so there is no volatility
+    if vart <= 0.0:
+        grad[:] = 0.0
+        return 0.0
+
+    v = np.sqrt(vart/t)
+
+    # d(vol)/d(vart)
+    dv = 0.5 / (t * v)
+
+    grad[0] = dv
+    grad[1] = dv * (rho*(x-m) + root)
+    grad[2] = dv * b * (x-m)
+    grad[3] = -dv * b * (rho + (x-m) / root)
+    grad[4] = dv * b * sigma / root
+
+    return v
+
 ###############################################################################
 # Gatheral SSVI surface SVI and equivalent local volatility
 # Code from https://wwwf.imperial.ac.uk/~ajacquie/IC_AMDP/IC_AMDP_Docs/Code/SSVI.pdf
@@ -101,11 +101,14 @@ class Bond:
                  face_amount: float = 100.0,
                  calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
                  bus_day_rule_type = BusDayAdjustTypes.FOLLOWING,
-                 date_gen_rule_type = DateGenRuleTypes.BACKWARD):
+                 date_gen_rule_type = DateGenRuleTypes.BACKWARD,
+                 schedule_dates = None):  # Optional pre-generated coupon dates
         """ Create Bond object by providing the issue date, maturity Date,
         coupon frequency, annualised coupon, the accrual convention type, face
         amount and the number of ex-dividend days. A calendar type is used 
-        to determine holidays from which coupon dates might be shifted."""
+        to determine holidays from which coupon dates might be shifted. The
+        unadjusted coupon dates can be passed in if they have already been
+        generated, for example by a ScheduleArray on the NONE calendar."""
 
         check_argument_types(self.__init__, locals())
 
@@ -145,6 +148,7 @@ class Bond:
 
         self.bus_day_rule_type = bus_day_rule_type
         self.date_gen_rule_type = date_gen_rule_type
+        self._schedule_dates = schedule_dates
 
         self._calculate_coupon_dates()
         self._calculate_flows()
@@ -161,6 +165,10 @@ class Bond:
         #bus_day_rule_type = BusDayAdjustTypes.FOLLOWING
         #date_gen_rule_type = DateGenRuleTypes.BACKWARD
 
+        if self._schedule_dates is not None:
+            self._coupon_dates = list(self._schedule_dates)
+            return
+
         self._coupon_dates = Schedule(self._issue_date,
                                     self._maturity_date,
                                     self._freq_type,
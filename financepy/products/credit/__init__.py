@@ -4,4 +4,5 @@ from .cds_basket import *
 from .cds_index_option import *
 from .cds_index_portfolio import *
 from .cds_option import *
+from .cds_portfolio import *
 from .cds_tranche import *
@@ -6,7 +6,7 @@
 import numpy as np
 from numba import njit, float64, int64
 from math import exp, log
-from copy import deepcopy
+from copy import copy
 
 from ...utils.date import Date
 from ...utils.error import FinError
@@ -18,6 +18,7 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.math import ONE_MILLION
 from ...utils.helpers import label_to_string, table_to_string
 from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from ...market.curves.curve_cache import CurveCache
 
 from ...utils.helpers import check_argument_types
 
@@ -198,8 +199,11 @@ class CDS:
                  day_count_type: DayCountTypes = DayCountTypes.ACT_360,
                  calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
                  bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
-                 date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
-        """ Create a CDS from the step-in date, maturity date and coupon """
+                 date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
+                 schedule_dates=None):  # Optional pre-generated payment dates
+        """ Create a CDS from the step-in date, maturity date and coupon. The
+        adjusted payment dates can be passed in if they have already been
+        generated, for example by ScheduleArray.from_cds. """
 
         check_argument_types(self.__init__, locals())
 
@@ -226,7 +230,11 @@ class CDS:
         self._freq_type = freq_type
         self._bus_day_adjust_type = bus_day_adjust_type
 
-        self._generate_adjusted_cds_payment_dates()
+        if schedule_dates is None:
+            self._generate_adjusted_cds_payment_dates()
+        else:
+            self._adjusted_dates = list(schedule_dates)
+
         self._calc_flows()
 
     ###############################################################################
@@ -386,10 +394,20 @@ class CDS:
 
         bump = 0.0001  # 1 basis point
 
-        # we create a deep copy to avoid state issues
-        bumpedIssuerCurve = deepcopy(issuer_curve)
-        for cds in bumpedIssuerCurve._cds_contracts:
-            cds._running_coupon += bump
+        # Only the CDS contracts are copied as they are the only part of the
+        # issuer curve which is changed by the bump. The bumped curve gets its
+        # own cache so that it does not evict the values of the issuer curve
+        bumpedIssuerCurve = copy(issuer_curve)
+        bumpedIssuerCurve._cds_contracts = []
+
+        if issuer_curve._cache is not None:
+            bumpedIssuerCurve._cache = \
+                CurveCache(issuer_curve._cache._max_size)
+
+        for cds in issuer_curve._cds_contracts:
+            bumped_cds = copy(cds)
+            bumped_cds._running_coupon += bump
+            bumpedIssuerCurve._cds_contracts.append(bumped_cds)
 
         bumpedIssuerCurve._build_curve()
 
@@ -413,7 +431,7 @@ class CDS:
                       prot_method: int = 0,
                       num_steps_per_year: int = 25):
         """ Calculation of the interest DV01 based on a simple bump of
-        the discount factors and reconstruction of the CDS curve. """
+        the Libor curve quotes and reconstruction of the CDS curve. """
 
         v0 = self.value(valuation_date,
                         issuer_curve,
@@ -422,31 +440,20 @@ class CDS:
                         prot_method,
                         num_steps_per_year)
 
-        # we create a deep copy to avoid state issues
-        new_issuer_curve = deepcopy(issuer_curve)
-
         bump = 0.0001  # 1 basis point
 
-        for depo in new_issuer_curve._libor_curve._usedDeposits:
-            depo._deposit_rate += bump
-
-        for fra in new_issuer_curve._libor_curve._usedFRAs:
-            fra._fraRate += bump
-
-        for swap in new_issuer_curve._libor_curve._usedSwaps:
-            cpn = swap._fixed_leg._coupon
-            swap._fixed_leg._coupon = cpn + bump
+        # The bumped Libor curve is built by bump_quotes from its own copies
+        # of the instruments so the Libor curve of the issuer curve is left
+        # unchanged. Only the issuer curve itself needs a shallow copy, with
+        # its own cache so that it does not evict the values of the original
+        new_issuer_curve = copy(issuer_curve)
 
-            # Need to regenerate fixed leg payments with bumped coupon
-            # I could call swap._fixed_leg.generate_payments() but it is
-            # overkill as it has to do all the schedule generation which is
-            # not needed as the dates are unchanged
-            num_payments = len(swap._fixed_leg._payments)
-            for i in range(0, num_payments):
-                old_pmt = swap._fixed_leg._payments[i]
-                swap._fixed_leg._payments[i] = old_pmt * (cpn + bump) / cpn
+        if issuer_curve._cache is not None:
+            new_issuer_curve._cache = \
+                CurveCache(issuer_curve._cache._max_size)
 
-        new_issuer_curve._libor_curve._build_curve()
+        new_issuer_curve._libor_curve = \
+            issuer_curve._libor_curve.bump_quotes(bump)
         new_issuer_curve._build_curve()
 
         v1 = self.value(valuation_date,
@@ -2,10 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: There are several speed ups for the Monte-Carlo including calculating
-# all default baskets at the same time.
-
 import numpy as np
+from numba import njit, prange
 
 from ...utils.error import FinError
 
@@ -17,7 +15,7 @@ from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...products.credit.cds import CDS
 
 from ...models.gauss_copula_onefactor import homog_basket_loss_dbn
-from ...models.gauss_copula import default_times_gc
+from ...models.gauss_copula import default_times_gc_chunks
 from ...models.student_t_copula import StudentTCopula
 
 from ...products.credit.cds_curve import CDSCurve
@@ -35,6 +33,71 @@ from ...utils.helpers import label_to_string
 ###############################################################################
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _nth_default_legs(default_times,
+                      levels,
+                      recovery_rates,
+                      tmat,
+                      average_accrual_factor,
+                      rpv01_to_times):
+    """ Select the nth default time of each trial for each of the levels of
+    n in parallel over the trials. A partial sort is used so that only the
+    smallest default times are ordered. Returns the nth default time capped
+    at the maturity, the risky PV01 and the loss given default of the nth
+    defaulting credit by level and trial. The loss is zero if the nth
+    default is after maturity. Discounting of the loss is left to the
+    caller so it can be done for all trials at once. """
+
+    num_credits = default_times.shape[0]
+    num_trials = default_times.shape[1]
+    num_levels = levels.size
+    num_flows = rpv01_to_times.size
+    max_level = np.max(levels)
+
+    nth_tau = np.zeros((num_levels, num_trials))
+    rpv01 = np.zeros((num_levels, num_trials))
+    lgd = np.zeros((num_levels, num_trials))
+
+    for iTrial in prange(num_trials):
+
+        asset_tau = default_times[:, iTrial].copy()
+
+        if max_level < num_credits:
+            asset_tau = np.partition(asset_tau, max_level - 1)
+
+        smallest_tau = np.sort(asset_tau[0:max_level])
+
+        for iLevel in range(0, num_levels):
+
+            min_tau = smallest_tau[levels[iLevel] - 1]
+
+            if min_tau < tmat:
+                index = min(int(min_tau / average_accrual_factor),
+                            num_flows - 1)
+                rpv01[iLevel, iTrial] = rpv01_to_times[index] + \
+                    (min_tau - index * average_accrual_factor)
+
+                # Identity of the nth defaulting credit
+                asset_index = 0
+                for iCredit in range(0, num_credits):
+                    if min_tau == default_times[iCredit, iTrial]:
+                        asset_index = iCredit
+                        break
+
+                nth_tau[iLevel, iTrial] = min_tau
+                lgd[iLevel, iTrial] = 1.0 - recovery_rates[asset_index]
+
+            else:
+                index = min(int(tmat / average_accrual_factor),
+                            num_flows - 1)
+                rpv01[iLevel, iTrial] = rpv01_to_times[index]
+                nth_tau[iLevel, iTrial] = tmat
+
+    return nth_tau, rpv01, lgd
+
+###############################################################################
+
+
 class CDSBasket:
 
     """ Class to deal with n-to-default CDS baskets. """
@@ -77,17 +140,22 @@ class CDSBasket:
 
 ###############################################################################
 
-    def value_legs_mc(self,
-                      valuation_date,
-                      nToDefault,
-                      default_times,
-                      issuer_curves,
-                      libor_curve):
-        """ Value the legs of the default basket using Monte Carlo. The default
-        times are an input so this valuation is not model dependent. """
-
-        num_credits = default_times.shape[0]
-        num_trials = default_times.shape[1]
+    def _value_legs_mc_stream(self,
+                              valuation_date,
+                              levels,
+                              default_time_chunks,
+                              issuer_curves,
+                              libor_curve,
+                              antithetic):
+        """ Accumulate the risky PV01 and protection leg of the basket for
+        each level of n in levels over a stream of chunks of default times
+        by credit and trial. If antithetic is set the second half of the
+        columns of each chunk holds the antithetic trials of the first half
+        and each pair is treated as one sample for the standard errors.
+        Returns the means and standard errors of the two legs and their
+        covariance by level along with the number of samples. """
+
+        levels = np.array(levels, dtype=np.int64)
 
         adjusted_dates = self._cds_contract._adjusted_dates
         num_flows = len(adjusted_dates)
@@ -109,48 +177,78 @@ class CDSBasket:
 
         tmat = (self._maturity_date - valuation_date) / gDaysInYear
 
-        rpv01 = 0.0
-        prot = 0.0
+        recovery_rates = np.array([c._recovery_rate for c in issuer_curves],
+                                  dtype=np.float64)
 
-        assetTau = np.zeros(num_credits)
+        num_levels = len(levels)
+        sums = np.zeros((5, num_levels))
+        num_samples = 0
+        num_trials = 0
 
-        for iTrial in range(0, num_trials):
-            for iCredit in range(0, num_credits):
-                assetTau[iCredit] = default_times[iCredit, iTrial]
+        for default_times in default_time_chunks:
 
-            # ORDER THE DEFAULT TIMES
-            assetTau.sort()
+            nth_tau, rpv01, lgd = _nth_default_legs(default_times,
+                                                    levels,
+                                                    recovery_rates,
+                                                    tmat,
+                                                    averageAccrualFactor,
+                                                    rpv01ToTimes)
 
-            # GET THE Nth DEFAULT TIME
-            minTau = assetTau[nToDefault - 1]
+            dfs = libor_curve._df(nth_tau.ravel()).reshape(nth_tau.shape)
+            prot = lgd * dfs
 
-            if minTau < tmat:
-                numPaymentsIndex = int(minTau / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                rpv01Trial += (minTau - numPaymentsIndex *
-                               averageAccrualFactor)
+            num_trials += rpv01.shape[1]
 
-                # DETERMINE IDENTITY OF N-TO-DEFAULT CREDIT IF BASKET NOT HOMO
-                assetIndex = 0
-                for iCredit in range(0, num_credits):
-                    if minTau == default_times[iCredit, iTrial]:
-                        assetIndex = iCredit
-                        break
+            if antithetic:
+                n = rpv01.shape[1] // 2
+                rpv01 = 0.5 * (rpv01[:, 0:n] + rpv01[:, n:2 * n])
+                prot = 0.5 * (prot[:, 0:n] + prot[:, n:2 * n])
 
-                protTrial = (1.0 - issuer_curves[assetIndex]._recovery_rate)
-                protTrial *= libor_curve._df(minTau)
+            num_samples += rpv01.shape[1]
 
-            else:
+            sums[0] += np.sum(rpv01, axis=1)
+            sums[1] += np.sum(prot, axis=1)
+            sums[2] += np.sum(rpv01 * rpv01, axis=1)
+            sums[3] += np.sum(prot * prot, axis=1)
+            sums[4] += np.sum(rpv01 * prot, axis=1)
+
+        if num_samples == 0:
+            raise FinError("No default times have been supplied.")
+
+        mean_rpv01 = sums[0] / num_samples
+        mean_prot = sums[1] / num_samples
+        var_rpv01 = np.maximum(sums[2] / num_samples - mean_rpv01**2, 0.0)
+        var_prot = np.maximum(sums[3] / num_samples - mean_prot**2, 0.0)
+        cov = sums[4] / num_samples - mean_rpv01 * mean_prot
 
-                numPaymentsIndex = int(tmat / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                protTrial = 0.0
+        return {"rpv01": mean_rpv01,
+                "prot_pv": mean_prot,
+                "rpv01_var": var_rpv01,
+                "prot_var": var_prot,
+                "cov": cov,
+                "num_samples": num_samples,
+                "num_trials": num_trials}
 
-            rpv01 += rpv01Trial
-            prot += protTrial
+###############################################################################
 
-        rpv01 = rpv01 / num_trials
-        prot = prot / num_trials
+    def value_legs_mc(self,
+                      valuation_date,
+                      nToDefault,
+                      default_times,
+                      issuer_curves,
+                      libor_curve):
+        """ Value the legs of the default basket using Monte Carlo. The default
+        times are an input so this valuation is not model dependent. """
+
+        legs = self._value_legs_mc_stream(valuation_date,
+                                          [nToDefault],
+                                          [default_times],
+                                          issuer_curves,
+                                          libor_curve,
+                                          False)
+
+        rpv01 = legs["rpv01"][0]
+        prot = legs["prot_pv"][0]
         return (rpv01, prot)
 
 ###############################################################################
@@ -171,24 +269,97 @@ class CDSBasket:
         if nToDefault > num_credits or nToDefault < 1:
             raise FinError("nToDefault must be 1 to num_credits")
 
-        default_times = default_times_gc(issuer_curves,
+        v = self.value_gaussian_mc_levels(valuation_date,
+                                          [nToDefault],
+                                          issuer_curves,
+                                          correlationMatrix,
+                                          libor_curve,
+                                          num_trials,
+                                          seed,
+                                          num_trials)
+
+        return (v["value"][0], v["rpv01"][0], v["spread"][0])
+
+###############################################################################
+
+    def value_gaussian_mc_levels(self,
+                                 valuation_date,
+                                 nToDefaults,
+                                 issuer_curves,
+                                 correlationMatrix,
+                                 libor_curve,
+                                 num_trials,
+                                 seed,
+                                 chunk_size: int = 10000,
+                                 use_sobol: bool = False):
+        """ Value the basket for several levels of n-to-default in one pass
+        of a Gaussian copula simulation with antithetic draws. The default
+        times are generated in chunks of chunk_size draws so that the memory
+        used stays bounded. Returns a dictionary of arrays with one entry per
+        level of the value, risky PV01, protection leg PV and par spread and
+        of their Monte-Carlo standard errors. The standard errors are not
+        meaningful if Sobol draws are used. """
+
+        num_credits = len(issuer_curves)
+        levels = np.array(nToDefaults, dtype=np.int64).reshape(-1)
+
+        if levels.size == 0:
+            raise FinError("No nToDefault levels have been supplied.")
+
+        if np.max(levels) > num_credits or np.min(levels) < 1:
+            raise FinError("nToDefault must be 1 to num_credits")
+
+        chunks = default_times_gc_chunks(issuer_curves,
                                          correlationMatrix,
                                          num_trials,
-                                         seed)
+                                         seed,
+                                         chunk_size,
+                                         use_sobol,
+                                         True)
+
+        legs = self._value_legs_mc_stream(valuation_date,
+                                          levels,
+                                          chunks,
+                                          issuer_curves,
+                                          libor_curve,
+                                          True)
+
+        return self._levels_values(legs)
+
+###############################################################################
 
-        rpv01, prot_pv = self.value_legs_mc(valuation_date,
-                                            nToDefault,
-                                            default_times,
-                                            issuer_curves,
-                                            libor_curve)
+    def _levels_values(self, legs):
+        """ Return the values, risky PV01s, protection leg PVs and par
+        spreads of the levels of n-to-default and their Monte-Carlo standard
+        errors from the leg statistics of _value_legs_mc_stream. """
+
+        rpv01 = legs["rpv01"]
+        prot_pv = legs["prot_pv"]
+        n = legs["num_samples"]
+        c = self._running_coupon
 
         spd = prot_pv / rpv01
-        value = self._notional * (prot_pv - self._running_coupon * rpv01)
+        value = self._notional * (prot_pv - c * rpv01)
+
+        var_value = legs["prot_var"] - 2.0 * c * legs["cov"] \
+            + c * c * legs["rpv01_var"]
+
+        # Delta method for the ratio of the two leg means
+        var_spd = (legs["prot_var"] - 2.0 * spd * legs["cov"]
+                   + spd * spd * legs["rpv01_var"]) / rpv01**2
 
         if not self._long_protection:
             value = value * -1.0
 
-        return (value, rpv01, spd)
+        return {"value": value,
+                "rpv01": rpv01,
+                "prot_pv": prot_pv,
+                "spread": spd,
+                "value_stderr":
+                    self._notional * np.sqrt(np.maximum(var_value, 0.0) / n),
+                "rpv01_stderr": np.sqrt(legs["rpv01_var"] / n),
+                "prot_stderr": np.sqrt(legs["prot_var"] / n),
+                "spread_stderr": np.sqrt(np.maximum(var_spd, 0.0) / n)}
 
 ###############################################################################
 
@@ -208,27 +379,67 @@ class CDSBasket:
         if nToDefault > num_credits or nToDefault < 1:
             raise FinError("nToDefault must be 1 to num_credits")
 
-        model = StudentTCopula()
+        v = self.value_student_t_mc_levels(valuation_date,
+                                           [nToDefault],
+                                           issuer_curves,
+                                           correlationMatrix,
+                                           degreesOfFreedom,
+                                           libor_curve,
+                                           num_trials,
+                                           seed,
+                                           num_trials)
 
-        default_times = model.default_times(issuer_curves,
-                                            correlationMatrix,
-                                            degreesOfFreedom,
-                                            num_trials,
-                                            seed)
+        return (v["value"][0], v["rpv01"][0], v["spread"][0])
 
-        rpv01, prot_pv = self.value_legs_mc(valuation_date,
-                                            nToDefault,
-                                            default_times,
-                                            issuer_curves,
-                                            libor_curve)
+###############################################################################
 
-        spd = prot_pv / rpv01
-        value = self._notional * (prot_pv - self._running_coupon * rpv01)
+    def value_student_t_mc_levels(self,
+                                  valuation_date,
+                                  nToDefaults,
+                                  issuer_curves,
+                                  correlationMatrix,
+                                  degreesOfFreedom,
+                                  libor_curve,
+                                  num_trials,
+                                  seed,
+                                  chunk_size: int = 10000,
+                                  seed_per_chunk: bool = False):
+        """ Value the basket for several levels of n-to-default in one pass
+        of a Student-t copula simulation with antithetic draws. The default
+        times are generated in chunks of chunk_size draws by a compiled
+        kernel. If seed_per_chunk is set each chunk has its own random stream
+        derived from the seed so that the chunks do not depend on the order
+        they are generated in. Returns the same dictionary of arrays as
+        value_gaussian_mc_levels. """
 
-        if not self._long_protection:
-            value = value * -1.0
+        num_credits = len(issuer_curves)
+        levels = np.array(nToDefaults, dtype=np.int64).reshape(-1)
+
+        if levels.size == 0:
+            raise FinError("No nToDefault levels have been supplied.")
+
+        if np.max(levels) > num_credits or np.min(levels) < 1:
+            raise FinError("nToDefault must be 1 to num_credits")
 
-        return (value, rpv01, spd)
+        model = StudentTCopula()
+
+        chunks = model.default_times_chunks(issuer_curves,
+                                            correlationMatrix,
+                                            degreesOfFreedom,
+                                            num_trials,
+                                            seed,
+                                            chunk_size,
+                                            True,
+                                            seed_per_chunk)
+
+        legs = self._value_legs_mc_stream(valuation_date,
+                                          levels,
+                                          chunks,
+                                          issuer_curves,
+                                          libor_curve,
+                                          True)
+
+        return self._levels_values(legs)
 
 ###############################################################################
 
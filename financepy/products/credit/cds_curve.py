@@ -4,16 +4,24 @@
 
 import numpy as np
 import scipy.optimize as optimize
+from scipy.linalg import solve_triangular
+from numba import njit, prange
+from math import exp, log
+from copy import copy
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import _uinterpolate, InterpTypes
+from ...market.curves.interpolator import _uinterpolate_partials
+from ...market.curves.curve_cache import CurveCache
 from ...utils.helpers import input_time, table_to_string
 from ...utils.day_count import DayCount
 from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.helpers import label_to_string
+from .cds import CDS
+from ..rates.curve_bootstrap import _adjoint_quote_sensitivities
 
 
 ###############################################################################
@@ -38,6 +46,382 @@ def f(q, *args):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _cds_value_and_hazard_delta(teff,
+                                tmat,
+                                accrual_factorPCDToNow,
+                                paymentTimes,
+                                year_fracs,
+                                npIborTimes,
+                                npIborValues,
+                                npSurvTimes,
+                                npSurvValues,
+                                coupon,
+                                contract_recovery_rate,
+                                num_steps_per_year,
+                                tprev):
+    """ Return the clean value per unit notional of a long protection CDS as
+    calculated by the risky PV01 and protection leg kernels of the CDS class
+    together with its derivative with respect to the flat hazard rate of the
+    last interval of the survival curve which starts at time tprev. Moving
+    this hazard rate by dh moves the survival probability at any later time
+    t by -(t - tprev) * q(t) * dh. """
+
+    method = InterpTypes.FLAT_FWD_RATES.value
+
+    # Premium leg as in _risky_pv01_numba
+    tncd = paymentTimes[1]
+    qeff = _uinterpolate(teff, npSurvTimes, npSurvValues, method)
+    q1 = _uinterpolate(tncd, npSurvTimes, npSurvValues, method)
+    z1 = _uinterpolate(tncd, npIborTimes, npIborValues, method)
+    dqeff = -qeff * max(teff - tprev, 0.0)
+    dq1 = -q1 * max(tncd - tprev, 0.0)
+
+    a = accrual_factorPCDToNow
+    fullRPV01 = q1 * z1 * year_fracs[1] + z1 * (qeff - q1) * a \
+        + 0.5 * z1 * (qeff - q1) * (year_fracs[1] - a)
+    dfullRPV01 = dq1 * z1 * year_fracs[1] + z1 * (dqeff - dq1) * a \
+        + 0.5 * z1 * (dqeff - dq1) * (year_fracs[1] - a)
+
+    for it in range(2, len(paymentTimes)):
+
+        t2 = paymentTimes[it]
+        q2 = _uinterpolate(t2, npSurvTimes, npSurvValues, method)
+        z2 = _uinterpolate(t2, npIborTimes, npIborValues, method)
+        dq2 = -q2 * max(t2 - tprev, 0.0)
+
+        tau = year_fracs[it]
+        fullRPV01 += q2 * z2 * tau
+        dfullRPV01 += dq2 * z2 * tau
+
+        h12 = -log(q2 / q1) / tau
+        dh12 = -(dq2 / q2 - dq1 / q1) / tau
+        r12 = -log(z2 / z1) / tau
+        alpha = h12 + r12
+        e = exp(-alpha * tau)
+        expTerm = 1.0 - e - alpha * tau * e
+        dexpTerm = alpha * tau * tau * e * dh12
+        aa = abs(alpha * alpha + 1e-20)
+        daa = 2.0 * alpha * dh12
+
+        d = q1 * z1 * h12 * expTerm / aa
+        fullRPV01 += d
+        dfullRPV01 += z1 * (dq1 * h12 * expTerm + q1 * dh12 * expTerm
+                            + q1 * h12 * dexpTerm) / aa - d * daa / aa
+
+        q1 = q2
+        dq1 = dq2
+
+    cleanRPV01 = fullRPV01 - accrual_factorPCDToNow
+
+    # Protection leg as in _protection_leg_pv_numba
+    dt = (tmat - teff) / num_steps_per_year
+    t = teff
+    z1 = _uinterpolate(t, npIborTimes, npIborValues, method)
+    q1 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
+    dq1 = -q1 * max(t - tprev, 0.0)
+
+    prot_pv = 0.0
+    dprot_pv = 0.0
+    small = 1e-8
+
+    for _ in range(0, num_steps_per_year):
+        t = t + dt
+        z2 = _uinterpolate(t, npIborTimes, npIborValues, method)
+        q2 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
+        dq2 = -q2 * max(t - tprev, 0.0)
+
+        h12 = -log(q2 / q1) / dt
+        dh12 = -(dq2 / q2 - dq1 / q1) / dt
+        r12 = -log(z2 / z1) / dt
+        expTerm = exp(-(r12 + h12) * dt)
+        dexpTerm = -expTerm * dt * dh12
+        b = abs(h12 + r12) + small
+        db = np.sign(h12 + r12) * dh12
+
+        d = h12 * (1.0 - expTerm) * q1 * z1 / b
+        prot_pv += d
+        dprot_pv += z1 * (dh12 * (1.0 - expTerm) * q1 - h12 * dexpTerm * q1
+                          + h12 * (1.0 - expTerm) * dq1) / b - d * db / b
+
+        q1 = q2
+        z1 = z2
+        dq1 = dq2
+
+    prot_pv *= (1.0 - contract_recovery_rate)
+    dprot_pv *= (1.0 - contract_recovery_rate)
+
+    v = prot_pv - coupon * cleanRPV01
+    dv = dprot_pv - coupon * dfullRPV01
+    return v, dv
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_partials(grad, indices, partials, row, coeff):
+    """ Add coeff times the partials of one interpolated value with respect
+    to the grid values into the gradient. """
+
+    for j in range(0, 3):
+        grad[indices[row, j]] += coeff * partials[row, j]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cds_value_and_gradients(teff,
+                             tmat,
+                             accrual_factorPCDToNow,
+                             paymentTimes,
+                             year_fracs,
+                             npIborTimes,
+                             npIborValues,
+                             npSurvTimes,
+                             npSurvValues,
+                             coupon,
+                             contract_recovery_rate,
+                             num_steps_per_year,
+                             grad_surv,
+                             grad_ibor):
+    """ Return the clean value per unit notional of a long protection CDS and
+    its clean risky PV01 as calculated by the risky PV01 and protection leg
+    kernels of the CDS class. The derivatives of the value with respect to
+    the survival probabilities and the Libor discount factors at the grid
+    times are added to grad_surv and grad_ibor. """
+
+    method = InterpTypes.FLAT_FWD_RATES.value
+
+    # Rows hold the interpolation partials of qeff, q1, q2, z1 and z2
+    indices = np.zeros((5, 3), dtype=np.int64)
+    partials = np.zeros((5, 3))
+    QEFF, Q1, Q2, Z1, Z2 = 0, 1, 2, 3, 4
+
+    # Premium leg as in _risky_pv01_numba
+    tncd = paymentTimes[1]
+    qeff = _uinterpolate_partials(teff, npSurvTimes, npSurvValues, method,
+                                  indices[QEFF], partials[QEFF])
+    q1 = _uinterpolate_partials(tncd, npSurvTimes, npSurvValues, method,
+                                indices[Q1], partials[Q1])
+    z1 = _uinterpolate_partials(tncd, npIborTimes, npIborValues, method,
+                                indices[Z1], partials[Z1])
+
+    a = accrual_factorPCDToNow
+    y1 = year_fracs[1]
+    fullRPV01 = q1 * z1 * y1 + z1 * (qeff - q1) * a \
+        + 0.5 * z1 * (qeff - q1) * (y1 - a)
+
+    c = -coupon
+    _add_partials(grad_surv, indices, partials, Q1,
+                  c * (z1 * y1 - z1 * a - 0.5 * z1 * (y1 - a)))
+    _add_partials(grad_surv, indices, partials, QEFF,
+                  c * (z1 * a + 0.5 * z1 * (y1 - a)))
+    _add_partials(grad_ibor, indices, partials, Z1,
+                  c * (q1 * y1 + (qeff - q1) * a
+                       + 0.5 * (qeff - q1) * (y1 - a)))
+
+    for it in range(2, len(paymentTimes)):
+
+        t2 = paymentTimes[it]
+        q2 = _uinterpolate_partials(t2, npSurvTimes, npSurvValues, method,
+                                    indices[Q2], partials[Q2])
+        z2 = _uinterpolate_partials(t2, npIborTimes, npIborValues, method,
+                                    indices[Z2], partials[Z2])
+
+        tau = year_fracs[it]
+        fullRPV01 += q2 * z2 * tau
+        _add_partials(grad_surv, indices, partials, Q2, c * z2 * tau)
+        _add_partials(grad_ibor, indices, partials, Z2, c * q2 * tau)
+
+        h12 = -log(q2 / q1) / tau
+        r12 = -log(z2 / z1) / tau
+        alpha = h12 + r12
+        e = exp(-alpha * tau)
+        expTerm = 1.0 - e - alpha * tau * e
+        aa = abs(alpha * alpha + 1e-20)
+
+        d = q1 * z1 * h12 * expTerm / aa
+        fullRPV01 += d
+
+        d_alpha = q1 * z1 * h12 * (alpha * tau * tau * e / aa
+                                   - expTerm * 2.0 * alpha / (aa * aa))
+        d_h = q1 * z1 * expTerm / aa + d_alpha
+
+        _add_partials(grad_surv, indices, partials, Q1,
+                      c * (d / q1 + d_h / (q1 * tau)))
+        _add_partials(grad_surv, indices, partials, Q2,
+                      c * (-d_h / (q2 * tau)))
+        _add_partials(grad_ibor, indices, partials, Z1,
+                      c * (d / z1 + d_alpha / (z1 * tau)))
+        _add_partials(grad_ibor, indices, partials, Z2,
+                      c * (-d_alpha / (z2 * tau)))
+
+        q1 = q2
+        indices[Q1] = indices[Q2]
+        partials[Q1] = partials[Q2]
+
+    cleanRPV01 = fullRPV01 - accrual_factorPCDToNow
+
+    # Protection leg as in _protection_leg_pv_numba
+    c = 1.0 - contract_recovery_rate
+    dt = (tmat - teff) / num_steps_per_year
+    t = teff
+    z1 = _uinterpolate_partials(t, npIborTimes, npIborValues, method,
+                                indices[Z1], partials[Z1])
+    q1 = _uinterpolate_partials(t, npSurvTimes, npSurvValues, method,
+                                indices[Q1], partials[Q1])
+
+    prot_pv = 0.0
+    small = 1e-8
+
+    for _ in range(0, num_steps_per_year):
+        t = t + dt
+        z2 = _uinterpolate_partials(t, npIborTimes, npIborValues, method,
+                                    indices[Z2], partials[Z2])
+        q2 = _uinterpolate_partials(t, npSurvTimes, npSurvValues, method,
+                                    indices[Q2], partials[Q2])
+
+        h12 = -log(q2 / q1) / dt
+        r12 = -log(z2 / z1) / dt
+        expTerm = exp(-(r12 + h12) * dt)
+        b = abs(h12 + r12) + small
+
+        d = h12 * (1.0 - expTerm) * q1 * z1 / b
+        prot_pv += d
+
+        d_s = h12 * q1 * z1 * (expTerm * dt / b
+                               - (1.0 - expTerm) * np.sign(h12 + r12)
+                               / (b * b))
+        d_h = (1.0 - expTerm) * q1 * z1 / b + d_s
+
+        _add_partials(grad_surv, indices, partials, Q1,
+                      c * (d / q1 + d_h / (q1 * dt)))
+        _add_partials(grad_surv, indices, partials, Q2,
+                      c * (-d_h / (q2 * dt)))
+        _add_partials(grad_ibor, indices, partials, Z1,
+                      c * (d / z1 + d_s / (z1 * dt)))
+        _add_partials(grad_ibor, indices, partials, Z2,
+                      c * (-d_s / (z2 * dt)))
+
+        q1 = q2
+        z1 = z2
+        indices[Q1] = indices[Q2]
+        partials[Q1] = partials[Q2]
+        indices[Z1] = indices[Z2]
+        partials[Z1] = partials[Z2]
+
+    prot_pv *= (1.0 - contract_recovery_rate)
+
+    v = prot_pv - coupon * cleanRPV01
+    return v, cleanRPV01
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _bootstrap_cds_curves(spreads,
+                          recovery_rates,
+                          pillar_times,
+                          teff,
+                          accrued_factors,
+                          pay_offsets,
+                          pay_times,
+                          year_fracs,
+                          npIborTimes,
+                          npIborValues,
+                          num_steps_per_year,
+                          tol,
+                          max_iter,
+                          start_values,
+                          first_pillar):
+    """ Bootstrap the survival curves of many issuers in parallel. Issuer i
+    has the CDS running coupons in row i of spreads and all issuers share the
+    pillar times and the payment schedules of the contract for each pillar.
+    The flat hazard rate of each interval is solved by Newton's method using
+    the analytic derivative of the contract value. The survival probabilities
+    up to and including pillar first_pillar are taken from start_values and
+    only the later intervals are solved. Newton's method starts from the
+    hazard rate of the interval in start_values if it is positive. Returns
+    the survival probabilities at the pillar times and the number of the
+    first pillar that failed to converge for each issuer or -1 if all
+    converged. """
+
+    num_issuers, num_pillars = spreads.shape
+    values = start_values.copy()
+    failed = -np.ones(num_issuers, dtype=np.int64)
+
+    for i in prange(num_issuers):
+
+        h = spreads[i, first_pillar] / (1.0 - recovery_rates[i])
+
+        for k in range(first_pillar, num_pillars):
+
+            tprev = pillar_times[k]
+            dtk = pillar_times[k + 1] - tprev
+            p0 = pay_offsets[k]
+            p1 = pay_offsets[k + 1]
+
+            # Start from the hazard rate of an earlier solution if given
+            if start_values[i, k + 1] < start_values[i, k]:
+                h = log(start_values[i, k] / start_values[i, k + 1]) / dtk
+
+            converged = False
+
+            for _ in range(0, max_iter):
+
+                values[i, k + 1] = values[i, k] * exp(-h * dtk)
+
+                v, dv = _cds_value_and_hazard_delta(teff,
+                                                    pillar_times[k + 1],
+                                                    accrued_factors[k],
+                                                    pay_times[p0:p1],
+                                                    year_fracs[p0:p1],
+                                                    npIborTimes,
+                                                    npIborValues,
+                                                    pillar_times[0:k + 2],
+                                                    values[i, 0:k + 2],
+                                                    spreads[i, k],
+                                                    recovery_rates[i],
+                                                    num_steps_per_year,
+                                                    tprev)
+
+                step = v / dv
+                h = h - step
+
+                if abs(step) < tol:
+                    converged = True
+                    break
+
+            values[i, k + 1] = values[i, k] * exp(-h * dtk)
+
+            if converged is False and failed[i] < 0:
+                failed[i] = k
+
+    return values, failed
+
+###############################################################################
+
+
+def _cds_kernel_inputs(cds, valuation_date):
+    """ Return the effective and maturity times, the accrual factor from the
+    previous coupon date to the step in date, the payment times and the
+    accrual factors of a CDS in the form used by the CDS kernels. """
+
+    dates = cds._adjusted_dates
+    day_count = DayCount(cds._day_count_type)
+
+    teff = (cds._step_in_date - valuation_date) / gDaysInYear
+    tmat = (cds._maturity_date - valuation_date) / gDaysInYear
+    accrued_factor = day_count.year_frac(dates[0], cds._step_in_date)[0]
+    payment_times = np.array([(dt - valuation_date) / gDaysInYear
+                              for dt in dates])
+    year_fracs = np.array(cds._accrual_factors)
+
+    return teff, tmat, accrued_factor, payment_times, year_fracs
+
+###############################################################################
+
+
 class CDSCurve:
     """ Generate a survival probability curve implied by the value of CDS
     contracts given a Ibor curve and an assumed recovery rate. The recovery 
@@ -53,7 +437,9 @@ class CDSCurve:
                  interpolation_method: InterpTypes = InterpTypes.FLAT_FWD_RATES):
         """ Construct a credit curve from a sequence of maturity-ordered CDS
         contracts and a Ibor curve using the same recovery rate and the
-        same interpolation method. """
+        same interpolation method. If use_cache is True the survival
+        probabilities on each grid of times are memoised until the curve
+        changes. """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
 
@@ -68,6 +454,15 @@ class CDSCurve:
         self._interpolation_method = interpolation_method
         self._built_ok = False
 
+        if use_cache is True:
+            self._cache = CurveCache()
+        else:
+            self._cache = None
+
+        self._jacobian = None
+        self._spread_derivs = None
+        self._rate_jacobian = None
+
         self._times = []
         self._values = []
 
@@ -78,6 +473,53 @@ class CDSCurve:
 
         return
 
+###############################################################################
+
+    @classmethod
+    def from_survival_probabilities(cls,
+                                    valuation_date: Date,
+                                    cds_contracts: list,
+                                    libor_curve,
+                                    recovery_rate,
+                                    times: (list, np.ndarray),
+                                    values: (list, np.ndarray),
+                                    use_cache: bool = False,
+                                    interpolation_method: InterpTypes = InterpTypes.FLAT_FWD_RATES):
+        """ Create a credit curve from survival probabilities which have
+        already been solved for, such as those of a batch bootstrap, so that
+        the curve is not built again. The times start at zero with a survival
+        probability of one and have one more entry than the CDS contracts,
+        which are kept so that the curve can be updated and its risk
+        calculated. """
+
+        check_argument_types(cls.from_survival_probabilities, locals())
+
+        times = np.array(times, dtype=np.float64)
+        values = np.array(values, dtype=np.float64)
+
+        if times.ndim != 1 or times.shape != values.shape:
+            raise FinError("Need one survival probability per time.")
+
+        if len(times) == 0 or times[0] != 0.0 or values[0] != 1.0:
+            raise FinError("Survival curve must start at time zero with a "
+                           "survival probability of one.")
+
+        if len(cds_contracts) > 0:
+            if len(times) != len(cds_contracts) + 1:
+                raise FinError("Need one time per CDS contract plus time "
+                               "zero.")
+
+        curve = cls(valuation_date, [], libor_curve, recovery_rate, use_cache,
+                    interpolation_method)
+
+        if len(cds_contracts) > 0:
+            curve._validate(cds_contracts)
+
+        curve._cds_contracts = cds_contracts
+        curve._times = times
+        curve._values = values
+        return curve
+
 ###############################################################################
 
     def _validate(self, cds_contracts):
@@ -110,6 +552,23 @@ class CDSCurve:
         if np.any(t < 0.0):
             raise FinError("Survival Date before curve anchor date")
 
+        if self._cache is None:
+            return self._survival_prob(t)
+
+        qs = self._cache.values(t, self._survival_prob,
+                                self._times, self._values)
+
+        if isinstance(qs, np.ndarray):
+            return qs.copy()
+        else:
+            return qs
+
+###############################################################################
+
+    def _survival_prob(self, t):
+        """ Interpolate the survival probability to time t which is a float
+        or an array of times. """
+
         if isinstance(t, np.ndarray):
             n = len(t)
             qs = np.zeros(n)
@@ -128,6 +587,17 @@ class CDSCurve:
         else:
             raise FinError("Unknown time type")
 
+###############################################################################
+
+    def cache_info(self):
+        """ Return a dictionary with the numbers of cache hits and misses and
+        of cached entries or None if the curve has no cache. """
+
+        if self._cache is None:
+            return None
+
+        return self._cache.info()
+
 ###############################################################################
 
     def df(self, dt):
@@ -136,6 +606,8 @@ class CDSCurve:
 
         if isinstance(dt, Date):
             t = (dt - self._valuation_date) / gDaysInYear
+        elif isinstance(dt, DateArray):
+            t = (dt - self._valuation_date) / gDaysInYear
         elif isinstance(dt, list):
             t = np.array(dt)
         else:
@@ -145,17 +617,25 @@ class CDSCurve:
 
 ###############################################################################
 
-    def _build_curve(self):
-        """ Construct the CDS survival curve from a set of CDS contracts """
+    def _build_curve(self, first_contract: int = 0):
+        """ Construct the CDS survival curve from a set of CDS contracts. The
+        survival probabilities before the maturity of the first contract
+        given are kept from the last build. """
 
         self._validate(self._cds_contracts)
         num_times = len(self._cds_contracts)
+        self._jacobian = None
 
-        # we size the vectors to include time zero
-        self._times = np.array([0.0])
-        self._values = np.array([1.0])
+        if first_contract > 0:
+            # Each point only depends on the contracts up to its own
+            self._times = self._times[0:first_contract + 1].copy()
+            self._values = self._values[0:first_contract + 1].copy()
+        else:
+            # we size the vectors to include time zero
+            self._times = np.array([0.0])
+            self._values = np.array([1.0])
 
-        for i in range(0, num_times):
+        for i in range(first_contract, num_times):
 
             maturity_date = self._cds_contracts[i]._maturity_date
 
@@ -172,6 +652,227 @@ class CDSCurve:
             optimize.newton(f, x0=q, fprime=None, args=argtuple,
                             tol=1e-7, maxiter=50, fprime2=None)
 
+###############################################################################
+
+    def update_quotes(self,
+                      changed_quotes: dict):
+        """ Change the running coupons of some of the CDS contracts and
+        rebuild the curve. The keys of changed_quotes are the positions of the
+        contracts and the values are their new running coupons. The survival
+        probabilities before the maturity of the first changed contract are
+        kept and only the later ones are solved again. Returns the indices of
+        the curve times whose survival probabilities have changed. """
+
+        num_contracts = len(self._cds_contracts)
+
+        if len(changed_quotes) == 0:
+            raise FinError("No quotes have been changed.")
+
+        for i in changed_quotes:
+            if i < 0 or i >= num_contracts:
+                raise FinError("Contract index " + str(i) + " out of range.")
+
+        # The premium leg flows are proportional to the coupon so they are
+        # calculated again for the contracts whose coupon has changed
+        for i in changed_quotes:
+            self._cds_contracts[i]._running_coupon = changed_quotes[i]
+            self._cds_contracts[i]._calc_flows()
+
+        old_values = self._values.copy()
+        self._build_curve(min(changed_quotes))
+
+        changed_points = np.nonzero(self._values != old_values)[0]
+        return changed_points
+
+###############################################################################
+
+    def _build_jacobian(self):
+        """ Calculate the derivatives of the bootstrap equations. Contract k
+        is priced to zero on the curve truncated after its own maturity so
+        its clean value depends on the survival probabilities up to pillar
+        k+1 only and the Jacobian with respect to them is lower triangular.
+        The derivatives with respect to the running coupons and to the Libor
+        discount factors are also stored. """
+
+        num_contracts = len(self._cds_contracts)
+        libor_curve = self._libor_curve
+
+        jacobian = np.zeros((num_contracts, num_contracts))
+        spread_derivs = np.zeros(num_contracts)
+        rate_jacobian = np.zeros((num_contracts, len(libor_curve._times)))
+
+        times = np.array(self._times, dtype=np.float64)
+        values = np.array(self._values, dtype=np.float64)
+
+        for k, cds in enumerate(self._cds_contracts):
+
+            teff, tmat, accrued_factor, payment_times, year_fracs = \
+                _cds_kernel_inputs(cds, self._valuation_date)
+
+            grad_surv = np.zeros(k + 2)
+
+            _, cleanRPV01 = \
+                _cds_value_and_gradients(teff, tmat, accrued_factor,
+                                         payment_times, year_fracs,
+                                         libor_curve._times,
+                                         libor_curve._dfs,
+                                         times[0:k + 2],
+                                         values[0:k + 2],
+                                         cds._running_coupon,
+                                         self._recovery_rate,
+                                         25,
+                                         grad_surv,
+                                         rate_jacobian[k])
+
+            jacobian[k, 0:k + 1] = grad_surv[1:]
+            spread_derivs[k] = -cleanRPV01
+
+        self._jacobian = jacobian
+        self._spread_derivs = spread_derivs
+        self._rate_jacobian = rate_jacobian[:, 1:]
+
+###############################################################################
+
+    def _trade_gradients(self,
+                         valuation_date,
+                         cds_contracts,
+                         contract_recovery_rate):
+        """ Return the gradients of the full values of the contracts with
+        respect to the survival probabilities, excluding the one at time zero,
+        and to the Libor discount factors, excluding the one at time zero,
+        each with a row per contract. """
+
+        if valuation_date != self._valuation_date:
+            raise FinError("Valuation date is not the curve valuation date.")
+
+        if isinstance(cds_contracts, CDS):
+            cds_contracts = [cds_contracts]
+
+        if self._jacobian is None:
+            self._build_jacobian()
+
+        libor_curve = self._libor_curve
+        num_trades = len(cds_contracts)
+
+        grads_surv = np.zeros((num_trades, len(self._times)))
+        grads_ibor = np.zeros((num_trades, len(libor_curve._times)))
+
+        times = np.array(self._times, dtype=np.float64)
+        values = np.array(self._values, dtype=np.float64)
+
+        for i, cds in enumerate(cds_contracts):
+
+            teff, tmat, accrued_factor, payment_times, year_fracs = \
+                _cds_kernel_inputs(cds, valuation_date)
+
+            _cds_value_and_gradients(teff, tmat, accrued_factor,
+                                     payment_times, year_fracs,
+                                     libor_curve._times,
+                                     libor_curve._dfs,
+                                     times,
+                                     values,
+                                     cds._running_coupon,
+                                     contract_recovery_rate,
+                                     25,
+                                     grads_surv[i],
+                                     grads_ibor[i])
+
+            if cds._long_protection:
+                scale = cds._notional
+            else:
+                scale = -cds._notional
+
+            grads_surv[i] *= scale
+            grads_ibor[i] *= scale
+
+        return grads_surv[:, 1:], grads_ibor[:, 1:]
+
+###############################################################################
+
+    def spread_sensitivities(self,
+                             valuation_date: Date,
+                             cds_contracts,
+                             contract_recovery_rate: float,
+                             aggregate: bool = False):
+        """ Return the change in the full value of each CDS contract for a
+        one basis point rise in the running coupon of each of the contracts
+        used to build this curve, holding the Libor curve fixed. The survival
+        probabilities P solve R(P, s) = 0 so dP/ds = -J^-1 dR/ds and the
+        sensitivities come from one transposed solve with the stored
+        bootstrap Jacobian J without copying or rebuilding the curve. Returns
+        an array with a row per contract and a column per curve contract or,
+        if aggregate is True, the vector of portfolio sensitivities. Their
+        sum is the credit DV01 to first order. """
+
+        grads_surv, _ = self._trade_gradients(valuation_date,
+                                              cds_contracts,
+                                              contract_recovery_rate)
+
+        if aggregate is True:
+            grads_surv = np.sum(grads_surv, axis=0)
+
+        bump = 0.0001  # 1 basis point
+
+        adjoints = solve_triangular(self._jacobian, np.transpose(grads_surv),
+                                    trans='T', lower=True)
+        sensitivities = -np.transpose(adjoints) * self._spread_derivs * bump
+
+        if isinstance(cds_contracts, CDS) and aggregate is False:
+            return sensitivities[0]
+
+        return sensitivities
+
+###############################################################################
+
+    def rate_sensitivities(self,
+                           valuation_date: Date,
+                           cds_contracts,
+                           contract_recovery_rate: float,
+                           aggregate: bool = False):
+        """ Return the change in the full value of each CDS contract for a
+        one basis point rise in each quote used to build the Libor curve with
+        the survival curve rebuilt from unchanged CDS coupons. A rate move
+        changes the contract values directly through the discount factors
+        and indirectly through the survival probabilities which must move to
+        keep the curve contracts priced at zero. Both are found with adjoint
+        solves using the stored Jacobians of the two curves. Returns an array
+        with a row per contract and a column per Libor quote or, if aggregate
+        is True, the vector of portfolio sensitivities. Their sum is the
+        interest DV01 to first order. """
+
+        libor_curve = self._libor_curve
+
+        if getattr(libor_curve, "_jacobian", None) is None:
+            raise FinError("Rate sensitivities need a Libor curve built with "
+                           "an analytic bootstrap.")
+
+        grads_surv, grads_ibor = self._trade_gradients(valuation_date,
+                                                       cds_contracts,
+                                                       contract_recovery_rate)
+
+        if aggregate is True:
+            grads_surv = np.sum(grads_surv, axis=0)
+            grads_ibor = np.sum(grads_ibor, axis=0)
+
+        # Include the move in the survival probabilities
+        adjoints = solve_triangular(self._jacobian, np.transpose(grads_surv),
+                                    trans='T', lower=True)
+        grads_ibor = grads_ibor - \
+            np.transpose(np.dot(np.transpose(self._rate_jacobian), adjoints))
+
+        bump = 0.0001  # 1 basis point
+
+        sensitivities = \
+            _adjoint_quote_sensitivities(libor_curve._jacobian,
+                                         libor_curve._quote_derivs,
+                                         grads_ibor,
+                                         bump)
+
+        if isinstance(cds_contracts, CDS) and aggregate is False:
+            return sensitivities[0]
+
+        return sensitivities
+
 ###############################################################################
 
     def fwd(self, dt):
@@ -244,3 +945,166 @@ class CDSCurve:
         print(self)
 
 ##########################################################################
+
+
+def _bootstrap_inputs(valuation_date, step_in_date, maturity_dates_or_tenors):
+    """ Return the template contracts for a set of curve maturities together
+    with the pillar times and the flattened payment schedules used by the
+    batch bootstrap kernel. """
+
+    num_pillars = len(maturity_dates_or_tenors)
+
+    # One template contract per maturity provides the shared schedules
+    templates = []
+    for maturity_date_or_tenor in maturity_dates_or_tenors:
+        templates.append(CDS(step_in_date, maturity_date_or_tenor, 0.0))
+
+    pillar_times = np.zeros(num_pillars + 1)
+    accrued_factors = np.zeros(num_pillars)
+    pay_offsets = np.zeros(num_pillars + 1, dtype=np.int64)
+    pay_times = []
+    year_fracs = []
+
+    for k, cds in enumerate(templates):
+
+        if k > 0 and cds._maturity_date <= templates[k - 1]._maturity_date:
+            raise FinError("CDS contracts not in increasing maturity.")
+
+        dates = cds._adjusted_dates
+        day_count = DayCount(cds._day_count_type)
+
+        pillar_times[k + 1] = \
+            (cds._maturity_date - valuation_date) / gDaysInYear
+        accrued_factors[k] = day_count.year_frac(dates[0], step_in_date)[0]
+        pay_offsets[k + 1] = pay_offsets[k] + len(dates)
+        pay_times.append([(dt - valuation_date) / gDaysInYear
+                          for dt in dates])
+        year_fracs.append(cds._accrual_factors)
+
+    teff = (step_in_date - valuation_date) / gDaysInYear
+
+    return templates, pillar_times, teff, accrued_factors, pay_offsets, \
+        np.concatenate(pay_times), np.concatenate(year_fracs)
+
+###############################################################################
+
+
+def build_cds_curves(valuation_date: Date,
+                     step_in_date: Date,
+                     maturity_dates_or_tenors: list,
+                     spreads: np.ndarray,
+                     libor_curve,
+                     recovery_rates=0.40,
+                     interpolation_method: InterpTypes = InterpTypes.FLAT_FWD_RATES):
+    """ Build the survival curves of many issuers at once from a matrix of
+    CDS running coupons with one row per issuer and one column per maturity
+    date or tenor. All issuers share the Libor curve and the maturities and
+    the recovery rate is one number or an array with one per issuer. The
+    curves are bootstrapped together in a parallel NUMBA kernel which solves
+    for the flat hazard rate of each interval using the analytic derivative
+    of the CDS value. Returns a list of CDSCurve objects which are the same
+    as those built one at a time from the same contracts. The CDS pricing
+    kernels interpolate flat forward rates and so this is the only
+    interpolation method supported. """
+
+    check_argument_types(build_cds_curves, locals())
+
+    if interpolation_method != InterpTypes.FLAT_FWD_RATES:
+        raise FinError("Only FLAT_FWD_RATES interpolation is supported by "
+                       "the batch bootstrap.")
+
+    if valuation_date != libor_curve._valuation_date:
+        raise FinError(
+            "Curve does not have same valuation date as Issuer curve.")
+
+    spreads = np.array(spreads, dtype=np.float64)
+    num_pillars = len(maturity_dates_or_tenors)
+
+    if spreads.ndim != 2 or spreads.shape[1] != num_pillars:
+        raise FinError("Need one column of spreads per maturity.")
+
+    num_issuers = spreads.shape[0]
+    recovery_rates = np.array(recovery_rates, dtype=np.float64)
+
+    if recovery_rates.ndim == 0:
+        recovery_rates = np.full(num_issuers, float(recovery_rates))
+    elif recovery_rates.shape != (num_issuers,):
+        raise FinError("Need one recovery rate per issuer.")
+
+    templates, pillar_times, teff, accrued_factors, pay_offsets, pay_times, \
+        year_fracs = _bootstrap_inputs(valuation_date,
+                                       step_in_date,
+                                       maturity_dates_or_tenors)
+
+    values, failed = _bootstrap_cds_curves(spreads,
+                                           recovery_rates,
+                                           pillar_times,
+                                           teff,
+                                           accrued_factors,
+                                           pay_offsets,
+                                           pay_times,
+                                           year_fracs,
+                                           libor_curve._times,
+                                           libor_curve._dfs,
+                                           25,
+                                           1e-12,
+                                           50,
+                                           np.ones((num_issuers,
+                                                    num_pillars + 1)),
+                                           0)
+
+    if np.any(failed >= 0):
+        i = int(np.argmax(failed >= 0))
+        raise FinError("Bootstrap failed for issuer " + str(i) +
+                       " at contract " + str(failed[i]) + ".")
+
+    return _cds_curves_from_values(valuation_date,
+                                   templates,
+                                   spreads,
+                                   pillar_times,
+                                   values,
+                                   libor_curve,
+                                   recovery_rates,
+                                   interpolation_method)
+
+###############################################################################
+
+
+def _cds_curves_from_values(valuation_date,
+                            templates,
+                            spreads,
+                            pillar_times,
+                            values,
+                            libor_curve,
+                            recovery_rates,
+                            interpolation_method):
+    """ Return a list of CDSCurve objects with one per row of bootstrapped
+    survival probabilities whose CDS contracts are copies of the template
+    contracts paying the issuer spreads. """
+
+    issuer_curves = []
+
+    for i in range(0, spreads.shape[0]):
+
+        cds_contracts = []
+        for k, template in enumerate(templates):
+            cds = copy(template)
+            cds._running_coupon = spreads[i, k]
+            cds._flows = [accrual_factor * cds._running_coupon * cds._notional
+                          for accrual_factor in cds._accrual_factors]
+            cds_contracts.append(cds)
+
+        issuer_curve = CDSCurve.from_survival_probabilities(
+            valuation_date,
+            cds_contracts,
+            libor_curve,
+            recovery_rates[i],
+            pillar_times,
+            values[i],
+            interpolation_method=interpolation_method)
+
+        issuer_curves.append(issuer_curve)
+
+    return issuer_curves
+
+###############################################################################
@@ -3,18 +3,24 @@
 ##############################################################################
 
 
-from math import exp, log, sqrt
-
+import numpy as np
+from numba import njit, prange
 
 from ...utils.calendar import CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
-from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.global_vars import gDaysInYear
-from ...utils.math import ONE_MILLION, INVROOT2PI, N
+from ...utils.math import ONE_MILLION, INVROOT2PI
 from ...utils.error import FinError
-from ...products.credit.cds_curve import CDSCurve
+from ...market.curves.interpolator import _uinterpolate, InterpTypes
 from ...products.credit.cds import CDS
+from ...products.credit.cds_curve import _bootstrap_inputs
+from ...products.credit.cds_curve import _bootstrap_cds_curves
+from ...products.credit.cds_option import _black_option_grid
+from ...products.credit.cds_option import _black_implied_vol_grid
+from ...products.credit.cds_option import _grid_values, _strike_grid
+from ...products.credit.cds_option import _forward_cds_legs
 from ...utils.helpers import check_argument_types
 from ...utils.date import Date
 from ...utils.helpers import label_to_string
@@ -24,6 +30,628 @@ RPV01_INDEX = 1  # 0 is FULL, 1 is CLEAN
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _anderson_integrals(x,
+                        sigma,
+                        texp,
+                        index_coupon,
+                        strike_value,
+                        lgd,
+                        flow_times,
+                        flow_dfs,
+                        flow_accruals,
+                        accrued_factor,
+                        df_to_expiry):
+    """ Calculates the intrinsic value of the index payer swap and the
+    value of the index payer option in the Anderson model with the forward
+    spread mean x. The payment times and forward discount factors of the
+    flows after expiry are measured from the expiry date. """
+
+    z = -6.0
+    dz = 0.2
+    numZSteps = int(2.0 * abs(z) / dz)
+
+    intH = 0.0
+    intMaxH = 0.0
+
+    s0 = np.exp(-0.5 * sigma * sigma * texp)
+
+    for _ in range(0, numZSteps):
+        s = x * s0 * np.exp(sigma * np.sqrt(texp) * z)
+        pdf = np.exp(-(z**2) / 2.0)
+        z = z + dz
+
+        fwdRPV01 = 0.0
+        for iFlow in range(0, len(flow_times)):
+            survivalProbability = np.exp(-s * flow_times[iFlow] / lgd)
+            fwdRPV01 += flow_accruals[iFlow] * survivalProbability * \
+                flow_dfs[iFlow]
+
+        fwdRPV01 += -accrued_factor
+        h = (s - index_coupon) * fwdRPV01
+        maxh = max(h - strike_value, 0.0)
+
+        intH += h * pdf
+        intMaxH += maxh * pdf
+
+    intH *= INVROOT2PI * dz
+    intMaxH *= INVROOT2PI * dz * df_to_expiry
+    return intH, intMaxH
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _anderson_solve_x(sigma,
+                      texp,
+                      index_coupon,
+                      lgd,
+                      flow_times,
+                      flow_dfs,
+                      flow_accruals,
+                      accrued_factor,
+                      df_to_expiry,
+                      expH):
+    """ Solve by bisection for the mean of the forward spread which makes
+    the expected intrinsic value of the index payer swap equal to expH.
+    Returns -1 if the solution is not bracketed. """
+
+    x1 = 0.0
+    x2 = 0.9999
+    ftol = 1e-8
+    jmax = 40
+    xacc = 0.000000001
+
+    f = _anderson_integrals(x1, sigma, texp, index_coupon, 0.0, lgd,
+                            flow_times, flow_dfs, flow_accruals,
+                            accrued_factor, df_to_expiry)[0] - expH
+
+    fmid = _anderson_integrals(x2, sigma, texp, index_coupon, 0.0, lgd,
+                               flow_times, flow_dfs, flow_accruals,
+                               accrued_factor, df_to_expiry)[0] - expH
+
+    if f * fmid >= 0.0:
+        return -1.0
+
+    if f < 0.0:
+        rtb = x1
+        dx = x2 - x1
+    else:
+        rtb = x2
+        dx = x1 - x2
+
+    for _ in range(0, jmax):
+        dx = dx * 0.5
+        xmid = rtb + dx
+        fmid = _anderson_integrals(xmid, sigma, texp, index_coupon, 0.0, lgd,
+                                   flow_times, flow_dfs, flow_accruals,
+                                   accrued_factor, df_to_expiry)[0] - expH
+        if fmid <= 0.0:
+            rtb = xmid
+        if abs(dx) < xacc or abs(fmid) < ftol:
+            return xmid
+
+    return rtb
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _anderson_grid(texps,
+                   sigmas,
+                   strike_values,
+                   exp_hs,
+                   index_coupon,
+                   lgd,
+                   flow_offsets,
+                   flow_times,
+                   flow_dfs,
+                   flow_accruals,
+                   accrued_factors,
+                   dfs_to_expiry):
+    """ Solve for the forward spread mean x and value the index payer option
+    of each cell of a grid with one row per expiry and one column per strike
+    in parallel. The flows after expiry i are the slice from flow_offsets[i]
+    to flow_offsets[i+1]. Returns the matrices of x and of the payer values
+    per unit notional. The value of x is -1 where it is not bracketed. """
+
+    num_expiries = sigmas.shape[0]
+    num_strikes = sigmas.shape[1]
+    out = np.zeros((2, num_expiries, num_strikes))
+
+    for iCell in prange(num_expiries * num_strikes):
+
+        i = iCell // num_strikes
+        j = iCell % num_strikes
+        f0 = flow_offsets[i]
+        f1 = flow_offsets[i + 1]
+
+        x = _anderson_solve_x(sigmas[i, j],
+                              texps[i],
+                              index_coupon,
+                              lgd,
+                              flow_times[f0:f1],
+                              flow_dfs[f0:f1],
+                              flow_accruals[f0:f1],
+                              accrued_factors[i],
+                              dfs_to_expiry[i],
+                              exp_hs[i, j])
+
+        out[0, i, j] = x
+
+        if x >= 0.0:
+            out[1, i, j] = _anderson_integrals(x,
+                                               sigmas[i, j],
+                                               texps[i],
+                                               index_coupon,
+                                               strike_values[i, j],
+                                               lgd,
+                                               flow_times[f0:f1],
+                                               flow_dfs[f0:f1],
+                                               flow_accruals[f0:f1],
+                                               accrued_factors[i],
+                                               dfs_to_expiry[i])[1]
+
+    return out
+
+###############################################################################
+
+
+def _strike_curve_grids(valuation_date,
+                        step_in_date,
+                        maturity_date,
+                        strikes,
+                        libor_curve,
+                        recovery_rate):
+    """ Bootstrap the flat hazard curves implied by CDS paying each of the
+    strike coupons in one pass and return the grid of times and survival
+    probabilities of each curve together with the template CDS contract. """
+
+    templates, pillar_times, teff, accrued_factors, pay_offsets, pay_times, \
+        year_fracs = _bootstrap_inputs(valuation_date,
+                                       step_in_date,
+                                       [maturity_date])
+
+    num_strikes = len(strikes)
+
+    values, failed = _bootstrap_cds_curves(strikes.reshape(-1, 1),
+                                           np.full(num_strikes, recovery_rate),
+                                           pillar_times,
+                                           teff,
+                                           accrued_factors,
+                                           pay_offsets,
+                                           pay_times,
+                                           year_fracs,
+                                           libor_curve._times,
+                                           libor_curve._dfs,
+                                           25,
+                                           1e-12,
+                                           50,
+                                           np.ones((num_strikes, 2)),
+                                           0)
+
+    if np.any(failed >= 0):
+        raise FinError("Strike curve bootstrap failed.")
+
+    grids = [(pillar_times, values[j]) for j in range(0, num_strikes)]
+    return grids, templates[0]
+
+###############################################################################
+
+
+def _index_option_contracts(expiry_dates,
+                            maturity_date,
+                            index_coupon,
+                            valuation_date,
+                            freq_type,
+                            day_count_type,
+                            calendar_type,
+                            bus_day_adjust_type,
+                            date_gen_rule_type):
+    """ Return the time to each expiry date and the index CDS which steps in
+    on that date. """
+
+    num_expiries = len(expiry_dates)
+
+    if num_expiries == 0:
+        raise FinError("No expiry dates have been supplied.")
+
+    texps = np.zeros(num_expiries)
+    cds_contracts = []
+
+    for i, expiry_date in enumerate(expiry_dates):
+
+        if expiry_date > maturity_date:
+            raise FinError("Expiry date after end date")
+
+        if valuation_date > expiry_date:
+            raise FinError("Expiry date is now or in the past")
+
+        texps[i] = (expiry_date - valuation_date) / gDaysInYear
+
+        cds_contracts.append(CDS(expiry_date,
+                                 maturity_date,
+                                 index_coupon,
+                                 1.0,
+                                 True,
+                                 freq_type,
+                                 day_count_type,
+                                 calendar_type,
+                                 bus_day_adjust_type,
+                                 date_gen_rule_type))
+
+    return texps, cds_contracts
+
+###############################################################################
+
+
+def _adjusted_black_inputs(valuation_date,
+                           expiry_dates,
+                           maturity_date,
+                           index_coupon,
+                           strikes,
+                           index_curve,
+                           index_recovery,
+                           libor_curve,
+                           freq_type,
+                           day_count_type,
+                           calendar_type,
+                           bus_day_adjust_type,
+                           date_gen_rule_type):
+    """ Return the times to expiry, the adjusted forward spreads and index
+    risky PV01s by expiry and the matrix of adjusted strikes used by the
+    adjusted Black model. The strike curves are bootstrapped once per
+    distinct strike and all of the forward legs are valued in one pass. """
+
+    texps, cds_contracts = _index_option_contracts(expiry_dates,
+                                                   maturity_date,
+                                                   index_coupon,
+                                                   valuation_date,
+                                                   freq_type,
+                                                   day_count_type,
+                                                   calendar_type,
+                                                   bus_day_adjust_type,
+                                                   date_gen_rule_type)
+
+    num_expiries = len(expiry_dates)
+    unique_strikes, strike_ids = np.unique(strikes, return_inverse=True)
+    strike_ids = strike_ids.reshape(strikes.shape)
+    num_unique = len(unique_strikes)
+
+    strike_grids, _ = _strike_curve_grids(valuation_date,
+                                          valuation_date,
+                                          maturity_date,
+                                          unique_strikes,
+                                          libor_curve,
+                                          index_recovery)
+
+    surv_grids = [(index_curve._times, index_curve._values)] + strike_grids
+    libor_ids = [0] + [1] * num_unique
+
+    pairs = [(0, i) for i in range(0, num_expiries)]
+    for i in range(0, num_expiries):
+        pairs += [(1 + j, i) for j in range(0, num_unique)]
+
+    rpv01s, prot_pvs, _ = _forward_cds_legs(valuation_date,
+                                            cds_contracts,
+                                            surv_grids,
+                                            [index_curve._libor_curve,
+                                             libor_curve],
+                                            libor_ids,
+                                            pairs)
+
+    indexRPV01 = rpv01s[0:num_expiries]
+    s = prot_pvs[0:num_expiries] / indexRPV01
+    strikeRPV01 = rpv01s[num_expiries:].reshape(num_expiries, num_unique)
+    strikeRPV01 = np.take_along_axis(strikeRPV01, strike_ids, axis=1)
+
+    df = libor_curve.df(expiry_dates)
+    qExpiryIndex = index_curve.survival_prob(texps)
+
+    fep = df * (1.0 - qExpiryIndex) * (1.0 - index_recovery)
+    adjFwd = s + fep / indexRPV01
+
+    indexRPV01 = indexRPV01[:, np.newaxis]
+    adjStrike = index_coupon + (strikes - index_coupon) * strikeRPV01 / \
+        indexRPV01 / qExpiryIndex[:, np.newaxis]
+
+    return texps, adjFwd, indexRPV01[:, 0], adjStrike
+
+###############################################################################
+
+
+def value_adjusted_black_grid(valuation_date: Date,
+                              expiry_dates: list,
+                              maturity_date: Date,
+                              index_coupon: float,
+                              strikes,
+                              volatilities,
+                              index_curve,
+                              index_recovery: float,
+                              libor_curve,
+                              notional: float = ONE_MILLION,
+                              freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                              day_count_type: DayCountTypes = DayCountTypes.ACT_360,
+                              calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                              bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                              date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
+    """ Value options on a CDS index for a grid of expiry dates and strike
+    coupons using the adjusted Black model of value_adjusted_black. The
+    strikes are one list for all expiries or a matrix with one row per
+    expiry and the volatilities are one number, one per expiry or a matrix.
+    The adjusted forward spread and forward risky PV01 are calculated once
+    per expiry and the strike curves once per strike. Returns a dictionary
+    of matrices by expiry and strike of the payer and receiver values, their
+    deltas and the gamma and vega with respect to the adjusted forward, and
+    the adjusted forwards, index risky PV01s and adjusted strikes. """
+
+    check_argument_types(value_adjusted_black_grid, locals())
+
+    strikes = _strike_grid(strikes, len(expiry_dates))
+    num_expiries, num_strikes = strikes.shape
+    vols = _grid_values(volatilities, num_expiries, num_strikes, "volatility")
+
+    if np.any(strikes < 0.0):
+        raise FinError("Index Option strike coupon is negative")
+
+    if np.any(vols <= 0.0):
+        raise FinError("Volatility must be greater than zero")
+
+    texps, adjFwd, indexRPV01, adjStrike = \
+        _adjusted_black_inputs(valuation_date,
+                               expiry_dates,
+                               maturity_date,
+                               index_coupon,
+                               strikes,
+                               index_curve,
+                               index_recovery,
+                               libor_curve,
+                               freq_type,
+                               day_count_type,
+                               calendar_type,
+                               bus_day_adjust_type,
+                               date_gen_rule_type)
+
+    out = _black_option_grid(adjFwd, adjStrike, indexRPV01, texps, vols)
+
+    return {'payer': out[0] * notional,
+            'receiver': out[1] * notional,
+            'payer_delta': out[2] * notional,
+            'receiver_delta': out[3] * notional,
+            'gamma': out[4] * notional,
+            'vega': out[5] * notional,
+            'adjusted_forward': adjFwd,
+            'index_rpv01': indexRPV01,
+            'adjusted_strike': adjStrike}
+
+###############################################################################
+
+
+def implied_volatility_adjusted_black_grid(valuation_date: Date,
+                                           expiry_dates: list,
+                                           maturity_date: Date,
+                                           index_coupon: float,
+                                           strikes,
+                                           option_values,
+                                           index_curve,
+                                           index_recovery: float,
+                                           libor_curve,
+                                           notional: float = ONE_MILLION,
+                                           long_protection: bool = True,
+                                           freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                                           day_count_type: DayCountTypes = DayCountTypes.ACT_360,
+                                           calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                                           bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                                           date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
+                                           tolerance: float = 1e-10,
+                                           max_iterations: int = 100):
+    """ Calculate the adjusted Black implied volatilities of a grid of CDS
+    index payer option prices, or receiver option prices if long_protection
+    is False, laid out by expiry date and strike coupon as the values
+    returned by value_adjusted_black_grid. Prices which no volatility
+    reproduces give NaN. """
+
+    check_argument_types(implied_volatility_adjusted_black_grid, locals())
+
+    strikes = _strike_grid(strikes, len(expiry_dates))
+    num_expiries, num_strikes = strikes.shape
+    prices = _grid_values(option_values, num_expiries, num_strikes, "price")
+
+    texps, adjFwd, indexRPV01, adjStrike = \
+        _adjusted_black_inputs(valuation_date,
+                               expiry_dates,
+                               maturity_date,
+                               index_coupon,
+                               strikes,
+                               index_curve,
+                               index_recovery,
+                               libor_curve,
+                               freq_type,
+                               day_count_type,
+                               calendar_type,
+                               bus_day_adjust_type,
+                               date_gen_rule_type)
+
+    return _black_implied_vol_grid(adjFwd,
+                                   adjStrike,
+                                   indexRPV01,
+                                   texps,
+                                   prices / notional,
+                                   long_protection,
+                                   tolerance,
+                                   max_iterations)
+
+###############################################################################
+
+
+def value_anderson_grid(valuation_date: Date,
+                        expiry_dates: list,
+                        maturity_date: Date,
+                        index_coupon: float,
+                        strikes,
+                        volatilities,
+                        issuer_curves: list,
+                        index_recovery: float,
+                        notional: float = ONE_MILLION,
+                        freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                        day_count_type: DayCountTypes = DayCountTypes.ACT_360,
+                        calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                        bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                        date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
+    """ Value options on a CDS index for a grid of expiry dates and strike
+    coupons using the Anderson (2006) model of value_anderson. The strikes
+    and volatilities are laid out as for value_adjusted_black_grid. The
+    forward legs of every issuer are valued once per expiry, the strike
+    curves once per expiry and strike, and the forward spread mean of each
+    cell is solved in a parallel NUMBA kernel. Returns a dictionary of
+    matrices by expiry and strike of the payer and receiver values, the
+    strike values, the forward spread means x and the expected index
+    intrinsic values. """
+
+    check_argument_types(value_anderson_grid, locals())
+
+    strikes = _strike_grid(strikes, len(expiry_dates))
+    num_expiries, num_strikes = strikes.shape
+    vols = _grid_values(volatilities, num_expiries, num_strikes, "volatility")
+
+    if np.any(strikes < 0.0):
+        raise FinError("Index Option strike coupon is negative")
+
+    if np.any(vols <= 0.0):
+        raise FinError("Volatility must be greater than zero")
+
+    num_credits = len(issuer_curves)
+
+    if num_credits < 1:
+        raise FinError("Need at least one issuer curve.")
+
+    texps, cds_contracts = _index_option_contracts(expiry_dates,
+                                                   maturity_date,
+                                                   index_coupon,
+                                                   valuation_date,
+                                                   freq_type,
+                                                   day_count_type,
+                                                   calendar_type,
+                                                   bus_day_adjust_type,
+                                                   date_gen_rule_type)
+
+    c = index_coupon
+    libor_curve = issuer_curves[0]._libor_curve
+    dfToExpiry = issuer_curves[0].df(texps)
+
+    # Libor curves shared by several issuer curves are only packed once
+    libor_curves = [libor_curve]
+    libor_ids = []
+    for issuer_curve in issuer_curves:
+        for k, curve in enumerate(libor_curves):
+            if curve is issuer_curve._libor_curve:
+                libor_ids.append(k)
+                break
+        else:
+            libor_ids.append(len(libor_curves))
+            libor_curves.append(issuer_curve._libor_curve)
+
+    surv_grids = [(curve._times, curve._values) for curve in issuer_curves]
+    pairs = [(j, i) for i in range(0, num_expiries)
+             for j in range(0, num_credits)]
+
+    # The strike CDS of each expiry steps in on the expiry date
+    for i, expiry_date in enumerate(expiry_dates):
+
+        grids, strikeCDS = _strike_curve_grids(valuation_date,
+                                               expiry_date,
+                                               maturity_date,
+                                               strikes[i],
+                                               libor_curve,
+                                               index_recovery)
+
+        cds_contracts.append(strikeCDS)
+
+        for j in range(0, num_strikes):
+            pairs.append((len(surv_grids), num_expiries + i))
+            surv_grids.append(grids[j])
+            libor_ids.append(0)
+
+    rpv01s, prot_pvs, accrued_factors = \
+        _forward_cds_legs(valuation_date,
+                          cds_contracts,
+                          surv_grids,
+                          libor_curves,
+                          libor_ids,
+                          pairs)
+
+    num_issuer_pairs = num_credits * num_expiries
+    issuerRPV01 = rpv01s[0:num_issuer_pairs].reshape(num_expiries, -1)
+    issuerSpd = prot_pvs[0:num_issuer_pairs].reshape(num_expiries, -1) / \
+        issuerRPV01
+    strikeRPV01 = rpv01s[num_issuer_pairs:].reshape(num_expiries, -1)
+
+    qToExpiry = np.zeros((num_expiries, num_strikes))
+    for i in range(0, num_expiries):
+        for j in range(0, num_strikes):
+            grid = surv_grids[num_credits + i * num_strikes + j]
+            qToExpiry[i, j] = _uinterpolate(texps[i],
+                                            grid[0],
+                                            grid[1],
+                                            InterpTypes.FLAT_FWD_RATES.value)
+
+    strikeValue = (strikes - c) * strikeRPV01
+    strikeValue /= (dfToExpiry[:, np.newaxis] * qToExpiry)
+
+    h1 = np.zeros(num_expiries)
+    for iCredit, issuer_curve in enumerate(issuer_curves):
+        q = issuer_curve.survival_prob(texps)
+        h1 += (1.0 - issuer_curve._recovery_rate) * (1.0 - q)
+
+    h2 = np.sum((issuerSpd - c) * issuerRPV01, axis=1)
+    h2 = h2[:, np.newaxis] / (dfToExpiry[:, np.newaxis] * qToExpiry)
+    expH = (h1[:, np.newaxis] + h2) / num_credits
+
+    # The flows after each expiry discounted to the expiry date
+    flow_offsets = np.zeros(num_expiries + 1, dtype=np.int64)
+    flow_times = []
+    flow_dfs = []
+    flow_accruals = []
+    dfsToExpiry = libor_curve.df(expiry_dates)
+
+    for i, cds in enumerate(cds_contracts[0:num_expiries]):
+        flow_dates = cds._adjusted_dates[1:]
+        flow_offsets[i + 1] = flow_offsets[i] + len(flow_dates)
+        flow_times.append([(dt - expiry_dates[i]) / gDaysInYear
+                           for dt in flow_dates])
+        flow_dfs.append(libor_curve.df(flow_dates) / dfsToExpiry[i])
+        flow_accruals.append(cds._accrual_factors[1:])
+
+    out = _anderson_grid(texps,
+                         vols,
+                         strikeValue,
+                         expH,
+                         c,
+                         1.0 - index_recovery,
+                         flow_offsets,
+                         np.concatenate(flow_times),
+                         np.concatenate(flow_dfs),
+                         np.array(np.concatenate(flow_accruals),
+                                  dtype=np.float64),
+                         accrued_factors[0:num_expiries],
+                         dfsToExpiry)
+
+    if np.any(out[0] < 0.0):
+        raise FinError("Solution not bracketed.")
+
+    v_pay = out[1] * notional
+    v_rec = v_pay + (strikeValue - expH) * dfToExpiry[:, np.newaxis] * \
+        notional
+
+    return {'payer': v_pay,
+            'receiver': v_rec,
+            'strike_value': strikeValue,
+            'x': out[0],
+            'exp_h': expH}
+
+###############################################################################
+
+
 class CDSIndexOption:
 
     """ Class to manage the pricing and risk management of an option to enter
@@ -88,42 +716,27 @@ class CDSIndexOption:
                              libor_curve,
                              sigma):
         """ This approach uses two adjustments to Black's option pricing
-        model to value an option on a CDS index. """
-
-        k = self._strike_coupon
-        c = self._index_coupon
-        time_to_expiry = (self._expiry_date - valuation_date) / gDaysInYear
-        df = libor_curve.df(self._expiry_date)
-        qExpiryIndex = index_curve.survival_prob(time_to_expiry)
-
-        cds = CDS(valuation_date, self._maturity_date, k)
-        strikeCurve = CDSCurve(
-            valuation_date, [cds], libor_curve, indexRecovery)
-#        qExpiryStrike = strikeCurve.survivalProbability(time_to_expiry)
-
-        strikeRPV01 = self._cds_contract.risky_pv01(
-            valuation_date, strikeCurve)['clean_rpv01']
-        indexRPV01 = self._cds_contract.risky_pv01(
-            valuation_date, index_curve)['clean_rpv01']
-
-        s = self._cds_contract.par_spread(valuation_date, index_curve)
-
-        fep = df * (1.0 - qExpiryIndex) * (1.0 - indexRecovery)
-        adjFwd = s + fep / indexRPV01
-        adjStrike = c + (k - c) * strikeRPV01 / indexRPV01 / qExpiryIndex
-
-        denom = sigma * sqrt(time_to_expiry)
-        d1 = log(adjFwd / adjStrike) + 0.5 * sigma * sigma * time_to_expiry
-        d2 = log(adjFwd / adjStrike) - 0.5 * sigma * sigma * time_to_expiry
-        d1 /= denom
-        d2 /= denom
-
-        v_pay = (adjFwd * N(d1) - adjStrike * N(d2)) * indexRPV01
-        v_rec = (adjStrike * N(-d2) - adjFwd * N(-d1)) * indexRPV01
-
-        v_pay *= self._notional
-        v_rec *= self._notional
-
+        model to value an option on a CDS index. See value_adjusted_black_grid
+        for valuing many strikes and expiry dates together. """
+
+        values = value_adjusted_black_grid(valuation_date,
+                                           [self._expiry_date],
+                                           self._maturity_date,
+                                           self._index_coupon,
+                                           [self._strike_coupon],
+                                           sigma,
+                                           index_curve,
+                                           indexRecovery,
+                                           libor_curve,
+                                           self._notional,
+                                           self._freq_type,
+                                           self._day_count_type,
+                                           self._calendar_type,
+                                           self._bus_day_adjust_type,
+                                           self._date_gen_rule_type)
+
+        v_pay = values['payer'][0, 0]
+        v_rec = values['receiver'][0, 0]
         return (v_pay, v_rec)
 
 ###############################################################################
@@ -137,206 +750,31 @@ class CDSIndexOption:
         Anderson (2006). This ensures that a no-arbitrage relationship between
         the constituent CDS contract and the CDS index is enforced. It models
         the forward spread as a log-normally distributed quantity and uses the
-        credit triangle to compute the forward RPV01. """
-
-        num_credits = len(issuer_curves)
-        time_to_expiry = (self._expiry_date - valuation_date) / gDaysInYear
-#        timeToMaturity = (self._maturity_date - valuation_date) / gDaysInYear
-        dfToExpiry = issuer_curves[0].df(time_to_expiry)
-        libor_curve = issuer_curves[0]._libor_curve
-
-        k = self._strike_coupon
-        c = self._index_coupon
-
-        strikeCDS = CDS(
-            self._expiry_date,
-            self._maturity_date,
-            self._strike_coupon,
-            1.0)
-
-        strikeCurve = CDSCurve(valuation_date, [strikeCDS], libor_curve, index_recovery)
-        strikeRPV01s = strikeCDS.risky_pv01(valuation_date, strikeCurve)
-        qToExpiry = strikeCurve.survival_prob(time_to_expiry)
-        strikeValue = (k - c) * strikeRPV01s['clean_rpv01']
-        strikeValue /= (dfToExpiry * qToExpiry)
-
-        expH = 0.0
-        h1 = 0.0
-        h2 = 0.0
-
-        for iCredit in range(0, num_credits):
-
-            issuer_curve = issuer_curves[iCredit]
-            q = issuer_curve.survival_prob(time_to_expiry)
-            dh1 = (1.0 - issuer_curve._recovery_rate) * (1.0 - q)
-
-            s = self._cds_contract.par_spread(valuation_date, issuer_curve)
-            rpv01 = self._cds_contract.risky_pv01(valuation_date, issuer_curve)
-            dh2 = (s - c) * rpv01['clean_rpv01'] / (dfToExpiry * qToExpiry)
-
-            h1 = h1 + dh1
-            h2 = h2 + dh2
-
-        expH = (h1 + h2) / num_credits
-
-        x = self._solve_for_x(valuation_date,
-                              sigma,
-                              c,
-                              index_recovery,
-                              libor_curve,
-                              expH)
-
-        v = self._calc_index_payer_option_price(valuation_date,
-                                                x,
-                                                sigma,
-                                                c,
-                                                strikeValue,
-                                                libor_curve,
-                                                index_recovery)
-
-        v = v[1]
-        v_pay = v * self._notional
-        v_rec = v_pay + (strikeValue - expH) * dfToExpiry * self._notional
-        strikeValue *= 10000.0
-        x *= 10000.0
-        expH *= 10000.0
+        credit triangle to compute the forward RPV01. See value_anderson_grid
+        for valuing many strikes and expiry dates together. """
+
+        values = value_anderson_grid(valuation_date,
+                                     [self._expiry_date],
+                                     self._maturity_date,
+                                     self._index_coupon,
+                                     [self._strike_coupon],
+                                     sigma,
+                                     issuer_curves,
+                                     index_recovery,
+                                     self._notional,
+                                     self._freq_type,
+                                     self._day_count_type,
+                                     self._calendar_type,
+                                     self._bus_day_adjust_type,
+                                     self._date_gen_rule_type)
+
+        v_pay = values['payer'][0, 0]
+        v_rec = values['receiver'][0, 0]
+        strikeValue = values['strike_value'][0, 0] * 10000.0
+        x = values['x'][0, 0] * 10000.0
+        expH = values['exp_h'][0, 0] * 10000.0
         return v_pay, v_rec, strikeValue, x, expH
 
-###############################################################################
-
-    def _solve_for_x(self,
-                     valuation_date,
-                     sigma,
-                     index_coupon,
-                     indexRecovery,
-                     libor_curve,
-                     expH):
-        """ Function to solve for the arbitrage free """
-        x1 = 0.0
-        x2 = 0.9999
-        ftol = 1e-8
-        jmax = 40
-        xacc = 0.000000001
-        rtb = 999999
-
-        f = self._calc_obj_func(x1, valuation_date, sigma, index_coupon,
-                                indexRecovery, libor_curve) - expH
-
-        fmid = self._calc_obj_func(x2, valuation_date, sigma, index_coupon,
-                                   indexRecovery, libor_curve) - expH
-
-        if f * fmid >= 0.0:
-            raise FinError("Solution not bracketed.")
-
-        if f < 0.0:
-            rtb = x1
-            dx = x2 - x1
-        else:
-            rtb = x2
-            dx = x1 - x2
-
-        for _ in range(0, jmax):
-            dx = dx * 0.5
-            xmid = rtb + dx
-            fmid = self._calc_obj_func(xmid, valuation_date, sigma,
-                                       index_coupon,
-                                       indexRecovery, libor_curve) - expH
-            if fmid <= 0.0:
-                rtb = xmid
-            if abs(dx) < xacc or abs(fmid) < ftol:
-                return rtb
-
-        return rtb
-
-###############################################################################
-
-    def _calc_obj_func(self,
-                       x,
-                       valuation_date,
-                       sigma,
-                       index_coupon,
-                       indexRecovery,
-                       libor_curve):
-        """ An internal function used in the Anderson valuation. """
-
-        # The strike value is not relevant here as we want the zeroth element
-        # of the return value
-        strikeValue = 0.0
-
-        values = self._calc_index_payer_option_price(valuation_date,
-                                                     x,
-                                                     sigma,
-                                                     self._index_coupon,
-                                                     strikeValue,
-                                                     libor_curve,
-                                                     indexRecovery)
-
-        return values[0]
-
-###############################################################################
-
-    def _calc_index_payer_option_price(self,
-                                       valuation_date,
-                                       x,
-                                       sigma,
-                                       index_coupon,
-                                       strikeValue,
-                                       libor_curve,
-                                       indexRecovery):
-        """ Calculates the intrinsic value of the index payer swap and the
-        value of the index payer option which are both returned in an array.
-        """
-
-        z = -6.0
-        dz = 0.2
-        numZSteps = int(2.0 * abs(z) / dz)
-
-        flow_dates = self._cds_contract._adjusted_dates
-        num_flows = len(flow_dates)
-        texp = (self._expiry_date - valuation_date) / gDaysInYear
-        dfToExpiry = libor_curve.df(self._expiry_date)
-        lgd = 1.0 - indexRecovery
-
-        fwdDfs = [1.0] * (num_flows)
-        expiryToFlowTimes = [1.0] * (num_flows)
-
-        for iFlow in range(1, num_flows):
-            expiryToFlowTimes[iFlow] = (
-                flow_dates[iFlow] - self._expiry_date) / gDaysInYear
-            fwdDfs[iFlow] = libor_curve.df(flow_dates[iFlow]) / dfToExpiry
-
-        intH = 0.0
-        intMaxH = 0.0
-
-        day_count = DayCount(self._day_count_type)
-        pcd = flow_dates[0]  # PCD
-        eff = self._expiry_date
-        accrual_factorPCDToExpiry = day_count.year_frac(pcd, eff)[0]
-
-        s0 = exp(-0.5 * sigma * sigma * texp)
-
-        for _ in range(0, numZSteps):
-            s = x * s0 * exp(sigma * sqrt(texp) * z)
-            pdf = exp(-(z**2) / 2.0)
-            z = z + dz
-
-            fwdRPV01 = 0.0
-            for iFlow in range(1, num_flows):
-                acc_factor = self._cds_contract._accrual_factors[iFlow]
-                survivalProbability = exp(-s * expiryToFlowTimes[iFlow] / lgd)
-                fwdRPV01 += acc_factor * survivalProbability * fwdDfs[iFlow]
-
-            fwdRPV01 += -accrual_factorPCDToExpiry
-            h = (s - index_coupon) * fwdRPV01
-            maxh = max(h - strikeValue, 0.0)
-
-            intH += h * pdf
-            intMaxH += maxh * pdf
-
-        intH *= INVROOT2PI * dz
-        intMaxH *= INVROOT2PI * dz * dfToExpiry
-        return intH, intMaxH
-
 ###############################################################################
 
     def __repr__(self):
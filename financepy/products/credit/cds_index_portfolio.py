@@ -2,16 +2,24 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-
-from math import pow
+import numpy as np
+from numba import njit, prange
 
 from ...utils.calendar import CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.error import FinError
-from ...products.credit.cds import CDS
+from ...market.curves.interpolator import InterpTypes
+from ...products.credit.cds import CDS, standard_recovery_rate
+from ...products.credit.cds import _risky_pv01_numba, _protection_leg_pv_numba
 from ...products.credit.cds_curve import CDSCurve
+from ...products.credit.cds_curve import _cds_kernel_inputs, _bootstrap_inputs
+from ...products.credit.cds_curve import _cds_curves_from_values
+from ...products.credit.cds_curve import _bootstrap_cds_curves
+from ...products.credit.cds_curve import _cds_value_and_gradients
+from ...products.credit.cds_portfolio import _pack_curve_grids
+from ...products.credit.cds_portfolio import _pack_issuer_curves
 from ...utils.helpers import check_argument_types
 from ...utils.helpers import label_to_string
 
@@ -22,6 +30,240 @@ from ...utils.helpers import label_to_string
 ###########################################################################
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _index_legs(credit_ids,
+                contract_ids,
+                teffs,
+                tmats,
+                accrued_factors,
+                pay_offsets,
+                pay_times,
+                year_fracs,
+                recovery_rates,
+                surv_offsets,
+                surv_times,
+                surv_values,
+                libor_indices,
+                libor_offsets,
+                libor_times,
+                libor_dfs,
+                num_steps_per_year):
+    """ Value the legs of index contract contract_ids[i] on the survival curve
+    of issuer credit_ids[i] in parallel. The grids of the curves and the
+    payment schedules of the contracts are packed into flat arrays with
+    offsets. Returns an array with one row per pair holding the clean risky
+    PV01 and the protection leg PV per unit notional with the recovery rate
+    recovery_rates[i]. """
+
+    num_pairs = credit_ids.size
+    out = np.zeros((num_pairs, 2))
+
+    for i in prange(num_pairs):
+
+        j = credit_ids[i]
+        s0 = surv_offsets[j]
+        s1 = surv_offsets[j + 1]
+
+        m = libor_indices[j]
+        l0 = libor_offsets[m]
+        l1 = libor_offsets[m + 1]
+
+        k = contract_ids[i]
+        p0 = pay_offsets[k]
+        p1 = pay_offsets[k + 1]
+
+        rpv01 = _risky_pv01_numba(teffs[k],
+                                  accrued_factors[k],
+                                  pay_times[p0:p1],
+                                  year_fracs[p0:p1],
+                                  libor_times[l0:l1],
+                                  libor_dfs[l0:l1],
+                                  surv_times[s0:s1],
+                                  surv_values[s0:s1],
+                                  0)
+
+        prot_pv = _protection_leg_pv_numba(teffs[k],
+                                           tmats[k],
+                                           libor_times[l0:l1],
+                                           libor_dfs[l0:l1],
+                                           surv_times[s0:s1],
+                                           surv_values[s0:s1],
+                                           recovery_rates[i],
+                                           num_steps_per_year,
+                                           0)
+
+        out[i, 0] = rpv01[1]
+        out[i, 1] = prot_pv
+
+    return out
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _index_legs_and_deltas(credit_ids,
+                           contract_ids,
+                           teffs,
+                           tmats,
+                           accrued_factors,
+                           pay_offsets,
+                           pay_times,
+                           year_fracs,
+                           coupons,
+                           recovery_rates,
+                           nodes,
+                           surv_offsets,
+                           surv_times,
+                           surv_values,
+                           libor_indices,
+                           libor_offsets,
+                           libor_times,
+                           libor_dfs,
+                           num_steps_per_year):
+    """ As _index_legs but also returns in a third column the derivative of
+    the clean value of a long protection contract paying coupons[i] with
+    respect to the packed survival probability at position nodes[i] which
+    must lie on the grid of issuer credit_ids[i]. """
+
+    num_pairs = credit_ids.size
+    out = np.zeros((num_pairs, 3))
+
+    for i in prange(num_pairs):
+
+        j = credit_ids[i]
+        s0 = surv_offsets[j]
+        s1 = surv_offsets[j + 1]
+
+        m = libor_indices[j]
+        l0 = libor_offsets[m]
+        l1 = libor_offsets[m + 1]
+
+        k = contract_ids[i]
+        p0 = pay_offsets[k]
+        p1 = pay_offsets[k + 1]
+
+        grad_surv = np.zeros(s1 - s0)
+        grad_libor = np.zeros(l1 - l0)
+
+        v, rpv01 = _cds_value_and_gradients(teffs[k],
+                                            tmats[k],
+                                            accrued_factors[k],
+                                            pay_times[p0:p1],
+                                            year_fracs[p0:p1],
+                                            libor_times[l0:l1],
+                                            libor_dfs[l0:l1],
+                                            surv_times[s0:s1],
+                                            surv_values[s0:s1],
+                                            coupons[i],
+                                            recovery_rates[i],
+                                            num_steps_per_year,
+                                            grad_surv,
+                                            grad_libor)
+
+        out[i, 0] = rpv01
+        out[i, 1] = v + coupons[i] * rpv01
+        out[i, 2] = grad_surv[nodes[i] - s0]
+
+    return out
+
+###############################################################################
+
+
+def _pack_index_contracts(valuation_date, cds_contracts):
+    """ Return the effective and maturity times and the accrual factors of a
+    list of index contracts together with their payment times and accrual
+    factors packed into flat arrays with offsets for the index leg kernels.
+    """
+
+    num_contracts = len(cds_contracts)
+    teffs = np.zeros(num_contracts)
+    tmats = np.zeros(num_contracts)
+    accrued_factors = np.zeros(num_contracts)
+    pay_offsets = np.zeros(num_contracts + 1, dtype=np.int64)
+    pay_times = []
+    year_fracs = []
+
+    for k, cds in enumerate(cds_contracts):
+
+        teffs[k], tmats[k], accrued_factors[k], payment_times, fracs = \
+            _cds_kernel_inputs(cds, valuation_date)
+
+        pay_offsets[k + 1] = pay_offsets[k] + len(payment_times)
+        pay_times.append(payment_times)
+        year_fracs.append(fracs)
+
+    return teffs, tmats, accrued_factors, pay_offsets, \
+        np.concatenate(pay_times), np.concatenate(year_fracs)
+
+###############################################################################
+
+
+def _index_series_inputs(valuation_date,
+                         series_coupons,
+                         series_upfronts,
+                         series_maturity_dates,
+                         series_recovery_rates,
+                         num_series):
+    """ Check the quotes of several index series and return the index
+    contracts of all series packed for the index leg kernels, the position
+    of the contract of each series and maturity, the number of maturities of
+    each series and the index recovery rate of each series. """
+
+    if len(series_coupons) != num_series or \
+            len(series_upfronts) != num_series or \
+            len(series_maturity_dates) != num_series:
+        raise FinError("Need coupons, upfronts and maturities per index.")
+
+    recovery_rates = np.array(series_recovery_rates, dtype=np.float64)
+
+    if recovery_rates.ndim == 0:
+        recovery_rates = np.full(num_series, float(recovery_rates))
+    elif recovery_rates.shape != (num_series,):
+        raise FinError("Need one recovery rate per index.")
+
+    num_maturities = np.zeros(num_series, dtype=np.int64)
+    contracts = []
+    contract_table = []
+
+    for s in range(0, num_series):
+
+        n = len(series_coupons[s])
+
+        if n < 1:
+            raise FinError("Need at least one index maturity.")
+
+        if len(series_upfronts[s]) != n or \
+                len(series_maturity_dates[s]) != n:
+            raise FinError("Need one upfront and maturity per index coupon.")
+
+        num_maturities[s] = n
+        contract_table.append(np.arange(len(contracts), len(contracts) + n))
+
+        for maturity_date in series_maturity_dates[s]:
+            contracts.append(CDS(valuation_date, maturity_date, 0.0, 1.0))
+
+    packed_contracts = _pack_index_contracts(valuation_date, contracts)
+
+    return packed_contracts, contract_table, num_maturities, recovery_rates
+
+###############################################################################
+
+
+def _series_quotes(series_quotes, num_maturities, i):
+    """ Return the quote at maturity i of each series or zero for a series
+    with no maturity i. """
+
+    quotes = np.zeros(len(series_quotes))
+
+    for s in range(0, len(series_quotes)):
+        if num_maturities[s] > i:
+            quotes[s] = series_quotes[s][i]
+
+    return quotes
+
+###############################################################################
+
+
 class CDSIndexPortfolio:
     """ This class manages the calculations associated with an equally weighted
     portfolio of CDS contracts with the same maturity date. """
@@ -45,13 +287,14 @@ class CDSIndexPortfolio:
 
     ###########################################################################
 
-    def intrinsic_rpv01(self,
+    def _intrinsic_legs(self,
                         valuation_date,
                         step_in_date,
                         maturity_date,
                         issuer_curves):
-        """ Calculation of the risky PV01 of the CDS portfolio by taking the
-        average of the risky PV01s of each contract. """
+        """ Return arrays with one entry per issuer of the clean risky PV01
+        and the protection leg PV per unit notional of a CDS to the maturity
+        date, all issuers being valued in one parallel NUMBA pass. """
 
         num_credits = len(issuer_curves)
 
@@ -59,17 +302,49 @@ class CDSIndexPortfolio:
                            maturity_date,
                            0.0)
 
-        intrinsic_rpv01 = 0.0
+        surv_offsets, surv_times, surv_values, libor_indices, \
+            libor_offsets, libor_times, libor_dfs = \
+            _pack_issuer_curves(issuer_curves)
+
+        teffs, tmats, accrued_factors, pay_offsets, pay_times, year_fracs = \
+            _pack_index_contracts(valuation_date, [cds_contract])
+
+        out = _index_legs(np.arange(num_credits),
+                          np.zeros(num_credits, dtype=np.int64),
+                          teffs,
+                          tmats,
+                          accrued_factors,
+                          pay_offsets,
+                          pay_times,
+                          year_fracs,
+                          np.full(num_credits, standard_recovery_rate),
+                          surv_offsets,
+                          surv_times,
+                          surv_values,
+                          libor_indices,
+                          libor_offsets,
+                          libor_times,
+                          libor_dfs,
+                          25)
+
+        return out[:, 0], out[:, 1]
 
-        for m in range(0, num_credits):
-            retValue = cds_contract.risky_pv01(valuation_date,
-                                               issuer_curves[m])
+    ###########################################################################
 
-            cleanRPV01 = retValue['clean_rpv01']
+    def intrinsic_rpv01(self,
+                        valuation_date,
+                        step_in_date,
+                        maturity_date,
+                        issuer_curves):
+        """ Calculation of the risky PV01 of the CDS portfolio by taking the
+        average of the risky PV01s of each contract. """
 
-            intrinsic_rpv01 += cleanRPV01
+        rpv01s, _ = self._intrinsic_legs(valuation_date,
+                                         step_in_date,
+                                         maturity_date,
+                                         issuer_curves)
 
-        intrinsic_rpv01 /= num_credits
+        intrinsic_rpv01 = np.mean(rpv01s)
         return (intrinsic_rpv01)
 
     ###########################################################################
@@ -82,23 +357,12 @@ class CDSIndexPortfolio:
         """ Calculation of intrinsic protection leg value of the CDS portfolio
         by taking the average sum the protection legs of each contract. """
 
-        num_credits = len(issuer_curves)
-
-        intrinsic_prot_pv = 0.0
+        _, prot_pvs = self._intrinsic_legs(valuation_date,
+                                           step_in_date,
+                                           maturity_date,
+                                           issuer_curves)
 
-        # All contracts have same flows so only need one object
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0,
-                           1.0)
-
-        for m in range(0, num_credits):
-            protectionPV = cds_contract.protection_leg_pv(valuation_date,
-                                                          issuer_curves[m])
-
-            intrinsic_prot_pv += protectionPV
-
-        intrinsic_prot_pv /= num_credits
+        intrinsic_prot_pv = np.mean(prot_pvs)
         return intrinsic_prot_pv
 
     ###########################################################################
@@ -112,17 +376,12 @@ class CDSIndexPortfolio:
         which would make the value of the protection legs equal to the value of
         the premium legs if all premium legs paid the same spread. """
 
-        intrinsic_prot_pv = self.intrinsic_protection_leg_pv(valuation_date,
-                                                             step_in_date,
-                                                             maturity_date,
-                                                             issuer_curves)
-
-        intrinsic_rpv01 = self.intrinsic_rpv01(valuation_date,
-                                               step_in_date,
-                                               maturity_date,
-                                               issuer_curves)
+        rpv01s, prot_pvs = self._intrinsic_legs(valuation_date,
+                                                step_in_date,
+                                                maturity_date,
+                                                issuer_curves)
 
-        intrinsic_spread = intrinsic_prot_pv / intrinsic_rpv01
+        intrinsic_spread = np.mean(prot_pvs) / np.mean(rpv01s)
 
         return (intrinsic_spread)
 
@@ -135,19 +394,12 @@ class CDSIndexPortfolio:
                        issuer_curves):
         """ Calculates the average par CDS spread of the CDS portfolio. """
 
-        num_credits = len(issuer_curves)
+        rpv01s, prot_pvs = self._intrinsic_legs(valuation_date,
+                                                step_in_date,
+                                                maturity_date,
+                                                issuer_curves)
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        average_spread = 0.0
-
-        for m in range(0, num_credits):
-            spread = cds_contract.par_spread(valuation_date, issuer_curves[m])
-            average_spread += spread
-
-        average_spread /= num_credits
+        average_spread = np.mean(prot_pvs / rpv01s)
         return average_spread
 
     ###########################################################################
@@ -160,18 +412,12 @@ class CDSIndexPortfolio:
         """ Calculates the total CDS spread of the CDS portfolio by summing
         over all of the issuers and adding the spread with no weights. """
 
-        num_credits = len(issuer_curves)
-
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        totalSpread = 0.0
-
-        for m in range(0, num_credits):
-            spread = cds_contract.par_spread(valuation_date, issuer_curves[m])
-            totalSpread += spread
+        rpv01s, prot_pvs = self._intrinsic_legs(valuation_date,
+                                                step_in_date,
+                                                maturity_date,
+                                                issuer_curves)
 
+        totalSpread = np.sum(prot_pvs / rpv01s)
         return totalSpread
 
     ###########################################################################
@@ -190,17 +436,12 @@ class CDSIndexPortfolio:
             raise FinError(
                 "Number of credits in index must be > 1 and not" + str(num_credits))
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        min_spread = cds_contract.par_spread(valuation_date, issuer_curves[0])
-
-        for m in range(1, num_credits):
-            spread = cds_contract.par_spread(valuation_date, issuer_curves[m])
-            if spread < min_spread:
-                min_spread = spread
+        rpv01s, prot_pvs = self._intrinsic_legs(valuation_date,
+                                                step_in_date,
+                                                maturity_date,
+                                                issuer_curves)
 
+        min_spread = np.min(prot_pvs / rpv01s)
         return min_spread
 
     ###########################################################################
@@ -219,17 +460,12 @@ class CDSIndexPortfolio:
             raise FinError(
                 "Number of credits in index must be > 1 and not " + str(num_credits))
 
-        cds_contract = CDS(step_in_date,
-                           maturity_date,
-                           0.0)
-
-        max_spread = cds_contract.par_spread(valuation_date, issuer_curves[0])
-
-        for m in range(1, num_credits):
-            spread = cds_contract.par_spread(valuation_date, issuer_curves[m])
-            if spread > max_spread:
-                max_spread = spread
+        rpv01s, prot_pvs = self._intrinsic_legs(valuation_date,
+                                                step_in_date,
+                                                maturity_date,
+                                                issuer_curves)
 
+        max_spread = np.max(prot_pvs / rpv01s)
         return max_spread
 
     ###########################################################################
@@ -243,9 +479,10 @@ class CDSIndexPortfolio:
                                 indexRecoveryRate,
                                 tolerance=1e-6):
         """ Adjust individual CDS discount to reprice CDS index prices.
-        This approach uses an iterative scheme but is slow as it has to use a
-        CDS curve bootstrap required when each trial spread adjustment is made
-        """
+        This multiplies the CDS spreads of all issuers at each curve maturity
+        by a common factor and rebuilds the issuer curves. The factors are
+        found by a secant method with all issuer curves being bootstrapped
+        together. See spread_adjust_indices. """
 
         num_credits = len(issuer_curves)
 
@@ -253,133 +490,237 @@ class CDSIndexPortfolio:
             raise FinError(
                 "Number of credits in index must be > 1 and not " + str(num_credits))
 
-        libor_curve = issuer_curves[0]._libor_curve
-        numIndexMaturityPoints = len(index_coupons)
-
-        cdsMaturityDates = []
-        for cds in issuer_curves[0]._cds_contracts:
-            cdsDates = cds._maturity_date
-            cdsMaturityDates.append(cdsDates)
-
-        numCDSMaturityPoints = len(cdsMaturityDates)
-
-        for issuer_curve in issuer_curves:
-            n = len(issuer_curve._cds_contracts)
-            if n != len(cdsMaturityDates):
-                raise FinError(
-                    "All issuer discount must be built from same cds maturities")
+        adjustedIssuerCurves = \
+            self.spread_adjust_indices(valuation_date,
+                                       [issuer_curves],
+                                       [index_coupons],
+                                       [indexUpfronts],
+                                       [indexMaturityDates],
+                                       indexRecoveryRate,
+                                       tolerance)[0]
 
-        cdsSpreadMultipliers = [1.0] * numCDSMaturityPoints
-
-        #        spreadDifference = [0.0] * numCDSMaturityPoints
-
-        adjustedCDSSpreads = [0.0] * numCDSMaturityPoints
-
-        #######################################################################
-        # Set up CDS contracts used to build curve
-        #######################################################################
+        return adjustedIssuerCurves
 
-        curveCDSContracts = []
+    ###########################################################################
 
-        for j in range(0, numCDSMaturityPoints):
-            cdsCoupon = 1.0
+    def spread_adjust_indices(self,
+                              valuation_date,
+                              series_issuer_curves: list,
+                              series_coupons: list,
+                              series_upfronts: list,
+                              series_maturity_dates: list,
+                              series_recovery_rates,
+                              tolerance=1e-6,
+                              max_iterations: int = 20):
+        """ Adjust the issuer curves of several CDS indices such as CDX and
+        iTraxx at once so that the intrinsic value of each index reprices its
+        upfront and coupon at each of its maturity dates. Index s is given by
+        position s of the lists of issuer curves, coupons, upfronts and
+        maturity dates and the index recovery rate is one number or an array
+        with one per index. The issuer curves of an index must be built from
+        CDS with the same maturities. For index maturity i the spreads of all
+        issuers of the index at curve maturity i are multiplied by a common
+        factor and the curves are rebuilt. The factors of all indices are
+        solved together by a secant method. Each iteration rebootstraps the
+        issuer curves of an index from the current maturity onwards in one
+        parallel pass and values the index legs of all indices in another.
+        Returns a list with the list of adjusted issuer curves of each index.
+        """
 
-            cds_contract = CDS(valuation_date,
-                               cdsMaturityDates[j],
-                               cdsCoupon)
+        check_argument_types(self.spread_adjust_indices, locals())
 
-            curveCDSContracts.append(cds_contract)
+        num_series = len(series_issuer_curves)
 
-        #######################################################################
+        packed_contracts, contract_table, num_maturities, recovery_rates = \
+            _index_series_inputs(valuation_date,
+                                 series_coupons,
+                                 series_upfronts,
+                                 series_maturity_dates,
+                                 series_recovery_rates,
+                                 num_series)
 
-        # We calibrate the individual CDS discount to fit each index maturity
-        # point
-        for iMaturity in range(0, numIndexMaturityPoints):
+        libor_curves = []
+        cds_maturity_dates = []
+        bootstrap_inputs = []
+        curve_spreads = []
+        curve_recovery_rates = []
 
-            alpha = 0.0
-            numIterations = 0
+        for s, issuer_curves in enumerate(series_issuer_curves):
 
-            while abs(alpha - 1.0) > tolerance:
+            if len(issuer_curves) < 1:
+                raise FinError("Number of credits in index must be > 1")
 
-                numIterations += 1
+            maturity_dates = [cds._maturity_date
+                              for cds in issuer_curves[0]._cds_contracts]
 
-                if numIterations > 20:
+            for issuer_curve in issuer_curves:
+                if len(issuer_curve._cds_contracts) != len(maturity_dates):
                     raise FinError(
-                        "Num iterations > 20. Increase limit or reduce tolerance or check inputs.")
-
-                sumRPV01 = 0.0
-                sumProt = 0.0
+                        "All issuer discount must be built from same cds maturities")
 
-                # This is for the specific index maturity date
-                indexMaturityDate = indexMaturityDates[iMaturity]
-                cdsIndex = CDS(valuation_date, indexMaturityDate, 0.0, 1.0)
+            if num_maturities[s] > len(maturity_dates):
+                raise FinError("More index maturities than CDS maturities.")
 
-                for iCredit in range(0, num_credits):
+            libor_curves.append(issuer_curves[0]._libor_curve)
+            cds_maturity_dates.append(maturity_dates)
 
-                    cds_contracts = issuer_curves[iCredit]._cds_contracts
-                    recovery_rate = issuer_curves[iCredit]._recovery_rate
-                    adjustedCDSContracts = []
+            bootstrap_inputs.append(_bootstrap_inputs(valuation_date,
+                                                      valuation_date,
+                                                      maturity_dates))
 
-                    for j in range(0, numCDSMaturityPoints):
-                        cdsSpread = cds_contracts[j]._running_coupon
-                        adjustedCDSSpreads[j] = cdsSpread * \
-                            cdsSpreadMultipliers[j]
-                        curveCDSContracts[j]._running_coupon = adjustedCDSSpreads[j]
+            curve_spreads.append(np.array([[cds._running_coupon
+                                            for cds in c._cds_contracts]
+                                           for c in issuer_curves]))
 
-                    adjustedIssuerCurve = CDSCurve(valuation_date,
-                                                   curveCDSContracts,
-                                                   libor_curve,
-                                                   recovery_rate)
+            curve_recovery_rates.append(np.array([c._recovery_rate
+                                                  for c in issuer_curves]))
 
-                    indexProtectionPV = cdsIndex.protection_leg_pv(valuation_date,
-                                                                   adjustedIssuerCurve,
-                                                                   indexRecoveryRate)
+        libor_offsets, libor_times, libor_dfs = \
+            _pack_curve_grids([c._times for c in libor_curves],
+                              [c._dfs for c in libor_curves])
 
-                    cleanRPV01 = cdsIndex.risky_pv01(valuation_date,
-                                                     adjustedIssuerCurve)['clean_rpv01']
+        multipliers = [np.ones(c.shape[1]) for c in curve_spreads]
+        curve_values = [np.ones((c.shape[0], c.shape[1] + 1))
+                        for c in curve_spreads]
 
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtectionPV
-
-                sumRPV01 /= num_credits
-                sumProt /= num_credits
+        # We calibrate the individual CDS discount to fit each index maturity
+        # point
+        for i in range(0, np.max(num_maturities)):
+
+            coupons = _series_quotes(series_coupons, num_maturities, i)
+            upfronts = _series_quotes(series_upfronts, num_maturities, i)
+            unsolved = num_maturities > i
+            converged = np.zeros(num_series, dtype=bool)
+            last_multipliers = np.zeros(num_series)
+            last_errors = np.zeros(num_series)
+            numIterations = 0
 
-                sumPrem = sumRPV01 * index_coupons[iMaturity]
+            while np.any(unsolved):
 
-                numerator = indexUpfronts[iMaturity] + sumPrem
-                denominator = sumProt
+                numIterations += 1
 
-                alpha = numerator / denominator
-                cdsSpreadMultipliers[iMaturity] *= alpha
+                if numIterations > max_iterations and \
+                        not np.all(converged[unsolved]):
+                    raise FinError(
+                        "Num iterations > " + str(max_iterations) +
+                        ". Increase limit or reduce tolerance or check inputs.")
+
+                # Only curve points after the solved maturities need rebuilding
+                solving = np.nonzero(unsolved)[0]
+
+                for s in solving:
+
+                    _, pillar_times, teff, accrued_factors, pay_offsets, \
+                        pay_times, year_fracs = bootstrap_inputs[s]
+
+                    values, failed = _bootstrap_cds_curves(
+                        curve_spreads[s] * multipliers[s],
+                        curve_recovery_rates[s],
+                        pillar_times,
+                        teff,
+                        accrued_factors,
+                        pay_offsets,
+                        pay_times,
+                        year_fracs,
+                        libor_curves[s]._times,
+                        libor_curves[s]._dfs,
+                        25,
+                        1e-12,
+                        50,
+                        curve_values[s],
+                        i)
+
+                    if np.any(failed >= 0):
+                        raise FinError(
+                            "Adjusted issuer curve bootstrap failed.")
+
+                    curve_values[s] = values
+
+                row_series = np.repeat(solving,
+                                       [curve_values[s].shape[0]
+                                        for s in solving])
+
+                surv_times = np.concatenate(
+                    [np.tile(bootstrap_inputs[s][1], curve_values[s].shape[0])
+                     for s in solving])
+
+                surv_values = np.concatenate([curve_values[s].ravel()
+                                              for s in solving])
+
+                surv_offsets = np.zeros(row_series.size + 1, dtype=np.int64)
+                surv_offsets[1:] = np.cumsum(
+                    [len(bootstrap_inputs[s][1]) for s in row_series])
+
+                contract_ids = np.array([contract_table[s][i]
+                                         for s in row_series])
+
+                out = _index_legs(np.arange(row_series.size),
+                                  contract_ids,
+                                  *packed_contracts,
+                                  recovery_rates[row_series],
+                                  surv_offsets,
+                                  surv_times,
+                                  surv_values,
+                                  row_series,
+                                  libor_offsets,
+                                  libor_times,
+                                  libor_dfs,
+                                  25)
+
+                sumRPV01 = np.bincount(row_series, out[:, 0],
+                                       minlength=num_series)
+                sumProt = np.bincount(row_series, out[:, 1],
+                                      minlength=num_series)
+
+                for s in solving:
+
+                    # The curves have been rebuilt after the final step
+                    if converged[s]:
+                        unsolved[s] = False
+                        continue
+
+                    sumPrem = upfronts[s] + coupons[s] * sumRPV01[s]
+                    alpha = sumPrem / sumProt[s]
+                    error = sumPrem - sumProt[s]
+                    multiplier = multipliers[s][i]
+
+                    # Once within the tolerance one more step is taken and
+                    # the curves rebuilt so that the secant method, which
+                    # converges faster than linearly, leaves an error well
+                    # below the tolerance
+                    if abs(alpha - 1.0) <= tolerance:
+                        converged[s] = True
+
+                    # A secant step is only taken after a step that reduced
+                    # the error and otherwise the spreads are scaled by alpha
+                    if error == 0.0:
+                        pass
+                    elif numIterations == 1 or \
+                            abs(error) >= abs(last_errors[s]):
+                        multipliers[s][i] *= alpha
+                    else:
+                        slope = (error - last_errors[s]) / \
+                            (multiplier - last_multipliers[s])
+                        multipliers[s][i] -= error / slope
+
+                    last_multipliers[s] = multiplier
+                    last_errors[s] = error
 
         # use spread multipliers to build and store adjusted discount
         adjustedIssuerCurves = []
 
-        for iCredit in range(0, num_credits):
-
-            recovery_rate = issuer_curves[iCredit]._recovery_rate
-
-            adjustedCDSContracts = []
-            adjustedSpreads = []
+        for s in range(0, num_series):
 
-            for j in range(0, numCDSMaturityPoints):
-                unadjustedSpread = issuer_curves[iCredit]._cds_contracts[j]._running_coupon
+            curves = _cds_curves_from_values(valuation_date,
+                                             bootstrap_inputs[s][0],
+                                             curve_spreads[s] * multipliers[s],
+                                             bootstrap_inputs[s][1],
+                                             curve_values[s],
+                                             libor_curves[s],
+                                             curve_recovery_rates[s],
+                                             InterpTypes.FLAT_FWD_RATES)
 
-                adjustedSpread = unadjustedSpread * cdsSpreadMultipliers[j]
-
-                adjustedcds_contract = CDS(valuation_date,
-                                           cdsMaturityDates[j],
-                                           adjustedSpread)
-
-                adjustedCDSContracts.append(adjustedcds_contract)
-                adjustedSpreads.append(adjustedSpread)
-
-                adjustedIssuerCurve = CDSCurve(valuation_date,
-                                               adjustedCDSContracts,
-                                               libor_curve,
-                                               recovery_rate)
-
-            adjustedIssuerCurves.append(adjustedIssuerCurve)
+            adjustedIssuerCurves.append(curves)
 
         return adjustedIssuerCurves
 
@@ -396,87 +737,180 @@ class CDSIndexPortfolio:
                                      maxIterations=100):
         """ Adjust individual CDS discount to reprice CDS index prices.
         This approach adjusts the hazard rates and so avoids the slowish
-        CDS curve bootstrap required when a spread adjustment is made."""
+        CDS curve bootstrap required when a spread adjustment is made. See
+        hazard_rate_adjust_indices. """
+
         num_credits = len(issuer_curves)
 
         if num_credits < 1:
             raise FinError("Number of credits must be greater than 1")
 
-        libor_curve = issuer_curves[0]._libor_curve
-        num_index_maturity_points = len(index_coupons)
-
-        #        hazardRateMultipliers = [1.0] * numIndexMaturityPoints
-
-        adjusted_issuer_curves = []
+        adjusted_issuer_curves = \
+            self.hazard_rate_adjust_indices(valuation_date,
+                                            [issuer_curves],
+                                            [index_coupons],
+                                            [index_up_fronts],
+                                            [index_maturity_dates],
+                                            index_recovery_rate,
+                                            tolerance,
+                                            maxIterations)[0]
 
-        # making a copy of the issuer discount
-        for issuer_curve in issuer_curves:
+        return adjusted_issuer_curves
 
-            adjusted_issuer_curve = CDSCurve(valuation_date,
-                                             [],
-                                             libor_curve, 
-                                             index_recovery_rate)
+    ###########################################################################
 
-            adjusted_issuer_curve._times = issuer_curve._times.copy()
-            adjusted_issuer_curve._values = issuer_curve._values.copy()
-            adjusted_issuer_curves.append(adjusted_issuer_curve)
+    def hazard_rate_adjust_indices(self,
+                                   valuation_date,
+                                   series_issuer_curves: list,
+                                   series_coupons: list,
+                                   series_upfronts: list,
+                                   series_maturity_dates: list,
+                                   series_recovery_rates,
+                                   tolerance=1e-6,
+                                   max_iterations: int = 100):
+        """ Adjust the issuer curves of several CDS indices such as CDX and
+        iTraxx at once so that the intrinsic value of each index reprices its
+        upfront and coupon at each of its maturity dates. Index s is given by
+        position s of the lists of issuer curves, coupons, upfronts and
+        maturity dates and the index recovery rate is one number or an array
+        with one per index. For index maturity i the survival probability of
+        every issuer of the index over the curve interval ending at point i+1
+        is raised to a common power. The survival grids of all issuers are
+        held in one packed array and the powers of all indices are solved
+        together by Newton's method using the analytic derivative of the
+        index value with respect to the adjusted survival probabilities. The
+        adjusted curves use the index recovery rate. Returns a list with the
+        list of adjusted issuer curves of each index. """
+
+        check_argument_types(self.hazard_rate_adjust_indices, locals())
+
+        num_series = len(series_issuer_curves)
+
+        packed_contracts, contract_table, num_maturities, recovery_rates = \
+            _index_series_inputs(valuation_date,
+                                 series_coupons,
+                                 series_upfronts,
+                                 series_maturity_dates,
+                                 series_recovery_rates,
+                                 num_series)
 
-        # We solve for each maturity point
-        for iMaturity in range(0, num_index_maturity_points):
+        adjusted_issuer_curves = []
+        series_ids = []
 
-            alpha = 1.0
-            ratio = 1.0 + 2.0 * tolerance
-            numIterations = 0
+        # making a copy of the issuer discount
+        for s, issuer_curves in enumerate(series_issuer_curves):
 
-            while abs(ratio - 1.0) > tolerance:
+            if len(issuer_curves) < 1:
+                raise FinError("Number of credits must be greater than 1")
 
-                numIterations += 1
+            libor_curve = issuer_curves[0]._libor_curve
 
-                if numIterations == maxIterations:
-                    raise FinError("Max Iterations exceeded")
+            for issuer_curve in issuer_curves:
 
-                sumRPV01 = 0.0
-                sumProt = 0.0
+                adjusted_issuer_curve = CDSCurve(valuation_date,
+                                                 [],
+                                                 libor_curve,
+                                                 recovery_rates[s])
 
-                for iCredit in range(0, num_credits):
-                    q1 = adjusted_issuer_curves[iCredit]._values[iMaturity]
-                    q2 = adjusted_issuer_curves[iCredit]._values[iMaturity + 1]
-                    q12 = q2 / q1
-                    q12NEW = pow(q12, ratio)
-                    q2NEW = q1 * q12NEW
+                adjusted_issuer_curve._times = issuer_curve._times.copy()
+                adjusted_issuer_curve._values = issuer_curve._values.copy()
+                adjusted_issuer_curves.append(adjusted_issuer_curve)
+                series_ids.append(s)
 
-                    adjusted_issuer_curves[iCredit]._values[iMaturity + 1] = q2NEW
+        series_ids = np.array(series_ids, dtype=np.int64)
+        num_credits = np.bincount(series_ids, minlength=num_series)
 
-                    index_maturity_date = index_maturity_dates[iMaturity]
+        surv_offsets, surv_times, surv_values, libor_indices, \
+            libor_offsets, libor_times, libor_dfs = \
+            _pack_issuer_curves(adjusted_issuer_curves)
 
-                    # the CDS spreads we extract here should be the index
-                    # maturity dates
-                    cdsIndex = CDS(valuation_date, index_maturity_date, 0, 1.0)
+        num_points = np.diff(surv_offsets)
 
-                    indexProtPV = cdsIndex.protection_leg_pv(valuation_date,
-                                                             adjusted_issuer_curves[iCredit],
-                                                             index_recovery_rate)
+        # We solve for each maturity point
+        for i in range(0, np.max(num_maturities)):
 
-                    rpv01Ret = cdsIndex.risky_pv01(
-                        valuation_date, 
-                        adjusted_issuer_curves[iCredit])
+            coupons = _series_quotes(series_coupons, num_maturities, i)
+            upfronts = _series_quotes(series_upfronts, num_maturities, i)
+            unsolved = num_maturities > i
+            last_errors = np.full(num_series, np.inf)
+            numIterations = 0
 
-                    cleanRPV01 = rpv01Ret['clean_rpv01']
+            credit_ids = np.nonzero(unsolved[series_ids])[0]
 
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtPV
+            if np.any(num_points[credit_ids] < i + 2):
+                raise FinError("Issuer curve has fewer points than the index.")
 
-                sumRPV01 /= num_credits
-                sumProt /= num_credits
-                sumPrem = sumRPV01 * index_coupons[iMaturity]
+            while np.any(unsolved):
 
-                numerator = index_up_fronts[iMaturity] + sumPrem
-                denominator = sumProt
+                numIterations += 1
 
-                ratio = numerator / denominator
-                alpha *= ratio
+                if numIterations > max_iterations:
+                    raise FinError("Max Iterations exceeded")
 
-        return adjusted_issuer_curves
+                credit_ids = np.nonzero(unsolved[series_ids])[0]
+                credit_series = series_ids[credit_ids]
+                nodes = surv_offsets[credit_ids] + i + 1
+
+                contract_ids = np.array([contract_table[s][i]
+                                         for s in credit_series],
+                                        dtype=np.int64)
+
+                out = _index_legs_and_deltas(credit_ids,
+                                             contract_ids,
+                                             *packed_contracts,
+                                             coupons[credit_series],
+                                             recovery_rates[credit_series],
+                                             nodes,
+                                             surv_offsets,
+                                             surv_times,
+                                             surv_values,
+                                             libor_indices,
+                                             libor_offsets,
+                                             libor_times,
+                                             libor_dfs,
+                                             25)
+
+                # Moving the power y moves q2 by q2 * log(q2 / q1) * dy
+                q1 = surv_values[nodes - 1]
+                q2 = surv_values[nodes]
+                log_q12 = np.log(q2 / q1)
+
+                sumRPV01 = np.bincount(credit_series, out[:, 0],
+                                       minlength=num_series) / num_credits
+                sumProt = np.bincount(credit_series, out[:, 1],
+                                      minlength=num_series) / num_credits
+                dv = np.bincount(credit_series, out[:, 2] * q2 * log_q12,
+                                 minlength=num_series) / num_credits
+
+                numerator = upfronts + coupons * sumRPV01
+                ratio = np.ones(num_series)
+                ratio[unsolved] = numerator[unsolved] / sumProt[unsolved]
+                errors = numerator - sumProt
+
+                unsolved = unsolved & (np.abs(ratio - 1.0) > tolerance)
+
+                # A Newton step that has not reduced the error is followed by
+                # the fixed point step of raising to the power of the ratio
+                newton = unsolved & (np.abs(errors) < np.abs(last_errors)) \
+                    & (dv != 0.0)
+
+                power = ratio.copy()
+                power[newton] = 1.0 + errors[newton] / dv[newton]
+                last_errors = errors
+
+                update = unsolved[credit_series]
+                surv_values[nodes[update]] = \
+                    q1[update] * np.exp(power[credit_series[update]]
+                                        * log_q12[update])
+
+        series_curves = [[] for _ in range(0, num_series)]
+
+        for j, adjusted_issuer_curve in enumerate(adjusted_issuer_curves):
+            adjusted_issuer_curve._values = \
+                surv_values[surv_offsets[j]:surv_offsets[j + 1]].copy()
+            series_curves[series_ids[j]].append(adjusted_issuer_curve)
+
+        return series_curves
 
     ###########################################################################
 
@@ -2,7 +2,8 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from math import sqrt, log
+import numpy as np
+from numba import njit, prange
 from scipy import optimize
 
 from ...utils.calendar import CalendarTypes
@@ -10,8 +11,11 @@ from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.global_vars import gDaysInYear
-from ...utils.math import ONE_MILLION, N
-from ...products.credit.cds import CDS
+from ...utils.math import ONE_MILLION, N, normpdf
+from ...products.credit.cds import CDS, standard_recovery_rate
+from ...products.credit.cds_portfolio import _pack_curve_grids
+from ...products.credit.cds_index_portfolio import _index_legs
+from ...products.credit.cds_index_portfolio import _pack_index_contracts
 from ...utils.helpers import check_argument_types
 from ...utils.date import Date
 from ...utils.error import FinError
@@ -36,6 +40,413 @@ def fvol(volatility, *args):
 ###############################################################################
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _black_option_grid(forwards, strikes, rpv01s, texps, vols):
+    """ Value payer and receiver options on a forward spread with Black's
+    model for a grid with one row per expiry and one column per strike. The
+    forward spread, risky PV01 and time to expiry are given per expiry and
+    the strikes and volatilities per cell. Returns the payer and receiver
+    values, the payer and receiver deltas and the gamma and vega per unit
+    notional, all with respect to the forward spread. """
+
+    num_expiries = strikes.shape[0]
+    num_strikes = strikes.shape[1]
+    out = np.zeros((6, num_expiries, num_strikes))
+
+    for i in prange(num_expiries):
+
+        f = forwards[i]
+        rpv01 = rpv01s[i]
+        sqrtT = np.sqrt(texps[i])
+
+        for j in range(0, num_strikes):
+
+            k = strikes[i, j]
+            v = vols[i, j]
+
+            logMoneyness = np.log(f / k)
+            halfVolSquaredT = 0.5 * v * v * texps[i]
+            volSqrtT = v * sqrtT
+
+            d1 = (logMoneyness + halfVolSquaredT) / volSqrtT
+            d2 = (logMoneyness - halfVolSquaredT) / volSqrtT
+
+            nd1 = N(d1)
+            pdf = normpdf(d1)
+
+            out[0, i, j] = (f * nd1 - k * N(d2)) * rpv01
+            out[1, i, j] = (k * N(-d2) - f * N(-d1)) * rpv01
+            out[2, i, j] = nd1 * rpv01
+            out[3, i, j] = (nd1 - 1.0) * rpv01
+            out[4, i, j] = pdf / (f * volSqrtT) * rpv01
+            out[5, i, j] = f * pdf * sqrtT * rpv01
+
+    return out
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _black_implied_vol_grid(forwards, strikes, rpv01s, texps, prices,
+                            long_protection, tol, max_iterations):
+    """ Solve for the Black volatility of each cell of a grid of payer or
+    receiver option prices per unit notional laid out as in
+    _black_option_grid. Newton steps using the vega are kept inside a
+    bracket of the root and replaced by bisection when they leave it. Cells
+    whose price is outside the range of Black prices are set to NaN. """
+
+    num_expiries = strikes.shape[0]
+    num_strikes = strikes.shape[1]
+    sigmas = np.full((num_expiries, num_strikes), np.nan)
+
+    for i in prange(num_expiries):
+
+        f = forwards[i]
+        rpv01 = rpv01s[i]
+        texp = texps[i]
+        sqrtT = np.sqrt(texp)
+
+        for j in range(0, num_strikes):
+
+            k = strikes[i, j]
+            target = prices[i, j] / rpv01
+
+            if long_protection:
+                intrinsic = max(f - k, 0.0)
+                upper = f
+            else:
+                intrinsic = max(k - f, 0.0)
+                upper = k
+
+            if target <= intrinsic or target >= upper:
+                continue
+
+            lo = 0.0
+            hi = 10.0
+            v = 0.30
+
+            for _ in range(0, max_iterations):
+
+                logMoneyness = np.log(f / k)
+                halfVolSquaredT = 0.5 * v * v * texp
+                volSqrtT = v * sqrtT
+                d1 = (logMoneyness + halfVolSquaredT) / volSqrtT
+                d2 = (logMoneyness - halfVolSquaredT) / volSqrtT
+
+                if long_protection:
+                    price = f * N(d1) - k * N(d2)
+                else:
+                    price = k * N(-d2) - f * N(-d1)
+
+                diff = price - target
+
+                if abs(diff) < tol:
+                    sigmas[i, j] = v
+                    break
+
+                if diff > 0.0:
+                    hi = v
+                else:
+                    lo = v
+
+                vega = f * normpdf(d1) * sqrtT
+                v_new = v - diff / vega if vega > 0.0 else -1.0
+
+                if v_new <= lo or v_new >= hi:
+                    v_new = 0.5 * (lo + hi)
+
+                if hi - lo < tol:
+                    sigmas[i, j] = v_new
+                    break
+
+                v = v_new
+
+    return sigmas
+
+###############################################################################
+
+
+def _grid_values(x, num_expiries, num_strikes, label):
+    """ Broadcast one number, an array with one value per expiry or a matrix
+    with one row per expiry and one column per strike to the full grid. """
+
+    x = np.array(x, dtype=np.float64)
+
+    if x.ndim == 0:
+        return np.full((num_expiries, num_strikes), float(x))
+    elif x.shape == (num_expiries,):
+        return np.repeat(x[:, np.newaxis], num_strikes, axis=1)
+    elif x.shape == (num_expiries, num_strikes):
+        return x.copy()
+    else:
+        raise FinError("Need one " + label + " per expiry or per expiry and "
+                       "strike.")
+
+###############################################################################
+
+
+def _strike_grid(strikes, num_expiries):
+    """ Return a matrix of strikes with one row per expiry from one list of
+    strikes for all expiries or from a matrix of strikes. """
+
+    strikes = np.array(strikes, dtype=np.float64)
+
+    if strikes.ndim < 2:
+        strikes = np.tile(strikes.reshape(-1), (num_expiries, 1))
+
+    if strikes.ndim != 2 or strikes.shape[0] != num_expiries:
+        raise FinError("Need one row of strikes per expiry.")
+
+    return strikes
+
+###############################################################################
+
+
+def _forward_cds_legs(valuation_date,
+                      cds_contracts,
+                      surv_grids,
+                      libor_curves,
+                      libor_ids,
+                      pairs,
+                      recovery_rate=standard_recovery_rate):
+    """ Value the clean risky PV01 and protection leg PV per unit notional of
+    each pair (curve, contract) of a list of pairs in one parallel pass. The
+    survival curves are given by their grids of times and values and curve
+    c discounts on the Libor curve at position libor_ids[c]. Returns the
+    clean risky PV01 and protection leg PV of each pair and the accrual
+    factor to the step in date of each contract. """
+
+    teffs, tmats, accrued_factors, pay_offsets, pay_times, year_fracs = \
+        _pack_index_contracts(valuation_date, cds_contracts)
+
+    surv_offsets, surv_times, surv_values = \
+        _pack_curve_grids([grid[0] for grid in surv_grids],
+                          [grid[1] for grid in surv_grids])
+
+    libor_offsets, libor_times, libor_dfs = \
+        _pack_curve_grids([c._times for c in libor_curves],
+                          [c._dfs for c in libor_curves])
+
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+    out = _index_legs(pairs[:, 0],
+                      pairs[:, 1],
+                      teffs,
+                      tmats,
+                      accrued_factors,
+                      pay_offsets,
+                      pay_times,
+                      year_fracs,
+                      np.full(len(pairs), recovery_rate),
+                      surv_offsets,
+                      surv_times,
+                      surv_values,
+                      np.array(libor_ids, dtype=np.int64),
+                      libor_offsets,
+                      libor_times,
+                      libor_dfs,
+                      25)
+
+    return out[:, 0], out[:, 1], accrued_factors
+
+###############################################################################
+
+
+def _cds_option_forwards(valuation_date,
+                         issuer_curve,
+                         expiry_dates,
+                         maturity_date,
+                         freq_type,
+                         day_count_type,
+                         calendar_type,
+                         bus_day_adjust_type,
+                         date_gen_rule_type):
+    """ Return the time to each expiry date together with the forward spread
+    and the forward full risky PV01 of the CDS that steps in on that date and
+    ends on the maturity date. The legs of all expiries are valued in one
+    pass. """
+
+    num_expiries = len(expiry_dates)
+
+    if num_expiries == 0:
+        raise FinError("No expiry dates have been supplied.")
+
+    cds_contracts = []
+    texps = np.zeros(num_expiries)
+
+    for i, expiry_date in enumerate(expiry_dates):
+
+        if valuation_date > expiry_date:
+            raise FinError("Expiry date is now or in the past")
+
+        if maturity_date < expiry_date:
+            raise FinError("Maturity date must be after option expiry date")
+
+        texps[i] = (expiry_date - valuation_date) / gDaysInYear
+
+        # The underlying CDS steps in on the expiry date
+        cds_contracts.append(CDS(expiry_date,
+                                 maturity_date,
+                                 0.0,
+                                 1.0,
+                                 True,
+                                 freq_type,
+                                 day_count_type,
+                                 calendar_type,
+                                 bus_day_adjust_type,
+                                 date_gen_rule_type))
+
+    clean_rpv01s, prot_pvs, accrued_factors = \
+        _forward_cds_legs(valuation_date,
+                          cds_contracts,
+                          [(issuer_curve._times, issuer_curve._values)],
+                          [issuer_curve._libor_curve],
+                          [0],
+                          [(0, i) for i in range(0, num_expiries)])
+
+    forward_spreads = prot_pvs / clean_rpv01s
+    forward_rpv01s = clean_rpv01s + accrued_factors
+
+    return texps, forward_spreads, forward_rpv01s
+
+###############################################################################
+
+
+def value_cds_option_grid(valuation_date: Date,
+                          issuer_curve,
+                          expiry_dates: list,
+                          maturity_date: Date,
+                          strikes,
+                          volatilities,
+                          notional: float = ONE_MILLION,
+                          long_protection: bool = True,
+                          knockout_flag: bool = True,
+                          freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                          day_count_type: DayCountTypes = DayCountTypes.ACT_360,
+                          calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                          bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                          date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
+    """ Value CDS options on one underlying CDS for a grid of expiry dates
+    and strike coupons using Black's model as CDSOption.value does. The
+    strikes are one list for all expiries or a matrix with one row per
+    expiry and the volatilities are one number, one per expiry or a matrix.
+    The forward spread and forward risky PV01 are calculated once for each
+    expiry. Returns a dictionary of matrices by expiry and strike of the
+    option values and of their delta, gamma and vega with respect to the
+    forward spread, together with the forward spreads and risky PV01s. """
+
+    check_argument_types(value_cds_option_grid, locals())
+
+    texps, forward_spreads, forward_rpv01s = \
+        _cds_option_forwards(valuation_date,
+                             issuer_curve,
+                             expiry_dates,
+                             maturity_date,
+                             freq_type,
+                             day_count_type,
+                             calendar_type,
+                             bus_day_adjust_type,
+                             date_gen_rule_type)
+
+    strikes = _strike_grid(strikes, len(expiry_dates))
+    num_expiries, num_strikes = strikes.shape
+    vols = _grid_values(volatilities, num_expiries, num_strikes, "volatility")
+
+    if np.any(strikes <= 0.0):
+        raise FinError("Strike must be greater than zero")
+
+    if np.any(vols <= 0.0):
+        raise FinError("Volatility must be greater than zero")
+
+    out = _black_option_grid(forward_spreads, strikes, forward_rpv01s,
+                             texps, vols)
+
+    if long_protection:
+        values = out[0]
+        deltas = out[2]
+    else:
+        values = out[1]
+        deltas = out[3]
+
+    # If the option does not knockout on a default before expiry then we
+    # need to include the cost of protection which is provided between
+    # the value date and the expiry date
+    if knockout_flag is False and long_protection is True:
+        dfs = issuer_curve.df(texps)
+        qs = issuer_curve.survival_prob(texps)
+        recovery = issuer_curve._recovery_rate
+        frontEndProtection = dfs * (1.0 - qs) * (1.0 - recovery)
+        values = values + frontEndProtection[:, np.newaxis]
+
+    return {'value': values * notional,
+            'delta': deltas * notional,
+            'gamma': out[4] * notional,
+            'vega': out[5] * notional,
+            'forward_spread': forward_spreads,
+            'forward_rpv01': forward_rpv01s}
+
+###############################################################################
+
+
+def implied_volatility_cds_option_grid(valuation_date: Date,
+                                       issuer_curve,
+                                       expiry_dates: list,
+                                       maturity_date: Date,
+                                       strikes,
+                                       option_values,
+                                       notional: float = ONE_MILLION,
+                                       long_protection: bool = True,
+                                       knockout_flag: bool = True,
+                                       freq_type: FrequencyTypes = FrequencyTypes.QUARTERLY,
+                                       day_count_type: DayCountTypes = DayCountTypes.ACT_360,
+                                       calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                                       bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                                       date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
+                                       tolerance: float = 1e-10,
+                                       max_iterations: int = 100):
+    """ Calculate the Black implied volatilities of a grid of CDS option
+    prices by expiry date and strike coupon laid out as the values returned
+    by value_cds_option_grid. The forward spread and forward risky PV01 are
+    calculated once per expiry and all the volatilities are solved together
+    in a NUMBA kernel. Prices which no volatility reproduces give NaN. """
+
+    check_argument_types(implied_volatility_cds_option_grid, locals())
+
+    texps, forward_spreads, forward_rpv01s = \
+        _cds_option_forwards(valuation_date,
+                             issuer_curve,
+                             expiry_dates,
+                             maturity_date,
+                             freq_type,
+                             day_count_type,
+                             calendar_type,
+                             bus_day_adjust_type,
+                             date_gen_rule_type)
+
+    strikes = _strike_grid(strikes, len(expiry_dates))
+    num_expiries, num_strikes = strikes.shape
+    prices = _grid_values(option_values, num_expiries, num_strikes, "price")
+    prices = prices / notional
+
+    if knockout_flag is False and long_protection is True:
+        dfs = issuer_curve.df(texps)
+        qs = issuer_curve.survival_prob(texps)
+        recovery = issuer_curve._recovery_rate
+        frontEndProtection = dfs * (1.0 - qs) * (1.0 - recovery)
+        prices = prices - frontEndProtection[:, np.newaxis]
+
+    return _black_implied_vol_grid(forward_spreads,
+                                   strikes,
+                                   forward_rpv01s,
+                                   texps,
+                                   prices,
+                                   long_protection,
+                                   tolerance,
+                                   max_iterations)
+
+###############################################################################
+
+
 class CDSOption:
     """ Class to manage the pricing and risk-management of an option on a
     single-name CDS. This is a contract in which the option buyer pays for an
@@ -89,62 +500,29 @@ class CDSOption:
               issuer_curve,
               volatility):
         """ Value the CDS option using Black's model with an adjustment for any
-        Front End Protection.
-        TODO - Should the CDS be created in the init method ? """
-
-        if valuation_date > self._expiry_date:
-            raise FinError("Expiry date is now or in the past")
+        Front End Protection. See value_cds_option_grid for valuing options
+        on the same CDS at many strikes and expiry dates. """
 
         if volatility < 0.0:
             raise FinError("Volatility must be greater than zero")
 
-        # The underlying is a forward starting option that steps in on
-        # the expiry date and matures on the expiry date with a coupon
-        # set equal to the option spread strike
-        cds = CDS(self._expiry_date,
-                  self._maturity_date,
-                  self._strike_coupon,
-                  self._notional,
-                  self._long_protection,
-                  self._freq_type,
-                  self._day_count_type,
-                  self._calendar_type,
-                  self._businessDateAdjustType,
-                  self._date_gen_rule_type)
-
-        strike = self._strike_coupon
-        forward_spread = cds.par_spread(valuation_date, issuer_curve)
-        forward_rpv01 = cds.risky_pv01(
-            valuation_date, issuer_curve)['full_rpv01']
-
-        time_to_expiry = (self._expiry_date - valuation_date) / gDaysInYear
-        logMoneyness = log(forward_spread / strike)
-
-        halfVolSquaredT = 0.5 * volatility * volatility * time_to_expiry
-        volSqrtT = volatility * sqrt(time_to_expiry)
-
-        d1 = (logMoneyness + halfVolSquaredT) / volSqrtT
-        d2 = (logMoneyness - halfVolSquaredT) / volSqrtT
-
-        if self._long_protection:
-            option_value = forward_spread * N(d1) - strike * N(d2)
-        else:
-            option_value = strike * N(-d2) - forward_spread * N(-d1)
-
-        option_value = option_value * forward_rpv01
-
-        # If the option does not knockout on a default before expiry then we
-        # need to include the cost of protection which is provided between
-        # the value date and the expiry date
-        if self._knockout_flag is False and self._long_protection is True:
-            df = issuer_curve.getDF(time_to_expiry)
-            q = issuer_curve.getSurvProb(time_to_expiry)
-            recovery = issuer_curve._recovery_rate
-            frontEndProtection = df * (1.0 - q) * (1.0 - recovery)
-            option_value += frontEndProtection
+        values = value_cds_option_grid(valuation_date,
+                                       issuer_curve,
+                                       [self._expiry_date],
+                                       self._maturity_date,
+                                       [self._strike_coupon],
+                                       volatility,
+                                       self._notional,
+                                       self._long_protection,
+                                       self._knockout_flag,
+                                       self._freq_type,
+                                       self._day_count_type,
+                                       self._calendar_type,
+                                       self._businessDateAdjustType,
+                                       self._date_gen_rule_type)
 
         # we return the option price in dollars
-        return option_value * self._notional
+        return values['value'][0, 0]
 
 ###############################################################################
 
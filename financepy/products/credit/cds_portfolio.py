@@ -0,0 +1,304 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ...utils.date import Date
+from ...utils.error import FinError
+from ...utils.day_count import DayCount
+from ...utils.global_vars import gDaysInYear
+from ...utils.helpers import check_argument_types
+from ...utils.helpers import label_to_string
+from .cds import _risky_pv01_numba, _protection_leg_pv_numba
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _value_cds_portfolio(valuation_serial,
+                         step_in_serials,
+                         maturity_serials,
+                         accrued_factors,
+                         pay_offsets,
+                         pay_serials,
+                         year_fracs,
+                         coupons,
+                         notionals,
+                         signs,
+                         recovery_rates,
+                         issuer_indices,
+                         surv_offsets,
+                         surv_times,
+                         surv_values,
+                         libor_indices,
+                         libor_offsets,
+                         libor_times,
+                         libor_dfs,
+                         num_steps_per_year,
+                         pv01_method,
+                         prot_method):
+    """ Value each contract of a flattened book of CDS in parallel. The
+    payment dates and accrual factors of contract i are the slice from
+    pay_offsets[i] to pay_offsets[i+1] and the grids of its issuer and Libor
+    curves are sliced the same way using the curve offsets. Returns an array
+    with one row per contract holding the full PV, clean PV, full RPV01,
+    clean RPV01 and the par spread. """
+
+    num_contracts = step_in_serials.size
+    out = np.zeros((num_contracts, 5))
+
+    for i in prange(num_contracts):
+
+        j = issuer_indices[i]
+        s0 = surv_offsets[j]
+        s1 = surv_offsets[j + 1]
+
+        k = libor_indices[j]
+        l0 = libor_offsets[k]
+        l1 = libor_offsets[k + 1]
+
+        p0 = pay_offsets[i]
+        p1 = pay_offsets[i + 1]
+
+        teff = (step_in_serials[i] - valuation_serial) / gDaysInYear
+        tmat = (maturity_serials[i] - valuation_serial) / gDaysInYear
+        payment_times = (pay_serials[p0:p1] - valuation_serial) / gDaysInYear
+
+        rpv01 = _risky_pv01_numba(teff,
+                                  accrued_factors[i],
+                                  payment_times,
+                                  year_fracs[p0:p1],
+                                  libor_times[l0:l1],
+                                  libor_dfs[l0:l1],
+                                  surv_times[s0:s1],
+                                  surv_values[s0:s1],
+                                  pv01_method)
+
+        prot_pv = _protection_leg_pv_numba(teff,
+                                           tmat,
+                                           libor_times[l0:l1],
+                                           libor_dfs[l0:l1],
+                                           surv_times[s0:s1],
+                                           surv_values[s0:s1],
+                                           recovery_rates[i],
+                                           num_steps_per_year,
+                                           prot_method)
+
+        prot_pv = prot_pv * notionals[i]
+        premium = coupons[i] * notionals[i]
+
+        out[i, 0] = signs[i] * (prot_pv - premium * rpv01[0])
+        out[i, 1] = signs[i] * (prot_pv - premium * rpv01[1])
+        out[i, 2] = rpv01[0]
+        out[i, 3] = rpv01[1]
+        out[i, 4] = prot_pv / rpv01[1] / notionals[i]
+
+    return out
+
+###############################################################################
+
+
+def _pack_curve_grids(times_list, values_list):
+    """ Concatenate the grids of several curves into two flat arrays with an
+    array of offsets marking where the grid of each curve starts. """
+
+    offsets = np.zeros(len(times_list) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(times) for times in times_list])
+
+    times = np.concatenate(times_list).astype(np.float64)
+    values = np.concatenate(values_list).astype(np.float64)
+    return offsets, times, values
+
+###############################################################################
+
+
+def _pack_issuer_curves(issuer_curves):
+    """ Pack the survival grids of a list of issuer curves and the grids of
+    the distinct Libor curves that they use into flat arrays with offsets.
+    Issuer curves which share a Libor curve object share its packed grid and
+    the index of the Libor grid of each issuer curve is also returned. """
+
+    libor_curves = []
+    libor_indices = np.zeros(len(issuer_curves), dtype=np.int64)
+
+    for j, issuer_curve in enumerate(issuer_curves):
+
+        libor_curve = issuer_curve._libor_curve
+
+        for k, curve in enumerate(libor_curves):
+            if curve is libor_curve:
+                libor_indices[j] = k
+                break
+        else:
+            libor_indices[j] = len(libor_curves)
+            libor_curves.append(libor_curve)
+
+    surv_offsets, surv_times, surv_values = \
+        _pack_curve_grids([c._times for c in issuer_curves],
+                          [c._values for c in issuer_curves])
+
+    libor_offsets, libor_times, libor_dfs = \
+        _pack_curve_grids([c._times for c in libor_curves],
+                          [c._dfs for c in libor_curves])
+
+    return surv_offsets, surv_times, surv_values, libor_indices, \
+        libor_offsets, libor_times, libor_dfs
+
+###############################################################################
+
+
+class CDSPortfolio:
+    """ A book of single name CDS contracts which is packed into flat arrays
+    of coupons, notionals, payment dates, accrual factors, recovery rates and
+    issuer indices so that all of the contracts can be valued together in one
+    parallel NUMBA pass against a list of issuer curves. """
+
+    def __init__(self,
+                 cds_contracts: list,
+                 issuer_indices,
+                 recovery_rates=0.40):
+        """ Create the portfolio from a list of CDS contracts. Contract i is
+        valued on the issuer curve at position issuer_indices[i] of the list
+        of issuer curves passed to value. The contract recovery rate is one
+        number for all contracts or an array with one per contract. The
+        contract terms are copied when the portfolio is created. """
+
+        check_argument_types(self.__init__, locals())
+
+        num_contracts = len(cds_contracts)
+
+        if num_contracts == 0:
+            raise FinError("No CDS contracts have been supplied.")
+
+        issuer_indices = np.array(issuer_indices, dtype=np.int64)
+
+        if issuer_indices.shape != (num_contracts,):
+            raise FinError("Need one issuer index per contract.")
+
+        if np.any(issuer_indices < 0):
+            raise FinError("Issuer indices must not be negative.")
+
+        recovery_rates = np.array(recovery_rates, dtype=np.float64)
+
+        if recovery_rates.ndim == 0:
+            recovery_rates = np.full(num_contracts, float(recovery_rates))
+        elif recovery_rates.shape != (num_contracts,):
+            raise FinError("Need one recovery rate per contract.")
+
+        step_in_serials = np.zeros(num_contracts)
+        maturity_serials = np.zeros(num_contracts)
+        accrued_factors = np.zeros(num_contracts)
+        coupons = np.zeros(num_contracts)
+        notionals = np.zeros(num_contracts)
+        signs = np.zeros(num_contracts)
+        pay_offsets = np.zeros(num_contracts + 1, dtype=np.int64)
+
+        pay_serials = []
+        year_fracs = []
+
+        for i, cds in enumerate(cds_contracts):
+
+            dates = cds._adjusted_dates
+            day_count = DayCount(cds._day_count_type)
+
+            step_in_serials[i] = cds._step_in_date._excel_date
+            maturity_serials[i] = cds._maturity_date._excel_date
+            accrued_factors[i] = day_count.year_frac(dates[0],
+                                                     cds._step_in_date)[0]
+            coupons[i] = cds._running_coupon
+            notionals[i] = cds._notional
+            signs[i] = 1.0 if cds._long_protection else -1.0
+            pay_offsets[i + 1] = pay_offsets[i] + len(dates)
+
+            pay_serials.append([dt._excel_date for dt in dates])
+            year_fracs.append(cds._accrual_factors)
+
+        self._cds_contracts = cds_contracts
+        self._issuer_indices = issuer_indices
+        self._recovery_rates = recovery_rates
+        self._step_in_serials = step_in_serials
+        self._maturity_serials = maturity_serials
+        self._accrued_factors = accrued_factors
+        self._coupons = coupons
+        self._notionals = notionals
+        self._signs = signs
+        self._pay_offsets = pay_offsets
+        self._pay_serials = np.concatenate(pay_serials).astype(np.float64)
+        self._year_fracs = np.concatenate(year_fracs).astype(np.float64)
+
+    ###########################################################################
+
+    def value(self,
+              valuation_date: Date,
+              issuer_curves: list,
+              pv01_method: int = 0,
+              prot_method: int = 0,
+              num_steps_per_year: int = 25):
+        """ Value all of the contracts on the valuation date given a list of
+        issuer curves. The issuer curves may share their Libor curves. Returns
+        a dictionary of arrays with one entry per contract of the full and
+        clean PV, the full and clean risky PV01 and the par spread, each as
+        calculated by the CDS class. """
+
+        check_argument_types(self.value, locals())
+
+        num_curves = len(issuer_curves)
+
+        if np.max(self._issuer_indices) >= num_curves:
+            raise FinError("Issuer index exceeds the number of issuer curves.")
+
+        for issuer_curve in issuer_curves:
+            if issuer_curve._valuation_date != valuation_date:
+                raise FinError("Issuer curve has a different valuation date.")
+
+        surv_offsets, surv_times, surv_values, libor_indices, \
+            libor_offsets, libor_times, libor_dfs = \
+            _pack_issuer_curves(issuer_curves)
+
+        out = _value_cds_portfolio(float(valuation_date._excel_date),
+                                   self._step_in_serials,
+                                   self._maturity_serials,
+                                   self._accrued_factors,
+                                   self._pay_offsets,
+                                   self._pay_serials,
+                                   self._year_fracs,
+                                   self._coupons,
+                                   self._notionals,
+                                   self._signs,
+                                   self._recovery_rates,
+                                   self._issuer_indices,
+                                   surv_offsets,
+                                   surv_times,
+                                   surv_values,
+                                   libor_indices,
+                                   libor_offsets,
+                                   libor_times,
+                                   libor_dfs,
+                                   num_steps_per_year,
+                                   pv01_method,
+                                   prot_method)
+
+        return {'full_pv': out[:, 0],
+                'clean_pv': out[:, 1],
+                'full_rpv01': out[:, 2],
+                'clean_rpv01': out[:, 3],
+                'par_spread': out[:, 4]}
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM CONTRACTS", len(self._cds_contracts))
+        s += label_to_string("NUM ISSUERS", np.max(self._issuer_indices) + 1)
+        s += label_to_string("TOTAL NOTIONAL", np.sum(self._notionals))
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
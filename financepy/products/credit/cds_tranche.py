@@ -5,12 +5,9 @@
 # TODO: Add __repr__ method
 
 import numpy as np
-from math import sqrt
+from numba import njit, prange
 
-from ...models.gauss_copula_onefactor import tranch_surv_prob_gaussian
-from ...models.gauss_copula_onefactor import tranche_surv_prob_adj_binomial
-from ...models.gauss_copula_onefactor import tranche_surv_prob_recursion
-from ...models.gauss_copula_lhp import tr_surv_prob_lhp
+from ...models.gauss_copula_onefactor import base_tranche_surv_probs
 
 from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -43,6 +40,206 @@ class FinLossDistributionBuilder(Enum):
 ###############################################################################
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _base_tranche_surv_prob_grid(strikes,
+                                 job_time_indices,
+                                 job_corrs,
+                                 survival_matrix,
+                                 recovery_rates,
+                                 num_points,
+                                 model):
+    """ Calculate the survival probabilities of the base tranches [0, K] for
+    the ladder of strikes at each pair of time and correlation in the list of
+    jobs in parallel. The row of the survival matrix used by a job is given
+    by its time index. Returns one row of survival probabilities per job with
+    one column per strike. """
+
+    num_jobs = len(job_time_indices)
+    out = np.zeros((num_jobs, len(strikes)))
+
+    for iJob in prange(num_jobs):
+        beta = np.sqrt(job_corrs[iJob])
+        qVector = survival_matrix[job_time_indices[iJob]].copy()
+        out[iJob] = base_tranche_surv_probs(strikes,
+                                            qVector,
+                                            recovery_rates,
+                                            beta,
+                                            num_points,
+                                            model)
+
+    return out
+
+###############################################################################
+
+
+def value_tranches_bc(valuation_date,
+                      tranches,
+                      issuer_curves,
+                      upfronts,
+                      running_coupons,
+                      corr1s,
+                      corr2s,
+                      num_points=50,
+                      model=FinLossDistributionBuilder.RECURSION):
+    """ Value a list of tranches on the same portfolio of issuer curves using
+    the base correlation approach. Tranche i with strikes K1 and K2 uses the
+    base correlation corr1s[i] for [0, K1] and corr2s[i] for [0, K2]. The
+    upfronts, coupons and correlations may each be one number or a list with
+    one value per tranche. The issuer survival probabilities are calculated
+    once on the union of the payment times of all the tranches. The loss
+    distribution is then built once for each pair of time and correlation
+    and gives the base tranche survival probabilities of every strike that
+    uses that correlation. This means that the tranches of a base correlation
+    curve, or of several maturities, share almost all of the work. Returns
+    an array with one row per tranche of the values returned by value_bc. """
+
+    num_tranches = len(tranches)
+
+    if num_tranches == 0:
+        raise FinError("No tranches have been supplied.")
+
+    def per_tranche(x, label):
+        x = np.array(x, dtype=np.float64).reshape(-1)
+        if x.size == 1:
+            x = np.full(num_tranches, x[0])
+        elif x.size != num_tranches:
+            raise FinError("Need one " + label + " per tranche.")
+        return x
+
+    upfronts = per_tranche(upfronts, "upfront")
+    running_coupons = per_tranche(running_coupons, "running coupon")
+    corr1s = per_tranche(corr1s, "corr1")
+    corr2s = per_tranche(corr2s, "corr2")
+
+    num_credits = len(issuer_curves)
+
+    # Payment times of each tranche and their union
+    tranche_times = []
+    for tranche in tranches:
+
+        tmat = (tranche._maturity_date - valuation_date) / gDaysInYear
+
+        if tmat < 0.0:
+            raise FinError("Value date is after maturity date")
+
+        payment_dates = tranche._cds_contract._adjusted_dates
+        times = np.array([(dt - valuation_date) / gDaysInYear
+                          for dt in payment_dates[1:]])
+        tranche_times.append(times)
+
+    all_times = np.unique(np.concatenate(tranche_times))
+
+    recovery_rates = np.zeros(num_credits)
+    survival_matrix = np.zeros((len(all_times), num_credits))
+
+    for j in range(0, num_credits):
+        issuer_curve = issuer_curves[j]
+        recovery_rates[j] = issuer_curve._recovery_rate
+        survival_matrix[:, j] = interpolate(all_times,
+                                            issuer_curve._times,
+                                            issuer_curve._values,
+                                            InterpTypes.FLAT_FWD_RATES.value)
+
+    # Each distinct pair of time and correlation is one job
+    strikes = []
+    jobs = {}
+    job_time_indices = []
+    job_corrs = []
+    tranche_indices = []
+
+    for i, tranche in enumerate(tranches):
+
+        time_indices = np.searchsorted(all_times, tranche_times[i])
+        tranche_indices.append(time_indices)
+
+        for k in (tranche._k1, tranche._k2):
+            if k not in strikes:
+                strikes.append(k)
+
+        for corr in (corr1s[i], corr2s[i]):
+            for time_index in time_indices:
+                key = (time_index, corr)
+                if key not in jobs:
+                    jobs[key] = len(job_time_indices)
+                    job_time_indices.append(time_index)
+                    job_corrs.append(corr)
+
+    q = _base_tranche_surv_prob_grid(np.array(strikes),
+                                     np.array(job_time_indices,
+                                              dtype=np.int64),
+                                     np.array(job_corrs),
+                                     survival_matrix,
+                                     recovery_rates,
+                                     num_points,
+                                     model.value)
+
+    libor_curve = issuer_curves[0]._libor_curve
+    curveRecovery = 0.0  # For tranches only
+
+    trancheOutput = np.zeros((num_tranches, 4))
+
+    for i, tranche in enumerate(tranches):
+
+        k1 = tranche._k1
+        k2 = tranche._k2
+
+        if abs(k1 - k2) < 0.00000001:
+            continue
+
+        kappa = k2 / (k2 - k1)
+        i1 = strikes.index(k1)
+        i2 = strikes.index(k2)
+        time_indices = tranche_indices[i]
+        num_times = len(time_indices) + 1
+
+        qt1 = np.ones(num_times)
+        qt2 = np.ones(num_times)
+
+        for iTime in range(1, num_times):
+            time_index = time_indices[iTime - 1]
+            qt1[iTime] = q[jobs[(time_index, corr1s[i])], i1]
+            qt2[iTime] = q[jobs[(time_index, corr2s[i])], i2]
+
+        if np.any(qt1[1:] > qt1[:-1]):
+            raise FinError(
+                "Tranche K1 survival probabilities not decreasing.")
+
+        if np.any(qt2[1:] > qt2[:-1]):
+            raise FinError(
+                "Tranche K2 survival probabilities not decreasing.")
+
+        trancheTimes = np.zeros(num_times)
+        trancheTimes[1:] = tranche_times[i]
+        trancheSurvivalCurve = kappa * qt2 + (1.0 - kappa) * qt1
+        trancheSurvivalCurve[0] = 1.0
+
+        trancheCurve = CDSCurve(
+            valuation_date, [], libor_curve, curveRecovery)
+        trancheCurve._times = trancheTimes
+        trancheCurve._values = trancheSurvivalCurve
+
+        protLegPV = tranche._cds_contract.protection_leg_pv(
+            valuation_date, trancheCurve, curveRecovery)
+        risky_pv01 = tranche._cds_contract.risky_pv01(
+            valuation_date, trancheCurve)['clean_rpv01']
+
+        mtm = tranche._notional * (protLegPV - upfronts[i] -
+                                   risky_pv01 * running_coupons[i])
+
+        if not tranche._long_protection:
+            mtm *= -1.0
+
+        trancheOutput[i, 0] = mtm
+        trancheOutput[i, 1] = \
+            risky_pv01 * tranche._notional * running_coupons[i]
+        trancheOutput[i, 2] = protLegPV * tranche._notional
+        trancheOutput[i, 3] = protLegPV / risky_pv01
+
+    return trancheOutput
+
+###############################################################################
+
+
 class CDSTranche:
 
     def __init__(self,
@@ -103,140 +300,21 @@ class CDSTranche:
                  num_points=50,
                  model=FinLossDistributionBuilder.RECURSION):
 
-        num_credits = len(issuer_curves)
-        k1 = self._k1
-        k2 = self._k2
-        tmat = (self._maturity_date - valuation_date) / gDaysInYear
-
-        if tmat < 0.0:
-            raise FinError("Value date is after maturity date")
-
-        if abs(k1 - k2) < 0.00000001:
-            output = np.zeros(4)
-            output[0] = 0.0
-            output[1] = 0.0
-            output[2] = 0.0
-            output[3] = 0.0
-            return output
-
-        if k1 > k2:
-            raise FinError("K1 > K2")
-
-        kappa = k2 / (k2 - k1)
-
-        recovery_rates = np.zeros(num_credits)
-
-        payment_dates = self._cds_contract._adjusted_dates
-        num_times = len(payment_dates)
-
-        beta1 = sqrt(corr1)
-        beta2 = sqrt(corr2)
-        beta_vector1 = np.zeros(num_credits)
-        for bb in range(0, num_credits):
-            beta_vector1[bb] = beta1
-
-        beta_vector2 = np.zeros(num_credits)
-        for bb in range(0, num_credits):
-            beta_vector2[bb] = beta2
-
-        qVector = np.zeros(num_credits)
-        qt1 = np.zeros(num_times)
-        qt2 = np.zeros(num_times)
-        trancheTimes = np.zeros(num_times)
-        trancheSurvivalCurve = np.zeros(num_times)
-
-        trancheTimes[0] = 0
-        trancheSurvivalCurve[0] = 1.0
-        qt1[0] = 1.0
-        qt2[0] = 1.0
-
-        for i in range(1, num_times):
-
-            t = (payment_dates[i] - valuation_date) / gDaysInYear
-
-            for j in range(0, num_credits):
-                issuer_curve = issuer_curves[j]
-                vTimes = issuer_curve._times
-                qRow = issuer_curve._values
-                recovery_rates[j] = issuer_curve._recovery_rate
-                qVector[j] = interpolate(
-                    t, vTimes, qRow, InterpTypes.FLAT_FWD_RATES.value)
-
-            if model == FinLossDistributionBuilder.RECURSION:
-                qt1[i] = tranche_surv_prob_recursion(
-                    0.0, k1, num_credits, qVector, recovery_rates,
-                    beta_vector1, num_points)
-                qt2[i] = tranche_surv_prob_recursion(
-                    0.0, k2, num_credits, qVector, recovery_rates,
-                    beta_vector2, num_points)
-            elif model == FinLossDistributionBuilder.ADJUSTED_BINOMIAL:
-                qt1[i] = tranche_surv_prob_adj_binomial(
-                    0.0, k1, num_credits, qVector, recovery_rates,
-                    beta_vector1, num_points)
-                qt2[i] = tranche_surv_prob_adj_binomial(
-                    0.0, k2, num_credits, qVector, recovery_rates,
-                    beta_vector2, num_points)
-            elif model == FinLossDistributionBuilder.GAUSSIAN:
-                qt1[i] = tranch_surv_prob_gaussian(
-                    0.0,
-                    k1,
-                    num_credits,
-                    qVector,
-                    recovery_rates,
-                    beta_vector1,
-                    num_points)
-                qt2[i] = tranch_surv_prob_gaussian(
-                    0.0,
-                    k2,
-                    num_credits,
-                    qVector,
-                    recovery_rates,
-                    beta_vector2,
-                    num_points)
-            elif model == FinLossDistributionBuilder.LHP:
-                qt1[i] = tr_surv_prob_lhp(
-                    0.0, k1, num_credits, qVector, recovery_rates, beta1)
-                qt2[i] = tr_surv_prob_lhp(
-                    0.0, k2, num_credits, qVector, recovery_rates, beta2)
-            else:
-                raise FinError(
-                    "Unknown model type only full and AdjBinomial allowed")
-
-            if qt1[i] > qt1[i - 1]:
-                raise FinError(
-                    "Tranche K1 survival probabilities not decreasing.")
-
-            if qt2[i] > qt2[i - 1]:
-                raise FinError(
-                    "Tranche K2 survival probabilities not decreasing.")
-
-            trancheSurvivalCurve[i] = kappa * qt2[i] + (1.0 - kappa) * qt1[i]
-            trancheTimes[i] = t
-
-        curveRecovery = 0.0  # For tranches only
-        libor_curve = issuer_curves[0]._libor_curve
-        trancheCurve = CDSCurve(
-            valuation_date, [], libor_curve, curveRecovery)
-        trancheCurve._times = trancheTimes
-        trancheCurve._values = trancheSurvivalCurve
-
-        protLegPV = self._cds_contract.protection_leg_pv(
-            valuation_date, trancheCurve, curveRecovery)
-        risky_pv01 = self._cds_contract.risky_pv01(
-            valuation_date, trancheCurve)['clean_rpv01']
-
-        mtm = self._notional * (protLegPV - upfront -
-                                risky_pv01 * running_coupon)
-
-        if not self._long_protection:
-            mtm *= -1.0
-
-        trancheOutput = np.zeros(4)
-        trancheOutput[0] = mtm
-        trancheOutput[1] = risky_pv01 * self._notional * running_coupon
-        trancheOutput[2] = protLegPV * self._notional
-        trancheOutput[3] = protLegPV / risky_pv01
-
-        return trancheOutput
+        """ Value the tranche using the base correlation approach with the
+        base correlation corr1 for [0, K1] and corr2 for [0, K2]. The loss
+        distribution is built with the chosen model. Returns an array of the
+        value, premium leg, protection leg and par spread. """
+
+        output = value_tranches_bc(valuation_date,
+                                   [self],
+                                   issuer_curves,
+                                   upfront,
+                                   running_coupon,
+                                   corr1,
+                                   corr2,
+                                   num_points,
+                                   model)
+
+        return output[0]
 
 ###############################################################################
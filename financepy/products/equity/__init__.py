@@ -13,6 +13,7 @@ from .equity_model_types import *
 from .equity_option import *
 from .equity_rainbow_option import *
 from .equity_vanilla_option import *
+from .equity_option_book import *
 from .equity_variance_swap import *
 from .equity_one_touch_option import *
 from .equity_forward import *
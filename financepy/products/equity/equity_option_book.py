@@ -0,0 +1,362 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ...utils.date import Date, DateArray
+from ...utils.global_vars import gDaysInYear, gSmall
+from ...utils.error import FinError
+from ...utils.global_types import OptionTypes
+from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.math import N, nprime
+from ...market.curves.discount_curve import DiscountCurve
+from ...models.black_scholes import BlackScholes
+from ...models.implied_volatility import bs_implied_volatilities
+
+###############################################################################
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _value_option_book(s, t, k, r, q, v, option_type_values, num_options,
+                       greeks):
+    """ Value a book of European calls and puts with the Black-Scholes model
+    in parallel over the options. All inputs are arrays with one entry per
+    option. The first row of the output holds the values. If greeks is set the
+    following rows hold the delta, gamma, vega, theta, rho and vanna using the
+    same formulae as bs_delta, bs_gamma and the other analytical greeks. Each
+    row is multiplied by the number of options of the position. """
+
+    num_opts = s.size
+
+    if greeks:
+        out = np.zeros((7, num_opts))
+    else:
+        out = np.zeros((1, num_opts))
+
+    for i in prange(num_opts):
+
+        if option_type_values[i] == OptionTypes.EUROPEAN_CALL.value:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        kk = max(k[i], gSmall)
+        tt = max(t[i], gSmall)
+        vv = max(v[i], gSmall)
+
+        sqrtT = np.sqrt(tt)
+        vsqrtT = vv * sqrtT
+        dq = np.exp(-q[i] * tt)
+        dr = np.exp(-r[i] * tt)
+        ss = s[i] * dq
+        kdf = kk * dr
+        d1 = np.log(ss / kdf) / vsqrtT + vsqrtT / 2.0
+        d2 = d1 - vsqrtT
+
+        nd1 = N(phi * d1)
+        nd2 = N(phi * d2)
+        w = num_options[i]
+
+        out[0, i] = w * (phi * ss * nd1 - phi * kdf * nd2)
+
+        if greeks:
+            pdf = nprime(d1)
+            out[1, i] = w * phi * dq * nd1
+            out[2, i] = w * dq * pdf / s[i] / vsqrtT
+            out[3, i] = w * ss * sqrtT * pdf
+            out[4, i] = w * (- ss * pdf * vv / 2.0 / sqrtT
+                             - phi * r[i] * kk * dr * nd2
+                             + phi * q[i] * ss * nd1)
+            out[5, i] = w * phi * kk * tt * dr * nd2
+            out[6, i] = w * dq * sqrtT * pdf * (d2 / vv)
+
+    return out
+
+###############################################################################
+
+
+def _option_values(option_types, num_opts):
+    """ Convert a list of option types or an array of option type values into
+    an array of integer option type values, checking that each one is a
+    European call or put. """
+
+    if isinstance(option_types, OptionTypes):
+        values = np.full(num_opts, option_types.value, dtype=np.int64)
+    elif isinstance(option_types, list):
+        values = np.array([opt.value for opt in option_types], dtype=np.int64)
+    else:
+        values = np.array(option_types, dtype=np.int64)
+
+    if values.shape != (num_opts,):
+        raise FinError("Need one option type per option.")
+
+    valid = (values == OptionTypes.EUROPEAN_CALL.value) | \
+        (values == OptionTypes.EUROPEAN_PUT.value)
+
+    if not np.all(valid):
+        raise FinError("Option types must be European calls or puts.")
+
+    return values
+
+###############################################################################
+
+
+def _per_option(x, num_opts, label):
+    """ Broadcast a number or an array with one entry per option to a float
+    array with one entry per option. """
+
+    x = np.array(x, dtype=np.float64)
+
+    if x.ndim == 0:
+        return np.full(num_opts, float(x))
+    elif x.shape == (num_opts,):
+        return x
+    else:
+        raise FinError("Need one " + label + " per option.")
+
+###############################################################################
+
+
+class EquityOptionBook:
+    """ A book of European equity calls and puts held as columns of expiry
+    dates, strikes, option types, position sizes and underlying indices so
+    that every option can be valued together. The discount and dividend
+    factors are computed in one array call per curve on the distinct expiry
+    dates of the book and the Black-Scholes values and greeks are evaluated
+    in one parallel NUMBA pass over all of the options. """
+
+    def __init__(self,
+                 expiry_dates: (list, DateArray),
+                 strike_prices,
+                 option_types,
+                 num_options=1.0,
+                 underlying_indices=None):
+        """ Create the book from a list or DateArray of expiry dates, an
+        array of strikes and a list of OptionTypes or an array of option type
+        values, with one entry for each option. The number of options of each
+        position can be one number or an array. If the book holds options on
+        several underlyings then underlying_indices gives the position of the
+        underlying of each option in the arrays of stock prices and the list
+        of dividend curves passed to value. """
+
+        check_argument_types(self.__init__, locals())
+
+        expiry_serials = DateArray(expiry_dates)._excel_date.astype(np.int64)
+        num_opts = len(expiry_serials)
+
+        if num_opts == 0:
+            raise FinError("No options have been supplied.")
+
+        strike_prices = _per_option(strike_prices, num_opts, "strike")
+
+        if np.any(strike_prices < 0.0):
+            raise FinError("Strike prices must not be negative.")
+
+        if underlying_indices is not None:
+            underlying_indices = np.array(underlying_indices, dtype=np.int64)
+
+            if underlying_indices.shape != (num_opts,):
+                raise FinError("Need one underlying index per option.")
+
+            if np.any(underlying_indices < 0):
+                raise FinError("Underlying indices must not be negative.")
+
+        # Listed options share a few expiry dates so the curves are only
+        # evaluated on the distinct dates
+        unique_serials, expiry_indices = np.unique(expiry_serials,
+                                                   return_inverse=True)
+
+        self._expiry_serials = expiry_serials
+        self._unique_serials = unique_serials
+        self._expiry_indices = expiry_indices
+        self._strike_prices = strike_prices
+        self._option_type_values = _option_values(option_types, num_opts)
+        self._num_options = _per_option(num_options, num_opts, "size")
+        self._underlying_indices = underlying_indices
+
+    ###########################################################################
+
+    def _inputs(self,
+                valuation_date,
+                stock_prices,
+                discount_curve,
+                dividend_curve):
+        """ Return the arrays of stock prices, times to expiry, rates and
+        dividend yields with one entry per option. """
+
+        num_opts = len(self._expiry_serials)
+        underlying_indices = self._underlying_indices
+
+        if valuation_date._excel_date > self._unique_serials[0]:
+            raise FinError("Valuation date after one or more expiry dates.")
+
+        if isinstance(dividend_curve, DiscountCurve):
+            dividend_curves = [dividend_curve]
+        else:
+            dividend_curves = dividend_curve
+
+            if underlying_indices is None:
+                raise FinError("A list of dividend curves needs the "
+                               "underlying indices of the options.")
+
+            if np.max(underlying_indices) >= len(dividend_curves):
+                raise FinError("Underlying index exceeds the number of "
+                               "dividend curves.")
+
+        for curve in [discount_curve] + list(dividend_curves):
+            if curve._valuation_date != valuation_date:
+                raise FinError("Curve valuation date not same as option "
+                               "valuation date")
+
+        stock_prices = np.array(stock_prices, dtype=np.float64)
+
+        if stock_prices.ndim == 0:
+            s = np.full(num_opts, float(stock_prices))
+        elif underlying_indices is not None:
+            if np.max(underlying_indices) >= len(stock_prices):
+                raise FinError("Underlying index exceeds the number of "
+                               "stock prices.")
+            s = stock_prices[underlying_indices]
+        else:
+            s = _per_option(stock_prices, num_opts, "stock price")
+
+        if np.any(s <= 0.0):
+            raise FinError("Stock price must be greater than zero.")
+
+        # One call per curve on the distinct expiry dates
+        expiry_dates = DateArray(self._unique_serials)
+        texp = (self._unique_serials - valuation_date._excel_date) / \
+            gDaysInYear
+        texp = np.maximum(texp, 1e-10)
+
+        r = -np.log(discount_curve.df(expiry_dates)) / texp
+
+        q = np.zeros((len(dividend_curves), len(texp)))
+        for j, curve in enumerate(dividend_curves):
+            q[j] = -np.log(curve.df(expiry_dates)) / texp
+
+        idx = self._expiry_indices
+
+        if len(dividend_curves) == 1:
+            q = q[0, idx]
+        else:
+            q = q[underlying_indices, idx]
+
+        return s, texp[idx], r[idx], q
+
+    ###########################################################################
+
+    def _volatilities(self,
+                      volatilities):
+        """ Return an array with the volatility of each option. """
+
+        if isinstance(volatilities, BlackScholes):
+            volatilities = volatilities._volatility
+
+        return _per_option(volatilities, len(self._expiry_serials),
+                           "volatility")
+
+    ###########################################################################
+
+    def value(self,
+              valuation_date: Date,
+              stock_prices,
+              discount_curve: DiscountCurve,
+              dividend_curve,
+              volatilities):
+        """ Value every option in the book with the Black-Scholes model. The
+        stock price is one number, an array with one per underlying if the
+        book has underlying indices or else one per option. The dividend
+        curve is one curve or a list with one per underlying. The volatility
+        is a BlackScholes model, one number or an array with one per option.
+        Returns an array of option values times the number of options. """
+
+        check_argument_types(self.value, locals())
+
+        s, t, r, q = self._inputs(valuation_date, stock_prices,
+                                  discount_curve, dividend_curve)
+        v = self._volatilities(volatilities)
+
+        out = _value_option_book(s, t, self._strike_prices, r, q, v,
+                                 self._option_type_values, self._num_options,
+                                 False)
+
+        return out[0]
+
+    ###########################################################################
+
+    def value_and_greeks(self,
+                         valuation_date: Date,
+                         stock_prices,
+                         discount_curve: DiscountCurve,
+                         dividend_curve,
+                         volatilities):
+        """ Value every option in the book and calculate its analytical
+        greeks in the same pass. The inputs are as for value. Returns a
+        dictionary of arrays of the value, delta, gamma, vega, theta, rho and
+        vanna with one entry per option, each times the number of options. """
+
+        check_argument_types(self.value_and_greeks, locals())
+
+        s, t, r, q = self._inputs(valuation_date, stock_prices,
+                                  discount_curve, dividend_curve)
+        v = self._volatilities(volatilities)
+
+        out = _value_option_book(s, t, self._strike_prices, r, q, v,
+                                 self._option_type_values, self._num_options,
+                                 True)
+
+        return {'value': out[0],
+                'delta': out[1],
+                'gamma': out[2],
+                'vega': out[3],
+                'theta': out[4],
+                'rho': out[5],
+                'vanna': out[6]}
+
+    ###########################################################################
+
+    def implied_volatility(self,
+                           valuation_date: Date,
+                           stock_prices,
+                           discount_curve: DiscountCurve,
+                           dividend_curve,
+                           prices,
+                           tolerance: float = 1e-12,
+                           max_iterations: int = 20):
+        """ Solve for the Black-Scholes implied volatility of every option in
+        the book from an array with the price of one option of each position.
+        The other inputs are as for value. Returns an array of volatilities
+        and an array of ImpliedVolStatus values. Options which cannot be
+        solved have a NaN volatility and a status saying why instead of
+        raising an error. """
+
+        check_argument_types(self.implied_volatility, locals())
+
+        s, t, r, q = self._inputs(valuation_date, stock_prices,
+                                  discount_curve, dividend_curve)
+
+        prices = _per_option(prices, len(self._expiry_serials), "price")
+
+        return bs_implied_volatilities(prices, s, self._strike_prices, t, r,
+                                       q, self._option_type_values,
+                                       tolerance, max_iterations)
+
+    ###########################################################################
+
+    def __repr__(self):
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM OPTIONS", len(self._expiry_serials))
+        s += label_to_string("NUM EXPIRY DATES", len(self._unique_serials))
+        s += label_to_string("TOTAL NUMBER", np.sum(self._num_options), "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
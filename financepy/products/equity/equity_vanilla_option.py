@@ -115,7 +115,7 @@ class EquityVanillaOption():
             texp = []
             for expDate in self._expiry_date:
                 t = (expDate - valuation_date) / gDaysInYear
-            texp.append(t)
+                texp.append(t)
             texp = np.array(texp)
         else:
             texp = valuation_date
@@ -153,7 +153,7 @@ class EquityVanillaOption():
             raise FinError("Valuation date is not a Date")
 
         if isinstance(self._expiry_date, list):
-            if any(valuation_date > self._expiry_date):
+            if any(valuation_date > dt for dt in self._expiry_date):
                 raise FinError(f"Valuation date after one or more expiry dates.")
         elif valuation_date > self._expiry_date:
             raise FinError(f"Valuation date after expiry date.")
@@ -172,7 +172,7 @@ class EquityVanillaOption():
             texp = []
             for expDate in self._expiry_date:
                 t = (expDate - valuation_date) / gDaysInYear
-            texp.append(t)
+                texp.append(t)
             texp = np.array(texp)
         else:
             texp = valuation_date
@@ -0,0 +1,1114 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import copy
+
+import numpy as np
+from numba import njit
+from scipy.linalg import solve_triangular
+
+from ...utils.error import FinError
+from ...utils.date import DateArray
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.helpers import times_from_dates
+from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import SwapTypes
+from ...market.curves.interpolator import InterpTypes, _uinterpolate_partials
+from ...market.curves.interpolator import Interpolator
+from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.ibor_deposit import IborDeposit
+from ...products.rates.ibor_fra import IborFRA
+from ...products.rates.ibor_swap import IborSwap
+from ...products.rates.ois import OIS
+
+swaptol = 1e-10
+
+# These are the interpolation schemes with analytic partial derivatives
+gAnalyticInterpTypes = (InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES)
+
+# An instrument either fixes its pillar discount factor directly from the
+# discount factor at an earlier date or has to be solved for
+FORWARD_DF = 0
+SOLVED_DF = 1
+
+# The flows of an instrument can be split into those that only depend on the
+# earlier pillars and those which also depend on the pillar being solved
+ALL_FLOWS = 0
+EARLIER_FLOWS = 1
+LATER_FLOWS = 2
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _flows_value(i, t_grid, df_grid, method, lin_offsets, lin_times,
+                 lin_amounts, rat_offsets, rat_pay_times, rat_start_times,
+                 rat_end_times, rat_gs, t_prev, flows, grad):
+    """ Return the value of the flows of instrument i on the curve given by
+    the grid of times and discount factors. This is the sum of the linear
+    flows a * D(t) and of the ratio flows g * D(ts) * D(tp) / D(te). The
+    partial derivatives of the value with respect to the grid values are
+    added to grad. The flows argument selects all flows, only the flows on
+    or before t_prev or only the flows after it. Flows with a zero amount
+    are skipped. """
+
+    indices = np.zeros(3, dtype=np.int64)
+    partials = np.zeros(3)
+
+    value = 0.0
+
+    for k in range(lin_offsets[i], lin_offsets[i + 1]):
+
+        if flows == EARLIER_FLOWS and lin_times[k] > t_prev:
+            continue
+        elif flows == LATER_FLOWS and lin_times[k] <= t_prev:
+            continue
+
+        a = lin_amounts[k]
+        if a == 0.0:
+            continue
+
+        d = _uinterpolate_partials(lin_times[k], t_grid, df_grid, method,
+                                   indices, partials)
+        value += a * d
+        for j in range(0, 3):
+            grad[indices[j]] += a * partials[j]
+
+    start_indices = np.zeros(3, dtype=np.int64)
+    start_partials = np.zeros(3)
+    pay_indices = np.zeros(3, dtype=np.int64)
+    pay_partials = np.zeros(3)
+
+    for k in range(rat_offsets[i], rat_offsets[i + 1]):
+
+        t_max = max(rat_start_times[k], rat_pay_times[k], rat_end_times[k])
+
+        if flows == EARLIER_FLOWS and t_max > t_prev:
+            continue
+        elif flows == LATER_FLOWS and t_max <= t_prev:
+            continue
+
+        g = rat_gs[k]
+        if g == 0.0:
+            continue
+
+        ds = _uinterpolate_partials(rat_start_times[k], t_grid, df_grid,
+                                    method, start_indices, start_partials)
+        dp = _uinterpolate_partials(rat_pay_times[k], t_grid, df_grid,
+                                    method, pay_indices, pay_partials)
+        de = _uinterpolate_partials(rat_end_times[k], t_grid, df_grid,
+                                    method, indices, partials)
+
+        value += g * ds * dp / de
+
+        for j in range(0, 3):
+            grad[start_indices[j]] += g * dp / de * start_partials[j]
+            grad[pay_indices[j]] += g * ds / de * pay_partials[j]
+            grad[indices[j]] -= g * ds * dp / (de * de) * partials[j]
+
+    return value
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _instrument_residual(i, times, dfs, method, kinds, gs, start_times,
+                         lin_offsets, lin_times, lin_amounts, rat_offsets,
+                         rat_pay_times, rat_start_times, rat_end_times, rat_gs,
+                         flows, grad):
+    """ Return the residual of instrument i which is zero when the curve
+    reprices it. The curve is made of the grid points up to and including
+    the pillar of the instrument which is at i + 1. The partial derivatives
+    of the residual with respect to these grid values are written into grad.
+
+    A forward discount factor instrument has a residual g * df - D(ts) where
+    df is the pillar discount factor and D(ts) is taken from the earlier
+    pillars. A solved instrument has a residual which is the value of its
+    flows. The flows argument selects all flows, only the flows on or before
+    the previous pillar or only the flows after it. """
+
+    n = i + 2
+    t_prev = times[n - 2]
+    t_grid = times[:n]
+    df_grid = dfs[:n]
+
+    for j in range(0, n):
+        grad[j] = 0.0
+
+    if kinds[i] == FORWARD_DF:
+
+        indices = np.zeros(3, dtype=np.int64)
+        partials = np.zeros(3)
+
+        d = _uinterpolate_partials(start_times[i], t_grid[:n - 1],
+                                   df_grid[:n - 1], method, indices, partials)
+        for j in range(0, 3):
+            grad[indices[j]] -= partials[j]
+
+        grad[n - 1] += gs[i]
+        return gs[i] * dfs[n - 1] - d
+
+    return _flows_value(i, t_grid, df_grid, method, lin_offsets, lin_times,
+                        lin_amounts, rat_offsets, rat_pay_times,
+                        rat_start_times, rat_end_times, rat_gs, t_prev, flows,
+                        grad)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bootstrap_pillars(times, method, kinds, gs, g_quote, start_times,
+                       lin_offsets, lin_times, lin_amounts, lin_quote,
+                       rat_offsets, rat_pay_times, rat_start_times,
+                       rat_end_times, rat_gs, rat_quote, first_instrument,
+                       dfs, jac, quote_derivs, tol, max_iter):
+    """ Solve for the discount factor at each pillar in turn using a Newton
+    search with the analytic derivative of the instrument residual. The
+    flows on or before the previous pillar do not depend on the pillar being
+    solved and so they are only valued once. The initial guess extrapolates
+    the last forward rate. The discount factor at time zero is one.
+
+    The solve starts at the first instrument given. The discount factors of
+    the earlier pillars, the Jacobian of the instrument residuals with
+    respect to the pillar discount factors and the derivative of each
+    residual with respect to the quote of its instrument are filled in from
+    this instrument onwards. The residuals are linear in the quotes so the
+    quote derivative is the value of the flows using the quote coefficients
+    as the amounts. Returns the index of the first instrument that failed to
+    converge or minus one if all of them did. """
+
+    num_instruments = len(kinds)
+    num_points = num_instruments + 1
+
+    grad = np.zeros(num_points)
+    earlier_grad = np.zeros(num_points)
+    quote_grad = np.zeros(num_points)
+
+    indices = np.zeros(3, dtype=np.int64)
+    partials = np.zeros(3)
+
+    for i in range(first_instrument, num_instruments):
+
+        n = i + 1
+
+        if kinds[i] == FORWARD_DF:
+
+            d = _uinterpolate_partials(start_times[i], times[:n], dfs[:n],
+                                       method, indices, partials)
+            dfs[n] = d / gs[i]
+
+            _instrument_residual(i, times, dfs, method, kinds, gs,
+                                 start_times, lin_offsets, lin_times,
+                                 lin_amounts, rat_offsets, rat_pay_times,
+                                 rat_start_times, rat_end_times, rat_gs,
+                                 ALL_FLOWS, grad)
+
+            quote_derivs[i] = g_quote[i] * dfs[n]
+
+        else:
+
+            x = dfs[n - 1]
+
+            if n > 1:
+                fwd = np.log(dfs[n - 2] / dfs[n - 1]) / \
+                    (times[n - 1] - times[n - 2])
+                x = dfs[n - 1] * np.exp(-fwd * (times[n] - times[n - 1]))
+
+            earlier = _instrument_residual(i, times, dfs, method, kinds, gs,
+                                           start_times, lin_offsets,
+                                           lin_times, lin_amounts, rat_offsets,
+                                           rat_pay_times, rat_start_times,
+                                           rat_end_times, rat_gs,
+                                           EARLIER_FLOWS, earlier_grad)
+
+            converged = False
+
+            for _ in range(0, max_iter):
+
+                dfs[n] = x
+                residual = earlier + \
+                    _instrument_residual(i, times, dfs, method, kinds, gs,
+                                         start_times, lin_offsets, lin_times,
+                                         lin_amounts, rat_offsets,
+                                         rat_pay_times, rat_start_times,
+                                         rat_end_times, rat_gs, LATER_FLOWS,
+                                         grad)
+
+                step = residual / grad[n]
+                x = x - step
+
+                if abs(step) < tol:
+                    converged = True
+                    break
+
+            if not converged:
+                return i
+
+            dfs[n] = x
+
+            _instrument_residual(i, times, dfs, method, kinds, gs,
+                                 start_times, lin_offsets, lin_times,
+                                 lin_amounts, rat_offsets, rat_pay_times,
+                                 rat_start_times, rat_end_times, rat_gs,
+                                 LATER_FLOWS, grad)
+
+            for j in range(0, n + 1):
+                grad[j] += earlier_grad[j]
+
+            quote_derivs[i] = \
+                _instrument_residual(i, times, dfs, method, kinds, gs,
+                                     start_times, lin_offsets, lin_times,
+                                     lin_quote, rat_offsets, rat_pay_times,
+                                     rat_start_times, rat_end_times,
+                                     rat_quote, ALL_FLOWS, quote_grad)
+
+        for j in range(0, n + 1):
+            jac[i, j] = grad[j]
+
+    return -1
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _flows_values_and_gradients(times, dfs, method, lin_offsets, lin_times,
+                                lin_amounts, rat_offsets, rat_pay_times,
+                                rat_start_times, rat_end_times, rat_gs):
+    """ Return the value of the flows of each instrument on the full curve
+    and the gradient of each value with respect to the grid discount
+    factors with one row per instrument. """
+
+    num_instruments = len(lin_offsets) - 1
+    values = np.zeros(num_instruments)
+    grads = np.zeros((num_instruments, len(times)))
+
+    for i in range(0, num_instruments):
+        values[i] = _flows_value(i, times, dfs, method, lin_offsets,
+                                 lin_times, lin_amounts, rat_offsets,
+                                 rat_pay_times, rat_start_times, rat_end_times,
+                                 rat_gs, 0.0, ALL_FLOWS, grads[i])
+
+    return values, grads
+
+###############################################################################
+
+
+def _join(arrays, dtype):
+    """ Join a list of arrays into one array of the given type. """
+
+    if len(arrays) == 0:
+        return np.zeros(0, dtype=dtype)
+
+    return np.concatenate(arrays).astype(dtype)
+
+###############################################################################
+
+
+def _instrument_quotes(instruments):
+    """ Return the deposit rates, FRA rates and swap coupons of a list of
+    deposits, FRAs and swaps. """
+
+    quotes = np.zeros(len(instruments))
+
+    for i, instrument in enumerate(instruments):
+        if isinstance(instrument, IborDeposit):
+            quotes[i] = instrument._deposit_rate
+        elif isinstance(instrument, IborFRA):
+            quotes[i] = instrument._fraRate
+        else:
+            quotes[i] = instrument._fixed_leg._coupon
+
+    return quotes
+
+###############################################################################
+
+
+def _bump_instrument_quotes(deposits, fras, swaps, bumps):
+    """ Add the bumps to the deposit rates, FRA rates and swap coupons of the
+    instruments in place. The bumps are one number or an array with one
+    number per instrument. """
+
+    instruments = deposits + fras + swaps
+    bumps = np.broadcast_to(np.asarray(bumps, dtype=float), len(instruments))
+    quotes = _instrument_quotes(instruments) + bumps
+
+    for instrument, quote in zip(instruments, quotes):
+        _set_instrument_quote(instrument, quote)
+
+###############################################################################
+
+
+def _set_instrument_quote(instrument, quote):
+    """ Set the deposit rate, FRA rate or swap coupon of an instrument. The
+    fixed leg rates of a swap are set to the coupon and its payments are
+    rescaled as they are proportional to the coupon. """
+
+    if isinstance(instrument, IborDeposit):
+        instrument._deposit_rate = quote
+    elif isinstance(instrument, IborFRA):
+        instrument._fraRate = quote
+    else:
+        fixed_leg = instrument._fixed_leg
+        cpn = fixed_leg._coupon
+        fixed_leg._coupon = quote
+
+        if cpn != 0.0:
+            fixed_leg._rates = [quote] * len(fixed_leg._rates)
+            fixed_leg._payments = [pmt * quote / cpn
+                                   for pmt in fixed_leg._payments]
+        else:
+            fixed_leg.generate_payments()
+
+###############################################################################
+
+
+def _update_instrument_quotes(instruments, changed_quotes):
+    """ Set the quotes of the instruments whose positions in the list are the
+    keys of changed_quotes to its values. Returns the position of the first
+    instrument whose quote was changed. """
+
+    if len(changed_quotes) == 0:
+        raise FinError("No quotes have been changed.")
+
+    for i in changed_quotes:
+        if i < 0 or i >= len(instruments):
+            raise FinError("Instrument index " + str(i) + " out of range.")
+
+    for i in sorted(changed_quotes):
+        _set_instrument_quote(instruments[i], changed_quotes[i])
+
+    return min(changed_quotes)
+
+###############################################################################
+
+
+def _adjoint_quote_sensitivities(jacobian, quote_derivs, grads, bump):
+    """ Convert the gradients of trade values with respect to the pillar
+    discount factors of a curve, excluding the one at time zero, into the
+    first order changes in the trade values for a bump in each quote used
+    to build the curve. The gradients are one row per trade or a vector. """
+
+    adjoints = solve_triangular(jacobian, np.transpose(grads), trans='T',
+                                lower=True)
+    return -np.transpose(adjoints) * quote_derivs * bump
+
+###############################################################################
+
+
+class InstrumentFlows():
+    """ Holds the flows of a list of deposits, FRAs and swaps as arrays
+    of times and amounts per unit notional so that they can all be valued
+    in one compiled call. A linear flow pays an amount a at time t and has a
+    value a * D(t). A ratio flow has a value g * D(ts) * D(tp) / D(te) and is
+    used for the floating payments and deposits. Each amount is split into
+    a part which does not depend on the quote of the instrument and a part
+    which is proportional to it. """
+
+    def __init__(self,
+                 valuation_date,
+                 instruments: list,
+                 index_day_count_type):
+        """ Create the flows of the instruments as seen from the valuation
+        date. Only flows paid after the valuation date are included. The
+        index day count type is that of the curve which is used to calculate
+        the swap forwards. """
+
+        self._valuation_date = valuation_date
+        self._instruments = instruments
+        self._index_day_count_type = index_day_count_type
+
+        self._build_flows()
+
+###############################################################################
+
+    def _build_flows(self):
+        """ Convert the flows of each instrument into arrays of times and of
+        the amounts per unit notional. The flows are collected as arrays for
+        each instrument and joined at the end. The index year fractions of
+        all of the floating flows are calculated in one call. """
+
+        valuation_date = self._valuation_date
+        value_serial = valuation_date._excel_date
+        num_instruments = len(self._instruments)
+
+        notionals = np.zeros(num_instruments)
+
+        lin_counts = np.zeros(num_instruments, dtype=np.int64)
+        lin_serials = []
+        lin_base = []
+        lin_quote = []
+        lin_floating = []
+
+        rat_counts = np.zeros(num_instruments, dtype=np.int64)
+        rat_pay_serials = []
+        rat_start_serials = []
+        rat_end_serials = []
+        rat_base = []
+        rat_quote = []
+        rat_floating = []
+
+        # The floating flows have a forward which depends on the index curve
+        float_coeffs = []
+        float_spreads = []
+
+        for i, instrument in enumerate(self._instruments):
+
+            if isinstance(instrument, IborDeposit):
+
+                depo = instrument
+                dc = DayCount(depo._day_count_type)
+                acc_factor = dc.year_frac(depo._start_date,
+                                          depo._maturity_date)[0]
+
+                # The repayment is discounted back to the start date
+                notionals[i] = depo._notional
+                rat_pay_serials.append(np.array([value_serial]))
+                rat_start_serials.append(
+                    np.array([depo._maturity_date._excel_date]))
+                rat_end_serials.append(
+                    np.array([depo._start_date._excel_date]))
+                rat_base.append(np.ones(1))
+                rat_quote.append(np.array([acc_factor]))
+                rat_floating.append(np.zeros(1, dtype=bool))
+                rat_counts[i] = 1
+
+            elif isinstance(instrument, IborFRA):
+
+                fra = instrument
+                dc = DayCount(fra._day_count_type)
+                acc_factor = dc.year_frac(fra._start_date,
+                                          fra._maturity_date)[0]
+                sign = -1.0 if fra._payFixedRate is True else 1.0
+
+                # The forward is paid at maturity as a ratio flow
+                notionals[i] = fra._notional
+                lin_serials.append(np.array([fra._maturity_date._excel_date]))
+                lin_base.append(np.array([-sign]))
+                lin_quote.append(np.array([-sign * acc_factor]))
+                lin_floating.append(np.zeros(1, dtype=bool))
+                lin_counts[i] = 1
+
+                rat_pay_serials.append(
+                    np.array([fra._maturity_date._excel_date]))
+                rat_start_serials.append(
+                    np.array([fra._start_date._excel_date]))
+                rat_end_serials.append(
+                    np.array([fra._maturity_date._excel_date]))
+                rat_base.append(np.array([sign]))
+                rat_quote.append(np.zeros(1))
+                rat_floating.append(np.zeros(1, dtype=bool))
+                rat_counts[i] = 1
+
+            elif isinstance(instrument, (IborSwap, OIS)):
+
+                swap = instrument
+                fixed_leg = swap._fixed_leg
+                float_leg = swap._float_leg
+
+                notional = fixed_leg._notional
+                notionals[i] = notional
+
+                # Fixed leg flows are proportional to the fixed coupon
+                sign = -1.0 if fixed_leg._leg_type == SwapTypes.PAY else 1.0
+                schedule = fixed_leg._accrual_schedule
+                future = schedule._payment_serials > value_serial
+                num_fixed = np.count_nonzero(future)
+
+                base = np.zeros(num_fixed)
+                if num_fixed > 0 and future[-1]:
+                    base[-1] = sign * fixed_leg._principal
+
+                lin_serials.append(schedule._payment_serials[future])
+                lin_base.append(base)
+                lin_quote.append(sign * schedule._year_frac_array[future])
+                lin_floating.append(np.zeros(num_fixed, dtype=bool))
+
+                # Float leg flows are each split into a forward part and the
+                # rest
+                sign = -1.0 if float_leg._leg_type == SwapTypes.PAY else 1.0
+                schedule = float_leg._accrual_schedule
+                future = schedule._payment_serials > value_serial
+                pay_serials = schedule._payment_serials[future]
+                num_float = len(pay_serials)
+
+                if len(float_leg._notional_array):
+                    float_notionals = np.array(float_leg._notional_array,
+                                               dtype=float)
+                else:
+                    float_notionals = np.full(len(future), float_leg._notional)
+
+                notional_ratios = float_notionals[future] / notional
+
+                base = np.zeros(num_float)
+                if num_float > 0 and future[-1]:
+                    base[-1] = sign * float_leg._principal \
+                        * notional_ratios[-1]
+
+                lin_serials.append(pay_serials)
+                lin_base.append(base)
+                lin_quote.append(np.zeros(num_float))
+                lin_floating.append(np.ones(num_float, dtype=bool))
+
+                rat_pay_serials.append(pay_serials)
+                rat_start_serials.append(
+                    schedule._start_accrued_serials[future])
+                rat_end_serials.append(schedule._end_accrued_serials[future])
+                rat_base.append(np.zeros(num_float))
+                rat_quote.append(np.zeros(num_float))
+                rat_floating.append(np.ones(num_float, dtype=bool))
+
+                float_coeffs.append(sign * notional_ratios
+                                    * schedule._year_frac_array[future])
+                float_spreads.append(np.full(num_float, float_leg._spread))
+
+                lin_counts[i] = num_fixed + num_float
+                rat_counts[i] = num_float
+
+            else:
+                raise FinError("Instrument must be an IborDeposit, IborFRA, "
+                               "IborSwap or OIS.")
+
+        lin_serials = _join(lin_serials, np.int64)
+        lin_base = _join(lin_base, float)
+        lin_quote = _join(lin_quote, float)
+        lin_floating = _join(lin_floating, bool)
+
+        rat_pay_serials = _join(rat_pay_serials, np.int64)
+        rat_start_serials = _join(rat_start_serials, np.int64)
+        rat_end_serials = _join(rat_end_serials, np.int64)
+        rat_base = _join(rat_base, float)
+        rat_quote = _join(rat_quote, float)
+        rat_floating = _join(rat_floating, bool)
+
+        float_coeffs = _join(float_coeffs, float)
+        float_spreads = _join(float_spreads, float)
+
+        # The floating flows pay (spread + (D(ts) / D(te) - 1) / alpha) which
+        # is split into a linear flow and a ratio flow
+        if len(float_coeffs) > 0:
+            index_day_counter = DayCount(self._index_day_count_type)
+            index_alphas = index_day_counter.year_frac(
+                DateArray(rat_start_serials[rat_floating]),
+                DateArray(rat_end_serials[rat_floating]))[0]
+
+            lin_base[lin_floating] += float_coeffs * \
+                (float_spreads - 1.0 / index_alphas)
+            rat_base[rat_floating] = float_coeffs / index_alphas
+
+        lin_offsets = np.zeros(num_instruments + 1, dtype=np.int64)
+        lin_offsets[1:] = np.cumsum(lin_counts)
+        rat_offsets = np.zeros(num_instruments + 1, dtype=np.int64)
+        rat_offsets[1:] = np.cumsum(rat_counts)
+
+        # All of the flow dates are converted to times in a single call using
+        # the same day count as the discount factor lookup of the curve
+        num_lin = len(lin_serials)
+        num_rat = len(rat_pay_serials)
+        serials = np.concatenate((lin_serials, rat_pay_serials,
+                                  rat_start_serials, rat_end_serials))
+
+        if len(serials) > 0:
+            flow_times = times_from_dates(DateArray(serials), valuation_date,
+                                          DayCountTypes.ACT_ACT_ISDA)
+        else:
+            flow_times = np.zeros(0)
+
+        flow_times = np.atleast_1d(np.asarray(flow_times, dtype=float))
+
+        self._notionals = notionals
+
+        self._lin_offsets = lin_offsets
+        self._lin_instruments = np.repeat(np.arange(num_instruments),
+                                          lin_counts)
+        self._lin_times = flow_times[0:num_lin].copy()
+        self._lin_base = lin_base
+        self._lin_quote = lin_quote
+
+        self._rat_offsets = rat_offsets
+        self._rat_instruments = np.repeat(np.arange(num_instruments),
+                                          rat_counts)
+        self._rat_pay_times = flow_times[num_lin:num_lin + num_rat].copy()
+        self._rat_start_times = flow_times[num_lin + num_rat:
+                                           num_lin + 2 * num_rat].copy()
+        self._rat_end_times = flow_times[num_lin + 2 * num_rat:].copy()
+        self._rat_base = rat_base
+        self._rat_quote = rat_quote
+
+###############################################################################
+
+    def quotes(self):
+        """ Return the current quotes of the instruments which are the
+        deposit rates, the FRA rates and the swap fixed coupons. """
+
+        return _instrument_quotes(self._instruments)
+
+###############################################################################
+
+    def amounts(self, quotes):
+        """ Return the amounts of the linear flows and of the ratio flows per
+        unit notional for the given instrument quotes. """
+
+        lin_amounts = self._lin_base + \
+            self._lin_quote * quotes[self._lin_instruments]
+        rat_gs = self._rat_base + \
+            self._rat_quote * quotes[self._rat_instruments]
+        return lin_amounts, rat_gs
+
+###############################################################################
+
+    def values_and_gradients(self,
+                             times: np.ndarray,
+                             dfs: np.ndarray,
+                             interp_type: InterpTypes):
+        """ Return the value of each instrument and the gradient of each
+        value with respect to the discount factors of a curve given by its
+        grid of times and discount factors. The values and gradients are in
+        units of the instrument notionals. """
+
+        if interp_type not in gAnalyticInterpTypes:
+            raise FinError("Interpolation type has no analytic partials.")
+
+        if np.any(self._lin_times < 0.0) or \
+                np.any(self._rat_start_times < 0.0) or \
+                np.any(self._rat_end_times < 0.0):
+            raise FinError("Instrument has flows which depend on rates "
+                           "before the curve valuation date.")
+
+        lin_amounts, rat_gs = self.amounts(self.quotes())
+
+        values, grads = _flows_values_and_gradients(times, dfs,
+                                                    interp_type.value,
+                                                    self._lin_offsets,
+                                                    self._lin_times,
+                                                    lin_amounts,
+                                                    self._rat_offsets,
+                                                    self._rat_pay_times,
+                                                    self._rat_start_times,
+                                                    self._rat_end_times,
+                                                    rat_gs)
+
+        values *= self._notionals
+        grads *= self._notionals[:, np.newaxis]
+        return values, grads
+
+###############################################################################
+
+
+class CurveBootstrap():
+    """ Bootstraps a curve from a set of deposits, FRAs and swaps. The curve
+    is used both for discounting and as the index curve unless a separate
+    discount curve is given in which case it is only the index curve. There
+    is one pillar for each instrument. The flow dates of the instruments are
+    turned into times once when the bootstrap is created. Each rebuild then
+    reads the current instrument quotes and solves all of the pillars in one
+    compiled call using the analytic derivative of each instrument with
+    respect to its pillar discount factor. The Jacobian of the instrument
+    residuals with respect to the pillar discount factors is returned as a
+    by-product and is used to calculate the quote sensitivities of trades. """
+
+    def __init__(self,
+                 valuation_date,
+                 deposits: list,
+                 fras: list,
+                 swaps: list,
+                 index_day_count_type,
+                 discount_curve=None):
+        """ Create the bootstrap from the instruments in the order in which
+        their pillars are added to the curve. The index day count type is
+        that of the curve which is used to calculate the swap forwards. The
+        discount curve, if given, is read each time the curve is solved. """
+
+        self._valuation_date = valuation_date
+        self._deposits = deposits
+        self._fras = fras
+        self._swaps = swaps
+        self._index_day_count_type = index_day_count_type
+        self._discount_curve = discount_curve
+
+        self._build_pillars()
+
+###############################################################################
+
+    def _build_pillars(self):
+        """ Set up the pillar time of each instrument and whether it fixes
+        its pillar discount factor directly or has to be solved for. The
+        flows of the solved instruments are held as InstrumentFlows. """
+
+        valuation_date = self._valuation_date
+        instruments = self._deposits + self._fras + self._swaps
+        num_instruments = len(instruments)
+
+        pillar_times = np.zeros(num_instruments + 1)
+        kinds = np.zeros(num_instruments, dtype=np.int64)
+        g_base = np.zeros(num_instruments)
+        g_quote = np.zeros(num_instruments)
+        start_serials = [valuation_date._excel_date] * num_instruments
+
+        i = 0
+        tmat = 0.0
+
+        for depo in self._deposits:
+            dc = DayCount(depo._day_count_type)
+            acc_factor = dc.year_frac(depo._start_date,
+                                      depo._maturity_date)[0]
+            tmat = (depo._maturity_date - valuation_date) / gDaysInYear
+            pillar_times[i + 1] = tmat
+            kinds[i] = FORWARD_DF
+            g_base[i] = 1.0
+            g_quote[i] = acc_factor
+            start_serials[i] = depo._start_date._excel_date
+            i += 1
+
+        oldtmat = tmat
+
+        for fra in self._fras:
+            dc = DayCount(fra._day_count_type)
+            acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+            tset = (fra._start_date - valuation_date) / gDaysInYear
+            tmat = (fra._maturity_date - valuation_date) / gDaysInYear
+            pillar_times[i + 1] = tmat
+
+            # A FRA which starts inside the deposits fixes its pillar directly
+            if tset < oldtmat and tmat > oldtmat:
+                kinds[i] = FORWARD_DF
+                g_base[i] = 1.0
+                g_quote[i] = acc_factor
+                start_serials[i] = fra._start_date._excel_date
+            else:
+                kinds[i] = SOLVED_DF
+
+            i += 1
+
+        for swap in self._swaps:
+            maturity_date = swap._fixed_leg._payment_dates[-1]
+            pillar_times[i + 1] = (maturity_date - valuation_date) / gDaysInYear
+            kinds[i] = SOLVED_DF
+            i += 1
+
+        if num_instruments > 0:
+            start_times = times_from_dates(DateArray(np.array(start_serials)),
+                                           valuation_date,
+                                           DayCountTypes.ACT_ACT_ISDA)
+        else:
+            start_times = np.zeros(0)
+
+        self._pillar_times = pillar_times
+        self._kinds = kinds
+        self._g_base = g_base
+        self._g_quote = g_quote
+        self._start_times = np.atleast_1d(np.asarray(start_times,
+                                                     dtype=float))
+
+        self._flows = InstrumentFlows(valuation_date,
+                                      instruments,
+                                      self._index_day_count_type)
+
+###############################################################################
+
+    def quotes(self):
+        """ Return the current market quotes of the instruments which are the
+        deposit rates, the FRA rates and the swap fixed coupons. """
+
+        return self._flows.quotes()
+
+###############################################################################
+
+    def solve(self,
+              interp_type: InterpTypes,
+              quotes=None,
+              first_instrument: int = 0,
+              dfs=None,
+              jacobian=None,
+              quote_derivs=None):
+        """ Solve for the pillar discount factors using the current quotes of
+        the instruments or the quotes given. Returns the pillar times, the
+        discount factors, the Jacobian of the instrument residuals with
+        respect to the pillar discount factors excluding the fixed discount
+        factor at time zero and the derivative of each residual with respect
+        to the quote of its instrument. If the results of an earlier solve
+        are given then the pillars before that of the first instrument are
+        taken from them and only the later pillars are solved. """
+
+        if interp_type not in gAnalyticInterpTypes:
+            raise FinError("Interpolation type has no analytic bootstrap.")
+
+        if quotes is None:
+            quotes = self.quotes()
+
+        num_instruments = len(self._kinds)
+
+        new_dfs = np.zeros(num_instruments + 1)
+        new_dfs[0] = 1.0
+        new_jac = np.zeros((num_instruments, num_instruments + 1))
+        new_quote_derivs = np.zeros(num_instruments)
+
+        if dfs is None:
+            first_instrument = 0
+        else:
+            n = first_instrument
+            new_dfs[0:n + 1] = dfs[0:n + 1]
+            new_jac[0:n, 1:] = jacobian[0:n]
+            new_quote_derivs[0:n] = quote_derivs[0:n]
+
+        flows = self._flows
+        gs = self._g_base + self._g_quote * quotes
+        lin_amounts, rat_gs = flows.amounts(quotes)
+
+        lin_times = flows._lin_times
+        lin_quote = flows._lin_quote
+        rat_pay_times = flows._rat_pay_times
+        rat_quote = flows._rat_quote
+
+        # With a separate discount curve the payments are discounted on it
+        # and so they become known amounts paid at time zero
+        if self._discount_curve is not None:
+            lin_dfs = self._discount_factors(lin_times)
+            rat_dfs = self._discount_factors(rat_pay_times)
+            lin_amounts = lin_amounts * lin_dfs
+            lin_quote = lin_quote * lin_dfs
+            rat_gs = rat_gs * rat_dfs
+            rat_quote = rat_quote * rat_dfs
+            lin_times = np.zeros(len(lin_times))
+            rat_pay_times = np.zeros(len(rat_pay_times))
+
+        failed = _bootstrap_pillars(self._pillar_times,
+                                    interp_type.value,
+                                    self._kinds,
+                                    gs,
+                                    self._g_quote,
+                                    self._start_times,
+                                    flows._lin_offsets,
+                                    lin_times,
+                                    lin_amounts,
+                                    lin_quote,
+                                    flows._rat_offsets,
+                                    rat_pay_times,
+                                    flows._rat_start_times,
+                                    flows._rat_end_times,
+                                    rat_gs,
+                                    rat_quote,
+                                    first_instrument,
+                                    new_dfs,
+                                    new_jac,
+                                    new_quote_derivs,
+                                    swaptol,
+                                    50)
+
+        if failed >= 0:
+            raise FinError("Bootstrap failed to converge for pillar "
+                           + str(failed + 1))
+
+        return self._pillar_times.copy(), new_dfs, new_jac[:, 1:], \
+            new_quote_derivs
+
+###############################################################################
+
+    def _discount_factors(self, times: np.ndarray):
+        """ Return the discount factors of the discount curve at the times. """
+
+        if len(times) == 0:
+            return np.zeros(0)
+
+        return np.asarray(self._discount_curve._df(times), dtype=float)
+
+###############################################################################
+
+    def quote_sensitivities(self,
+                            times: np.ndarray,
+                            dfs: np.ndarray,
+                            jacobian: np.ndarray,
+                            quote_derivs: np.ndarray,
+                            interp_type: InterpTypes,
+                            trades: list,
+                            bump: float,
+                            aggregate: bool):
+        """ Return the change in the value of each trade for a bump in each
+        of the instrument quotes to first order. This is only available when
+        the curve is also the discount curve. The pillar discount factors
+        D solve R(D, q) = 0 so that dD/dq = -J^-1 dR/dq. Rather than solving
+        for dD/dq we solve the transposed system J^T x = dV/dD for all of the
+        trades at once and then dV/dq = -x dR/dq where dR/dq is diagonal. If
+        aggregate is True the trade gradients are summed first so that only
+        one adjoint solve is needed and a vector is returned. """
+
+        if self._discount_curve is not None:
+            raise FinError("Quote sensitivities need a single curve.")
+
+        trade_flows = InstrumentFlows(self._valuation_date,
+                                      trades,
+                                      self._index_day_count_type)
+
+        _, grads = trade_flows.values_and_gradients(times, dfs, interp_type)
+
+        # The discount factor at time zero is fixed
+        grads = grads[:, 1:]
+
+        if aggregate is True:
+            grads = np.sum(grads, axis=0)
+
+        return _adjoint_quote_sensitivities(jacobian, quote_derivs, grads,
+                                            bump)
+
+###############################################################################
+
+
+class BootstrappedCurve(DiscountCurve):
+    """ Base class of the discount curves which are bootstrapped from a list
+    of deposits, FRAs and swaps held in _usedDeposits, _usedFRAs and
+    _usedSwaps. The interpolation schemes with analytic derivatives are
+    built with a CurveBootstrap which also gives the Jacobian used for quote
+    updates and risk. A subclass provides _build_curve_using_1d_solver for
+    the other interpolation schemes and _check_refits. """
+
+###############################################################################
+
+    def _build_curve(self):
+        """ Build curve based on interpolation. The interpolation schemes
+        with analytic derivatives use the Jacobian bootstrap and the others
+        use a one dimensional root search. """
+
+        if self._interp_type in gAnalyticInterpTypes:
+            self._build_curve_using_jacobian()
+        else:
+            self._build_curve_using_1d_solver()
+
+###############################################################################
+
+    def _build_curve_using_jacobian(self, first_instrument: int = 0):
+        """ Construct the discount curve using a bootstrap which solves each
+        pillar discount factor with a Newton search that uses the analytic
+        derivative of the instrument value. The instrument flows are set up
+        the first time the curve is built and are reused by later rebuilds.
+        The Jacobian of the instrument values with respect to the pillar
+        discount factors is kept for risk calculations. The pillars before
+        that of the first instrument given are kept from the last build. """
+
+        if self._bootstrap is None:
+            self._bootstrap = CurveBootstrap(self._valuation_date,
+                                             self._usedDeposits,
+                                             self._usedFRAs,
+                                             self._usedSwaps,
+                                             self._day_count_type)
+
+        if self._jacobian is None or first_instrument == 0:
+            solution = self._bootstrap.solve(self._interp_type)
+        else:
+            solution = self._bootstrap.solve(self._interp_type, None,
+                                             first_instrument, self._dfs,
+                                             self._jacobian,
+                                             self._quote_derivs)
+
+        times, dfs, jacobian, quote_derivs = solution
+
+        self._times = times
+        self._dfs = dfs
+        self._jacobian = jacobian
+        self._quote_derivs = quote_derivs
+
+        self._interpolator = Interpolator(self._interp_type)
+        self._interpolator.fit(self._times, self._dfs)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def jacobian(self):
+        """ Return the Jacobian of the calibration instrument values per unit
+        notional with respect to the pillar discount factors of the curve.
+        Each row is an instrument and each column is a pillar, excluding the
+        discount factor of one at the valuation date. It is lower triangular
+        as each instrument only depends on its own and earlier pillars. """
+
+        if self._jacobian is None:
+            raise FinError("Jacobian is only available for interpolation "
+                           "types with an analytic bootstrap.")
+
+        return self._jacobian.copy()
+
+###############################################################################
+
+    def update_quotes(self,
+                      changed_quotes: dict):
+        """ Change the quotes of some of the calibration instruments and
+        rebuild the curve. The keys of changed_quotes are the positions of the
+        instruments in the order of deposits, FRAs and then swaps and the
+        values are the new deposit rates, FRA rates or swap coupons. Each
+        pillar only depends on the instruments up to its own so the pillars
+        before that of the first changed instrument are kept and only the
+        later ones are solved again reusing the instrument schedules. The
+        interpolation types without an analytic bootstrap are fully rebuilt.
+        Returns the indices of the curve times whose discount factors have
+        changed so that anything which depends on them can be updated. """
+
+        instruments = self._usedDeposits + self._usedFRAs + self._usedSwaps
+        first_instrument = _update_instrument_quotes(instruments,
+                                                     changed_quotes)
+
+        old_dfs = self._dfs.copy()
+
+        if self._interp_type in gAnalyticInterpTypes:
+            self._build_curve_using_jacobian(first_instrument)
+        else:
+            self._build_curve()
+
+        changed_pillars = np.nonzero(self._dfs != old_dfs)[0]
+        return changed_pillars
+
+###############################################################################
+
+    def quote_sensitivities(self,
+                            trades: list,
+                            aggregate: bool = False):
+        """ Return the change in the value of each trade in a list of
+        IborDeposit, IborFRA and IborSwap trades for a one basis point rise
+        in each of the deposit rates, FRA rates and swap coupons used to build
+        the curve. The curve is used for discounting and as the index curve
+        and the values are as of the curve valuation date. The sensitivities
+        come from the bootstrap Jacobian with one adjoint solve for all of the
+        trades so the curve is not rebuilt. This returns an array with a row
+        per trade and a column per quote or, if aggregate is True, a vector
+        with the sensitivities of the portfolio of trades. """
+
+        if self._jacobian is None:
+            raise FinError("Quote sensitivities are only available for "
+                           "interpolation types with an analytic bootstrap.")
+
+        bump = 0.0001  # 1 basis point
+
+        return self._bootstrap.quote_sensitivities(self._times,
+                                                   self._dfs,
+                                                   self._jacobian,
+                                                   self._quote_derivs,
+                                                   self._interp_type,
+                                                   trades,
+                                                   bump,
+                                                   aggregate)
+
+###############################################################################
+
+    def bump_quotes(self, bumps):
+        """ Return a new curve built from copies of the instruments with the
+        deposit rates, FRA rates and swap coupons shifted by bumps which is
+        either one number or an array with one number per instrument. The
+        new curve has its own instruments and bootstrap so it can be updated
+        without changing this curve. The copied bootstrap keeps the
+        instrument flows so the schedules are not generated again. """
+
+        new_curve = copy.deepcopy(self)
+        _bump_instrument_quotes(new_curve._usedDeposits,
+                                new_curve._usedFRAs,
+                                new_curve._usedSwaps,
+                                bumps)
+        new_curve._build_curve()
+
+        # The bumped curve must not share the memo of this curve
+        if self._cache is not None:
+            new_curve.enable_cache(self._cache._max_size)
+
+        return new_curve
+
+###############################################################################
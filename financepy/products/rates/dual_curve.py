@@ -16,6 +16,10 @@ from ...market.curves.discount_curve import DiscountCurve
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
+from ...products.rates.curve_bootstrap import CurveBootstrap
+from ...products.rates.curve_bootstrap import gAnalyticInterpTypes
+from ...products.rates.curve_bootstrap import _update_instrument_quotes
+from ...products.rates.curve_bootstrap import _bump_instrument_quotes
 
 swaptol = 1e-10
 
@@ -96,14 +100,112 @@ class IborDualCurve(DiscountCurve):
         self._validate_inputs(ibor_deposits, ibor_fras, ibor_swaps)
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._interpolator = None
+        self._bootstrap = None
+        self._jacobian = None
+        self._quote_derivs = None
         self._build_curve()
 
 ###############################################################################
 
     def _build_curve(self):
-        """ Build curve based on interpolation. """
+        """ Build curve based on interpolation. The interpolation schemes
+        with analytic derivatives use the Jacobian bootstrap and the others
+        use a one dimensional root search. """
 
-        self._build_curve_using_1d_solver()
+        if self._interp_type in gAnalyticInterpTypes:
+            self._build_curve_using_jacobian()
+        else:
+            self._build_curve_using_1d_solver()
+
+###############################################################################
+
+    def _build_curve_using_jacobian(self, first_instrument: int = 0):
+        """ Construct the index curve using a bootstrap which solves each
+        pillar discount factor with a Newton search that uses the analytic
+        derivative of the instrument value. The payments are discounted on
+        the discount curve which is read each time the curve is built. The
+        pillars before that of the first instrument given are kept from the
+        last build. """
+
+        if self._bootstrap is None:
+            self._bootstrap = CurveBootstrap(self._valuation_date,
+                                             self._usedDeposits,
+                                             self._usedFRAs,
+                                             self._usedSwaps,
+                                             self._day_count_type,
+                                             self._discount_curve)
+
+        if self._jacobian is None or first_instrument == 0:
+            solution = self._bootstrap.solve(self._interp_type)
+        else:
+            solution = self._bootstrap.solve(self._interp_type, None,
+                                             first_instrument, self._dfs,
+                                             self._jacobian,
+                                             self._quote_derivs)
+
+        times, dfs, jacobian, quote_derivs = solution
+
+        self._times = times
+        self._dfs = dfs
+        self._jacobian = jacobian
+        self._quote_derivs = quote_derivs
+
+        self._interpolator = Interpolator(self._interp_type)
+        self._interpolator.fit(self._times, self._dfs)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def update_quotes(self,
+                      changed_quotes: dict):
+        """ Change the quotes of some of the calibration instruments and
+        rebuild the curve. The keys of changed_quotes are the positions of the
+        instruments in the order of deposits, FRAs and then swaps and the
+        values are the new deposit rates, FRA rates or swap coupons. The
+        pillars before that of the first changed instrument are kept and only
+        the later ones are solved again. The discount curve is assumed to be
+        unchanged. Returns the indices of the curve times whose discount
+        factors have changed. """
+
+        instruments = self._usedDeposits + self._usedFRAs + self._usedSwaps
+        first_instrument = _update_instrument_quotes(instruments,
+                                                     changed_quotes)
+
+        old_dfs = self._dfs.copy()
+
+        if self._interp_type in gAnalyticInterpTypes:
+            self._build_curve_using_jacobian(first_instrument)
+        else:
+            self._build_curve_using_1d_solver(first_instrument)
+
+        changed_pillars = np.nonzero(self._dfs != old_dfs)[0]
+        return changed_pillars
+
+###############################################################################
+
+    def bump_quotes(self, bumps):
+        """ Return a new curve built from copies of the instruments with the
+        deposit rates, FRA rates and swap coupons shifted by bumps which is
+        either one number or an array with one number per instrument. The
+        discount curve is not bumped and is shared with this curve. The
+        instruments of this curve are not changed. """
+
+        memo = {id(self._discount_curve): self._discount_curve}
+        new_curve = copy.deepcopy(self, memo)
+        _bump_instrument_quotes(new_curve._usedDeposits,
+                                new_curve._usedFRAs,
+                                new_curve._usedSwaps,
+                                bumps)
+        new_curve._build_curve()
+
+        # The bumped curve must not share the memo of this curve
+        if self._cache is not None:
+            new_curve.enable_cache(self._cache._max_size)
+
+        return new_curve
 
 ###############################################################################
 
@@ -284,37 +386,53 @@ class IborDualCurve(DiscountCurve):
 
 ###############################################################################
 
-    def _build_curve_using_1d_solver(self):
+    def _build_curve_using_1d_solver(self, first_instrument: int = 0):
         """ Construct the discount curve using a bootstrap approach. This is
         the non-linear slower method that allows the user to choose a number
         of interpolation approaches between the swap rates and other rates. It
-        involves the use of a solver. """
+        involves the use of a solver. The pillars before that of the first
+        instrument given are kept from the last build. """
 
         self._interpolator = Interpolator(self._interp_type)
 
-        self._times = np.array([])
-        self._dfs = np.array([])
+        if first_instrument > 0:
+            # Each pillar only depends on the instruments up to its own
+            self._times = self._times[0:first_instrument + 1].copy()
+            self._dfs = self._dfs[0:first_instrument + 1].copy()
+        else:
+            self._times = np.array([])
+            self._dfs = np.array([])
+
+            # time zero is now.
+            self._times = np.append(self._times, 0.0)
+            self._dfs = np.append(self._dfs, 1.0)
 
-        # time zero is now.
         tmat = 0.0
-        dfMat = 1.0
-        self._times = np.append(self._times, 0.0)
-        self._dfs = np.append(self._dfs, dfMat)
+        dfMat = self._dfs[-1]
         self._interpolator.fit(self._times, self._dfs)
 
+        num_depos = len(self._usedDeposits)
+        num_fras = len(self._usedFRAs)
+
         # A deposit is not margined and not indexed to Libor so should
         # probably not be used to build an indexed Libor curve from
-        for depo in self._usedDeposits:
+        for i, depo in enumerate(self._usedDeposits):
+            tmat = (depo._maturity_date - self._valuation_date) / gDaysInYear
+            if i < first_instrument:
+                continue
+
             dfSettle = self.df(depo._start_date)
             dfMat = depo._maturity_df() * dfSettle
-            tmat = (depo._maturity_date - self._valuation_date) / gDaysInYear
             self._times = np.append(self._times, tmat)
             self._dfs = np.append(self._dfs, dfMat)
             self._interpolator.fit(self._times, self._dfs)
 
         oldtmat = tmat
 
-        for fra in self._usedFRAs:
+        for i, fra in enumerate(self._usedFRAs):
+
+            if num_depos + i < first_instrument:
+                continue
 
             tset = (fra._start_date - self._valuation_date) / gDaysInYear
             tmat = (fra._maturity_date - self._valuation_date) / gDaysInYear
@@ -335,7 +453,11 @@ class IborDualCurve(DiscountCurve):
                                         args=argtuple, tol=swaptol,
                                         maxiter=50, fprime2=None)
 
-        for swap in self._usedSwaps:
+        for i, swap in enumerate(self._usedSwaps):
+
+            if num_depos + num_fras + i < first_instrument:
+                continue
+
             # I use the lastPaymentDate in case a date has been adjusted fwd
             # over a holiday as the maturity date is usually not adjusted CHECK
             maturity_date = swap._fixed_leg._payment_dates[-1]
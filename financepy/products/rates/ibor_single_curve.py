@@ -16,7 +16,7 @@ from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
-from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_bootstrap import BootstrappedCurve
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
@@ -106,7 +106,7 @@ def _cost_function(dfs, *args):
 ###############################################################################
 
 
-class IborSingleCurve(DiscountCurve):
+class IborSingleCurve(BootstrappedCurve):
     """ Constructs one discount and index curve as implied by prices of Ibor
     deposits, FRAs and IRS. Discounting is assumed to be at Libor and the value
     of the floating leg (including a notional) is assumed to be par. This 
@@ -167,15 +167,11 @@ class IborSingleCurve(DiscountCurve):
         self._interp_type = interp_type
         self._check_refit = check_refit
         self._interpolator = None
+        self._bootstrap = None
+        self._jacobian = None
+        self._quote_derivs = None
         self._build_curve()
 
-###############################################################################
-
-    def _build_curve(self):
-        """ Build curve based on interpolation. """
-
-        self._build_curve_using_1d_solver()
-
 ###############################################################################
 
     def _validate_inputs(self,
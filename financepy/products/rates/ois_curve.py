@@ -12,7 +12,7 @@ from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import InterpTypes, Interpolator
-from ...market.curves.discount_curve import DiscountCurve
+from ...products.rates.curve_bootstrap import BootstrappedCurve
 
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ois import OIS
@@ -86,7 +86,7 @@ def _g(df, *args):
 ###############################################################################
 
 
-class OISCurve(DiscountCurve):
+class OISCurve(BootstrappedCurve):
     """ Constructs a discount curve as implied by the prices of Overnight
     Index Rate swaps. The curve date is the date on which we are
     performing the valuation based on the information available on the
@@ -125,15 +125,11 @@ class OISCurve(DiscountCurve):
         self._interp_type = interp_type
         self._check_refit = check_refit
         self._interpolator = None
+        self._bootstrap = None
+        self._jacobian = None
+        self._quote_derivs = None
         self._build_curve()
 
-###############################################################################
-
-    def _build_curve(self):
-        """ Build curve based on interpolation. """
-
-        self._build_curve_using_1d_solver()
-
 ###############################################################################
 
     def _validate_inputs(self,
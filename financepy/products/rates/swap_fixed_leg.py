@@ -2,14 +2,16 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
-from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
-from ...utils.schedule import Schedule
+from ...utils.schedule import AccrualSchedule, accrual_schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
 from ...market.curves.discount_curve import DiscountCurve
@@ -35,10 +37,12 @@ class SwapFixedLeg:
                  calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
                  bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
-                 end_of_month: bool = False):
+                 end_of_month: bool = False,
+                 schedule_dates=None):  # Optional pre-generated schedule
         """ Create the fixed leg of a swap contract giving the contract start
         date, its maturity, fixed coupon, fixed leg frequency, fixed leg day
-        count convention and notional.  """
+        count convention and notional. The schedule dates can be passed in if
+        they have already been generated, for example by a ScheduleArray. """
 
         check_argument_types(self.__init__, locals())
 
@@ -69,128 +73,132 @@ class SwapFixedLeg:
         self._bus_day_adjust_type = bus_day_adjust_type
         self._date_gen_rule_type = date_gen_rule_type
         self._end_of_month = end_of_month
+        self._schedule_dates = schedule_dates
+
+        # The payments are generated when they are first needed
+        self._flow_dfs = None
+        self._flow_pvs = None
+
+###############################################################################
 
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._payments = []
-        self._year_fracs = []
-        self._accrued_days = []
-        self._rates = []
+    def __getattr__(self, name):
+        """ Generate the payments on first access to any of the payment
+        attributes. This is only called if the attribute is not yet set. """
 
-        self.generate_payments()
+        if name in ("_startAccruedDates", "_endAccruedDates",
+                    "_payment_dates", "_payments", "_year_fracs",
+                    "_accrued_days", "_rates", "_accrual_schedule"):
+            self.generate_payments()
+            return self.__dict__[name]
+
+        raise AttributeError(name)
 
 ###############################################################################
 
     def generate_payments(self):
-        ''' These are generated immediately as they are for the entire
-        life of the swap. Given a valuation date we can determine
+        ''' These are generated for the entire life of the swap the first
+        time that they are needed. Given a valuation date we can determine
         which cash flows are in the future and value the swap
         The schedule allows for a specified lag in the payment date
         Nothing is paid on the swap effective date and so the first payment
-        date is the first actual payment date. '''
-
-        schedule = Schedule(self._effective_date,
-                            self._termination_date,
-                            self._freq_type,
-                            self._calendar_type,
-                            self._bus_day_adjust_type,
-                            self._date_gen_rule_type,
-                            end_of_month=self._end_of_month)
-
-        scheduleDates = schedule._adjusted_dates
-
-        if len(scheduleDates) < 2:
-            raise FinError("Schedule has none or only one date")
-
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._payments = []
-        self._year_fracs = []
-        self._accrued_days = []
-        self._rates = []
-
-        prev_dt = scheduleDates[0]
-
-        day_counter = DayCount(self._day_count_type)
-        calendar = Calendar(self._calendar_type)
-
-        for next_dt in scheduleDates[1:]:
-
-            self._startAccruedDates.append(prev_dt)
-            self._endAccruedDates.append(next_dt)
-
-            if self._payment_lag == 0:
-                payment_date = next_dt
-            else:
-                payment_date = calendar.add_business_days(next_dt,
-                                                          self._payment_lag)
-
-            self._payment_dates.append(payment_date)
-
-            (year_frac, num, den) = day_counter.year_frac(prev_dt,
-                                                          next_dt)
-
-            self._rates.append(self._coupon)
-
-            payment = year_frac * self._notional * self._coupon
-
-            self._payments.append(payment)
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
-
-            prev_dt = next_dt
+        date is the first actual payment date. The dates and year fractions
+        are shared with all other legs that have the same conventions. '''
+
+        if self._schedule_dates is None:
+            schedule = accrual_schedule(self._effective_date,
+                                        self._termination_date,
+                                        self._freq_type,
+                                        self._day_count_type,
+                                        self._calendar_type,
+                                        self._bus_day_adjust_type,
+                                        self._date_gen_rule_type,
+                                        self._end_of_month,
+                                        self._payment_lag)
+        else:
+            schedule = AccrualSchedule(list(self._schedule_dates),
+                                       self._day_count_type,
+                                       self._calendar_type,
+                                       self._payment_lag)
+
+        self._accrual_schedule = schedule
+        self._startAccruedDates = schedule._start_accrued_dates
+        self._endAccruedDates = schedule._end_accrued_dates
+        self._payment_dates = schedule._payment_dates
+        self._year_fracs = schedule._year_fracs
+        self._accrued_days = schedule._accrued_days
+
+        self._rates = [self._coupon] * len(self._year_fracs)
+        self._payments = [year_frac * self._notional * self._coupon
+                          for year_frac in self._year_fracs]
 
 ###############################################################################
 
     def value(self,
               valuation_date: Date,
               discount_curve: DiscountCurve):
+        """ Value the fixed leg on the valuation date using the discount
+        curve. The discount factors of all of the future payment dates are
+        calculated in one call to the curve. The discount factors and PVs of
+        each flow are kept as arrays and only turned into the per-flow
+        reporting lists if these are requested. """
 
-        self._paymentDfs = []
-        self._paymentPVs = []
-        self._cumulativePVs = []
+        schedule = self._accrual_schedule
+        payment_serials = schedule._payment_serials
 
         notional = self._notional
         dfValue = discount_curve.df(valuation_date)
-        legPV = 0.0
-        numPayments = len(self._payment_dates)
-
-        dfPmnt = 0.0
 
-        for iPmnt in range(0, numPayments):
+        future = payment_serials > valuation_date._excel_date
 
-            pmntDate = self._payment_dates[iPmnt]
-            pmntAmount = self._payments[iPmnt]
+        dfs = np.zeros(len(payment_serials))
 
-            if pmntDate > valuation_date:
+        if future.any():
+            future_dates = DateArray(payment_serials[future])
+            dfs[future] = discount_curve.df(future_dates) / dfValue
 
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
+        # The stored payments are used so that changes to them are valued
+        pvs = np.array(self._payments, dtype=float) * dfs
 
-                self._paymentDfs.append(dfPmnt)
-                self._paymentPVs.append(pmntAmount*dfPmnt)
-                self._cumulativePVs.append(legPV)
+        # A cumulative sum adds up the flows in the same order as a loop
+        legPV = np.cumsum(pvs)[-1]
 
-            else:
-
-                self._paymentDfs.append(0.0)
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(0.0)
-
-        if pmntDate > valuation_date:
-            paymentPV = self._principal * dfPmnt * notional
-            self._paymentPVs[-1] += paymentPV
+        if future[-1]:
+            paymentPV = self._principal * dfs[-1] * notional
+            pvs[-1] += paymentPV
             legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
+
+        self._flow_dfs = dfs
+        self._flow_pvs = pvs
 
         if self._leg_type == SwapTypes.PAY:
             legPV = legPV * (-1.0)
 
         return legPV
 
+###############################################################################
+
+    @property
+    def _paymentDfs(self):
+        """ Discount factors of the flows from the last valuation. """
+        if self._flow_dfs is None:
+            return []
+        return list(self._flow_dfs)
+
+    @property
+    def _paymentPVs(self):
+        """ Present values of the flows from the last valuation. """
+        if self._flow_pvs is None:
+            return []
+        return list(self._flow_pvs)
+
+    @property
+    def _cumulativePVs(self):
+        """ Cumulative present values of the flows from the last valuation.
+        """
+        if self._flow_pvs is None:
+            return []
+        return list(np.cumsum(self._flow_pvs))
+
 ##########################################################################
 
     def print_payments(self):
@@ -249,6 +257,10 @@ class SwapFixedLeg:
         header = [ "PAY_NUM", "PAY_DATE", "NOTIONAL", 
                   "RATE", "PMNT", "DF", "PV", "CUM_PV"]
 
+        paymentDfs = self._paymentDfs
+        paymentPVs = self._paymentPVs
+        cumulativePVs = self._cumulativePVs
+
         rows = []
         num_flows = len(self._payment_dates)
         for iFlow in range(0, num_flows):
@@ -258,9 +270,9 @@ class SwapFixedLeg:
                 round(self._notional, 0),
                 round(self._rates[iFlow] * 100.0, 4),
                 round(self._payments[iFlow], 2),
-                round(self._paymentDfs[iFlow], 4),
-                round(self._paymentPVs[iFlow], 2),
-                round(self._cumulativePVs[iFlow], 2),
+                round(paymentDfs[iFlow], 4),
+                round(paymentPVs[iFlow], 2),
+                round(cumulativePVs[iFlow], 2),
             ])
 
         table = format_table(header, rows)
@@ -2,14 +2,16 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
-from ...utils.schedule import Schedule
+from ...utils.schedule import AccrualSchedule, accrual_schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
 from ...market.curves.discount_curve import DiscountCurve
@@ -35,10 +37,12 @@ class SwapFloatLeg:
                  calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
                  bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
-                 end_of_month: bool = False):
+                 end_of_month: bool = False,
+                 schedule_dates=None):  # Optional pre-generated schedule
         """ Create the fixed leg of a swap contract giving the contract start
         date, its maturity, fixed coupon, fixed leg frequency, fixed leg day
-        count convention and notional.  """
+        count convention and notional. The schedule dates can be passed in if
+        they have already been generated, for example by a ScheduleArray. """
 
         check_argument_types(self.__init__, locals())
 
@@ -69,67 +73,59 @@ class SwapFloatLeg:
         self._bus_day_adjust_type = bus_day_adjust_type
         self._date_gen_rule_type = date_gen_rule_type
         self._end_of_month = end_of_month
+        self._schedule_dates = schedule_dates
 
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._payments = []
-        self._year_fracs = []
-        self._accrued_days = []
-
-        self.generate_payment_dates()
+        # The payment dates are generated when they are first needed
+        self._flow_rates = None
+        self._flow_payments = None
+        self._flow_dfs = None
+        self._flow_pvs = None
 
 ###############################################################################
 
-    def generate_payment_dates(self):
-        """ Generate the floating leg payment dates and accrual factors. The
-        coupons cannot be generated yet as we do not have the index curve. """
-
-        schedule = Schedule(self._effective_date,
-                            self._termination_date,
-                            self._freq_type,
-                            self._calendar_type,
-                            self._bus_day_adjust_type,
-                            self._date_gen_rule_type,
-                            end_of_month=self._end_of_month)
-
-        scheduleDates = schedule._adjusted_dates
-
-        if len(scheduleDates) < 2:
-            raise FinError("Schedule has none or only one date")
-
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._year_fracs = []
-        self._accrued_days = []
-
-        prev_dt = scheduleDates[0]
-
-        day_counter = DayCount(self._day_count_type)
-        calendar = Calendar(self._calendar_type)
-
-        # All of the lists end up with the same length
-        for next_dt in scheduleDates[1:]:
-
-            self._startAccruedDates.append(prev_dt)
-            self._endAccruedDates.append(next_dt)
-
-            if self._payment_lag == 0:
-                payment_date = next_dt
-            else:
-                payment_date = calendar.add_business_days(next_dt,
-                                                          self._payment_lag)
+    def __getattr__(self, name):
+        """ Generate the payment dates on first access to any of the payment
+        date attributes. This is only called if the attribute is not yet
+        set. """
 
-            self._payment_dates.append(payment_date)
+        if name in ("_startAccruedDates", "_endAccruedDates",
+                    "_payment_dates", "_year_fracs", "_accrued_days",
+                    "_accrual_schedule"):
+            self.generate_payment_dates()
+            return self.__dict__[name]
 
-            (year_frac, num, _) = day_counter.year_frac(prev_dt,
-                                                        next_dt)
+        raise AttributeError(name)
 
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
+###############################################################################
 
-            prev_dt = next_dt
+    def generate_payment_dates(self):
+        """ Generate the floating leg payment dates and accrual factors. The
+        coupons cannot be generated yet as we do not have the index curve.
+        The dates and year fractions are shared with all other legs that
+        have the same conventions. """
+
+        if self._schedule_dates is None:
+            schedule = accrual_schedule(self._effective_date,
+                                        self._termination_date,
+                                        self._freq_type,
+                                        self._day_count_type,
+                                        self._calendar_type,
+                                        self._bus_day_adjust_type,
+                                        self._date_gen_rule_type,
+                                        self._end_of_month,
+                                        self._payment_lag)
+        else:
+            schedule = AccrualSchedule(list(self._schedule_dates),
+                                       self._day_count_type,
+                                       self._calendar_type,
+                                       self._payment_lag)
+
+        self._accrual_schedule = schedule
+        self._startAccruedDates = schedule._start_accrued_dates
+        self._endAccruedDates = schedule._end_accrued_dates
+        self._payment_dates = schedule._payment_dates
+        self._year_fracs = schedule._year_fracs
+        self._accrued_days = schedule._accrued_days
 
 ###############################################################################
 
@@ -141,7 +137,10 @@ class SwapFloatLeg:
         """ Value the floating leg with payments from an index curve and
         discounting based on a supplied discount curve as of the valuation date
         supplied. For an existing swap, the user must enter the next fixing
-        coupon. """
+        coupon. The discount factors of all of the payment dates and the
+        index curve discount factors of all of the accrual dates are each
+        calculated in one call to the curve. The per-flow reporting lists are
+        only created if these are requested. """
 
         if discount_curve is None:
             raise FinError("Discount curve is None")
@@ -149,78 +148,117 @@ class SwapFloatLeg:
         if index_curve is None:
             index_curve = discount_curve
 
-        self._rates = []
-        self._payments = []
-        self._paymentDfs = []
-        self._paymentPVs = []
-        self._cumulativePVs = []
+        schedule = self._accrual_schedule
+        payment_serials = schedule._payment_serials
+        numPayments = len(payment_serials)
 
         dfValue = discount_curve.df(valuation_date)
-        legPV = 0.0
-        numPayments = len(self._payment_dates)
-        firstPayment = False
 
         if not len(self._notional_array):
             self._notional_array = [self._notional] * numPayments
 
-        index_basis = index_curve._day_count_type
-        index_day_counter = DayCount(index_basis)
-
-        for iPmnt in range(0, numPayments):
-
-            pmntDate = self._payment_dates[iPmnt]
+        future = payment_serials > valuation_date._excel_date
 
-            if pmntDate > valuation_date:
+        rates = np.zeros(numPayments)
+        payments = np.zeros(numPayments)
+        dfs = np.zeros(numPayments)
+        pvs = np.zeros(numPayments)
 
-                startAccruedDt = self._startAccruedDates[iPmnt]
-                endAccruedDt = self._endAccruedDates[iPmnt]
-                pay_alpha = self._year_fracs[iPmnt]
+        if future.any():
 
-                (index_alpha, num, _) = index_day_counter.year_frac(startAccruedDt,
-                                                                    endAccruedDt)
+            fwd_rates = np.zeros(np.count_nonzero(future))
 
-                if firstPayment is False and firstFixingRate is not None:
+            # The first coupon may already be fixed and so needs no forward
+            first = 0
+            if firstFixingRate is not None:
+                fwd_rates[0] = firstFixingRate
+                first = 1
 
-                    fwd_rate = firstFixingRate
-                    firstPayment = True
+            start_serials = schedule._start_accrued_serials[future][first:]
+            end_serials = schedule._end_accrued_serials[future][first:]
+            num_fwds = len(start_serials)
 
-                else:
+            if num_fwds > 0:
+                index_day_counter = DayCount(index_curve._day_count_type)
+                index_alphas = index_day_counter.year_frac(
+                    DateArray(start_serials), DateArray(end_serials))[0]
 
-                    dfStart = index_curve.df(startAccruedDt)
-                    dfEnd = index_curve.df(endAccruedDt)
-                    fwd_rate = (dfStart / dfEnd - 1.0) / index_alpha
+                # One call to the index curve for all accrual dates
+                accrual_dates = DateArray(np.concatenate((start_serials,
+                                                          end_serials)))
+                index_dfs = index_curve.df(accrual_dates)
+                dfStart = index_dfs[:num_fwds]
+                dfEnd = index_dfs[num_fwds:]
+                fwd_rates[first:] = (dfStart / dfEnd - 1.0) / index_alphas
 
-                pmntAmount = (fwd_rate + self._spread) * pay_alpha * self._notional_array[iPmnt]
+            pay_alphas = schedule._year_frac_array[future]
+            notionals = np.array(self._notional_array, dtype=float)[future]
+            pmntAmounts = (fwd_rates + self._spread) * pay_alphas * notionals
 
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
+            future_dates = DateArray(payment_serials[future])
+            dfPmnts = discount_curve.df(future_dates) / dfValue
 
-                self._rates.append(fwd_rate)
-                self._payments.append(pmntAmount)
-                self._paymentDfs.append(dfPmnt)
-                self._paymentPVs.append(pmntPV)
-                self._cumulativePVs.append(legPV)
+            rates[future] = fwd_rates
+            payments[future] = pmntAmounts
+            dfs[future] = dfPmnts
+            pvs[future] = pmntAmounts * dfPmnts
 
-            else:
+        # A cumulative sum adds up the flows in the same order as a loop
+        legPV = np.cumsum(pvs)[-1]
 
-                self._rates.append(0.0)
-                self._payments.append(0.0)
-                self._paymentDfs.append(0.0)
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(legPV)
-
-        if pmntDate > valuation_date:
-            paymentPV = self._principal * dfPmnt * self._notional_array[-1]
-            self._paymentPVs[-1] += paymentPV
+        if future[-1]:
+            paymentPV = self._principal * dfs[-1] * self._notional_array[-1]
+            pvs[-1] += paymentPV
             legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
+
+        self._flow_rates = rates
+        self._flow_payments = payments
+        self._flow_dfs = dfs
+        self._flow_pvs = pvs
 
         if self._leg_type == SwapTypes.PAY:
             legPV = legPV * (-1.0)
 
         return legPV
 
+###############################################################################
+
+    @property
+    def _rates(self):
+        """ Index rates of the flows from the last valuation. """
+        if self._flow_rates is None:
+            return []
+        return list(self._flow_rates)
+
+    @property
+    def _payments(self):
+        """ Cash amounts of the flows from the last valuation. """
+        if self._flow_payments is None:
+            return []
+        return list(self._flow_payments)
+
+    @property
+    def _paymentDfs(self):
+        """ Discount factors of the flows from the last valuation. """
+        if self._flow_dfs is None:
+            return []
+        return list(self._flow_dfs)
+
+    @property
+    def _paymentPVs(self):
+        """ Present values of the flows from the last valuation. """
+        if self._flow_pvs is None:
+            return []
+        return list(self._flow_pvs)
+
+    @property
+    def _cumulativePVs(self):
+        """ Cumulative present values of the flows from the last valuation.
+        """
+        if self._flow_pvs is None:
+            return []
+        return list(np.cumsum(self._flow_pvs))
+
 ##########################################################################
 
     def print_payments(self):
@@ -271,10 +309,16 @@ class SwapFloatLeg:
 
         self.print_payments()
 
-        if len(self._payments) == 0:
+        if self._flow_payments is None:
             print("Payments not calculated.")
             return
 
+        rates = self._rates
+        payments = self._payments
+        paymentDfs = self._paymentDfs
+        paymentPVs = self._paymentPVs
+        cumulativePVs = self._cumulativePVs
+
         header = [ "PAY_NUM", "PAY_DATE",  "NOTIONAL", 
                   "IBOR", "PMNT", "DF", "PV", "CUM_PV"]
 
@@ -285,11 +329,11 @@ class SwapFloatLeg:
                 iFlow + 1,
                 self._payment_dates[iFlow],
                 round(self._notional_array[iFlow], 0),
-                round(self._rates[iFlow] * 100.0, 4),
-                round(self._payments[iFlow], 2),
-                round(self._paymentDfs[iFlow], 4),
-                round(self._paymentPVs[iFlow], 2),
-                round(self._cumulativePVs[iFlow], 2),
+                round(rates[iFlow] * 100.0, 4),
+                round(payments[iFlow], 2),
+                round(paymentDfs[iFlow], 4),
+                round(paymentPVs[iFlow], 2),
+                round(cumulativePVs[iFlow], 2),
             ])
 
         table = format_table(header, rows)
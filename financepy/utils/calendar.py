@@ -8,12 +8,14 @@
 ###############################################################################
 
 import datetime
+import numpy as np
+from numba import njit
 from enum import Enum
-from .date import Date
+from .date import Date, DateArray, _excel_serials, _excel_dmy
+from .date import _excel_serial_dmy
+from .date import is_leap_year, monthDaysLeapYear, monthDaysNotLeapYear
 from .error import FinError
 
-# from numba import njit, jit, int64, boolean
-
 easterMondayDay = [98, 90, 103, 95, 114, 106, 91, 111, 102, 87,
                    107, 99, 83, 103, 95, 115, 99, 91, 111, 96, 87,
                    107, 92, 112, 103, 95, 108, 100, 91,
@@ -77,6 +79,218 @@ class DateGenRuleTypes(Enum):
     BACKWARD = 2
 
 ###############################################################################
+# The holiday rules are compiled once per calendar into business day bitmaps
+# which are cached here for the life of the process and shared by every
+# Calendar object of the same type.
+###############################################################################
+
+gBusinessDayIndices = {}
+
+# The Easter table starts in 1901 so earlier dates use the holiday rules
+gFirstIndexedYear = 1901
+gLastIndexedYear = 1900 + len(easterMondayDay)
+
+###############################################################################
+
+
+class BusinessDayIndex:
+    """ Holds the holidays and business days of a calendar as arrays indexed
+    by the Excel serial number of the date, together with the cumulative
+    number of business days and the serial numbers of the business days. This
+    makes business day tests and business day arithmetic O(1) lookups. The
+    range of years covered is extended on demand. """
+
+    def __init__(self,
+                 calendar_types: tuple):
+        """ Create an empty index for a calendar which is the union of the
+        holidays of all of the calendar types provided. """
+
+        self._calendar_types = calendar_types
+        self._start_year = None
+        self._end_year = None
+        self._start_serial = 0
+        self._holidays = np.zeros(0, dtype=np.uint8)
+        self._bus_days = np.zeros(0, dtype=np.uint8)
+        self._cum_bus_days = np.zeros(0, dtype=np.int32)
+        self._bus_day_serials = np.zeros(0, dtype=np.int32)
+
+    ###########################################################################
+
+    def _holidays_in_years(self,
+                           start_year: int,
+                           end_year: int):
+        """ Evaluate the holiday rules for every day in the years from start
+        year to end year inclusive and return the holiday flags. """
+
+        start_serial = _excel_serials(np.array([1]), np.array([1]),
+                                      np.array([start_year]))[0]
+        end_serial = _excel_serials(np.array([31]), np.array([12]),
+                                    np.array([end_year]))[0]
+
+        serials = np.arange(start_serial, end_serial + 1, dtype=np.int32)
+        dd, mm, yy = _excel_dmy(serials)
+        weekdays = (serials + 5) % 7
+
+        # The number of the day in the year
+        day_in_year = np.zeros(len(serials), dtype=np.int32)
+        year_start = 0
+        for i in range(1, len(serials)):
+            if dd[i] == 1 and mm[i] == 1:
+                year_start = i
+            day_in_year[i] = i - year_start
+        day_in_year += 1
+
+        holidays = np.zeros(len(serials), dtype=np.uint8)
+
+        for calendar_type in self._calendar_types:
+            calendar = Calendar(calendar_type)
+            for i in range(0, len(serials)):
+                if calendar._holiday_from_rules(int(dd[i]), int(mm[i]),
+                                                int(yy[i]),
+                                                int(day_in_year[i]),
+                                                int(weekdays[i])):
+                    holidays[i] = 1
+
+        return holidays
+
+    ###########################################################################
+
+    def extend(self,
+               start_year: int,
+               end_year: int):
+        """ Make sure that the index covers all of the years from start year
+        to end year inclusive. Only the missing years are evaluated. """
+
+        start_year = max(start_year, gFirstIndexedYear)
+
+        if self._start_year is None:
+            self._holidays = self._holidays_in_years(start_year, end_year)
+            self._start_year = start_year
+            self._end_year = end_year
+        else:
+            if start_year < self._start_year:
+                before = self._holidays_in_years(start_year,
+                                                 self._start_year - 1)
+                self._holidays = np.concatenate((before, self._holidays))
+                self._start_year = start_year
+
+            if end_year > self._end_year:
+                after = self._holidays_in_years(self._end_year + 1, end_year)
+                self._holidays = np.concatenate((self._holidays, after))
+                self._end_year = end_year
+
+        self._start_serial = _excel_serials(np.array([1]), np.array([1]),
+                                            np.array([self._start_year]))[0]
+
+        serials = np.arange(0, len(self._holidays)) + self._start_serial
+        weekdays = (serials + 5) % 7
+        weekend = (weekdays == Date.SAT) | (weekdays == Date.SUN)
+
+        self._bus_days = ((self._holidays == 0) & ~weekend).astype(np.uint8)
+        self._cum_bus_days = np.cumsum(self._bus_days, dtype=np.int32)
+        self._bus_day_serials = \
+            (np.flatnonzero(self._bus_days) + self._start_serial).astype(np.int32)
+
+    ###########################################################################
+
+    def covers(self,
+               y: int):
+        """ Return True if year y is inside the indexed range. """
+
+        if self._start_year is None:
+            return False
+
+        return y >= self._start_year and y <= self._end_year
+
+    ###########################################################################
+
+    def ensure_year(self,
+                    y: int):
+        """ Extend the index so that it covers year y with some padding on
+        each side so that adjustments near the edge do not fall off it. """
+
+        if self.covers(y - 1) and self.covers(y + 1):
+            return
+
+        pad = 10
+        start_year = y - pad
+        end_year = min(y + pad, max(y + 1, gLastIndexedYear))
+
+        if self._start_year is not None:
+            start_year = min(start_year, self._start_year)
+            end_year = max(end_year, self._end_year)
+
+        self.extend(start_year, end_year)
+
+###############################################################################
+
+
+def business_day_index(calendar_types: tuple):
+    """ Return the cached business day index for a tuple of calendar types,
+    creating it on the first call in this process. """
+
+    if calendar_types not in gBusinessDayIndices:
+        gBusinessDayIndices[calendar_types] = BusinessDayIndex(calendar_types)
+
+    return gBusinessDayIndices[calendar_types]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _adjust_serial(serial, bus_day_adjust_type, start_serial, bus_days):
+    """ Adjust an Excel serial date to a business day using a bitmap of
+    business days which starts on the start serial date. The adjustment type
+    is the value of the BusDayAdjustTypes enum. """
+
+    i = serial - start_serial
+
+    if bus_days[i] == 1:
+        return serial
+
+    if bus_day_adjust_type == BusDayAdjustTypes.NONE.value:
+        return serial
+
+    following = bus_day_adjust_type == BusDayAdjustTypes.FOLLOWING.value or \
+        bus_day_adjust_type == BusDayAdjustTypes.MODIFIED_FOLLOWING.value
+
+    modified = \
+        bus_day_adjust_type == BusDayAdjustTypes.MODIFIED_FOLLOWING.value or \
+        bus_day_adjust_type == BusDayAdjustTypes.MODIFIED_PRECEDING.value
+
+    if following:
+        step = 1
+    else:
+        step = -1
+
+    j = i + step
+    while bus_days[j] == 0:
+        j += step
+
+    # Modified conventions must stay in the same month so we go the other way
+    if modified:
+        m = _excel_serial_dmy(serial)[1]
+        if _excel_serial_dmy(start_serial + j)[1] != m:
+            j = i - step
+            while bus_days[j] == 0:
+                j -= step
+
+    return start_serial + j
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _adjust_serials(serials, bus_day_adjust_type, start_serial, bus_days):
+    """ Adjust a vector of Excel serial dates to business days. """
+    n = len(serials)
+    adjusted = np.empty(n, dtype=np.int32)
+    for i in range(0, n):
+        adjusted[i] = _adjust_serial(serials[i], bus_day_adjust_type,
+                                     start_serial, bus_days)
+    return adjusted
+
+###############################################################################
 
 
 class Calendar:
@@ -87,23 +301,41 @@ class Calendar:
     specified calendar. """
 
     def __init__(self,
-                 calendar_type: CalendarTypes):
-        """ Create a calendar based on a specified calendar type. """
+                 calendar_type: (CalendarTypes, tuple, list)):
+        """ Create a calendar based on a specified calendar type. A joint
+        calendar can be created by passing a tuple or list of calendar types
+        in which case a day is a holiday if it is a holiday in any of them. """
 
-        if calendar_type not in CalendarTypes:
-            raise FinError(
-                "Need to pass FinCalendarType and not " +
-                str(calendar_type))
+        if isinstance(calendar_type, (tuple, list)):
+            calendar_types = tuple(calendar_type)
+        else:
+            calendar_types = (calendar_type,)
+
+        if len(calendar_types) == 0:
+            raise FinError("Need to pass at least one FinCalendarType")
+
+        for cal_type in calendar_types:
+            if cal_type not in CalendarTypes:
+                raise FinError(
+                    "Need to pass FinCalendarType and not " +
+                    str(cal_type))
 
-        self._calendar_type = calendar_type
+        if len(calendar_types) == 1:
+            self._calendar_type = calendar_types[0]
+        else:
+            self._calendar_type = calendar_types
+
+        self._calendar_types = calendar_types
+        self._index = None
 
     ###########################################################################
 
     def adjust(self,
-               dt: Date,
+               dt: (Date, DateArray),
                busDayConventionType: BusDayAdjustTypes):
         """ Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. """
+        specified business day convention. If a DateArray is passed then all
+        of the dates are adjusted in one call and a DateArray is returned. """
 
         if type(busDayConventionType) != BusDayAdjustTypes:
             raise FinError("Invalid type passed. Need FinBusDayConventionType")
@@ -112,11 +344,113 @@ class Calendar:
         if self._calendar_type == CalendarTypes.NONE:
             return dt
 
+        if isinstance(dt, DateArray):
+            return self._adjust_date_array(dt, busDayConventionType)
+
+        # Dates in the first indexed year may need to look back before it
+        if dt._y <= gFirstIndexedYear:
+            if busDayConventionType == BusDayAdjustTypes.NONE:
+                return dt
+            return self._adjust_by_stepping(dt, busDayConventionType)
+
+        index = self._business_day_index(dt._y)
+        i = int(dt._excel_date) - index._start_serial
+
+        # Most dates are business days so we check this first
+        if index._bus_days[i] == 1:
+            return dt
+
         if busDayConventionType == BusDayAdjustTypes.NONE:
             return dt
 
         elif busDayConventionType == BusDayAdjustTypes.FOLLOWING:
 
+            serial = self._next_bus_day_serial(index, i)
+
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+
+            serial = self._next_bus_day_serial(index, i)
+
+            # if the business day is in a different month look back
+            # for previous first business day
+            if not self._same_month(dt, serial):
+                serial = self._prev_bus_day_serial(index, i)
+
+        elif busDayConventionType == BusDayAdjustTypes.PRECEDING:
+
+            serial = self._prev_bus_day_serial(index, i)
+
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_PRECEDING:
+
+            serial = self._prev_bus_day_serial(index, i)
+
+            # if the business day is in a different month look forward
+            # for next business day
+            if not self._same_month(dt, serial):
+                serial = self._next_bus_day_serial(index, i)
+
+        else:
+
+            raise FinError("Unknown adjustment convention" +
+                           str(busDayConventionType))
+
+        return Date.from_excel_date(serial)
+
+###############################################################################
+
+    def _same_month(self, dt: Date, serial: int):
+        """ Determine whether the Excel serial date lies in the same month as
+        the date dt without having to construct a new Date. """
+
+        day = dt._d + serial - int(dt._excel_date)
+
+        if day < 1:
+            return False
+
+        if is_leap_year(dt._y):
+            return day <= monthDaysLeapYear[dt._m - 1]
+        else:
+            return day <= monthDaysNotLeapYear[dt._m - 1]
+
+###############################################################################
+
+    def _adjust_date_array(self,
+                           dates: DateArray,
+                           busDayConventionType: BusDayAdjustTypes):
+        """ Adjust all of the dates in a DateArray using the business day
+        bitmap of this calendar. """
+
+        if len(dates) == 0:
+            return DateArray(dates._excel_date)
+
+        start_year = int(dates._y.min()) - 1
+        end_year = int(dates._y.max()) + 1
+
+        # The bitmap starts in the first indexed year so early dates step
+        if start_year < gFirstIndexedYear:
+            adjusted = [self.adjust(dt, busDayConventionType) for dt in dates]
+            return DateArray(adjusted)
+
+        start_serial, bus_days, _ = self.business_day_bitmap(start_year,
+                                                             end_year)
+
+        serials = _adjust_serials(dates._excel_date,
+                                  busDayConventionType.value,
+                                  start_serial,
+                                  bus_days)
+
+        return DateArray(serials)
+
+###############################################################################
+
+    def _adjust_by_stepping(self,
+                            dt: Date,
+                            busDayConventionType: BusDayAdjustTypes):
+        """ Adjust a date by stepping one day at a time. This is only used
+        for dates before the start of the business day index. """
+
+        if busDayConventionType == BusDayAdjustTypes.FOLLOWING:
+
             # step forward until we find a business day
             while self.is_business_day(dt) is False:
                 dt = dt.add_days(1)
@@ -135,7 +469,6 @@ class Calendar:
 
             # if the business day is in a different month look back
             # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
             if dt._m != m_start:
                 dt = Date(d_start, m_start, y_start)
                 while self.is_business_day(dt) is False:
@@ -164,7 +497,6 @@ class Calendar:
 
             # if the business day is in a different month look forward
             # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
             if dt._m != m_start:
                 dt = Date(d_start, m_start, y_start)
                 while self.is_business_day(dt) is False:
@@ -177,7 +509,51 @@ class Calendar:
             raise FinError("Unknown adjustment convention" +
                            str(busDayConventionType))
 
-        return dt
+###############################################################################
+
+    def _business_day_index(self,
+                            y: int):
+        """ Return the shared business day index of this calendar making sure
+        that it covers year y. """
+
+        index = self._index
+
+        if index is None:
+            index = business_day_index(self._calendar_types)
+            self._index = index
+        elif y > index._start_year and y < index._end_year:
+            return index
+
+        index.ensure_year(y)
+        return index
+
+###############################################################################
+
+    def _next_bus_day_serial(self,
+                             index: BusinessDayIndex,
+                             i: int):
+        """ Serial number of the first business day after position i. """
+
+        rank = index._cum_bus_days[i]
+
+        while rank >= len(index._bus_day_serials):
+            index.extend(index._start_year, index._end_year + 10)
+
+        return int(index._bus_day_serials[rank])
+
+###############################################################################
+
+    def _prev_bus_day_serial(self,
+                             index: BusinessDayIndex,
+                             i: int):
+        """ Serial number of the last business day before position i. """
+
+        num_before = index._cum_bus_days[i] - index._bus_days[i]
+
+        if num_before == 0:
+            raise FinError("Date is before the start of the calendar")
+
+        return int(index._bus_day_serials[num_before - 1])
 
 ###############################################################################
 
@@ -187,11 +563,47 @@ class Calendar:
         """ Returns a new date that is numDays business days after Date.
         All holidays in the chosen calendar are assumed not business days. """
 
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
-
         if isinstance(numDays, int) is False:
             raise FinError("Num days must be an integer")
 
+        if start_date._y < gFirstIndexedYear:
+            return self._add_business_days_by_stepping(start_date, numDays)
+
+        index = self._business_day_index(start_date._y)
+        i = int(start_date._excel_date) - index._start_serial
+
+        if numDays == 0:
+            return Date(start_date._d, start_date._m, start_date._y)
+
+        if numDays > 0:
+            # The rank of the business day we want in the index
+            rank = index._cum_bus_days[i] + numDays - 1
+
+            while rank >= len(index._bus_day_serials):
+                index.extend(index._start_year, index._end_year + 10)
+        else:
+            num_before = index._cum_bus_days[i] - index._bus_days[i]
+            rank = num_before + numDays
+
+            while rank < 0 and index._start_year > gFirstIndexedYear:
+                old_num_bus_days = len(index._bus_day_serials)
+                index.extend(index._start_year - 10, index._end_year)
+                rank += len(index._bus_day_serials) - old_num_bus_days
+
+            if rank < 0:
+                return self._add_business_days_by_stepping(start_date,
+                                                           numDays)
+
+        return Date.from_excel_date(index._bus_day_serials[rank])
+
+###############################################################################
+
+    def _add_business_days_by_stepping(self,
+                                       start_date: Date,
+                                       numDays: int):
+        """ Add business days one day at a time. This is only used for dates
+        before the start of the business day index. """
+
         dt = datetime.date(start_date._y, start_date._m, start_date._d)
         d = dt.day
         m = dt.month
@@ -222,6 +634,11 @@ class Calendar:
         """ Determines if a date is a business day according to the specified
         calendar. If it is it returns True, otherwise False. """
 
+        if dt._y >= gFirstIndexedYear:
+            index = self._business_day_index(dt._y)
+            i = int(dt._excel_date) - index._start_serial
+            return bool(index._bus_days[i])
+
         # For all calendars so far, SAT and SUN are not business days
         # If this ever changes I will need to add a filter here.
         if dt.is_weekend():
@@ -232,6 +649,37 @@ class Calendar:
         else:
             return True
 
+###############################################################################
+
+    def business_day_bitmap(self,
+                            start_year: int,
+                            end_year: int):
+        """ Returns NumPy arrays describing the business days of this calendar
+        from start year to end year inclusive so that they can be used in
+        numba kernels. These are the Excel serial number of the first day, an
+        array of uint8 flags which are 1 on a business day and 0 otherwise
+        indexed by serial number minus the first serial number, and the
+        cumulative number of business days up to and including each day. """
+
+        if start_year < gFirstIndexedYear:
+            raise FinError("Bitmap cannot start before " +
+                           str(gFirstIndexedYear))
+
+        index = self._business_day_index(start_year)
+        index.extend(start_year, end_year)
+
+        start_serial = _excel_serials(np.array([1]), np.array([1]),
+                                      np.array([start_year]))[0]
+        end_serial = _excel_serials(np.array([31]), np.array([12]),
+                                    np.array([end_year]))[0]
+
+        i1 = start_serial - index._start_serial
+        i2 = end_serial - index._start_serial + 1
+
+        bus_days = index._bus_days[i1:i2].copy()
+        cum_bus_days = np.cumsum(bus_days, dtype=np.int32)
+        return start_serial, bus_days, cum_bus_days
+
 ###############################################################################
 
     def is_holiday(self,
@@ -240,16 +688,39 @@ class Calendar:
         calendar. Weekends are not holidays unless the holiday falls on a 
         weekend date. """
 
+        if dt._y >= gFirstIndexedYear:
+            index = self._business_day_index(dt._y)
+            i = int(dt._excel_date) - index._start_serial
+            return bool(index._holidays[i])
+
         start_date = Date(1, 1, dt._y)
         day_in_year = dt._excel_date - start_date._excel_date + 1
-        weekday = dt._weekday
 
-        self._y = dt._y
-        self._m = dt._m
-        self._d = dt._d
+        for calendar_type in self._calendar_types:
+            calendar = Calendar(calendar_type)
+            if calendar._holiday_from_rules(dt._d, dt._m, dt._y,
+                                            day_in_year, dt._weekday):
+                return True
+
+        return False
+
+###############################################################################
+
+    def _holiday_from_rules(self,
+                            d: int,
+                            m: int,
+                            y: int,
+                            day_in_year: int,
+                            weekday: int):
+        """ Evaluates the holiday rules of a single calendar type for a date
+        given by its day, month, year, day in the year and weekday. This is
+        used to build the business day index. """
+
+        self._y = y
+        self._m = m
+        self._d = d
         self._day_in_year = day_in_year
         self._weekday = weekday
-        self._dt = dt
 
         if self._calendar_type == CalendarTypes.NONE:
             return self.holiday_none()
@@ -290,7 +761,7 @@ class Calendar:
     def holiday_weekend(self):
         """ Weekends by themselves are a holiday. """
 
-        if self._dt.is_weekend():
+        if self._weekday == Date.SAT or self._weekday == Date.SUN:
             return True
         else:
             return False
@@ -1099,7 +1570,7 @@ class Calendar:
 ###############################################################################
 
     def __str__(self):
-        s = self._calendar_type.name
+        s = "+".join([cal_type.name for cal_type in self._calendar_types])
         return s
 
 ###############################################################################
@@ -190,10 +190,172 @@ def weekday(day_count):
     return weekday
 
 ###############################################################################
+# Array kernels for the DateArray class. These work directly on the Excel
+# serial number and avoid the padded date list so that they can be used on
+# large vectors of dates. Serial numbers before 1 Mar 1900 are shifted by a
+# day to agree with Excel which believes that 29 Feb 1900 happened.
+###############################################################################
+
+gExcelSerialOf1Jan1970 = 25569
+
+
+@njit(fastmath=True, cache=True)
+def _days_from_civil(d, m, y):
+    """ Number of days since 1 Jan 1970 of the proleptic Gregorian date. """
+    if m <= 2:
+        y -= 1
+    era = y // 400
+    yoe = y - era * 400
+    if m > 2:
+        mp = m - 3
+    else:
+        mp = m + 9
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excel_serial(d, m, y):
+    """ Convert a day, month and year into an Excel serial number. """
+    days = _days_from_civil(d, m, y) + gExcelSerialOf1Jan1970
+    # Excel thinks 1900 was a leap year
+    if days < 61:
+        days -= 1
+    return days
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excel_serials(d, m, y):
+    """ Convert vectors of day, month and year into Excel serial numbers. """
+    n = len(d)
+    serials = np.empty(n, dtype=np.int32)
+    for i in range(0, n):
+        serials[i] = _excel_serial(d[i], m[i], y[i])
+    return serials
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excel_serial_dmy(serial):
+    """ Convert an Excel serial number into a day, month and year. """
+    z = serial - gExcelSerialOf1Jan1970
+    # Excel thinks 1900 was a leap year
+    if serial < 61:
+        z += 1
+    z += 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d = doy - (153 * mp + 2) // 5 + 1
+    if mp < 10:
+        m = mp + 3
+    else:
+        m = mp - 9
+    y = yoe + era * 400
+    if m <= 2:
+        y += 1
+    return d, m, y
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excel_dmy(serials):
+    """ Convert a vector of Excel serial numbers into vectors of day, month
+    and year. """
+    n = len(serials)
+    dd = np.empty(n, dtype=np.int32)
+    mm = np.empty(n, dtype=np.int32)
+    yy = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        dd[i], mm[i], yy[i] = _excel_serial_dmy(serials[i])
+
+    return dd, mm, yy
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _days_in_month(m, y):
+    """ The number of days in month m of year y. """
+    if m == 2:
+        if (y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0):
+            return 29
+        return 28
+    elif m == 4 or m == 6 or m == 9 or m == 11:
+        return 30
+    return 31
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _days_in_months(m, y):
+    """ Vector of the number of days in month m of year y. """
+    n = len(m)
+    num_days = np.empty(n, dtype=np.int32)
+    for i in range(0, n):
+        num_days[i] = _days_in_month(m[i], y[i])
+    return num_days
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_months(d, m, y, num_months):
+    """ Add a vector of months to vectors of day, month and year. The day is
+    capped at the end of the new month as in Date.add_months. """
+    n = len(d)
+    new_d = np.empty(n, dtype=np.int32)
+    new_m = np.empty(n, dtype=np.int32)
+    new_y = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        k = (m[i] - 1) + num_months[i]
+        new_y[i] = y[i] + k // 12
+        new_m[i] = k % 12 + 1
+
+    max_days = _days_in_months(new_m, new_y)
+
+    for i in range(0, n):
+        new_d[i] = min(d[i], max_days[i])
+
+    return new_d, new_m, new_y
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _add_months_to_serial(serial, num_months, end_of_month):
+    """ Add a number of months to an Excel serial number. The day is capped at
+    the end of the new month as in Date.add_months and is moved to the end of
+    the new month if the end of month flag is set. """
+    d, m, y = _excel_serial_dmy(serial)
+    k = (m - 1) + num_months
+    y = y + k // 12
+    m = k % 12 + 1
+    max_days = _days_in_month(m, y)
+    if end_of_month or d > max_days:
+        d = max_days
+    return _excel_serial(d, m, y)
+
+###############################################################################
 
 
 def vectorisation_helper(func):
     def wrapper(self_, other):
+        if isinstance(other, DateArray):
+            # Let the DateArray do the whole operation in one array call
+            return NotImplemented
         if isinstance(other, Iterable):
             # Store the type of other, then cast the output to be the same type
             output_type = type(other)
@@ -280,6 +442,15 @@ class Date():
         if ss < 0 or ss > 59:
             raise FinError("Seconds must be in range 0-59")
 
+        self._set(d, m, y, hh, mm, ss)
+
+    ###########################################################################
+
+    def _set(self, d, m, y, hh=0, mm=0, ss=0):
+        """ Set the fields of a date which has already been validated. This
+        is the only place where the fields are set so that every Date has the
+        same representation however it was created. """
+
         self._y = y
         self._m = m
         self._d = d
@@ -321,6 +492,33 @@ class Date():
         d, m, y = date.day, date.month, date.year
         return cls(d, m, y)
 
+    ###########################################################################
+
+    @classmethod
+    def from_excel_date(cls, excel_date: int):
+        """  Create a Date from an integer Excel serial number which counts the
+        days since 31 Dec 1899.
+        Example Input:
+        start_date = Date.from_excel_date(43891) """
+
+        excel_date = int(excel_date)
+
+        if excel_date < 61:
+            d, m, y = _excel_serial_dmy(excel_date)
+            return cls(d, m, y)
+
+        # After 1 Mar 1900 Excel serials are a fixed offset from ordinals
+        pydate = datetime.date.fromordinal(excel_date + 693594)
+        d, m, y = pydate.day, pydate.month, pydate.year
+
+        if gDateCounterList is None or y < gStartYear or y > gEndYear:
+            return cls(d, m, y)
+
+        # The date is valid by construction so we skip the validation
+        dt = cls.__new__(cls)
+        dt._set(d, m, y)
+        return dt
+
     ###########################################################################
     def _refresh(self):
         """ Update internal representation of date as number of days since the
@@ -956,6 +1154,276 @@ class Date():
         print(self)
 
 
+###############################################################################
+
+
+class DateArray():
+    """ A vector of dates held as a NumPy array of int32 Excel serial numbers
+    with day, month, year and weekday arrays alongside. All of the date
+    arithmetic is done on the whole array at once so that it is much faster
+    than working with a list of Date objects when there are many dates, such
+    as when generating the schedules of a large book of swaps. The internal
+    attributes mirror those of Date so the two can often be used in the same
+    way. Intraday times are not supported and are dropped. """
+
+    ###########################################################################
+
+    def __init__(self,
+                 dates: (list, np.ndarray)):
+        """ Create a DateArray from a list of Date objects, another DateArray
+        or a NumPy array of integer Excel serial numbers.
+
+        Example Input:
+        dates = DateArray([Date(1, 1, 2018), Date(1, 7, 2018)])
+        """
+
+        if isinstance(dates, DateArray):
+            serials = dates._excel_date.copy()
+        elif isinstance(dates, np.ndarray):
+            if np.issubdtype(dates.dtype, np.integer) is False:
+                if np.any(dates != np.floor(dates)):
+                    raise FinError("DateArray needs whole Excel serial numbers")
+            serials = dates.astype(np.int32).ravel()
+        elif isinstance(dates, (list, tuple)):
+            for dt in dates:
+                if isinstance(dt, Date) is False:
+                    raise FinError("DateArray needs a list of Dates")
+            serials = np.array([int(dt._excel_date) for dt in dates],
+                               dtype=np.int32)
+        else:
+            raise FinError("DateArray needs a list of Dates or an array")
+
+        if len(serials) > 0 and np.min(serials) < 1:
+            raise FinError("DateArray dates cannot be before 1 Jan 1900")
+
+        self._set_serials(serials)
+
+    ###########################################################################
+
+    @classmethod
+    def from_dmy(cls,
+                 d: np.ndarray,
+                 m: np.ndarray,
+                 y: np.ndarray):
+        """ Create a DateArray from vectors of day, month and year. The day
+        must be valid for the month.
+
+        Example Input:
+        dates = DateArray.from_dmy([1, 15], [1, 2], [2018, 2019])
+        """
+
+        d, m, y = np.broadcast_arrays(np.atleast_1d(d).astype(np.int64),
+                                      np.atleast_1d(m).astype(np.int64),
+                                      np.atleast_1d(y).astype(np.int64))
+
+        if np.any(y < 1900):
+            raise FinError("Year cannot be before 1900")
+
+        if np.any(m < 1) or np.any(m > 12):
+            raise FinError("Month must be 1-12")
+
+        if np.any(d < 1) or np.any(d > _days_in_months(m, y)):
+            raise FinError("DateArray: Day not valid.")
+
+        return cls(_excel_serials(d, m, y))
+
+    ###########################################################################
+
+    def _set_serials(self, serials):
+        """ Store the serial numbers and derive the calendar fields. """
+
+        self._excel_date = serials
+        self._d, self._m, self._y = _excel_dmy(serials)
+        self._weekday = (serials + 5) % 7
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._excel_date)
+
+    ###########################################################################
+
+    def __getitem__(self, key):
+        """ An integer index returns a Date while a slice or an index array
+        returns a DateArray. """
+
+        if isinstance(key, (int, np.integer)):
+            return Date.from_excel_date(self._excel_date[key])
+
+        return DateArray(self._excel_date[key])
+
+    ###########################################################################
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield Date(int(self._d[i]), int(self._m[i]), int(self._y[i]))
+
+    ###########################################################################
+
+    def to_list(self):
+        """ Returns the dates as a list of Date objects. """
+
+        return list(self)
+
+    ###########################################################################
+
+    def _other_serials(self, other):
+        """ Serial numbers of a Date or DateArray for use in a comparison. """
+
+        if isinstance(other, Date):
+            return other._excel_date
+        elif isinstance(other, DateArray):
+            return other._excel_date
+        else:
+            raise FinError("Can only compare a DateArray with dates")
+
+    ###########################################################################
+
+    def __gt__(self, other):
+        return self._excel_date > self._other_serials(other)
+
+    def __lt__(self, other):
+        return self._excel_date < self._other_serials(other)
+
+    def __ge__(self, other):
+        return self._excel_date >= self._other_serials(other)
+
+    def __le__(self, other):
+        return self._excel_date <= self._other_serials(other)
+
+    def __eq__(self, other):
+        return self._excel_date == self._other_serials(other)
+
+    def __ne__(self, other):
+        return self._excel_date != self._other_serials(other)
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        """ Number of days from the date(s) in other to each date. """
+        return self._excel_date - self._other_serials(other)
+
+    def __rsub__(self, other):
+        return self._other_serials(other) - self._excel_date
+
+    ###########################################################################
+
+    def is_weekend(self):
+        """ returns a boolean array which is True for dates on a weekend. """
+
+        return (self._weekday == Date.SAT) | (self._weekday == Date.SUN)
+
+    ###########################################################################
+
+    def is_eom(self):
+        """ returns a boolean array which is True for month end dates. """
+
+        return self._d == _days_in_months(self._m, self._y)
+
+    ###########################################################################
+
+    def eom(self):
+        """ returns the last date of the month of each date. """
+
+        last_day = _days_in_months(self._m, self._y)
+        return DateArray(_excel_serials(last_day, self._m, self._y))
+
+    ###########################################################################
+
+    def add_days(self,
+                 numDays: (int, np.ndarray) = 1):
+        """ Returns a new DateArray with each date moved on by numDays. This
+        can be a single integer or a vector of integers. """
+
+        numDays = np.asarray(numDays)
+
+        if np.issubdtype(numDays.dtype, np.integer) is False:
+            if np.any(numDays != np.round(numDays)):
+                raise FinError("Must only pass integers or float integers.")
+
+        return DateArray((self._excel_date + numDays).astype(np.int32))
+
+    ###########################################################################
+
+    def add_months(self,
+                   mm: (int, np.ndarray)):
+        """ Returns a new DateArray with each date moved on by mm months. This
+        can be a single integer or a vector of integers, one per date. A
+        DateArray holding one date and a vector of months gives a vector of
+        dates. If the day does not exist in the new month it falls on the
+        month end. """
+
+        mm = np.asarray(mm)
+
+        if np.issubdtype(mm.dtype, np.integer) is False:
+            if np.any(mm != np.round(mm)):
+                raise FinError("Must only pass integers or float integers.")
+
+        d, m, y, mm = np.broadcast_arrays(self._d, self._m, self._y,
+                                          mm.astype(np.int64))
+
+        d, m, y = _add_months(np.array(d), np.array(m), np.array(y),
+                              np.array(mm))
+
+        return DateArray(_excel_serials(d, m, y))
+
+    ###########################################################################
+
+    def add_tenor(self,
+                  tenor: str):
+        """ Return the dates following each date by a period given by the
+        tenor which is a string consisting of a number and a letter, the
+        letter being d, w, m , y for day, week, month or year. This gives the
+        same dates as calling Date.add_tenor on each date. The dates are NOT
+        weekend or holiday calendar adjusted. """
+
+        if isinstance(tenor, str) is False:
+            raise FinError("Tenor must be a string e.g. '5Y'")
+
+        tenStr = tenor.upper()
+
+        if tenStr == "ON" or tenStr == "TN":
+            return self.add_days(1)
+        elif tenStr[-1] == "D":
+            return self.add_days(int(tenStr[0:-1]))
+        elif tenStr[-1] == "W":
+            return self.add_days(7 * int(tenStr[0:-1]))
+        elif tenStr[-1] == "M":
+            return self.add_months(int(tenStr[0:-1]))
+        elif tenStr[-1] == "Y":
+            num_years = int(tenStr[0:-1])
+            new_dates = self.add_months(12 * num_years)
+
+            # Date.add_tenor steps a year at a time so a 29 Feb start date
+            # stays on the 28th even if it later lands in a leap year
+            if num_years != 0:
+                feb29 = (self._m == 2) & (self._d == 29)
+                if np.any(feb29):
+                    serials = new_dates._excel_date.copy()
+                    serials[feb29 & (new_dates._d == 29)] -= 1
+                    new_dates = DateArray(serials)
+
+            return new_dates
+        else:
+            raise FinError("Unknown tenor type in " + tenor)
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ returns a formatted string of the dates """
+
+        s = "DateArray(["
+        s += ", ".join([str(dt) for dt in self])
+        s += "])"
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ prints formatted string of the dates. """
+        print(self)
+
+
 ###############################################################################
 # Date functions that are not class members but are useful
 ###############################################################################
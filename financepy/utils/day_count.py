@@ -2,8 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from .date import Date, monthDaysLeapYear, monthDaysNotLeapYear, datediff
 from .date import is_leap_year
+from .date import DateArray, _excel_serials, _days_in_months
 from .error import FinError
 from .frequency import FrequencyTypes, annual_frequency
 from .global_vars import gDaysInYear
@@ -106,6 +109,10 @@ class DayCount:
         http://data.cbonds.info/files/cbondscalc/Calculator.pdf
         """
 
+        if isinstance(dt1, DateArray) or isinstance(dt2, DateArray):
+            return self._year_frac_array(dt1, dt2, dt3, freq_type,
+                                         isTerminationDate)
+
         d1 = dt1._d
         m1 = dt1._m
         y1 = dt1._y
@@ -287,6 +294,158 @@ class DayCount:
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def _year_frac_array(self,
+                         dt1: (Date, DateArray),
+                         dt2: (Date, DateArray),
+                         dt3: (Date, DateArray) = None,
+                         freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                         isTerminationDate: bool = False):
+        """ Vectorised version of year_frac for when either date is a
+        DateArray. It follows the same conventions and returns arrays of the
+        accrual factor, numerator and denominator. """
+
+        ex1 = np.atleast_1d(dt1._excel_date)
+        d1 = np.atleast_1d(dt1._d).astype(np.int64)
+        m1 = np.atleast_1d(dt1._m).astype(np.int64)
+        y1 = np.atleast_1d(dt1._y).astype(np.int64)
+
+        ex2 = np.atleast_1d(dt2._excel_date)
+        d2 = np.atleast_1d(dt2._d).astype(np.int64)
+        m2 = np.atleast_1d(dt2._m).astype(np.int64)
+        y2 = np.atleast_1d(dt2._y).astype(np.int64)
+
+        ex1, d1, m1, y1, ex2, d2, m2, y2 = \
+            [np.array(x) for x in np.broadcast_arrays(ex1, d1, m1, y1,
+                                                      ex2, d2, m2, y2)]
+
+        def is_leap(y):
+            return ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+
+        if self._type == DayCountTypes.THIRTY_360_BOND:
+
+            d1[d1 == 31] = 30
+            d2[(d2 == 31) & (d1 == 30)] = 30
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = np.full(num.shape, 360)
+
+        elif self._type == DayCountTypes.THIRTY_E_360:
+
+            d1[d1 == 31] = 30
+            d2[d2 == 31] = 30
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = np.full(num.shape, 360)
+
+        elif self._type == DayCountTypes.THIRTY_E_360_ISDA:
+
+            last_day_of_feb1 = (m1 == 2) & (d1 == _days_in_months(m1, y1))
+            last_day_of_feb2 = (m2 == 2) & (d2 == _days_in_months(m2, y2))
+
+            d1[(d1 == 31) | last_day_of_feb1] = 30
+            d2[d2 == 31] = 30
+
+            if isTerminationDate is False:
+                d2[last_day_of_feb2] = 30
+
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = np.full(num.shape, 360)
+
+        elif self._type == DayCountTypes.THIRTY_E_PLUS_360:
+
+            d1[d1 == 31] = 30
+            roll = (d2 == 31)
+            m2[roll] = m2[roll] + 1
+            d2[roll] = 1
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = np.full(num.shape, 360)
+
+        elif (self._type == DayCountTypes.ACT_ACT_ISDA) or \
+                (self._type == DayCountTypes.ZERO):
+
+            denom1 = np.where(is_leap(y1), 366, 365)
+            denom2 = np.where(is_leap(y2), 366, 365)
+
+            ones = np.ones(len(y1), dtype=np.int64)
+            start_year2 = _excel_serials(ones, ones, y1 + 1)
+            start_year3 = _excel_serials(ones, ones, y2)
+
+            days_year1 = np.floor(start_year2 - ex1)
+            days_year2 = np.floor(ex2 - start_year3)
+
+            same_year = (y1 == y2)
+
+            acc_factor = np.where(same_year,
+                                  (ex2 - ex1) / denom1,
+                                  days_year1 / denom1 + days_year2 / denom2
+                                  + (y2 - y1 - 1.0))
+
+            num = np.where(same_year, ex2 - ex1, days_year1 + days_year2)
+            den = np.where(same_year, denom1, denom1 + denom2)
+            return (acc_factor, num, den)
+
+        elif self._type == DayCountTypes.ACT_ACT_ICMA:
+
+            freq = annual_frequency(freq_type)
+
+            if dt3 is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+            num = ex2 - ex1
+            den = freq * (dt3._excel_date - ex1)
+
+        elif self._type == DayCountTypes.ACT_365F:
+
+            num = ex2 - ex1
+            den = np.full(num.shape, 365)
+
+        elif self._type == DayCountTypes.ACT_360:
+
+            num = ex2 - ex1
+            den = np.full(num.shape, 360)
+
+        elif self._type == DayCountTypes.ACT_365L:
+
+            frequency = annual_frequency(freq_type)
+
+            if dt3 is None:
+                y3 = y2
+                ex3 = None
+            else:
+                y3 = np.broadcast_to(dt3._y, y2.shape).astype(np.int64)
+                ex3 = np.broadcast_to(dt3._excel_date, y2.shape)
+
+            num = ex2 - ex1
+            den = np.full(num.shape, 365)
+
+            d29 = np.full(len(y1), 29, dtype=np.int64)
+            m02 = np.full(len(y1), 2, dtype=np.int64)
+            feb29 = np.where(is_leap(y1),
+                             _excel_serials(d29, m02, y1),
+                             np.where(is_leap(y3),
+                                      _excel_serials(d29, m02, y3),
+                                      1))
+
+            if frequency == 1:
+                if ex3 is None:
+                    raise FinError("ACT_365L annual accrual requires dt3")
+                den[(feb29 > ex1) & (feb29 <= ex3)] = 366
+            else:
+                den[is_leap(y3)] = 366
+
+        elif self._type == DayCountTypes.SIMPLE:
+
+            num = ex2 - ex1
+            den = np.full(num.shape, gDaysInYear)
+
+        else:
+
+            raise FinError(str(self._type) +
+                           " is not one of DayCountTypes")
+
+        acc_factor = num / den
+        return (acc_factor, num, den)
+
 ###############################################################################
 
     def __repr__(self):
@@ -8,7 +8,7 @@ from numba import njit, float64
 from typing import Union
 from prettytable import PrettyTable
 
-from .date import Date
+from .date import Date, DateArray
 from .global_vars import gDaysInYear, gSmall
 from .error import FinError
 from .day_count import DayCountTypes, DayCount
@@ -78,13 +78,14 @@ def pv01_times(t: float,
 ###############################################################################
 
 
-def times_from_dates(dt: (Date, list),
+def times_from_dates(dt: (Date, list, DateArray),
                      valuation_date: Date,
                      day_count_type: DayCountTypes = None):
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A DateArray is
+    converted in a single vectorised call. """
 
     if isinstance(valuation_date, Date) is False:
         raise FinError("Valuation date is not a Date")
@@ -116,6 +117,14 @@ def times_from_dates(dt: (Date, list),
 
         return np.array(times)
 
+    elif isinstance(dt, DateArray):
+        if dcCounter is None:
+            times = (dt - valuation_date) / gDaysInYear
+        else:
+            times = dcCounter.year_frac(valuation_date, dt)[0]
+
+        return times
+
     elif isinstance(dt, np.ndarray):
         raise FinError("You passed an ndarray instead of dates.")
     else:
@@ -214,7 +223,8 @@ def input_time(dt: Date,
     """ Validates a time input in relation to a curve. If it is a float then
     it returns a float as long as it is positive. If it is a Date then it
     converts it to a float. If it is a Numpy array then it returns the array
-    as long as it is all positive. """
+    as long as it is all positive. A DateArray is converted to an array of
+    times in one vectorised call. """
 
     small = 1e-8
 
@@ -238,6 +248,12 @@ def input_time(dt: Date,
             raise FinError("Date is before curve value date.")
         t = np.maximum(small, t)
         return t
+    elif isinstance(dt, DateArray):
+        t = (dt - curve._valuation_date) / gDaysInYear
+        if np.any(t < 0.0):
+            raise FinError("Date is before curve value date.")
+        t = np.maximum(small, t)
+        return t
     else:
         raise FinError("Unknown type.")
 
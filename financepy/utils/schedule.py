@@ -3,11 +3,18 @@
 ##############################################################################
 
 
+import numpy as np
+from numba import njit
+from collections import OrderedDict
+
 from .error import FinError
-from .date import Date
+from .date import Date, DateArray
+from .date import _excel_serial_dmy, _add_months_to_serial
 from .calendar import (Calendar, CalendarTypes)
 from .calendar import (BusDayAdjustTypes, DateGenRuleTypes)
+from .calendar import _adjust_serial
 from .frequency import (annual_frequency, FrequencyTypes)
+from .day_count import DayCount, DayCountTypes
 from .helpers import label_to_string
 from .helpers import check_argument_types
 
@@ -125,6 +132,14 @@ class Schedule:
 
     ###############################################################################
 
+    def schedule_date_array(self):
+        """ Returns the schedule of Dates as a DateArray so that it can be
+        passed to array functions such as DiscountCurve.df in one call. """
+
+        return DateArray(self.schedule_dates())
+
+    ###############################################################################
+
     def _generate(self):
         """ Generate schedule of dates according to specified date generation
         rules and also adjust these dates for holidays according to the
@@ -267,3 +282,548 @@ class Schedule:
         print(self)
 
 ###############################################################################
+
+###############################################################################
+# Kernels used to generate many schedules at once. The dates are Excel serial
+# numbers and the schedules are written into one flat array with offsets.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _generate_schedules(effective_dates,
+                        termination_dates,
+                        num_months,
+                        calendar_indices,
+                        bus_day_adjust_types,
+                        date_gen_rule_types,
+                        adjust_termination_dates,
+                        end_of_months,
+                        cds_style,
+                        start_serial,
+                        bus_days):
+    """ Generate the adjusted dates of many schedules using the same rules as
+    Schedule._generate, or as the CDS class if the cds style flag is set. The
+    row calendar_indices[i] of bus_days is the business day bitmap used for
+    schedule i. Returns the flat dates, the offsets of each schedule into
+    them, the adjusted termination dates and a status which is 1 if a
+    schedule has two matching dates and 2 if its dates are not monotonic. """
+
+    n = len(effective_dates)
+
+    # Upper bound on the number of dates in each schedule
+    max_offsets = np.zeros(n + 1, dtype=np.int64)
+    for i in range(0, n):
+        _, m1, y1 = _excel_serial_dmy(effective_dates[i])
+        _, m2, y2 = _excel_serial_dmy(termination_dates[i])
+        num_months_apart = (y2 - y1) * 12 + (m2 - m1) + 1
+        max_offsets[i + 1] = max_offsets[i] + \
+            num_months_apart // num_months[i] + 3
+
+    buffer = np.empty(max_offsets[n], dtype=np.int32)
+    counts = np.zeros(n, dtype=np.int64)
+    adjusted_termination_dates = np.empty(n, dtype=np.int32)
+    status = np.zeros(n, dtype=np.int32)
+
+    backward = DateGenRuleTypes.BACKWARD.value
+
+    for i in range(0, n):
+
+        pos = max_offsets[i]
+        e = effective_dates[i]
+        t = termination_dates[i]
+        step = num_months[i]
+        eom = end_of_months[i]
+        bus_day_adjust_type = bus_day_adjust_types[i]
+        cal_bus_days = bus_days[calendar_indices[i]]
+        c = 0
+
+        if date_gen_rule_types[i] == backward:
+
+            # Step back from the termination date to the previous coupon date
+            next_date = t
+            while next_date > e:
+                buffer[pos + c] = next_date
+                c += 1
+                if cds_style:
+                    next_date = _add_months_to_serial(next_date, -step, False)
+                else:
+                    next_date = _add_months_to_serial(t, -step * c, eom)
+
+            buffer[pos + c] = next_date
+            c += 1
+
+            # Reverse the order so that the dates are increasing
+            for j in range(0, c // 2):
+                tmp = buffer[pos + j]
+                buffer[pos + j] = buffer[pos + c - 1 - j]
+                buffer[pos + c - 1 - j] = tmp
+
+            if cds_style:
+                # All dates but the last are adjusted
+                for j in range(0, c - 1):
+                    buffer[pos + j] = _adjust_serial(buffer[pos + j],
+                                                     bus_day_adjust_type,
+                                                     start_serial,
+                                                     cal_bus_days)
+            else:
+                # The previous coupon and termination dates are not adjusted
+                for j in range(1, c - 1):
+                    buffer[pos + j] = _adjust_serial(buffer[pos + j],
+                                                     bus_day_adjust_type,
+                                                     start_serial,
+                                                     cal_bus_days)
+
+        else:
+
+            # Step forward from the effective date
+            next_date = e
+            while next_date < t:
+                buffer[pos + c] = _adjust_serial(next_date,
+                                                 bus_day_adjust_type,
+                                                 start_serial,
+                                                 cal_bus_days)
+                c += 1
+                if cds_style:
+                    next_date = _add_months_to_serial(next_date, step, False)
+                else:
+                    next_date = _add_months_to_serial(e, step * c, False)
+
+            buffer[pos + c] = t
+            c += 1
+
+        if cds_style:
+            # The final accrual date is moved forward by one day
+            buffer[pos + c - 1] = t + 1
+            adjusted_termination_dates[i] = t
+        else:
+            if buffer[pos] < e:
+                buffer[pos] = e
+
+            if adjust_termination_dates[i]:
+                t = _adjust_serial(t, bus_day_adjust_type,
+                                   start_serial, cal_bus_days)
+                buffer[pos + c - 1] = t
+
+            adjusted_termination_dates[i] = t
+
+            for j in range(1, c):
+                if buffer[pos + j] == buffer[pos + j - 1]:
+                    status[i] = 1
+                    break
+                elif buffer[pos + j] < buffer[pos + j - 1]:
+                    status[i] = 2
+                    break
+
+        counts[i] = c
+
+    # Compress the schedules into a contiguous array
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    for i in range(0, n):
+        offsets[i + 1] = offsets[i] + counts[i]
+
+    serials = np.empty(offsets[n], dtype=np.int32)
+    for i in range(0, n):
+        pos = max_offsets[i]
+        for j in range(0, counts[i]):
+            serials[offsets[i] + j] = buffer[pos + j]
+
+    return serials, offsets, adjusted_termination_dates, status
+
+###############################################################################
+
+
+def _to_serials(dates: (list, DateArray)):
+    """ Convert a Date, list of Dates or DateArray into integer serials. """
+
+    if isinstance(dates, Date):
+        return np.array([int(dates._excel_date)], dtype=np.int32)
+
+    return DateArray(dates)._excel_date
+
+###############################################################################
+
+
+def _broadcast_types(values, n: int, enum_type, name: str):
+    """ Return a list of n enum values from a single value or a list. """
+
+    if isinstance(values, enum_type):
+        return [values] * n
+
+    values = list(values)
+
+    if len(values) != n:
+        raise FinError("Number of " + name + " does not match number of "
+                       "schedules.")
+
+    for value in values:
+        if isinstance(value, enum_type) is False:
+            raise FinError("Invalid " + name + " " + str(value))
+
+    return values
+
+###############################################################################
+
+
+class ScheduleArray:
+    """ A set of schedules generated together in one vectorised call. This is
+    intended for building the schedules of a large book of trades. The
+    adjusted dates of all of the schedules are stored in one flat array of
+    Excel serial numbers and the dates of schedule i are those between
+    offsets i and i+1, in the compressed sparse row style. The dates are the
+    same as those produced by the Schedule class with the same inputs and
+    can be passed to SwapFixedLeg, SwapFloatLeg, Bond and CDS through their
+    schedule_dates argument so that they do not rebuild them. """
+
+    def __init__(self,
+                 effective_dates: (list, DateArray),
+                 termination_dates: (list, DateArray),
+                 freq_types: (FrequencyTypes, list) = FrequencyTypes.ANNUAL,
+                 calendar_types: (CalendarTypes, list) = CalendarTypes.WEEKEND,
+                 bus_day_adjust_types: (BusDayAdjustTypes, list) = BusDayAdjustTypes.FOLLOWING,
+                 date_gen_rule_types: (DateGenRuleTypes, list) = DateGenRuleTypes.BACKWARD,
+                 adjust_termination_dates: (bool, list, np.ndarray) = True,
+                 end_of_months: (bool, list, np.ndarray) = False):
+        """ Create the schedules from vectors of effective and termination
+        dates. Each of the remaining schedule conventions can be given as a
+        single value used for all of the schedules or as a list with one
+        value per schedule. The rules are those of the Schedule class. """
+
+        check_argument_types(self.__init__, locals())
+
+        self._generate(effective_dates,
+                       termination_dates,
+                       freq_types,
+                       calendar_types,
+                       bus_day_adjust_types,
+                       date_gen_rule_types,
+                       adjust_termination_dates,
+                       end_of_months,
+                       False)
+
+    ###########################################################################
+
+    @classmethod
+    def from_cds(cls,
+                 step_in_dates: (list, DateArray),
+                 maturity_dates: (list, DateArray),
+                 freq_types: (FrequencyTypes, list) = FrequencyTypes.QUARTERLY,
+                 calendar_types: (CalendarTypes, list) = CalendarTypes.WEEKEND,
+                 bus_day_adjust_types: (BusDayAdjustTypes, list) = BusDayAdjustTypes.FOLLOWING,
+                 date_gen_rule_types: (DateGenRuleTypes, list) = DateGenRuleTypes.BACKWARD):
+        """ Create the premium leg schedules of many CDS contracts using the
+        same rules as the CDS class. All of the dates except the last are
+        adjusted and the last is the maturity date plus one day. """
+
+        check_argument_types(cls.from_cds, locals())
+
+        schedules = cls.__new__(cls)
+        schedules._generate(step_in_dates,
+                            maturity_dates,
+                            freq_types,
+                            calendar_types,
+                            bus_day_adjust_types,
+                            date_gen_rule_types,
+                            False,
+                            False,
+                            True)
+        return schedules
+
+    ###########################################################################
+
+    def _generate(self,
+                  effective_dates,
+                  termination_dates,
+                  freq_types,
+                  calendar_types,
+                  bus_day_adjust_types,
+                  date_gen_rule_types,
+                  adjust_termination_dates,
+                  end_of_months,
+                  cds_style):
+        """ Generate all of the schedules using a business day bitmap for
+        each of the calendars used. """
+
+        effective_serials = _to_serials(effective_dates)
+        termination_serials = _to_serials(termination_dates)
+
+        n = len(effective_serials)
+
+        if len(termination_serials) != n:
+            raise FinError("Number of effective and termination dates differ.")
+
+        if np.any(effective_serials >= termination_serials):
+            raise FinError("Effective date must be before termination date.")
+
+        freq_types = _broadcast_types(freq_types, n, FrequencyTypes,
+                                      "frequency types")
+        calendar_types = _broadcast_types(calendar_types, n, CalendarTypes,
+                                          "calendar types")
+        bus_day_adjust_types = _broadcast_types(bus_day_adjust_types, n,
+                                                BusDayAdjustTypes,
+                                                "business day adjust types")
+        date_gen_rule_types = _broadcast_types(date_gen_rule_types, n,
+                                               DateGenRuleTypes,
+                                               "date generation rule types")
+
+        num_months = np.empty(n, dtype=np.int64)
+        month_steps = {}
+        for freq_type in set(freq_types):
+            frequency = annual_frequency(freq_type)
+            if frequency is None or frequency <= 0:
+                raise FinError("Cannot generate a schedule for frequency " +
+                               str(freq_type))
+            month_steps[freq_type] = int(12 / frequency)
+
+        for i in range(0, n):
+            num_months[i] = month_steps[freq_types[i]]
+
+        adjust_bus_days = np.array([t.value for t in bus_day_adjust_types],
+                                   dtype=np.int64)
+        gen_rules = np.array([t.value for t in date_gen_rule_types],
+                             dtype=np.int64)
+
+        adjust_termination_dates = np.broadcast_to(
+            np.asarray(adjust_termination_dates, dtype=np.bool_), (n,))
+        end_of_months = np.broadcast_to(
+            np.asarray(end_of_months, dtype=np.bool_), (n,))
+
+        # One bitmap row for each calendar used covering all of the dates
+        start_year = _excel_serial_dmy(int(effective_serials.min()))[2] - 2
+        end_year = _excel_serial_dmy(int(termination_serials.max()))[2] + 2
+
+        unique_calendar_types = list(dict.fromkeys(calendar_types))
+        calendar_numbers = {}
+        bus_days = []
+
+        for j, calendar_type in enumerate(unique_calendar_types):
+            calendar_numbers[calendar_type] = j
+            calendar = Calendar(calendar_type)
+            start_serial, cal_bus_days, _ = \
+                calendar.business_day_bitmap(start_year, end_year)
+            bus_days.append(cal_bus_days)
+
+        bus_days = np.vstack(bus_days)
+
+        calendar_indices = np.array([calendar_numbers[t]
+                                     for t in calendar_types], dtype=np.int64)
+
+        # No dates are adjusted on the NONE calendar
+        no_calendar = np.array([t == CalendarTypes.NONE
+                                for t in calendar_types], dtype=np.bool_)
+        adjust_bus_days[no_calendar] = BusDayAdjustTypes.NONE.value
+
+        serials, offsets, adjusted_termination_serials, status = \
+            _generate_schedules(effective_serials.astype(np.int32),
+                                termination_serials.astype(np.int32),
+                                num_months,
+                                calendar_indices,
+                                adjust_bus_days,
+                                gen_rules,
+                                np.ascontiguousarray(adjust_termination_dates),
+                                np.ascontiguousarray(end_of_months),
+                                cds_style,
+                                start_serial,
+                                bus_days)
+
+        if np.any(status == 1):
+            i = int(np.argmax(status == 1))
+            raise FinError("Two matching dates in schedule " + str(i))
+
+        if np.any(status == 2):
+            i = int(np.argmax(status == 2))
+            raise FinError("Dates are not monotonic in schedule " + str(i))
+
+        self._effective_dates = effective_serials
+        self._termination_dates = adjusted_termination_serials
+        self._freq_types = freq_types
+        self._calendar_types = calendar_types
+        self._bus_day_adjust_types = bus_day_adjust_types
+        self._date_gen_rule_types = date_gen_rule_types
+        self._serials = serials
+        self._offsets = offsets
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    ###########################################################################
+
+    def num_dates(self):
+        """ Returns the number of dates in each of the schedules. """
+
+        return np.diff(self._offsets)
+
+    ###########################################################################
+
+    def schedule_date_array(self,
+                            i=None):
+        """ Returns the dates of schedule i as a DateArray. If no schedule is
+        given then the dates of all of the schedules are returned in one
+        DateArray which can be split using the offsets. """
+
+        if i is None:
+            return DateArray(self._serials)
+
+        return DateArray(self._serials[self._offsets[i]:self._offsets[i+1]])
+
+    ###########################################################################
+
+    def schedule_dates(self,
+                       i: int):
+        """ Returns a list of the Dates of schedule i in the same form as
+        Schedule.schedule_dates. """
+
+        serials = self._serials[self._offsets[i]:self._offsets[i+1]]
+        return [Date.from_excel_date(serial) for serial in serials]
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Print out the details of the schedules. """
+
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM SCHEDULES", len(self))
+        s += label_to_string("NUM DATES", len(self._serials), "")
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ Print out the details of the schedules. """
+        print(self)
+
+###############################################################################
+
+###############################################################################
+# Swap legs with the same conventions share their accrual schedules. These are
+# held in a least recently used cache for the life of the process.
+###############################################################################
+
+gAccrualScheduleCache = OrderedDict()
+gAccrualScheduleCacheSize = 10000
+
+###############################################################################
+
+
+def _read_only_serials(dates: list):
+    """ Return the whole day Excel serial numbers of a list of dates as a
+    NumPy array which cannot be modified. """
+
+    serials = np.array([int(dt._excel_date) for dt in dates], dtype=np.int32)
+    serials.flags.writeable = False
+    return serials
+
+###############################################################################
+
+
+class AccrualSchedule:
+    """ The accrual start and end dates, payment dates, year fractions and
+    accrued days of the periods of a swap leg. These depend only on the
+    conventions of the leg and not on its coupon or notional so they can be
+    shared by many legs. They are stored as tuples as they must not be
+    modified once created. The dates and year fractions are also held as
+    read-only NumPy arrays for vectorised valuation. """
+
+    def __init__(self,
+                 schedule_dates: list,
+                 day_count_type: DayCountTypes,
+                 calendar_type: CalendarTypes,
+                 payment_lag: int = 0):
+        """ Create the accrual periods from a list of adjusted schedule dates
+        with the payment dates lagged by a number of business days. """
+
+        if len(schedule_dates) < 2:
+            raise FinError("Schedule has none or only one date")
+
+        day_counter = DayCount(day_count_type)
+        calendar = Calendar(calendar_type)
+
+        start_accrued_dates = schedule_dates[:-1]
+        end_accrued_dates = schedule_dates[1:]
+
+        payment_dates = []
+        year_fracs = []
+        accrued_days = []
+
+        for prev_dt, next_dt in zip(start_accrued_dates, end_accrued_dates):
+
+            if payment_lag == 0:
+                payment_date = next_dt
+            else:
+                payment_date = calendar.add_business_days(next_dt,
+                                                          payment_lag)
+
+            (year_frac, num, _) = day_counter.year_frac(prev_dt, next_dt)
+
+            payment_dates.append(payment_date)
+            year_fracs.append(year_frac)
+            accrued_days.append(num)
+
+        self._start_accrued_dates = tuple(start_accrued_dates)
+        self._end_accrued_dates = tuple(end_accrued_dates)
+        self._payment_dates = tuple(payment_dates)
+        self._year_fracs = tuple(year_fracs)
+        self._accrued_days = tuple(accrued_days)
+
+        self._start_accrued_serials = _read_only_serials(start_accrued_dates)
+        self._end_accrued_serials = _read_only_serials(end_accrued_dates)
+        self._payment_serials = _read_only_serials(payment_dates)
+        self._year_frac_array = np.array(year_fracs, dtype=np.float64)
+        self._year_frac_array.flags.writeable = False
+
+###############################################################################
+
+
+def accrual_schedule(effective_date: Date,
+                     termination_date: Date,
+                     freq_type: FrequencyTypes,
+                     day_count_type: DayCountTypes,
+                     calendar_type: CalendarTypes,
+                     bus_day_adjust_type: BusDayAdjustTypes,
+                     date_gen_rule_type: DateGenRuleTypes,
+                     end_of_month: bool = False,
+                     payment_lag: int = 0):
+    """ Return the AccrualSchedule for a swap leg with these conventions. The
+    first leg with a given set of conventions generates the schedule and all
+    later legs with the same conventions share it. """
+
+    key = (effective_date._excel_date, termination_date._excel_date,
+           freq_type, day_count_type, calendar_type, bus_day_adjust_type,
+           date_gen_rule_type, end_of_month, payment_lag)
+
+    schedule = gAccrualScheduleCache.get(key)
+
+    if schedule is not None:
+        gAccrualScheduleCache.move_to_end(key)
+        return schedule
+
+    schedule_dates = Schedule(effective_date,
+                              termination_date,
+                              freq_type,
+                              calendar_type,
+                              bus_day_adjust_type,
+                              date_gen_rule_type,
+                              end_of_month=end_of_month)._adjusted_dates
+
+    schedule = AccrualSchedule(schedule_dates,
+                               day_count_type,
+                               calendar_type,
+                               payment_lag)
+
+    gAccrualScheduleCache[key] = schedule
+
+    if len(gAccrualScheduleCache) > gAccrualScheduleCacheSize:
+        gAccrualScheduleCache.popitem(last=False)
+
+    return schedule
+
+###############################################################################
+
+
+def clear_accrual_schedule_cache():
+    """ Remove all of the shared accrual schedules. """
+
+    gAccrualScheduleCache.clear()
+
+###############################################################################
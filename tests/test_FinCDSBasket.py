@@ -140,3 +140,165 @@ def test_student_t():
                                   seed)
 
     assert round(v[2] * 10000, 4) == 26.2872
+
+
+def test_default_times_kernel():
+    from financepy.utils.math import N
+    from financepy.utils.helpers import uniform_to_default_time
+    from financepy.models.gauss_copula import default_times_gc
+    from financepy.models.gauss_copula import default_times_gc_chunks
+
+    num_trials = 500
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+
+    tau = default_times_gc(issuer_curves, corr_matrix, num_trials, seed)
+
+    np.random.seed(seed)
+    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
+    y = np.dot(np.linalg.cholesky(corr_matrix), x)
+
+    for iCredit in range(0, num_credits):
+        curve = issuer_curves[iCredit]
+        for iTrial in range(0, num_trials):
+            u = 1.0 - N(y[iCredit, iTrial])
+            t1 = uniform_to_default_time(u, curve._times, curve._values)
+            t2 = uniform_to_default_time(1.0 - u, curve._times,
+                                         curve._values)
+            assert abs(tau[iCredit, iTrial] - t1) < 1e-10 * t1
+            assert abs(tau[iCredit, num_trials + iTrial] - t2) < 1e-10 * t2
+
+    chunks = list(default_times_gc_chunks(issuer_curves, corr_matrix,
+                                          num_trials, seed, num_trials))
+    assert len(chunks) == 1
+    assert np.max(np.abs(chunks[0] - tau)) < 1e-12
+
+    chunks = list(default_times_gc_chunks(issuer_curves, corr_matrix,
+                                          num_trials, seed, 200,
+                                          use_sobol=True, antithetic=False))
+    assert [c.shape for c in chunks] == [(5, 200), (5, 200), (5, 100)]
+
+
+def test_gaussian_copula_levels():
+    num_trials = 1000
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+    levels = [1, 2, 3, 4, 5]
+
+    v = basket.value_gaussian_mc_levels(valuation_date,
+                                        levels,
+                                        issuer_curves,
+                                        corr_matrix,
+                                        libor_curve,
+                                        num_trials,
+                                        seed,
+                                        num_trials)
+
+    # Values given by the trial by trial loop in value_gaussian_mc for this
+    # seed before it was moved onto the streaming engine
+    reference_rpv01s = [4.146284708754201, 4.294759035021335,
+                        4.309487437960499, 4.3095171145695845,
+                        4.3095171145695845]
+    reference_spreads = [134.01266691926267, 15.456572311868788,
+                         0.5572590260179415, 0.0, 0.0]
+
+    for i, ntd in enumerate(levels):
+        assert abs(v["spread"][i] * 10000 - reference_spreads[i]) < 1e-8
+        assert abs(v["rpv01"][i] - reference_rpv01s[i]) < 1e-10
+
+        v1 = basket.value_gaussian_mc(valuation_date,
+                                      ntd,
+                                      issuer_curves,
+                                      corr_matrix,
+                                      libor_curve,
+                                      num_trials,
+                                      seed)
+        assert abs(v1[2] * 10000 - reference_spreads[i]) < 1e-8
+        assert abs(v1[1] - reference_rpv01s[i]) < 1e-10
+
+    assert np.all(np.diff(v["spread"]) <= 0.0)
+    assert np.all(v["spread_stderr"][0:3] > 0.0)
+    assert np.all(v["spread_stderr"][0:2] < 0.2 * v["spread"][0:2])
+
+    v2 = basket.value_gaussian_mc_levels(valuation_date,
+                                         levels,
+                                         issuer_curves,
+                                         corr_matrix,
+                                         libor_curve,
+                                         num_trials,
+                                         seed,
+                                         300)
+
+    diff = np.abs(v2["spread"] - v["spread"])
+    assert np.all(diff <= 4.0 * (v["spread_stderr"] + v2["spread_stderr"]))
+
+
+def test_student_t_chunks():
+    from scipy.stats import t as student
+    from financepy.utils.helpers import uniform_to_default_time
+    from financepy.models.student_t_copula import StudentTCopula
+
+    num_trials = 500
+    doF = 4
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+    model = StudentTCopula()
+
+    tau = model.default_times(issuer_curves, corr_matrix, doF, num_trials,
+                              seed)
+
+    np.random.seed(seed)
+    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
+    y = np.dot(np.linalg.cholesky(corr_matrix), x)
+    chi2 = np.random.chisquare(doF, size=num_trials)
+    u = student.cdf(y / np.sqrt(chi2 / doF), doF)
+
+    for iCredit in range(0, num_credits):
+        curve = issuer_curves[iCredit]
+        for iTrial in range(0, num_trials):
+            t1 = uniform_to_default_time(u[iCredit, iTrial], curve._times,
+                                         curve._values)
+            t2 = uniform_to_default_time(1.0 - u[iCredit, iTrial],
+                                         curve._times, curve._values)
+            assert abs(tau[iCredit, iTrial] - t1) < 1e-8 * t1
+            assert abs(tau[iCredit, num_trials + iTrial] - t2) < 1e-8 * t2
+
+    # Chunks with their own seeds do not depend on the order of generation
+    chunks = list(model.default_times_chunks(issuer_curves, corr_matrix, doF,
+                                             num_trials, seed, 200,
+                                             seed_per_chunk=True))
+    assert [c.shape for c in chunks] == [(5, 400), (5, 400), (5, 200)]
+
+    for chunk_index in [2, 0, 1]:
+        chunk = model.default_times_chunk(issuer_curves, corr_matrix, doF,
+                                          num_trials, seed, chunk_index, 200)
+        assert np.array_equal(chunk, chunks[chunk_index])
+
+    levels = [1, 2, 3]
+    v = basket.value_student_t_mc_levels(valuation_date,
+                                         levels,
+                                         issuer_curves,
+                                         corr_matrix,
+                                         doF,
+                                         libor_curve,
+                                         num_trials,
+                                         seed,
+                                         num_trials)
+
+    # Values given by the trial by trial loop in value_student_t_mc for this
+    # seed before it was moved onto the streaming engine
+    reference_rpv01s = [4.20201256964299, 4.27856002348388,
+                        4.2993894562974155]
+    reference_spreads = [118.81967586472146, 25.532552429278468,
+                         7.344354083825608]
+
+    for i, ntd in enumerate(levels):
+        assert abs(v["spread"][i] * 10000 - reference_spreads[i]) < 1e-8
+        assert abs(v["rpv01"][i] - reference_rpv01s[i]) < 1e-10
+
+        v1 = basket.value_student_t_mc(valuation_date,
+                                       ntd,
+                                       issuer_curves,
+                                       corr_matrix,
+                                       doF,
+                                       libor_curve,
+                                       num_trials,
+                                       seed)
+        assert abs(v1[2] * 10000 - reference_spreads[i]) < 1e-8
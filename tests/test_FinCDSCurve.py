@@ -2,14 +2,21 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+
 from financepy.utils.global_types import SwapTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
-from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.rates.dual_curve import IborDualCurve
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.credit.cds_curve import CDSCurve, build_cds_curves
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.credit.cds import CDS
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.utils.error import FinError
 
 
 def test_FinCDSCurve():
@@ -80,3 +87,282 @@ def test_FinCDSCurve():
     assert round(v['full_pv'] * 1000, 4) == -1.3178
     assert round(v['clean_pv'] * 1000, 4) == -1.3178
 
+
+def test_FinCDSCurveUpdateQuotes():
+
+    curve_date = Date(20, 12, 2018)
+
+    swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY, 0.05,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_date, [], [], swaps)
+
+    cds_contracts = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        cds = CDS(curve_date, maturity_date, 0.005 + 0.001 * (i - 1))
+        cds_contracts.append(cds)
+
+    issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+    old_values = issuer_curve._values.copy()
+
+    changed = issuer_curve.update_quotes({6: 0.0125})
+
+    assert cds_contracts[6]._running_coupon == 0.0125
+    cds = cds_contracts[6]
+    assert cds._flows[1] == cds._accrual_factors[1] * 0.0125 * cds._notional
+    assert list(changed) == [7, 8, 9, 10]
+    assert all(issuer_curve._values[0:7] == old_values[0:7])
+
+    new_issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+    assert max(abs(new_issuer_curve._values - issuer_curve._values)) < 1e-15
+
+
+def test_FinCDSCurveCache():
+
+    curve_date = Date(20, 12, 2018)
+
+    swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY, 0.05,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_date, [], [], swaps)
+
+    cds_contracts = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        cds = CDS(curve_date, maturity_date, 0.005 + 0.001 * (i - 1))
+        cds_contracts.append(cds)
+
+    issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+    cached_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40,
+                            use_cache=True)
+
+    times = np.linspace(0.0, 10.0, 41)
+    qs = issuer_curve.survival_prob(times)
+
+    assert all(cached_curve.survival_prob(times) == qs)
+    assert all(cached_curve.survival_prob(times) == qs)
+    assert cached_curve.cache_info()["hits"] >= 1
+
+    cached_curve.update_quotes({6: 0.0125})
+    issuer_curve.update_quotes({6: 0.0125})
+
+    assert all(cached_curve.survival_prob(times)
+               == issuer_curve.survival_prob(times))
+
+
+def test_FinCDSCurveBatchBuild():
+
+    curve_date = Date(20, 12, 2018)
+    step_in_date = curve_date.add_days(1)
+
+    swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY, 0.05,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_date, [], [], swaps)
+
+    tenors = ["6M", "1Y", "3Y", "5Y", "7Y", "10Y"]
+    spreads = np.array([[0.0040, 0.0045, 0.0060, 0.0075, 0.0085, 0.0090],
+                        [0.0200, 0.0210, 0.0230, 0.0250, 0.0255, 0.0260],
+                        [0.0900, 0.0800, 0.0700, 0.0650, 0.0600, 0.0600]])
+    recovery_rates = np.array([0.40, 0.40, 0.25])
+
+    issuer_curves = build_cds_curves(curve_date, step_in_date, tenors,
+                                     spreads, libor_curve, recovery_rates)
+
+    for i in range(0, 3):
+
+        cds_contracts = []
+        for k, tenor in enumerate(tenors):
+            cds_contracts.append(CDS(step_in_date, tenor, spreads[i, k]))
+
+        issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve,
+                                recovery_rates[i])
+
+        assert all(issuer_curves[i]._times == issuer_curve._times)
+        assert max(abs(issuer_curves[i]._values
+                       - issuer_curve._values)) < 1e-6
+
+        # The last contract reprices to zero on the batch curve
+        v = issuer_curves[i]._cds_contracts[-1].value(curve_date,
+                                                      issuer_curves[i],
+                                                      recovery_rates[i])
+        assert abs(v['clean_pv']) < 1e-6
+
+        # A curve from the solved survival probabilities is the same
+        curve = CDSCurve.from_survival_probabilities(curve_date,
+                                                     cds_contracts,
+                                                     libor_curve,
+                                                     recovery_rates[i],
+                                                     issuer_curve._times,
+                                                     issuer_curve._values)
+
+        assert all(curve._values == issuer_curve._values)
+        assert curve._cds_contracts is cds_contracts
+        assert curve.survival_prob(3.0) == issuer_curve.survival_prob(3.0)
+
+    # The bootstrap kernel only interpolates flat forward rates
+    try:
+        build_cds_curves(curve_date, step_in_date, tenors, spreads,
+                         libor_curve, recovery_rates,
+                         InterpTypes.LINEAR_ZERO_RATES)
+        assert False
+    except FinError:
+        pass
+
+    try:
+        CDSCurve.from_survival_probabilities(curve_date, cds_contracts,
+                                             libor_curve, 0.40,
+                                             [0.0, 1.0], [1.0, 0.99])
+        assert False
+    except FinError:
+        pass
+
+
+def test_FinCDSCurveSensitivities():
+
+    curve_date = Date(20, 12, 2018)
+    step_in_date = curve_date.add_days(1)
+
+    depos = [IborDeposit(curve_date, "3M", 0.02, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY,
+                        0.03 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_date, depos, [], swaps)
+
+    cds_contracts = []
+    for i in [1, 2, 3, 5, 7, 10]:
+        maturity_date = curve_date.add_months(12 * i)
+        cds_contracts.append(CDS(curve_date, maturity_date, 0.005 + 0.001 * i))
+
+    issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+
+    trades = [CDS(step_in_date, "4Y", 0.01, 10000000),
+              CDS(step_in_date, "7Y", 0.05, 5000000, long_protection=False)]
+
+    spread_sens = issuer_curve.spread_sensitivities(curve_date, trades, 0.40)
+    rate_sens = issuer_curve.rate_sensitivities(curve_date, trades, 0.40)
+
+    assert spread_sens.shape == (2, 6)
+    assert rate_sens.shape == (2, 11)
+
+    # Compare with a central difference of one of the curve coupons
+    bump = 0.0001
+    values = []
+    for sign in [1.0, -1.0]:
+        bumped_contracts = []
+        for i, cds in enumerate(cds_contracts):
+            coupon = cds._running_coupon + sign * bump * (i == 3)
+            bumped_contracts.append(CDS(curve_date, cds._maturity_date,
+                                        coupon))
+        bumped_curve = CDSCurve(curve_date, bumped_contracts, libor_curve,
+                                0.40)
+        values.append([trade.value(curve_date, bumped_curve, 0.40)['full_pv']
+                       for trade in trades])
+
+    for i in range(0, 2):
+        fd = (values[0][i] - values[1][i]) / 2.0
+        assert abs(spread_sens[i, 3] - fd) < 1e-3 * abs(fd)
+
+    # The sums are the credit and interest DV01s to first order
+    for i, trade in enumerate(trades):
+        credit_dv01 = trade.credit_dv01(curve_date, issuer_curve, 0.40)
+        interest_dv01 = trade.interest_dv01(curve_date, issuer_curve, 0.40)
+        assert abs(np.sum(spread_sens[i]) - credit_dv01) < \
+            1e-3 * abs(credit_dv01)
+        assert abs(np.sum(rate_sens[i]) - interest_dv01) < \
+            1e-3 * abs(interest_dv01)
+
+    portfolio_sens = issuer_curve.spread_sensitivities(curve_date, trades,
+                                                       0.40, aggregate=True)
+    assert np.max(np.abs(portfolio_sens - np.sum(spread_sens, axis=0))) < 1e-8
+
+
+def test_interest_dv01_dual_curve():
+
+    curve_date = Date(20, 12, 2018)
+    step_in_date = curve_date.add_days(1)
+
+    discount_curve = DiscountCurveFlat(curve_date, 0.025)
+    depos = [IborDeposit(curve_date, "3M", 0.02, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY,
+                        0.03 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborDualCurve(curve_date, discount_curve, depos, [], swaps)
+
+    cds_contracts = []
+    for i in [1, 3, 5, 7, 10]:
+        maturity_date = curve_date.add_months(12 * i)
+        cds_contracts.append(CDS(curve_date, maturity_date, 0.005 + 0.001 * i))
+
+    issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+    trade = CDS(step_in_date, "4Y", 0.01, 10000000)
+
+    coupons = [swap._fixed_leg._coupon for swap in swaps]
+    interest_dv01 = trade.interest_dv01(curve_date, issuer_curve, 0.40)
+
+    # Compare with rebuilding both curves from bumped instruments
+    bumped_depos = [IborDeposit(curve_date, "3M", 0.0201,
+                                DayCountTypes.ACT_360)]
+    bumped_swaps = []
+    for i in range(1, 11):
+        maturity_date = curve_date.add_months(12 * i)
+        swap = IborSwap(curve_date, maturity_date, SwapTypes.PAY,
+                        0.0301 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.ACT_365F)
+        bumped_swaps.append(swap)
+
+    bumped_libor_curve = IborDualCurve(curve_date, discount_curve,
+                                       bumped_depos, [], bumped_swaps)
+    bumped_issuer_curve = CDSCurve(curve_date, cds_contracts,
+                                   bumped_libor_curve, 0.40)
+
+    v0 = trade.value(curve_date, issuer_curve, 0.40)['full_pv']
+    v1 = trade.value(curve_date, bumped_issuer_curve, 0.40)['full_pv']
+
+    assert interest_dv01 != 0.0
+    assert abs(interest_dv01 - (v1 - v0)) < 1e-6 * abs(interest_dv01)
+
+    # The curve instruments are not changed by the bump
+    assert depos[0]._deposit_rate == 0.02
+    assert [swap._fixed_leg._coupon for swap in swaps] == coupons
+
+
+def test_df_date_array():
+
+    curve_date = Date(20, 12, 2018)
+    libor_curve = DiscountCurveFlat(curve_date, 0.025)
+
+    cds_contracts = [CDS(curve_date, curve_date.add_months(12 * i), 0.01)
+                     for i in [1, 3, 5]]
+    issuer_curve = CDSCurve(curve_date, cds_contracts, libor_curve, 0.40)
+
+    dates = [curve_date.add_months(6 * i) for i in range(1, 11)]
+    dfs = issuer_curve.df(DateArray(dates))
+
+    assert np.max(np.abs(dfs - [issuer_curve.df(dt) for dt in dates])) < \
+        1e-15
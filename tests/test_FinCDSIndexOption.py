@@ -12,6 +12,9 @@ from financepy.products.rates.ibor_single_curve import IborSingleCurve
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.credit.cds import CDS
 from financepy.products.credit.cds_index_option import CDSIndexOption
+from financepy.products.credit.cds_index_option import value_anderson_grid
+from financepy.products.credit.cds_index_option import \
+    value_adjusted_black_grid, implied_volatility_adjusted_black_grid
 from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
 import os
 import numpy as np
@@ -131,3 +134,121 @@ def test_full_priceCDSIndexOption():
         assert round(expH, 1) == results[4]
         assert round(v_pay_2, 1) == results[5]
         assert round(v_rec_2, 1) == results[6]
+
+
+def test_index_option_grid():
+
+    tradeDate = Date(1, 8, 2007)
+    step_in_date = tradeDate.add_days(1)
+    valuation_date = step_in_date
+
+    libor_curve = build_Ibor_Curve(tradeDate)
+
+    maturity_dates = [tradeDate.next_cds_date(m) for m in (36, 60, 84, 120)]
+
+    path = os.path.join(os.path.dirname(__file__),
+                        './/data//CDX_NA_IG_S7_SPREADS.csv')
+    f = open(path, 'r')
+    data = f.readlines()
+    f.close()
+    issuer_curves = []
+
+    for row in data[1:21]:
+
+        splitRow = row.split(",")
+        cds_contracts = []
+        for k, maturity_date in enumerate(maturity_dates):
+            spd = float(splitRow[k + 1]) / 10000.0
+            cds_contracts.append(CDS(step_in_date, maturity_date, spd))
+
+        issuer_curve = CDSCurve(valuation_date,
+                                cds_contracts,
+                                libor_curve,
+                                float(splitRow[5]))
+
+        issuer_curves.append(issuer_curve)
+
+    indexMaturityDates = [Date(20, 12, 2009),
+                          Date(20, 12, 2011),
+                          Date(20, 12, 2013),
+                          Date(20, 12, 2016)]
+    indexRecovery = 0.40
+
+    cds_contracts = [CDS(valuation_date, dt, 0.0040)
+                     for dt in indexMaturityDates]
+    index_curve = CDSCurve(valuation_date, cds_contracts,
+                           libor_curve, indexRecovery)
+
+    index_coupon = 0.004
+    expiry_dates = [Date(1, 11, 2007), Date(1, 2, 2008)]
+    maturity_date = Date(20, 12, 2011)
+    strikes = np.array([30.0, 40.0, 50.0]) / 10000.0
+    vols = np.array([[0.40, 0.45, 0.50], [0.50, 0.55, 0.60]])
+    notional = 10000.0
+
+    black = value_adjusted_black_grid(valuation_date,
+                                      expiry_dates,
+                                      maturity_date,
+                                      index_coupon,
+                                      strikes,
+                                      vols,
+                                      index_curve,
+                                      indexRecovery,
+                                      libor_curve,
+                                      notional)
+
+    anderson = value_anderson_grid(valuation_date,
+                                   expiry_dates,
+                                   maturity_date,
+                                   index_coupon,
+                                   strikes,
+                                   vols,
+                                   issuer_curves,
+                                   indexRecovery,
+                                   notional)
+
+    for i, expiry_date in enumerate(expiry_dates):
+        for j, strike in enumerate(strikes):
+
+            option = CDSIndexOption(expiry_date,
+                                    maturity_date,
+                                    index_coupon,
+                                    strike,
+                                    notional)
+
+            v_pay, v_rec = option.value_adjusted_black(valuation_date,
+                                                       index_curve,
+                                                       indexRecovery,
+                                                       libor_curve,
+                                                       vols[i, j])
+
+            assert abs(black['payer'][i, j] - v_pay) < 1e-10
+            assert abs(black['receiver'][i, j] - v_rec) < 1e-10
+
+            v_pay, v_rec, strikeValue, mu, expH = option.value_anderson(
+                valuation_date, issuer_curves, indexRecovery, vols[i, j])
+
+            assert abs(anderson['payer'][i, j] - v_pay) < 1e-10
+            assert abs(anderson['receiver'][i, j] - v_rec) < 1e-10
+            assert abs(anderson['x'][i, j] * 10000.0 - mu) < 1e-10
+
+    for long_protection in [True, False]:
+
+        if long_protection:
+            prices = black['payer']
+        else:
+            prices = black['receiver']
+
+        sigmas = implied_volatility_adjusted_black_grid(valuation_date,
+                                                        expiry_dates,
+                                                        maturity_date,
+                                                        index_coupon,
+                                                        strikes,
+                                                        prices,
+                                                        index_curve,
+                                                        indexRecovery,
+                                                        libor_curve,
+                                                        notional,
+                                                        long_protection)
+
+        assert np.max(np.abs(sigmas - vols)) < 1e-6
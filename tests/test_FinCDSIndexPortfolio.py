@@ -107,3 +107,111 @@ def test_CDSIndexPortfolio():
     assert round(intrinsicSpd5Y, 4) == 35.5393
     assert round(intrinsicSpd7Y, 4) == 49.0120
     assert round(intrinsicSpd10Y, 4) == 61.4139
+
+
+def test_adjust_indices():
+    tradeDate = Date(1, 8, 2007)
+    step_in_date = tradeDate.add_days(1)
+    valuation_date = step_in_date
+
+    maturity_dates = [tradeDate.next_cds_date(m) for m in (36, 60, 84, 120)]
+
+    path = os.path.join(os.path.dirname(__file__),
+                        './/data//CDX_NA_IG_S7_SPREADS.csv')
+    f = open(path, 'r')
+    data = f.readlines()
+    f.close()
+
+    # The second index has wider spreads and its own Libor curve
+    series_issuer_curves = []
+    for scale in [1.0, 1.5]:
+        libor_curve = build_Ibor_Curve(tradeDate)
+        issuer_curves = []
+        for row in data[1:]:
+            splitRow = row.split(",")
+            cds_contracts = []
+            for k, maturity_date in enumerate(maturity_dates):
+                spd = scale * float(splitRow[k + 1]) / 10000.0
+                cds_contracts.append(CDS(step_in_date, maturity_date, spd))
+            issuer_curve = CDSCurve(valuation_date, cds_contracts,
+                                    libor_curve, float(splitRow[5]))
+            issuer_curves.append(issuer_curve)
+        series_issuer_curves.append(issuer_curves)
+
+    index_maturity_dates = [Date(20, 12, 2009), Date(20, 12, 2011),
+                            Date(20, 12, 2013), Date(20, 12, 2016)]
+
+    series_coupons = [[0.002, 0.0037, 0.0050, 0.0063],
+                      [0.0035, 0.0055, 0.0075]]
+    series_upfronts = [[0.0, 0.0, 0.0, 0.0], [0.0, 0.002, 0.0]]
+    series_maturity_dates = [index_maturity_dates, index_maturity_dates[0:3]]
+
+    cdsIndex = CDSIndexPortfolio()
+    tolerance = 1e-8
+
+    adjusted = cdsIndex.hazard_rate_adjust_indices(valuation_date,
+                                                   series_issuer_curves,
+                                                   series_coupons,
+                                                   series_upfronts,
+                                                   series_maturity_dates,
+                                                   0.40,
+                                                   tolerance)
+
+    for s in range(0, 2):
+
+        single = cdsIndex.hazard_rate_adjust_intrinsic(
+            valuation_date,
+            series_issuer_curves[s],
+            series_coupons[s],
+            series_upfronts[s],
+            series_maturity_dates[s],
+            0.40,
+            tolerance)
+
+        for curve1, curve2 in zip(adjusted[s], single):
+            assert max(abs(curve1._values - curve2._values)) < 1e-12
+
+        # The adjusted curves reprice each index maturity
+        for i, maturity_date in enumerate(series_maturity_dates[s]):
+            rpv01 = cdsIndex.intrinsic_rpv01(valuation_date, valuation_date,
+                                             maturity_date, adjusted[s])
+            prot = cdsIndex.intrinsic_protection_leg_pv(
+                valuation_date, valuation_date, maturity_date, adjusted[s])
+            value = series_upfronts[s][i] + series_coupons[s][i] * rpv01
+            assert abs(value / prot - 1.0) < tolerance
+
+    adjusted = cdsIndex.spread_adjust_indices(valuation_date,
+                                              series_issuer_curves,
+                                              series_coupons,
+                                              series_upfronts,
+                                              series_maturity_dates,
+                                              0.40,
+                                              tolerance)
+
+    for s in range(0, 2):
+
+        single = cdsIndex.spread_adjust_intrinsic(valuation_date,
+                                                  series_issuer_curves[s],
+                                                  series_coupons[s],
+                                                  series_upfronts[s],
+                                                  series_maturity_dates[s],
+                                                  0.40,
+                                                  tolerance)
+
+        for curve1, curve2 in zip(adjusted[s], single):
+            assert max(abs(curve1._values - curve2._values)) < 1e-12
+
+        # The first maturity only depends on the first curve interval
+        rpv01 = cdsIndex.intrinsic_rpv01(valuation_date, valuation_date,
+                                         index_maturity_dates[0], adjusted[s])
+        prot = cdsIndex.intrinsic_protection_leg_pv(
+            valuation_date, valuation_date, index_maturity_dates[0],
+            adjusted[s])
+        value = series_upfronts[s][0] + series_coupons[s][0] * rpv01
+        assert abs(value / prot - 1.0) < tolerance
+
+    # The second index has no 10Y maturity so its 10Y spreads are unchanged
+    for curve1, curve2 in zip(adjusted[1], series_issuer_curves[1]):
+        spd1 = curve1._cds_contracts[3]._running_coupon
+        spd2 = curve2._cds_contracts[3]._running_coupon
+        assert spd1 == spd2
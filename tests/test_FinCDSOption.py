@@ -5,6 +5,12 @@
 from helpers import buildFullIssuerCurve
 from financepy.utils.date import Date
 from financepy.products.credit.cds_option import CDSOption
+from financepy.products.credit.cds_option import value_cds_option_grid
+from financepy.products.credit.cds_option import \
+    implied_volatility_cds_option_grid
+from financepy.utils.global_vars import gDaysInYear
+from scipy.stats import norm
+import numpy as np
 
 
 # This reproduces example on page 38 of Open Gamma note on CDS Option
@@ -43,3 +49,62 @@ def test_cds_option():
 
         assert round(v, 4) == result
         assert vol == 0.3
+
+
+def test_cds_option_grid():
+
+    expiry_dates = [expiry_date, Date(20, 6, 2014), Date(20, 12, 2014)]
+    strikes = np.array([100, 125, 150, 175, 200]) / 10000.0
+    vols = np.array([0.25, 0.30, 0.35])
+
+    for long_protection in [True, False]:
+
+        values = value_cds_option_grid(valuation_date,
+                                       issuer_curve,
+                                       expiry_dates,
+                                       maturity_date,
+                                       strikes,
+                                       vols,
+                                       notional,
+                                       long_protection)
+
+        for i, expiry in enumerate(expiry_dates):
+            for j, strike in enumerate(strikes):
+                cdsOption = CDSOption(expiry,
+                                      maturity_date,
+                                      strike,
+                                      notional,
+                                      long_protection)
+                v = cdsOption.value(valuation_date, issuer_curve, vols[i])
+                assert abs(values['value'][i, j] - v) < 1e-10
+
+        sigmas = implied_volatility_cds_option_grid(valuation_date,
+                                                    issuer_curve,
+                                                    expiry_dates,
+                                                    maturity_date,
+                                                    strikes,
+                                                    values['value'],
+                                                    notional,
+                                                    long_protection)
+
+        # The volatility is only determined where the vega is not tiny
+        priced = values['vega'] > 1e-3 * notional
+        assert np.max(np.abs(sigmas - vols[:, np.newaxis])[priced]) < 1e-6
+
+    # The delta is the derivative with respect to the forward spread
+    bump = 1e-7
+    strike = strikes[2]
+    f = values['forward_spread'][1]
+    rpv01 = values['forward_rpv01'][1]
+    texp = (expiry_dates[1] - valuation_date) / gDaysInYear
+
+    def payer(fwd):
+        d1 = (np.log(fwd / strike) + 0.5 * 0.09 * texp) / (0.3 * np.sqrt(texp))
+        d2 = d1 - 0.3 * np.sqrt(texp)
+        return (fwd * norm.cdf(d1) - strike * norm.cdf(d2)) * rpv01 * notional
+
+    delta = (payer(f + bump) - payer(f - bump)) / (2.0 * bump)
+    values = value_cds_option_grid(valuation_date, issuer_curve,
+                                   expiry_dates, maturity_date, strikes, vols,
+                                   notional)
+    assert abs(values['delta'][1, 2] - delta) < 1e-4 * abs(delta)
@@ -0,0 +1,67 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_portfolio import CDSPortfolio
+
+
+def test_FinCDSPortfolio():
+
+    valuation_date = Date(20, 12, 2018)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    issuer_curves = []
+    for j in range(0, 3):
+        cds_contracts = []
+        for i in range(1, 11):
+            maturity_date = valuation_date.add_months(12 * i)
+            cds = CDS(valuation_date, maturity_date,
+                      0.005 + 0.002 * j + 0.001 * (i - 1))
+            cds_contracts.append(cds)
+
+        issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve,
+                                0.40)
+        issuer_curves.append(issuer_curve)
+
+    step_in_date = valuation_date.add_days(1)
+    contracts = []
+    for i, tenor in enumerate(["6M", "1Y", "3Y", "5Y", "7Y", "10Y"]):
+        cds = CDS(step_in_date, tenor, 0.01 + 0.002 * i,
+                  long_protection=(i % 2 == 0))
+        contracts.append(cds)
+
+    issuer_indices = [0, 1, 2, 0, 1, 2]
+    recovery_rates = np.array([0.4, 0.4, 0.3, 0.4, 0.25, 0.4])
+
+    portfolio = CDSPortfolio(contracts, issuer_indices, recovery_rates)
+    values = portfolio.value(valuation_date, issuer_curves)
+
+    for i, cds in enumerate(contracts):
+        issuer_curve = issuer_curves[issuer_indices[i]]
+        v = cds.value(valuation_date, issuer_curve, recovery_rates[i])
+        rpv01 = cds.risky_pv01(valuation_date, issuer_curve)
+        spd = cds.par_spread(valuation_date, issuer_curve, recovery_rates[i])
+
+        assert abs(values['full_pv'][i] - v['full_pv']) < 1e-8
+        assert abs(values['clean_pv'][i] - v['clean_pv']) < 1e-8
+        assert abs(values['full_rpv01'][i] - rpv01['full_rpv01']) < 1e-12
+        assert abs(values['clean_rpv01'][i] - rpv01['clean_rpv01']) < 1e-12
+        assert abs(values['par_spread'][i] - spd) < 1e-14
@@ -7,6 +7,7 @@ from financepy.utils.date import Date
 from financepy.products.credit.cds_tranche import CDSTranche
 from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
 from financepy.products.credit.cds_tranche import FinLossDistributionBuilder
+from financepy.products.credit.cds_tranche import value_tranches_bc
 
 
 tradeDate = Date(1, 3, 2007)
@@ -172,3 +173,53 @@ def test_heterogeneous():
         num_points,
         method)
     assert round(v[3] * 10000, 4) == 0.3379
+
+
+def test_base_correlation_ladder():
+    num_points = 40
+
+    issuer_curves = loadHeterogeneousSpreadCurves(valuation_date,
+                                                  libor_curve)
+
+    strikes = [0.0, 0.03, 0.06, 0.09, 0.12, 0.22]
+    base_corrs = [0.0, 0.15, 0.25, 0.30, 0.35, 0.50]
+    maturities = [Date(20, 12, 2009), Date(20, 12, 2011)]
+
+    ladder = []
+    corr1s = []
+    corr2s = []
+    for maturity_date in maturities:
+        for i in range(0, len(strikes) - 1):
+            ladder.append(CDSTranche(valuation_date, maturity_date,
+                                     strikes[i], strikes[i + 1]))
+            corr1s.append(base_corrs[i])
+            corr2s.append(base_corrs[i + 1])
+
+    # Tranche spreads in bp given by value_bc one tranche at a time before
+    # it was moved onto the shared ladder engine
+    reference_spreads = {
+        FinLossDistributionBuilder.RECURSION:
+            [689.0010, 10.4683, 5.8653, 1.7990, 0.4006,
+             1138.7681, 95.1951, 41.1590, 16.0659, 5.3061],
+        FinLossDistributionBuilder.ADJUSTED_BINOMIAL:
+            [688.9062, 10.5095, 5.8774, 1.8311, 0.3923,
+             1139.0328, 94.8097, 41.2232, 16.0737, 5.3060],
+        FinLossDistributionBuilder.GAUSSIAN:
+            [634.8642, 7.2842, 7.2871, 5.3915, 3.7949,
+             1181.0860, 48.3962, 28.9900, 12.3538, 5.4277],
+        FinLossDistributionBuilder.LHP:
+            [695.5214, 2.2874, 5.1834, 1.4506, 0.1257,
+             1152.7313, 67.3946, 39.2678, 15.7921, 5.3550]}
+
+    for method in FinLossDistributionBuilder:
+        v = value_tranches_bc(valuation_date, ladder, issuer_curves,
+                              upfront, spd, corr1s, corr2s, num_points,
+                              method)
+
+        for i, tranche in enumerate(ladder):
+            v1 = tranche.value_bc(valuation_date, issuer_curves, upfront,
+                                  spd, corr1s[i], corr2s[i], num_points,
+                                  method)
+            ref = reference_spreads[method][i]
+            assert abs(v[i, 3] * 10000 - ref) < 1e-4
+            assert abs(v1[3] * 10000 - ref) < 1e-4
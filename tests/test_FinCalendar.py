@@ -3,8 +3,9 @@
 ###############################################################################
 
 from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
 from financepy.utils.date import set_date_format, DateFormatTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
 import sys
 
 # Between 3rd of January 2020 and 3rd of January 2030
@@ -36,3 +37,41 @@ def test_add_business_day():
 
         assert cal.add_business_days(start, num_days) == end, \
             f"Landed on incorrect business day using {calendar_type}"
+
+
+def test_joint_calendar():
+    uk = Calendar(CalendarTypes.UNITED_KINGDOM)
+    us = Calendar(CalendarTypes.UNITED_STATES)
+    joint = Calendar((CalendarTypes.UNITED_KINGDOM,
+                      CalendarTypes.UNITED_STATES))
+
+    dt = Date(1, 1, 2021)
+    while dt < Date(1, 1, 2023):
+        assert joint.is_business_day(dt) == \
+            (uk.is_business_day(dt) and us.is_business_day(dt))
+        dt = dt.add_days(1)
+
+    # Independence day is only a US holiday
+    assert joint.adjust(Date(4, 7, 2022), BusDayAdjustTypes.FOLLOWING) == \
+        Date(5, 7, 2022)
+
+
+def test_business_day_bitmap():
+    cal = Calendar(CalendarTypes.TARGET)
+    start_serial, bus_days, cum_bus_days = cal.business_day_bitmap(2020, 2029)
+
+    assert start_serial == Date(1, 1, 2020)._excel_date
+    assert len(bus_days) == Date(1, 1, 2030) - Date(1, 1, 2020)
+    assert bus_days[0] == 0
+    assert bus_days[2] == 1
+    assert cum_bus_days[-1] == bus_days.sum()
+
+
+def test_adjust_date_array():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+    dates = [Date(1, 1, 2022).add_days(i) for i in range(0, 730)]
+
+    for bus_day_adjust_type in BusDayAdjustTypes:
+        adjusted = cal.adjust(DateArray(dates), bus_day_adjust_type)
+        for i in range(0, len(dates)):
+            assert adjusted[i] == cal.adjust(dates[i], bus_day_adjust_type)
@@ -4,7 +4,7 @@
 
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCount, DayCountTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
 
 
 start = Date(1, 1, 2019)
@@ -90,3 +90,16 @@ def test_year_frace_SIMPLE():
     answer = day_count.year_frac(start, end, end, finFreq)
 
     assert round(answer[0], 4) == 0.3836
+
+
+def test_year_frac_date_array():
+    ends = [end, Date(29, 2, 2020), Date(31, 12, 2021), Date(31, 3, 2024)]
+    end_array = DateArray(ends)
+
+    for day_count_type in DayCountTypes:
+        day_count = DayCount(day_count_type)
+        answers = day_count.year_frac(start, end_array, end_array, finFreq)
+
+        for i, dt in enumerate(ends):
+            answer = day_count.year_frac(start, dt, dt, finFreq)
+            assert round(answers[0][i], 10) == round(answer[0], 10)
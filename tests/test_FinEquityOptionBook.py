@@ -0,0 +1,119 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.global_types import OptionTypes
+from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+from financepy.products.equity.equity_option_book import EquityOptionBook
+
+
+def test_FinEquityOptionBook():
+
+    valuation_date = Date(1, 1, 2015)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+    dividend_curves = [DiscountCurveFlat(valuation_date, 0.01),
+                       DiscountCurveFlat(valuation_date, 0.03)]
+
+    expiry_dates = [Date(1, 7, 2015), Date(1, 1, 2016), Date(1, 7, 2015),
+                    Date(1, 3, 2015), Date(1, 1, 2016), Date(1, 7, 2015)]
+    strikes = np.array([100.0, 90.0, 110.0, 95.0, 120.0, 80.0])
+    option_types = [OptionTypes.EUROPEAN_CALL, OptionTypes.EUROPEAN_PUT,
+                    OptionTypes.EUROPEAN_PUT, OptionTypes.EUROPEAN_CALL,
+                    OptionTypes.EUROPEAN_CALL, OptionTypes.EUROPEAN_PUT]
+    num_options = np.array([1.0, 2.0, -3.0, 5.0, 1.0, 10.0])
+    underlying_indices = [0, 1, 0, 1, 0, 1]
+    stock_prices = np.array([100.0, 85.0])
+    vols = np.array([0.30, 0.25, 0.35, 0.20, 0.30, 0.40])
+
+    book = EquityOptionBook(expiry_dates, strikes, option_types, num_options,
+                            underlying_indices)
+
+    values = book.value_and_greeks(valuation_date, stock_prices,
+                                   discount_curve, dividend_curves, vols)
+
+    assert np.allclose(book.value(valuation_date, stock_prices,
+                                  discount_curve, dividend_curves, vols),
+                       values['value'], atol=1e-12)
+
+    for i in range(0, len(strikes)):
+
+        option = EquityVanillaOption(expiry_dates[i], strikes[i],
+                                     option_types[i], num_options[i])
+        model = BlackScholes(vols[i])
+        args = (valuation_date, stock_prices[underlying_indices[i]],
+                discount_curve, dividend_curves[underlying_indices[i]], model)
+
+        assert abs(values['value'][i] - option.value(*args)) < 1e-10
+
+        for greek in ['delta', 'gamma', 'vega', 'theta', 'rho', 'vanna']:
+            v = getattr(option, greek)(*args) * num_options[i]
+            assert abs(values[greek][i] - v) < 1e-10
+
+    # One dividend curve and one volatility for all options
+    values = book.value(valuation_date, stock_prices, discount_curve,
+                        dividend_curves[0], BlackScholes(0.30))
+
+    option = EquityVanillaOption(expiry_dates[3], strikes[3],
+                                 option_types[3], num_options[3])
+    v = option.value(valuation_date, stock_prices[1], discount_curve,
+                     dividend_curves[0], BlackScholes(0.30))
+    assert abs(values[3] - v) < 1e-10
+
+    try:
+        book.value(Date(1, 4, 2015), stock_prices, discount_curve,
+                   dividend_curves, vols)
+        assert False
+    except FinError:
+        pass
+
+
+def test_vanilla_option_expiry_list():
+
+    valuation_date = Date(1, 1, 2015)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+    model = BlackScholes(0.30)
+
+    expiry_dates = [Date(1, 7, 2015), Date(1, 1, 2016), Date(1, 3, 2015)]
+    option = EquityVanillaOption(expiry_dates, 100.0,
+                                 OptionTypes.EUROPEAN_CALL)
+
+    values = option.value(valuation_date, 100.0, discount_curve,
+                          dividend_curve, model)
+
+    for expiry_date, v in zip(expiry_dates, values):
+        single = EquityVanillaOption(expiry_date, 100.0,
+                                     OptionTypes.EUROPEAN_CALL)
+        assert abs(single.value(valuation_date, 100.0, discount_curve,
+                                dividend_curve, model) - v) < 1e-12
+
+
+def test_option_book_implied_volatility():
+
+    valuation_date = Date(1, 1, 2015)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.02)
+
+    expiry_dates = [Date(1, 3, 2015), Date(1, 7, 2015), Date(1, 1, 2017)] * 4
+    strikes = np.repeat([80.0, 95.0, 105.0, 125.0], 3)
+    option_types = [OptionTypes.EUROPEAN_CALL, OptionTypes.EUROPEAN_PUT] * 6
+    vols = np.linspace(0.2, 0.6, 12)
+
+    book = EquityOptionBook(expiry_dates, strikes, option_types, 10.0)
+
+    prices = book.value(valuation_date, 100.0, discount_curve,
+                        dividend_curve, vols) / 10.0
+
+    sigmas, status = book.implied_volatility(valuation_date, 100.0,
+                                             discount_curve, dividend_curve,
+                                             prices)
+
+    # The option values use an approximation to the normal CDF
+    assert np.all(status == 0)
+    assert np.max(np.abs(sigmas - vols)) < 1e-4
@@ -6,7 +6,9 @@ import matplotlib.pyplot as plt
 
 from financepy.models.volatility_fns import VolFunctionTypes
 from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
 from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.equity_vol_surface import vol_function
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
 import numpy as np
 
@@ -69,3 +71,107 @@ def test_equity_vol_surface():
     vol = equitySurface.volatility_from_delta_date(delta, expiry_date)
     assert round(vol[0], 4) == 0.3530
     assert round(vol[1], 4) == 2190.7766
+
+
+def test_equity_vol_surface_levenberg_marquardt():
+    valuation_date = Date(11, 1, 2021)
+
+    stock_price = 3800.0
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+                  [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+                  [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+                  [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+                  [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+                  [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+                  [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.020)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+    # The slices fitted independently are at least as good as the chained
+    # Nelder-Mead fit
+    for vol_functionType in [VolFunctionTypes.SVI,
+                             VolFunctionTypes.CLARK5,
+                             VolFunctionTypes.SABR_BETA_HALF]:
+
+        errors = []
+
+        for solverType in [FinSolverTypes.NELDER_MEAD,
+                           FinSolverTypes.LEVENBERG_MARQUARDT]:
+
+            surface = EquityVolSurface(valuation_date,
+                                       stock_price,
+                                       discount_curve,
+                                       dividend_curve,
+                                       expiry_dates,
+                                       strikes,
+                                       volSurface,
+                                       vol_functionType,
+                                       solverType)
+
+            error = 0.0
+            for i in range(0, len(expiry_dates)):
+                for j in range(0, len(strikes)):
+                    vol = vol_function(vol_functionType.value,
+                                       surface._parameters[i],
+                                       surface._F0T[i],
+                                       float(strikes[j]),
+                                       surface._texp[i])
+                    error += (vol - volSurface[i, j])**2
+
+            errors.append(error)
+
+        assert errors[1] <= errors[0] * 1.0001
+
+
+def test_equity_vol_surface_array_lookup():
+    valuation_date = Date(11, 1, 2021)
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 7, 2021), Date(11, 1, 2023)]
+    strikes = np.array([3037, 3418, 3798, 4178, 4557])
+
+    volSurface = [[42.94, 31.30, 19.72, 17.54, 25.67],
+                  [31.41, 26.25, 20.61, 16.01, 15.90],
+                  [27.59, 24.33, 21.17, 18.36, 16.26]]
+
+    volSurface = np.array(volSurface) / 100.0
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.020)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+    equitySurface = EquityVolSurface(valuation_date,
+                                     3800.0,
+                                     discount_curve,
+                                     dividend_curve,
+                                     expiry_dates,
+                                     strikes,
+                                     volSurface,
+                                     VolFunctionTypes.CLARK)
+
+    # Before, between, on and after the expiry dates
+    dates = [Date(1, 2, 2021), Date(11, 3, 2021), Date(11, 7, 2021),
+             Date(11, 1, 2022), Date(11, 1, 2025)]
+    ks = np.array([3200.0, 3500.0, 3800.0, 4100.0, 4400.0])
+
+    vols = equitySurface.volatility_from_strike_date(ks, dates)
+
+    for i in range(0, len(dates)):
+        vol = equitySurface.volatility_from_strike_date(ks[i], dates[i])
+        assert abs(vols[i] - vol) < 1e-12
+
+    # One date for all strikes
+    vols = equitySurface.volatility_from_strike_date(ks, dates[1])
+    vol = equitySurface.volatility_from_strike_date(ks[3], dates[1])
+    assert vols.shape == (5,)
+    assert abs(vols[3] - vol) < 1e-12
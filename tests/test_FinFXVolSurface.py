@@ -8,6 +8,7 @@ from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
 from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
 from financepy.market.volatility.fx_vol_surface import FXVolSurface
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+import numpy as np
 
 
 verboseCalibration = False
@@ -192,3 +193,41 @@ def test_FinFXMktVolSurface4(capsys):
     fxMarket.check_calibration(verboseCalibration)
     captured = capsys.readouterr()
     assert captured.out == ""
+
+
+def test_FinFXMktVolSurfaceArrayLookup():
+
+    valuation_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(valuation_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(valuation_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+
+    fxMarket = FXVolSurface(valuation_date,
+                            1.3465,
+                            "EURUSD",
+                            "EUR",
+                            dom_discount_curve,
+                            for_discount_curve,
+                            tenors,
+                            atm_vols,
+                            marketStrangle25DeltaVols,
+                            riskReversal25DeltaVols,
+                            FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                            FinFXDeltaMethod.SPOT_DELTA,
+                            VolFunctionTypes.CLARK)
+
+    # Before, between, on and after the expiry dates
+    dates = [Date(20, 4, 2020), Date(25, 5, 2020), Date(10, 7, 2020),
+             Date(1, 1, 2021), Date(10, 4, 2023)]
+    strikes = np.array([1.20, 1.30, 1.35, 1.40, 1.50])
+
+    vols = fxMarket.volatility(strikes, dates)
+
+    for i in range(0, len(dates)):
+        vol = fxMarket.volatility(strikes[i], dates[i])
+        assert abs(vols[i] - vol) < 1e-12
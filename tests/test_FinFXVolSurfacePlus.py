@@ -301,3 +301,47 @@ def test_FinFXMktVolSurface5(capsys):
     fxMarketPlus.check_calibration(verboseCalibration)
     captured = capsys.readouterr()
     assert captured.out == ""
+
+
+def test_FinFXMktVolSurfaceArrayLookup():
+
+    valuation_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(valuation_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(valuation_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    marketStrangle25DeltaVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    riskReversal25DeltaVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+    marketStrangle10DeltaVols = [2.433, 2.83, 3.228, 3.485, 3.806, 3.208]
+    riskReversal10DeltaVols = [-1.258, -1.297, -1.332, -1.408, -1.359,
+                               -1.208]
+
+    fxMarketPlus = FXVolSurfacePlus(valuation_date,
+                                    1.3465,
+                                    "EURUSD",
+                                    "EUR",
+                                    dom_discount_curve,
+                                    for_discount_curve,
+                                    tenors,
+                                    atm_vols,
+                                    marketStrangle25DeltaVols,
+                                    riskReversal25DeltaVols,
+                                    marketStrangle10DeltaVols,
+                                    riskReversal10DeltaVols,
+                                    0.50,
+                                    FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                                    FinFXDeltaMethod.SPOT_DELTA,
+                                    VolFunctionTypes.CLARK)
+
+    # Before, between, on and after the expiry dates
+    dates = [Date(20, 4, 2020), Date(25, 5, 2020), Date(10, 7, 2020),
+             Date(1, 1, 2021), Date(10, 4, 2023)]
+    strikes = np.array([1.20, 1.30, 1.35, 1.40, 1.50])
+
+    vols = fxMarketPlus.volatility_from_strike_date(strikes, dates)
+
+    for i in range(0, len(dates)):
+        vol = fxMarketPlus.volatility_from_strike_date(strikes[i], dates[i])
+        assert abs(vols[i] - vol) < 1e-12
@@ -271,3 +271,34 @@ def test_bloombergPricingExample():
         settlement_date, oisCurve), 4) == -55524.5709
     assert round(swaps[0]._float_leg.value(
         settlement_date, oisCurve, liborDualCurve, None), 4) == 55524.5709
+
+
+def test_update_quotes():
+
+    valuation_date = Date(6, 6, 2018)
+    settlement_date = valuation_date.add_weekdays(2)
+    oisCurve = buildOIS(valuation_date)
+
+    depos = [IborDeposit(settlement_date, "6M", 0.0231,
+                         DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "10Y"]):
+        swap = IborSwap(settlement_date, tenor, SwapTypes.PAY,
+                        0.025 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    liborDualCurve = IborDualCurve(valuation_date, oisCurve, depos, [],
+                                   swaps)
+
+    num_points = len(liborDualCurve._dfs)
+    old_dfs = liborDualCurve._dfs.copy()
+
+    changed = liborDualCurve.update_quotes({4: 0.0285})
+
+    assert list(changed) == list(range(5, num_points))
+    assert np.all(liborDualCurve._dfs[0:5] == old_dfs[0:5])
+
+    newDualCurve = IborDualCurve(valuation_date, oisCurve, depos, [], swaps)
+    assert np.max(np.abs(newDualCurve._dfs - liborDualCurve._dfs)) < 1e-15
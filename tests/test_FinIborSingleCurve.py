@@ -2,11 +2,14 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+
 from financepy.utils.global_types import SwapTypes
 from financepy.utils.math import ONE_MILLION
 from financepy.market.curves.interpolator import InterpTypes
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_fra import IborFRA
 from financepy.products.rates.ibor_future import IborFuture
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
 from financepy.utils.frequency import FrequencyTypes
@@ -137,3 +140,211 @@ def test_bloombergPricingExample():
         settlement_date, libor_curve), 4) == 53714.5507
     assert round(swaps[0]._float_leg.value(
         settlement_date, libor_curve, libor_curve, None), 4) == 53714.5507
+
+
+def test_bootstrap_jacobian():
+
+    valuation_date = Date(6, 6, 2018)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.LINEAR_FWD_RATES]:
+
+        depos = [IborDeposit(valuation_date, settlement_date, 0.02,
+                             DayCountTypes.ACT_360),
+                 IborDeposit(settlement_date, "6M", 0.021,
+                             DayCountTypes.ACT_360)]
+
+        swaps = []
+        for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]):
+            swap = IborSwap(settlement_date, tenor, SwapTypes.PAY,
+                            0.022 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360)
+            swaps.append(swap)
+
+        libor_curve = IborSingleCurve(valuation_date, depos, [], swaps,
+                                      interp_type)
+
+        jac = libor_curve.jacobian()
+        num_pillars = len(libor_curve._times) - 1
+        assert jac.shape == (num_pillars, num_pillars)
+        assert np.all(np.triu(jac, 1) == 0.0)
+        assert np.all(np.abs(np.diag(jac)) > 0.0)
+
+        # The last swap only depends on the full curve so the last row can be
+        # checked against bumping the pillar discount factors of the curve
+        swap = swaps[-1]
+        notional = swap._fixed_leg._notional
+        dfs = libor_curve._dfs.copy()
+        bump = 1e-6
+
+        for j in range(1, num_pillars + 1):
+            libor_curve._dfs = dfs.copy()
+            libor_curve._dfs[j] += bump
+            v_up = swap.value(valuation_date, libor_curve) / notional
+            libor_curve._dfs = dfs.copy()
+            libor_curve._dfs[j] -= bump
+            v_down = swap.value(valuation_date, libor_curve) / notional
+            deriv = (v_up - v_down) / (2.0 * bump)
+            assert abs(deriv - jac[-1, j - 1]) < 1e-6
+
+
+def test_quote_sensitivities():
+
+    valuation_date = Date(6, 6, 2018)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = [IborDeposit(settlement_date, "3M", 0.02, DayCountTypes.ACT_360)]
+    fras = [IborFRA(settlement_date.add_tenor("3M"), "3M", 0.021,
+                    DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]):
+        swap = IborSwap(settlement_date, tenor, SwapTypes.PAY,
+                        0.022 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                  InterpTypes.FLAT_FWD_RATES)
+
+    trades = [IborSwap(settlement_date, "4Y", SwapTypes.RECEIVE, 0.03,
+                       FrequencyTypes.ANNUAL, DayCountTypes.ACT_360,
+                       notional=ONE_MILLION),
+              IborSwap(settlement_date.add_tenor("1Y"), "12Y", SwapTypes.PAY,
+                       0.025, FrequencyTypes.QUARTERLY, DayCountTypes.ACT_360,
+                       notional=ONE_MILLION),
+              IborFRA(settlement_date.add_tenor("9M"), "3M", 0.02,
+                      DayCountTypes.ACT_360, notional=ONE_MILLION),
+              IborDeposit(settlement_date, "3M", 0.02, DayCountTypes.ACT_360,
+                          notional=ONE_MILLION)]
+
+    sens = libor_curve.quote_sensitivities(trades)
+    total = libor_curve.quote_sensitivities(trades, aggregate=True)
+
+    num_quotes = len(depos) + len(fras) + len(swaps)
+    assert sens.shape == (len(trades), num_quotes)
+    assert np.max(np.abs(total - np.sum(sens, axis=0))) < 1e-8
+
+    # Compare with bumping each quote and rebuilding the curve
+    bump = 1e-6
+
+    for j in range(0, num_quotes):
+        bumps = np.zeros(num_quotes)
+        bumps[j] = bump
+        curve_up = libor_curve.bump_quotes(bumps)
+        curve_down = libor_curve.bump_quotes(-bumps)
+
+        for i, trade in enumerate(trades):
+            v_up = trade.value(valuation_date, curve_up)
+            v_down = trade.value(valuation_date, curve_down)
+            deriv = (v_up - v_down) / (2.0 * bump) * 0.0001
+            assert abs(deriv - sens[i, j]) < 1e-4
+
+    # Bumping the quotes does not change the curve instruments
+    assert swaps[-1]._fixed_leg._coupon == 0.027
+
+    # The bumped curve has its own instruments and bootstrap so updating it
+    # leaves this curve unchanged and keeps the bump on the other quotes
+    coupons = [swap._fixed_leg._coupon for swap in swaps]
+    bumped_curve = libor_curve.bump_quotes(0.0001)
+    n = len(libor_curve._usedDeposits) + len(libor_curve._usedFRAs)
+    bumped_curve.update_quotes({n + 3: 0.0251})
+
+    assert [swap._fixed_leg._coupon for swap in swaps] == coupons
+    assert abs(swaps[3].value(valuation_date, libor_curve)) < 1e-4
+
+    for i, swap in enumerate(bumped_curve._usedSwaps):
+        if i == 3:
+            assert swap._fixed_leg._coupon == 0.0251
+        else:
+            assert abs(swap._fixed_leg._coupon
+                       - coupons[i] - 0.0001) < 1e-15
+        assert abs(swap.value(valuation_date, bumped_curve)) < 1e-4
+
+
+def test_update_quotes():
+
+    valuation_date = Date(6, 6, 2018)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = [IborDeposit(settlement_date, "3M", 0.02, DayCountTypes.ACT_360)]
+    fras = [IborFRA(settlement_date.add_tenor("3M"), "3M", 0.021,
+                    DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]):
+        swap = IborSwap(settlement_date, tenor, SwapTypes.PAY,
+                        0.022 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                  InterpTypes.FLAT_FWD_RATES)
+
+    old_dfs = libor_curve._dfs.copy()
+
+    # The curve inserts a deposit from the valuation date to settlement
+    n = len(libor_curve._usedDeposits) + len(libor_curve._usedFRAs)
+    changed = libor_curve.update_quotes({n + 3: 0.0265, n + 5: 0.0282})
+
+    assert swaps[3]._fixed_leg._coupon == 0.0265
+    assert swaps[3]._fixed_leg._rates == [0.0265] * len(
+        swaps[3]._fixed_leg._payments)
+    assert list(changed) == list(range(n + 4, n + 7))
+    assert np.all(libor_curve._dfs[0:n + 4] == old_dfs[0:n + 4])
+
+    # The update gives the same curve as a full build
+    new_curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                InterpTypes.FLAT_FWD_RATES)
+
+    assert np.max(np.abs(new_curve._dfs - libor_curve._dfs)) < 1e-15
+    assert np.max(np.abs(new_curve.jacobian()
+                         - libor_curve.jacobian())) < 1e-12
+
+    for swap in swaps:
+        v = swap.value(valuation_date, libor_curve)
+        assert abs(v) < 1e-4
+
+
+def test_curve_cache():
+
+    valuation_date = Date(6, 6, 2018)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = [IborDeposit(settlement_date, "3M", 0.02, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]):
+        swap = IborSwap(settlement_date, tenor, SwapTypes.PAY,
+                        0.022 + 0.001 * i, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, depos, [], swaps,
+                                  InterpTypes.FLAT_FWD_RATES)
+
+    dates = [settlement_date.add_months(6 * i) for i in range(1, 21)]
+    dfs = libor_curve.df(dates)
+
+    libor_curve.enable_cache(4)
+    assert np.all(libor_curve.df(dates) == dfs)
+    assert np.all(libor_curve.df(dates) == dfs)
+    assert libor_curve.cache_info()["hits"] == 2
+    assert libor_curve.cache_info()["misses"] == 2
+
+    # The cached discount factors are dropped when the curve changes
+    n = len(libor_curve._usedDeposits)
+    libor_curve.update_quotes({n + 2: 0.0265})
+    new_dfs = libor_curve.df(dates)
+    libor_curve.disable_cache()
+
+    assert np.all(libor_curve.df(dates) == new_dfs)
+    assert np.all(new_dfs[5:] != dfs[5:])
+
+    # And the bumped curve has its own cache
+    libor_curve.enable_cache()
+    bumped_curve = libor_curve.bump_quotes(0.0001)
+    assert np.all(bumped_curve.df(dates) < libor_curve.df(dates))
+    assert bumped_curve._cache is not libor_curve._cache
@@ -232,3 +232,33 @@ def test_PCHIP_LOG_DISCOUNT():
     y_int = interpolator.interpolate(x)
     assert round(x, 4) == 6.8421
     assert round(y_int, 4) == 0.5551
+
+
+def test_spline_kernels_match_scipy():
+    from scipy.interpolate import CubicSpline, PchipInterpolator
+
+    times = np.concatenate([[0.0], xValues])
+    dfs = np.concatenate([[1.0], yValues])
+    t = np.linspace(0.0, 12.0, 100)
+
+    log_dfs = np.log(dfs)
+    zero_rates = -np.log(dfs[1:]) / times[1:]
+    zero_rates = np.concatenate([[zero_rates[0]], zero_rates])
+
+    scipy_values = {
+        InterpTypes.FINCUBIC_ZERO_RATES: np.exp(-t * CubicSpline(
+            times, zero_rates, bc_type=((2, 0.0), (1, 0.0)))(t)),
+        InterpTypes.NATCUBIC_LOG_DISCOUNT: np.exp(CubicSpline(
+            times, log_dfs, bc_type='natural')(t)),
+        InterpTypes.NATCUBIC_ZERO_RATES: np.exp(-t * CubicSpline(
+            times, zero_rates, bc_type='natural')(t)),
+        InterpTypes.PCHIP_ZERO_RATES: np.exp(-t * PchipInterpolator(
+            times, zero_rates)(t)),
+        InterpTypes.PCHIP_LOG_DISCOUNT: np.exp(PchipInterpolator(
+            times, log_dfs)(t))}
+
+    for interp_type, values in scipy_values.items():
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(times, dfs)
+        y_int = interpolator.interpolate(t)
+        assert np.max(np.abs(y_int - values)) < 1e-10
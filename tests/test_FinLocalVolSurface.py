@@ -0,0 +1,104 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.models.volatility_fns import VolFunctionTypes
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.local_vol_surface import LocalVolSurface
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import ProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.models.implied_volatility import bs_implied_volatilities
+
+valuation_date = Date(11, 1, 2021)
+
+stock_price = 3800.0
+
+expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                Date(11, 4, 2021), Date(11, 7, 2021),
+                Date(11, 10, 2021), Date(11, 1, 2022),
+                Date(11, 1, 2023)]
+
+strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                    3893, 3988, 4178, 4557])
+
+volSurface = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+              [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+              [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+              [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+              [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+              [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+              [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+volSurface = np.array(volSurface) / 100.0
+
+r = 0.020
+q = 0.010
+discount_curve = DiscountCurveFlat(valuation_date, r)
+dividend_curve = DiscountCurveFlat(valuation_date, q)
+
+
+def test_local_vol_flat_surface():
+    flatSurface = np.full(volSurface.shape, 0.20)
+
+    equitySurface = EquityVolSurface(valuation_date,
+                                     stock_price,
+                                     discount_curve,
+                                     dividend_curve,
+                                     expiry_dates,
+                                     strikes,
+                                     flatSurface,
+                                     VolFunctionTypes.CLARK,
+                                     FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    localVolSurface = LocalVolSurface(equitySurface, 50, 50)
+
+    assert np.max(np.abs(localVolSurface._vols - 0.20)) < 1e-6
+
+    vols = localVolSurface.local_volatility(np.array([0.0, 0.5, 3.0]),
+                                            np.array([100.0, 3800.0, 1e6]))
+    assert np.max(np.abs(vols - 0.20)) < 1e-6
+
+    assert abs(localVolSurface.drift(0.5) - (r - q)) < 1e-10
+
+
+def test_local_vol_mc_reprices_smile():
+    equitySurface = EquityVolSurface(valuation_date,
+                                     stock_price,
+                                     discount_curve,
+                                     dividend_curve,
+                                     expiry_dates,
+                                     strikes,
+                                     volSurface,
+                                     VolFunctionTypes.SVI,
+                                     FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    localVolSurface = LocalVolSurface(equitySurface)
+
+    expiry_date = expiry_dates[5]
+    texp = equitySurface._texp[5]
+
+    model_params = (stock_price, localVolSurface,
+                    FinGBMNumericalScheme.ANTITHETIC)
+
+    paths = FinProcessSimulator().get_process(ProcessTypes.LOCAL_VOL, texp,
+                                              model_params, 100, 20000, 1919)
+
+    # The paths grow at the forward
+    fwd = np.mean(paths[:, -1])
+    assert abs(fwd / equitySurface._F0T[5] - 1.0) < 0.002
+
+    ks = np.array([3400.0, 3800.0, 4200.0])
+    values = np.array([np.mean(np.maximum(paths[:, -1] - k, 0.0))
+                       for k in ks]) * np.exp(-r * texp)
+
+    mc_vols, _ = bs_implied_volatilities(values, stock_price, ks, texp,
+                                         r, q, 1)
+    vols = equitySurface.volatility_from_strike_date(ks, expiry_date)
+
+    assert np.max(np.abs(mc_vols - vols)) < 0.005
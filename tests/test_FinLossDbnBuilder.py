@@ -4,6 +4,10 @@
 
 from financepy.models.gauss_copula_onefactor import loss_dbn_hetero_adj_binomial
 from financepy.models.gauss_copula_onefactor import loss_dbn_recursion_gcd
+from financepy.models.gauss_copula_onefactor import \
+    loss_dbn_recursion_gcd_parallel, loss_dbn_hetero_adj_binomial_parallel
+from financepy.models.gauss_copula_onefactor import loss_dbn_fft
+from financepy.models.gauss_copula_onefactor import loss_cdf_saddle_point
 import numpy as np
 
 
@@ -45,3 +49,57 @@ def test_FinLossDbnBuilder():
                                             beta_vector,
                                             num_steps)
         assert [round(x * 1000, 4) for x in dbn2[:4]] == results
+
+
+def test_FinLossDbnBuilderLargePools():
+    num_steps = 40
+
+    np.random.seed(1919)
+    num_credits = 500
+    default_probs = np.random.uniform(0.01, 0.20, num_credits)
+    beta_vector = np.random.uniform(0.2, 0.6, num_credits)
+    lossUnits = np.random.randint(1, 4, num_credits) / 1.0
+    loss_ratio = np.ones(num_credits)
+
+    dbn1 = loss_dbn_recursion_gcd(num_credits,
+                                  default_probs,
+                                  lossUnits,
+                                  beta_vector,
+                                  num_steps)
+
+    dbn2 = loss_dbn_recursion_gcd_parallel(num_credits,
+                                           default_probs,
+                                           lossUnits,
+                                           beta_vector,
+                                           num_steps)
+    assert np.max(np.abs(dbn2 - dbn1)) < 1e-14
+
+    dbn3 = loss_dbn_fft(num_credits,
+                        default_probs,
+                        lossUnits,
+                        beta_vector,
+                        num_steps)
+    assert len(dbn3) == len(dbn1)
+    assert np.max(np.abs(dbn3 - dbn1)) < 1e-14
+
+    loss_levels = np.array([20.0, 50.0, 100.0, 200.0, 400.0])
+    cdf = loss_cdf_saddle_point(loss_levels,
+                                default_probs,
+                                lossUnits,
+                                beta_vector,
+                                num_steps)
+    cdf1 = np.cumsum(dbn1)[loss_levels.astype(int)]
+    assert np.max(np.abs(cdf - cdf1)) < 1e-4
+
+    dbn4 = loss_dbn_hetero_adj_binomial(num_credits,
+                                        default_probs,
+                                        loss_ratio,
+                                        beta_vector,
+                                        num_steps)
+
+    dbn5 = loss_dbn_hetero_adj_binomial_parallel(num_credits,
+                                                 default_probs,
+                                                 loss_ratio,
+                                                 beta_vector,
+                                                 num_steps)
+    assert np.max(np.abs(dbn5 - dbn4)) < 1e-14
@@ -0,0 +1,88 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from scipy.stats import norm
+
+from financepy.utils.global_types import OptionTypes
+from financepy.models.implied_volatility import ImpliedVolStatus
+from financepy.models.implied_volatility import black_implied_volatilities
+from financepy.models.implied_volatility import bachelier_implied_volatilities
+
+
+def black_prices(f, k, t, df, v, phi):
+    s = v * np.sqrt(t)
+    d1 = np.log(f / k) / s + s / 2.0
+    d2 = d1 - s
+    return df * phi * (f * norm.cdf(phi * d1) - k * norm.cdf(phi * d2))
+
+
+def bachelier_prices(f, k, t, df, v, phi):
+    s = v * np.sqrt(t)
+    d = (f - k) / s
+    return df * (phi * (f - k) * norm.cdf(phi * d) + s * norm.pdf(d))
+
+
+def test_black_implied_volatilities():
+
+    f = 100.0
+    strikes = np.array([40.0, 80.0, 95.0, 100.0, 105.0, 130.0, 250.0])
+    texps = np.array([[0.1], [1.0], [5.0]])
+    vols = np.array([[0.15], [0.40], [1.20]])
+    df = np.exp(-0.02 * texps)
+
+    for option_type, phi in [(OptionTypes.EUROPEAN_CALL, 1.0),
+                             (OptionTypes.EUROPEAN_PUT, -1.0)]:
+
+        prices = black_prices(f, strikes, texps, df, vols, phi)
+        sigmas, status = black_implied_volatilities(prices, f, strikes, texps,
+                                                    df, option_type)
+
+        # Deep in the money the time value is lost in rounding
+        s = vols * np.sqrt(texps)
+        vega = f * norm.pdf(np.log(f / strikes) / s + s / 2.0) * s
+        solvable = vega > 1e-4 * f
+
+        assert sigmas.shape == (3, 7)
+        assert np.all(status == ImpliedVolStatus.CONVERGED.value)
+        assert np.max(np.abs(sigmas - vols)[solvable]) < 1e-9
+
+    # Bad prices are flagged instead of raising an error
+    prices = np.array([-1.0, 10.0, 98.5, 120.0])
+    strikes = np.array([100.0, 100.0, 1.0, 100.0])
+    option_types = [OptionTypes.EUROPEAN_CALL, OptionTypes.EUROPEAN_CALL,
+                    OptionTypes.EUROPEAN_CALL, OptionTypes.EUROPEAN_CALL]
+
+    sigmas, status = black_implied_volatilities(prices, f, strikes, 1.0, 1.0,
+                                                option_types)
+
+    assert status[0] == ImpliedVolStatus.INVALID_INPUTS.value
+    assert status[1] == ImpliedVolStatus.CONVERGED.value
+    assert status[2] == ImpliedVolStatus.BELOW_INTRINSIC.value
+    assert status[3] == ImpliedVolStatus.ABOVE_MAXIMUM.value
+    assert np.isnan(sigmas[0]) and np.isnan(sigmas[2]) and np.isnan(sigmas[3])
+
+
+def test_bachelier_implied_volatilities():
+
+    forwards = np.array([-0.005, 0.0, 0.01, 0.03])
+    strikes = np.array([[-0.02], [0.0], [0.01], [0.05], [0.10]])
+    texps = 2.0
+    df = 0.95
+    vols = 0.008
+
+    for option_type, phi in [(OptionTypes.EUROPEAN_CALL, 1.0),
+                             (OptionTypes.EUROPEAN_PUT, -1.0)]:
+
+        prices = bachelier_prices(forwards, strikes, texps, df, vols, phi)
+        sigmas, status = bachelier_implied_volatilities(prices, forwards,
+                                                        strikes, texps, df,
+                                                        option_type)
+
+        s = vols * np.sqrt(texps)
+        solvable = norm.pdf((forwards - strikes) / s) > 1e-4
+
+        assert sigmas.shape == (5, 4)
+        assert np.all(status == ImpliedVolStatus.CONVERGED.value)
+        assert np.max(np.abs(sigmas - vols)[solvable]) < 1e-11
@@ -5,9 +5,14 @@
 from financepy.utils.date import Date, set_date_format, DateFormatTypes
 from financepy.utils.calendar import CalendarTypes, Calendar
 from financepy.utils.frequency import FrequencyTypes
-from financepy.utils.schedule import Schedule
+from financepy.utils.schedule import Schedule, ScheduleArray
 from financepy.utils.calendar import DateGenRuleTypes
 from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.swap_fixed_leg import SwapFixedLeg
+from financepy.products.bonds.bond import Bond
+from financepy.products.credit.cds import CDS
 
 
 termination_dateAdjust = True
@@ -216,3 +221,97 @@ def test_forward_end_stub():
     adjusted_dates = schedule._adjusted_dates
     assert len(adjusted_dates) == 5
     check_frequency(schedule)
+
+
+def test_schedule_array():
+    effective_dates = [Date(20, 6, 2018), Date(31, 1, 2019),
+                       Date(19, 9, 2018), Date(15, 3, 2021)]
+    termination_dates = [Date(20, 6, 2028), Date(31, 1, 2024),
+                         Date(20, 6, 2020), Date(30, 11, 2031)]
+    freq_types = [FrequencyTypes.SEMI_ANNUAL, FrequencyTypes.QUARTERLY,
+                  FrequencyTypes.QUARTERLY, FrequencyTypes.MONTHLY]
+    calendar_types = [CalendarTypes.WEEKEND, CalendarTypes.TARGET,
+                      CalendarTypes.UNITED_KINGDOM, CalendarTypes.NONE]
+    bus_day_adjust_types = [BusDayAdjustTypes.FOLLOWING,
+                            BusDayAdjustTypes.MODIFIED_FOLLOWING,
+                            BusDayAdjustTypes.FOLLOWING,
+                            BusDayAdjustTypes.MODIFIED_PRECEDING]
+    date_gen_rule_types = [DateGenRuleTypes.BACKWARD,
+                           DateGenRuleTypes.BACKWARD,
+                           DateGenRuleTypes.FORWARD,
+                           DateGenRuleTypes.BACKWARD]
+    end_of_months = [False, True, False, True]
+
+    schedules = ScheduleArray(effective_dates,
+                              termination_dates,
+                              freq_types,
+                              calendar_types,
+                              bus_day_adjust_types,
+                              date_gen_rule_types,
+                              True,
+                              end_of_months)
+
+    assert len(schedules) == 4
+
+    for i in range(0, 4):
+        schedule = Schedule(effective_dates[i],
+                            termination_dates[i],
+                            freq_types[i],
+                            calendar_types[i],
+                            bus_day_adjust_types[i],
+                            date_gen_rule_types[i],
+                            True,
+                            end_of_months[i])
+
+        assert schedules.schedule_dates(i) == schedule._adjusted_dates
+        assert schedules.num_dates()[i] == len(schedule._adjusted_dates)
+
+
+def test_schedule_array_products():
+    effective_date = Date(20, 6, 2018)
+    termination_date = Date(20, 6, 2028)
+
+    schedules = ScheduleArray([effective_date], [termination_date],
+                              FrequencyTypes.SEMI_ANNUAL,
+                              CalendarTypes.TARGET,
+                              BusDayAdjustTypes.MODIFIED_FOLLOWING)
+
+    leg1 = SwapFixedLeg(effective_date, termination_date, SwapTypes.PAY,
+                        0.03, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360,
+                        calendar_type=CalendarTypes.TARGET,
+                        bus_day_adjust_type=BusDayAdjustTypes.MODIFIED_FOLLOWING)
+
+    leg2 = SwapFixedLeg(effective_date, termination_date, SwapTypes.PAY,
+                        0.03, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360,
+                        calendar_type=CalendarTypes.TARGET,
+                        bus_day_adjust_type=BusDayAdjustTypes.MODIFIED_FOLLOWING,
+                        schedule_dates=schedules.schedule_dates(0))
+
+    assert leg1._payment_dates == leg2._payment_dates
+    assert leg1._payments == leg2._payments
+
+    bond_schedules = ScheduleArray([effective_date], [termination_date],
+                                   FrequencyTypes.ANNUAL,
+                                   CalendarTypes.NONE)
+
+    bond1 = Bond(effective_date, termination_date, 0.05,
+                 FrequencyTypes.ANNUAL, DayCountTypes.ACT_ACT_ICMA)
+
+    bond2 = Bond(effective_date, termination_date, 0.05,
+                 FrequencyTypes.ANNUAL, DayCountTypes.ACT_ACT_ICMA,
+                 schedule_dates=bond_schedules.schedule_dates(0))
+
+    assert bond1._coupon_dates == bond2._coupon_dates
+    assert bond1._payment_dates == bond2._payment_dates
+
+    cds_schedules = ScheduleArray.from_cds([effective_date],
+                                           [termination_date])
+
+    cds1 = CDS(effective_date, termination_date, 0.01)
+    cds2 = CDS(effective_date, termination_date, 0.01,
+               schedule_dates=cds_schedules.schedule_dates(0))
+
+    assert cds1._adjusted_dates == cds2._adjusted_dates
+    assert cds1._flows == cds2._flows
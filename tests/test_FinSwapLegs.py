@@ -2,7 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.bonds.bond import Bond
+from financepy.products.bonds.zero_curve import BondZeroCurve
 from financepy.products.rates.swap_float_leg import SwapFloatLeg
 from financepy.products.rates.swap_fixed_leg import SwapFixedLeg
 from financepy.utils.date import Date
@@ -159,3 +163,120 @@ def test_FinFloatOISLeg():
     v = swapFloatLeg.value(effective_date, libor_curve, libor_curve,
                            firstFixing)
     assert round(v, 4) == -2038364.5665
+
+
+def test_swap_legs_share_accrual_schedule():
+
+    effective_date = Date(28, 10, 2020)
+    maturity_date = Date(28, 10, 2025)
+
+    legs = []
+    for coupon in [0.01, 0.02]:
+        leg = SwapFixedLeg(effective_date,
+                           maturity_date,
+                           SwapTypes.PAY,
+                           coupon,
+                           FrequencyTypes.ANNUAL,
+                           DayCountTypes.THIRTY_360_BOND,
+                           calendar_type=CalendarTypes.TARGET)
+        legs.append(leg)
+
+    # Nothing is generated until the payments are needed
+    assert "_payment_dates" not in legs[0].__dict__
+
+    assert len(legs[0]._payment_dates) == 5
+    assert legs[0]._payment_dates is legs[1]._payment_dates
+    assert legs[0]._year_fracs is legs[1]._year_fracs
+    assert legs[1]._payments[0] == 2.0 * legs[0]._payments[0]
+
+    float_leg = SwapFloatLeg(effective_date,
+                             maturity_date,
+                             SwapTypes.RECEIVE,
+                             0.0,
+                             FrequencyTypes.ANNUAL,
+                             DayCountTypes.THIRTY_360_BOND,
+                             calendar_type=CalendarTypes.TARGET)
+
+    assert float_leg._payment_dates is legs[0]._payment_dates
+
+
+def test_swap_leg_flow_reporting():
+
+    valuation_date = Date(28, 10, 2022)
+    effective_date = Date(28, 10, 2020)
+    maturity_date = Date(28, 10, 2025)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+
+    fixed_leg = SwapFixedLeg(effective_date,
+                             maturity_date,
+                             SwapTypes.RECEIVE,
+                             0.03,
+                             FrequencyTypes.ANNUAL,
+                             DayCountTypes.ACT_360)
+
+    float_leg = SwapFloatLeg(effective_date,
+                             maturity_date,
+                             SwapTypes.RECEIVE,
+                             0.0,
+                             FrequencyTypes.ANNUAL,
+                             DayCountTypes.ACT_360)
+
+    # The reporting lists are empty until a valuation has been done
+    assert fixed_leg._paymentPVs == []
+    assert float_leg._rates == []
+
+    v_fixed = fixed_leg.value(valuation_date, discount_curve)
+    v_float = float_leg.value(valuation_date, discount_curve,
+                              discount_curve, 0.04)
+
+    # The first two flows have been paid
+    assert fixed_leg._paymentDfs[0:2] == [0.0, 0.0]
+    assert float_leg._rates[0:3] == [0.0, 0.0, 0.04]
+
+    assert round(fixed_leg._cumulativePVs[-1] - v_fixed, 8) == 0.0
+    assert round(float_leg._cumulativePVs[-1] - v_float, 8) == 0.0
+    assert round(sum(float_leg._paymentPVs) - v_float, 8) == 0.0
+
+
+def test_swap_legs_on_other_curves():
+
+    valuation_date = Date(28, 10, 2020)
+    maturity_date = Date(28, 10, 2025)
+
+    bonds = [Bond(valuation_date, valuation_date.add_years(i), 0.02 + 0.002 * i,
+                  FrequencyTypes.ANNUAL, DayCountTypes.ACT_ACT_ICMA)
+             for i in range(1, 8)]
+    zero_curve = BondZeroCurve(valuation_date, bonds, [100.0] * 7)
+
+    fixed_leg = SwapFixedLeg(valuation_date,
+                             maturity_date,
+                             SwapTypes.RECEIVE,
+                             0.03,
+                             FrequencyTypes.ANNUAL,
+                             DayCountTypes.ACT_360)
+
+    float_leg = SwapFloatLeg(valuation_date,
+                             maturity_date,
+                             SwapTypes.RECEIVE,
+                             0.0,
+                             FrequencyTypes.ANNUAL,
+                             DayCountTypes.ACT_360)
+
+    # Curves whose df does not have its own DateArray path give the same
+    # values as discounting each flow on its own
+    v = fixed_leg.value(valuation_date, zero_curve)
+
+    df_value = zero_curve.df(valuation_date)
+    dfs = [zero_curve.df(dt) / df_value for dt in fixed_leg._payment_dates]
+    v_loop = sum([pmt * df for pmt, df in zip(fixed_leg._payments, dfs)])
+    assert abs(v - v_loop) < 1e-8
+
+    index_curve = DiscountCurveFlat(valuation_date, 0.03)
+    v_float = float_leg.value(valuation_date, zero_curve, index_curve)
+    assert abs(sum(float_leg._paymentPVs) - v_float) < 1e-8
+    assert max(abs(np.array(float_leg._paymentDfs) - dfs)) < 1e-15
+
+    # A payment which has been changed is valued
+    fixed_leg._payments[2] += 1000.0
+    v_changed = fixed_leg.value(valuation_date, zero_curve)
+    assert abs(v_changed - v - 1000.0 * dfs[2]) < 1e-8
@@ -6,7 +6,7 @@ import datetime
 import numpy as np
 import time
 
-from financepy.utils.date import Date, date_range
+from financepy.utils.date import Date, DateArray, date_range
 
 # Not under test
 
@@ -340,3 +340,57 @@ def test_list_of_date():
     # Test finding date difference
     assert (Date(1, 1, 2019) - dates) == [Date(1, 1, 2019) - d for d in dates]
     assert (dates - Date(1, 1, 2019)) == [Date(1, 1, 2019) - d for d in dates]
+
+
+def test_date_array():
+    dates = [Date(31, 1, 2020),
+             Date(29, 2, 2020),
+             Date(4, 3, 2020),
+             Date(31, 12, 2021),
+             Date(28, 2, 1950),
+             ]
+
+    date_array = DateArray(dates)
+
+    assert len(date_array) == 5
+    assert date_array[1] == Date(29, 2, 2020)
+    assert DateArray([Date(1, 3, 1900)])._excel_date[0] == 61
+    assert list(date_array._weekday) == [d._weekday for d in dates]
+    assert list(date_array.is_eom()) == [d.is_eom() for d in dates]
+    assert date_array.eom().to_list() == [d.eom() for d in dates]
+
+    for tenor in ["5D", "-2W", "1M", "-13M", "1Y", "4Y", "-10Y"]:
+        expected = [d.add_tenor(tenor) for d in dates]
+        assert date_array.add_tenor(tenor).to_list() == expected
+
+    expected = [d.add_months(7) for d in dates]
+    assert date_array.add_months(7).to_list() == expected
+
+    # Test logical operations and differences against a single date
+    dt = Date(1, 1, 2021)
+    assert list(date_array < dt) == [True, True, True, False, True]
+    assert list(dt < date_array) == [False, False, False, True, False]
+    assert list(date_array == Date(4, 3, 2020)) == [d == Date(4, 3, 2020)
+                                                    for d in dates]
+    assert list(date_array - dt) == [d - dt for d in dates]
+    assert list(dt - date_array) == [dt - d for d in dates]
+
+
+def test_date_array_from_dmy():
+    date_array = DateArray.from_dmy([1, 15], [1, 2], [2018, 2019])
+    assert date_array.to_list() == [Date(1, 1, 2018), Date(15, 2, 2019)]
+
+    start_date = Date(31, 1, 2020)
+    date_array = DateArray([start_date]).add_months(np.arange(0, 4))
+    assert date_array.to_list() == [Date(31, 1, 2020), Date(29, 2, 2020),
+                                    Date(31, 3, 2020), Date(30, 4, 2020)]
+
+
+def test_from_excel_date():
+    for dt in [Date(1, 1, 1900), Date(28, 2, 1900), Date(1, 3, 1900),
+               Date(29, 2, 2020), Date(31, 12, 2099)]:
+        new_dt = Date.from_excel_date(dt._excel_date)
+        assert new_dt == dt
+        assert new_dt.__dict__ == dt.__dict__
+        assert type(new_dt._excel_date) is type(dt._excel_date)
+        assert str(new_dt) == str(dt)
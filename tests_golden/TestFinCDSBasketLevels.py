@@ -0,0 +1,168 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCount, DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.global_vars import gDaysInYear
+from financepy.utils.math import N, corr_matrix_generator
+from financepy.utils.helpers import uniform_to_default_time
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds_curve import build_cds_curves
+from financepy.products.credit.cds_basket import CDSBasket
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def loop_basket_spread(basket, valuation_date, nToDefault, issuer_curves,
+                       correlationMatrix, libor_curve, num_trials, seed):
+    """ Spread of the basket from default times and legs calculated one
+    credit and trial at a time. """
+
+    np.random.seed(seed)
+    num_credits = len(issuer_curves)
+    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
+    y = np.dot(np.linalg.cholesky(correlationMatrix), x)
+
+    default_times = np.empty(shape=(num_credits, 2 * num_trials))
+
+    for iCredit in range(0, num_credits):
+        issuer_curve = issuer_curves[iCredit]
+        for iTrial in range(0, num_trials):
+            u1 = 1.0 - N(y[iCredit, iTrial])
+            u2 = 1.0 - u1
+            times = issuer_curve._times
+            values = issuer_curve._values
+            default_times[iCredit, iTrial] = \
+                uniform_to_default_time(u1, times, values)
+            default_times[iCredit, num_trials + iTrial] = \
+                uniform_to_default_time(u2, times, values)
+
+    adjusted_dates = basket._cds_contract._adjusted_dates
+    num_flows = len(adjusted_dates)
+    day_count = DayCount(basket._day_count_type)
+
+    averageAccrualFactor = 0.0
+    rpv01ToTimes = np.zeros(num_flows)
+    for iTime in range(1, num_flows):
+        t = (adjusted_dates[iTime] - valuation_date) / gDaysInYear
+        accrual_factor = day_count.year_frac(adjusted_dates[iTime - 1],
+                                             adjusted_dates[iTime])[0]
+        averageAccrualFactor += accrual_factor
+        rpv01ToTimes[iTime] = rpv01ToTimes[iTime - 1] + \
+            accrual_factor * libor_curve._df(t)
+
+    averageAccrualFactor /= num_flows
+    tmat = (basket._maturity_date - valuation_date) / gDaysInYear
+
+    rpv01 = 0.0
+    prot = 0.0
+
+    for iTrial in range(0, 2 * num_trials):
+        assetTau = np.sort(default_times[:, iTrial])
+        minTau = assetTau[nToDefault - 1]
+
+        if minTau < tmat:
+            numPaymentsIndex = int(minTau / averageAccrualFactor)
+            rpv01 += rpv01ToTimes[numPaymentsIndex] + \
+                (minTau - numPaymentsIndex * averageAccrualFactor)
+            assetIndex = np.argmax(default_times[:, iTrial] == minTau)
+            prot += (1.0 - issuer_curves[assetIndex]._recovery_rate) * \
+                libor_curve._df(minTau)
+        else:
+            rpv01 += rpv01ToTimes[int(tmat / averageAccrualFactor)]
+
+    return prot / rpv01
+
+###############################################################################
+
+
+def test_FinCDSBasketLevelsSpeed():
+
+    num_credits = 10
+    num_checked = 2000
+    num_trials = 200000
+    chunk_size = 20000
+    levels = [1, 2, 3, 4, 5]
+    seed = 1967
+
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+    maturity_date = Date(20, 12, 2023)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    tenors = ["1Y", "3Y", "5Y", "7Y", "10Y"]
+    np.random.seed(1919)
+    levels_spd = np.random.lognormal(np.log(0.01), 0.8, num_credits)
+    spreads = np.outer(levels_spd, [0.6, 0.8, 1.0, 1.1, 1.2])
+    issuer_curves = build_cds_curves(valuation_date, step_in_date, tenors,
+                                     spreads, libor_curve, 0.40)
+
+    corr_matrix = corr_matrix_generator(0.3, num_credits)
+    basket = CDSBasket(step_in_date, maturity_date)
+
+    # Compile the kernels
+    basket.value_gaussian_mc_levels(valuation_date, levels, issuer_curves,
+                                    corr_matrix, libor_curve, 10, seed)
+
+    start = time.time()
+    loop_spreads = []
+    for ntd in levels:
+        spd = loop_basket_spread(basket, valuation_date, ntd, issuer_curves,
+                                 corr_matrix, libor_curve, num_checked, seed)
+        loop_spreads.append(spd)
+    end = time.time()
+    elapsed_loop = (end - start) * num_trials / num_checked
+
+    v = basket.value_gaussian_mc_levels(valuation_date, levels,
+                                        issuer_curves, corr_matrix,
+                                        libor_curve, num_checked, seed,
+                                        num_checked)
+
+    max_diff = np.max(np.abs(v["spread"] - np.array(loop_spreads)))
+
+    testCases.header("NUM CREDITS", "NUM TRIALS", "MAX DIFF")
+    testCases.print(num_credits, num_checked, max_diff < 1e-12)
+
+    start = time.time()
+    v = basket.value_gaussian_mc_levels(valuation_date, levels,
+                                        issuer_curves, corr_matrix,
+                                        libor_curve, num_trials, seed,
+                                        chunk_size)
+    end = time.time()
+    elapsed = end - start
+
+    testCases.header("NTD", "SPREAD", "STDERR")
+    for i, ntd in enumerate(levels):
+        testCases.print(ntd, v["spread"][i] * 10000.0,
+                        v["spread_stderr"][i] * 10000.0)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("ONE LEVEL AT A TIME", elapsed_loop)
+    testCases.print("ALL LEVELS STREAMED", elapsed)
+    testCases.print("SPEEDUP", elapsed_loop / elapsed)
+
+###############################################################################
+
+
+test_FinCDSBasketLevelsSpeed()
+testCases.compareTestCases()
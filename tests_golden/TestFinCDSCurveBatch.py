@@ -0,0 +1,90 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve, build_cds_curves
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinCDSCurveBatchSpeed():
+
+    num_issuers = 1500
+    num_checked = 100
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    tenors = ["6M", "1Y", "2Y", "3Y", "4Y", "5Y", "7Y", "10Y"]
+    np.random.seed(1919)
+    levels = np.random.lognormal(np.log(0.01), 0.8, num_issuers)
+    slopes = np.random.uniform(-0.2, 0.8, num_issuers)
+    terms = np.array([0.5, 1.0, 2.0, 3.0, 4.0, 5.0, 7.0, 10.0])
+    spreads = np.outer(levels, np.ones(len(terms))) \
+        * (1.0 + np.outer(slopes, np.log(terms / 5.0 + 1.0)))
+
+    build_cds_curves(valuation_date, step_in_date, tenors, spreads[0:2],
+                     libor_curve, 0.40)
+
+    start = time.time()
+
+    issuer_curves = []
+    for i in range(0, num_checked):
+        cds_contracts = []
+        for k, tenor in enumerate(tenors):
+            cds_contracts.append(CDS(step_in_date, tenor, spreads[i, k]))
+        issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve,
+                                0.40)
+        issuer_curves.append(issuer_curve)
+
+    end = time.time()
+    elapsed_single = (end - start) * num_issuers / num_checked
+
+    start = time.time()
+    batch_curves = build_cds_curves(valuation_date, step_in_date, tenors,
+                                    spreads, libor_curve, 0.40)
+    end = time.time()
+    elapsed_batch = end - start
+
+    max_diff = 0.0
+    for i in range(0, num_checked):
+        diff = np.max(np.abs(batch_curves[i]._values
+                             - issuer_curves[i]._values))
+        max_diff = max(max_diff, diff)
+
+    testCases.header("NUM ISSUERS", "NUM TENORS", "MAX DIFF")
+    testCases.print(num_issuers, len(tenors), max_diff < 1e-6)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("ONE AT A TIME", elapsed_single)
+    testCases.print("BATCH", elapsed_batch)
+    testCases.print("SPEEDUP", elapsed_single / elapsed_batch)
+
+###############################################################################
+
+
+test_FinCDSCurveBatchSpeed()
+testCases.compareTestCases()
@@ -0,0 +1,139 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
+from FinTestCases import FinTestCases, globalTestCaseMode
+from os.path import dirname, join
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_flat_libor_curve(valuation_date, rate):
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, rate, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360_ISDA)
+        swaps.append(swap)
+
+    return IborSingleCurve(valuation_date, [], [], swaps)
+
+###############################################################################
+
+
+def test_FinCDSIndexAdjustBatchSpeed():
+
+    tradeDate = Date(1, 8, 2007)
+    step_in_date = tradeDate.add_days(1)
+    valuation_date = step_in_date
+
+    maturity_dates = [tradeDate.next_cds_date(m) for m in (36, 60, 84, 120)]
+
+    path = dirname(__file__)
+    f = open(join(path, "data", "CDX_NA_IG_S7_SPREADS.csv"), 'r')
+    data = f.readlines()
+    f.close()
+
+    # A CDX and an iTraxx style index with 125 names, each on its own curve
+    series_issuer_curves = []
+    for scale, rate in [(1.0, 0.050), (1.3, 0.043)]:
+        libor_curve = build_flat_libor_curve(valuation_date, rate)
+        issuer_curves = []
+        for row in data[1:]:
+            splitRow = row.split(",")
+            cds_contracts = []
+            for k, maturity_date in enumerate(maturity_dates):
+                spd = scale * float(splitRow[k + 1]) / 10000.0
+                cds_contracts.append(CDS(valuation_date, maturity_date, spd))
+            issuer_curve = CDSCurve(valuation_date, cds_contracts,
+                                    libor_curve, float(splitRow[5]))
+            issuer_curves.append(issuer_curve)
+        series_issuer_curves.append(issuer_curves)
+
+    index_maturity_dates = [Date(20, 12, 2009), Date(20, 12, 2011),
+                            Date(20, 12, 2013), Date(20, 12, 2016)]
+
+    series_coupons = [[0.0020, 0.0037, 0.0050, 0.0063],
+                      [0.0027, 0.0048, 0.0066, 0.0082]]
+    series_upfronts = [[0.0] * 4, [0.0] * 4]
+    series_maturity_dates = [index_maturity_dates] * 2
+    tolerance = 1e-6
+
+    portfolio = CDSIndexPortfolio()
+
+    for method in ["HAZARD", "SPREAD"]:
+
+        if method == "HAZARD":
+            single_fn = portfolio.hazard_rate_adjust_intrinsic
+            batch_fn = portfolio.hazard_rate_adjust_indices
+        else:
+            single_fn = portfolio.spread_adjust_intrinsic
+            batch_fn = portfolio.spread_adjust_indices
+
+        single_curves = []
+        for s in range(0, 2):
+            single_curves.append(single_fn(valuation_date,
+                                            series_issuer_curves[s],
+                                            series_coupons[s],
+                                            series_upfronts[s],
+                                            series_maturity_dates[s],
+                                            0.40,
+                                            tolerance))
+
+        start = time.time()
+        batch_curves = batch_fn(valuation_date,
+                                series_issuer_curves,
+                                series_coupons,
+                                series_upfronts,
+                                series_maturity_dates,
+                                0.40,
+                                tolerance)
+        end = time.time()
+        elapsed = end - start
+
+        max_diff = 0.0
+        for s in range(0, 2):
+            for curve1, curve2 in zip(single_curves[s], batch_curves[s]):
+                diff = np.max(np.abs(curve1._values - curve2._values))
+                max_diff = max(max_diff, diff)
+
+        testCases.header("METHOD", "NUM INDICES", "NUM CREDITS", "TIME",
+                         "SAME AS ONE AT A TIME")
+        testCases.print(method, 2, len(series_issuer_curves[0]), elapsed,
+                        max_diff < 1e-10)
+
+        testCases.header("METHOD", "INDEX", "MATURITY", "COUPON",
+                         "ADJUSTED INTRINSIC SPD")
+
+        for s in range(0, 2):
+            for i, maturity_date in enumerate(series_maturity_dates[s]):
+                spd = portfolio.intrinsic_spread(valuation_date,
+                                                 valuation_date,
+                                                 maturity_date,
+                                                 batch_curves[s])
+                testCases.print(method, s, str(maturity_date),
+                                series_coupons[s][i] * 10000.0,
+                                spd * 10000.0)
+
+###############################################################################
+
+
+test_FinCDSIndexAdjustBatchSpeed()
+testCases.compareTestCases()
@@ -0,0 +1,209 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_index_option import CDSIndexOption
+from financepy.products.credit.cds_index_option import value_anderson_grid
+from financepy.products.credit.cds_index_option import \
+    value_adjusted_black_grid, implied_volatility_adjusted_black_grid
+from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
+from FinTestCases import FinTestCases, globalTestCaseMode
+from os.path import dirname, join
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_flat_libor_curve(valuation_date, rate):
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, rate, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360_ISDA)
+        swaps.append(swap)
+
+    return IborSingleCurve(valuation_date, [], [], swaps)
+
+###############################################################################
+
+
+def test_FinCDSIndexOptionGrid():
+
+    tradeDate = Date(1, 8, 2007)
+    step_in_date = tradeDate.add_days(1)
+    valuation_date = step_in_date
+
+    libor_curve = build_flat_libor_curve(valuation_date, 0.050)
+
+    maturity_dates = [tradeDate.next_cds_date(m) for m in (36, 60, 84, 120)]
+
+    path = dirname(__file__)
+    f = open(join(path, "data", "CDX_NA_IG_S7_SPREADS.csv"), 'r')
+    data = f.readlines()
+    f.close()
+
+    issuer_curves = []
+    for row in data[1:]:
+        splitRow = row.split(",")
+        cds_contracts = []
+        for k, maturity_date in enumerate(maturity_dates):
+            spd = float(splitRow[k + 1]) / 10000.0
+            cds_contracts.append(CDS(valuation_date, maturity_date, spd))
+        issuer_curve = CDSCurve(valuation_date, cds_contracts,
+                                libor_curve, float(splitRow[5]))
+        issuer_curves.append(issuer_curve)
+
+    indexMaturityDates = [Date(20, 12, 2009), Date(20, 12, 2011),
+                          Date(20, 12, 2013), Date(20, 12, 2016)]
+    indexSpreads = [0.0040] * 4
+    indexUpfronts = [0.0] * 4
+    indexRecovery = 0.40
+
+    index_curve = CDSCurve(valuation_date,
+                           [CDS(valuation_date, dt, s)
+                            for dt, s in zip(indexMaturityDates,
+                                             indexSpreads)],
+                           libor_curve, indexRecovery)
+
+    portfolio = CDSIndexPortfolio()
+    adjustedIssuerCurves = portfolio.hazard_rate_adjust_intrinsic(
+        valuation_date,
+        issuer_curves,
+        indexSpreads,
+        indexUpfronts,
+        indexMaturityDates,
+        indexRecovery,
+        1e-6)
+
+    index_coupon = 0.004
+    maturity_date = Date(20, 12, 2011)
+    notional = 10000.0
+    expiry_dates = [Date(1, 10, 2007), Date(1, 11, 2007),
+                    Date(1, 12, 2007), Date(1, 2, 2008)]
+    strikes = np.linspace(20.0, 80.0, 25) / 10000.0
+
+    # A smile which rises away from the index coupon
+    vols = 0.45 + 2000.0 * (strikes - index_coupon)**2
+    vols = np.tile(vols, (len(expiry_dates), 1))
+
+    testCases.header("MODEL", "NUM EXPIRIES", "NUM STRIKES", "TIME",
+                     "SAME AS ONE AT A TIME")
+
+    for model in ["ADJUSTED BLACK", "ANDERSON"]:
+
+        loop_values = np.zeros((len(expiry_dates), len(strikes)))
+        for i, expiry_date in enumerate(expiry_dates):
+            for j, strike in enumerate(strikes):
+                option = CDSIndexOption(expiry_date,
+                                        maturity_date,
+                                        index_coupon,
+                                        strike,
+                                        notional)
+                if model == "ANDERSON":
+                    v = option.value_anderson(valuation_date,
+                                              adjustedIssuerCurves,
+                                              indexRecovery,
+                                              vols[i, j])
+                else:
+                    v = option.value_adjusted_black(valuation_date,
+                                                    index_curve,
+                                                    indexRecovery,
+                                                    libor_curve,
+                                                    vols[i, j])
+                loop_values[i, j] = v[0]
+
+        start = time.time()
+        if model == "ANDERSON":
+            values = value_anderson_grid(valuation_date,
+                                         expiry_dates,
+                                         maturity_date,
+                                         index_coupon,
+                                         strikes,
+                                         vols,
+                                         adjustedIssuerCurves,
+                                         indexRecovery,
+                                         notional)
+        else:
+            values = value_adjusted_black_grid(valuation_date,
+                                               expiry_dates,
+                                               maturity_date,
+                                               index_coupon,
+                                               strikes,
+                                               vols,
+                                               index_curve,
+                                               indexRecovery,
+                                               libor_curve,
+                                               notional)
+        end = time.time()
+        grid_time = end - start
+
+        same = np.max(np.abs(values['payer'] - loop_values)) < 1e-10
+
+        testCases.print(model, len(expiry_dates), len(strikes), grid_time,
+                        same)
+
+    values = value_adjusted_black_grid(valuation_date,
+                                       expiry_dates,
+                                       maturity_date,
+                                       index_coupon,
+                                       strikes,
+                                       vols,
+                                       index_curve,
+                                       indexRecovery,
+                                       libor_curve,
+                                       notional)
+
+    start = time.time()
+    sigmas = implied_volatility_adjusted_black_grid(valuation_date,
+                                                    expiry_dates,
+                                                    maturity_date,
+                                                    index_coupon,
+                                                    strikes,
+                                                    values['payer'],
+                                                    index_curve,
+                                                    indexRecovery,
+                                                    libor_curve,
+                                                    notional)
+    end = time.time()
+
+    # Deep in the money the price hardly depends on the volatility
+    solvable = values['vega'] > 1e-4 * notional
+    vol_error = np.max(np.abs(sigmas - vols)[solvable])
+
+    testCases.header("NUM VOLS", "TIME", "MAX VOL ERROR")
+    testCases.print(sigmas.size, end - start, vol_error)
+
+    testCases.header("EXPIRY", "STRIKE", "VOL", "PAYER", "RECEIVER",
+                     "DELTA", "GAMMA", "VEGA")
+
+    for i, expiry_date in enumerate(expiry_dates):
+        for j in range(0, len(strikes), 6):
+            testCases.print(str(expiry_date),
+                            strikes[j] * 10000.0,
+                            vols[i, j],
+                            values['payer'][i, j],
+                            values['receiver'][i, j],
+                            values['payer_delta'][i, j],
+                            values['gamma'][i, j],
+                            values['vega'][i, j])
+
+###############################################################################
+
+
+test_FinCDSIndexOptionGrid()
+testCases.compareTestCases()
@@ -0,0 +1,120 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import ONE_MILLION
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_portfolio import CDSPortfolio
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_issuer_curves(valuation_date, num_issuers):
+    """ Build issuer curves with different spread levels sharing one Libor
+    curve. """
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    issuer_curves = []
+    for j in range(0, num_issuers):
+        cds_contracts = []
+        for tenor in ["6M", "1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]:
+            spread = 0.004 + 0.0002 * j + 0.0005 * int(tenor[:-1]) \
+                * (1 if tenor[-1] == "Y" else 0)
+            cds = CDS(valuation_date, tenor, spread)
+            cds_contracts.append(cds)
+
+        issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve,
+                                0.40)
+        issuer_curves.append(issuer_curve)
+
+    return issuer_curves
+
+###############################################################################
+
+
+def test_FinCDSPortfolioSpeed():
+
+    num_contracts = 10000
+    num_issuers = 50
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    issuer_curves = build_issuer_curves(valuation_date, num_issuers)
+
+    np.random.seed(1919)
+    months = np.random.randint(3, 120, num_contracts)
+    coupons = np.random.choice([0.01, 0.05], num_contracts)
+    notionals = np.random.uniform(1.0, 10.0, num_contracts) * ONE_MILLION
+    long_protection = np.random.randint(0, 2, num_contracts)
+    issuer_indices = np.random.randint(0, num_issuers, num_contracts)
+
+    contracts = []
+    for i in range(0, num_contracts):
+        maturity_date = step_in_date.add_months(int(months[i]))
+        maturity_date = maturity_date.next_cds_date()
+        cds = CDS(step_in_date, maturity_date, coupons[i], notionals[i],
+                  bool(long_protection[i]))
+        contracts.append(cds)
+
+    start = time.time()
+
+    full_pvs = np.zeros(num_contracts)
+    for i, cds in enumerate(contracts):
+        v = cds.value(valuation_date, issuer_curves[issuer_indices[i]], 0.40)
+        full_pvs[i] = v['full_pv']
+
+    end = time.time()
+    elapsed_loop = end - start
+
+    start = time.time()
+    portfolio = CDSPortfolio(contracts, issuer_indices, 0.40)
+    end = time.time()
+    elapsed_pack = end - start
+
+    portfolio.value(valuation_date, issuer_curves)
+
+    start = time.time()
+    values = portfolio.value(valuation_date, issuer_curves)
+    end = time.time()
+    elapsed_portfolio = end - start
+
+    max_diff = np.max(np.abs(values['full_pv'] - full_pvs)) < 1e-6
+
+    testCases.header("NUM CONTRACTS", "NUM ISSUERS", "TOTAL PV", "MAX DIFF")
+    testCases.print(num_contracts, num_issuers, np.sum(values['full_pv']),
+                    max_diff)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("CDS LOOP", elapsed_loop)
+    testCases.print("PACKING", elapsed_pack)
+    testCases.print("PORTFOLIO", elapsed_portfolio)
+    testCases.print("SPEEDUP", elapsed_loop / elapsed_portfolio)
+
+###############################################################################
+
+
+test_FinCDSPortfolioSpeed()
+testCases.compareTestCases()
@@ -0,0 +1,115 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import ONE_MILLION
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinCDSRiskSpeed():
+
+    num_trades = 500
+    recovery_rate = 0.40
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    depos = [IborDeposit(valuation_date, "3M", 0.02, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, depos, [], swaps)
+
+    cds_contracts = []
+    for tenor, spread in [("6M", 0.0050), ("1Y", 0.0055), ("2Y", 0.0065),
+                          ("3Y", 0.0075), ("5Y", 0.0090), ("7Y", 0.0100),
+                          ("10Y", 0.0105)]:
+        cds_contracts.append(CDS(valuation_date, tenor, spread))
+
+    issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve,
+                            recovery_rate)
+
+    np.random.seed(1919)
+    months = np.random.randint(3, 120, num_trades)
+    coupons = np.random.choice([0.01, 0.05], num_trades)
+    notionals = np.random.uniform(1.0, 10.0, num_trades) * ONE_MILLION
+    long_protection = np.random.randint(0, 2, num_trades)
+
+    trades = []
+    for i in range(0, num_trades):
+        maturity_date = step_in_date.add_months(int(months[i]))
+        maturity_date = maturity_date.next_cds_date()
+        trade = CDS(step_in_date, maturity_date, coupons[i], notionals[i],
+                    bool(long_protection[i]))
+        trades.append(trade)
+
+    issuer_curve.spread_sensitivities(valuation_date, trades[0:1],
+                                      recovery_rate)
+    issuer_curve.rate_sensitivities(valuation_date, trades[0:1],
+                                    recovery_rate)
+
+    start = time.time()
+
+    credit_dv01s = np.zeros(num_trades)
+    interest_dv01s = np.zeros(num_trades)
+    for i, trade in enumerate(trades):
+        credit_dv01s[i] = trade.credit_dv01(valuation_date, issuer_curve,
+                                            recovery_rate)
+        interest_dv01s[i] = trade.interest_dv01(valuation_date, issuer_curve,
+                                                recovery_rate)
+
+    end = time.time()
+    elapsed_bump = end - start
+
+    start = time.time()
+
+    spread_sens = issuer_curve.spread_sensitivities(valuation_date, trades,
+                                                    recovery_rate)
+    rate_sens = issuer_curve.rate_sensitivities(valuation_date, trades,
+                                                recovery_rate)
+
+    end = time.time()
+    elapsed_jacobian = end - start
+
+    credit_diff = np.max(np.abs(np.sum(spread_sens, axis=1) - credit_dv01s)
+                         / np.abs(credit_dv01s))
+    interest_diff = np.max(np.abs(np.sum(rate_sens, axis=1)
+                                  - interest_dv01s))
+
+    testCases.header("NUM TRADES", "NUM SPREADS", "NUM RATES",
+                     "CREDIT DIFF", "RATE DIFF")
+    testCases.print(num_trades, spread_sens.shape[1], rate_sens.shape[1],
+                    credit_diff < 0.01, interest_diff < 1.0)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("BUMP AND REBUILD", elapsed_bump)
+    testCases.print("JACOBIAN", elapsed_jacobian)
+    testCases.print("SPEEDUP", elapsed_bump / elapsed_jacobian)
+
+###############################################################################
+
+
+test_FinCDSRiskSpeed()
+testCases.compareTestCases()
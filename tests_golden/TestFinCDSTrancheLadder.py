@@ -0,0 +1,170 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.global_vars import gDaysInYear
+from financepy.market.curves.interpolator import InterpTypes, interpolate
+from financepy.models.gauss_copula_onefactor import tranche_surv_prob_recursion
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds_curve import CDSCurve, build_cds_curves
+from financepy.products.credit.cds_tranche import CDSTranche
+from financepy.products.credit.cds_tranche import FinLossDistributionBuilder
+from financepy.products.credit.cds_tranche import value_tranches_bc
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def loop_tranche_spread(tranche, valuation_date, issuer_curves, corr1, corr2,
+                        num_points):
+    """ Par spread of a tranche with the survival probabilities of each
+    issuer interpolated and two loss distributions built at each date. """
+
+    num_credits = len(issuer_curves)
+    k1 = tranche._k1
+    k2 = tranche._k2
+    kappa = k2 / (k2 - k1)
+
+    payment_dates = tranche._cds_contract._adjusted_dates
+    num_times = len(payment_dates)
+
+    beta_vector1 = np.ones(num_credits) * np.sqrt(corr1)
+    beta_vector2 = np.ones(num_credits) * np.sqrt(corr2)
+    recovery_rates = np.zeros(num_credits)
+    qVector = np.zeros(num_credits)
+
+    trancheTimes = np.zeros(num_times)
+    trancheSurvivalCurve = np.ones(num_times)
+
+    for i in range(1, num_times):
+        t = (payment_dates[i] - valuation_date) / gDaysInYear
+
+        for j in range(0, num_credits):
+            issuer_curve = issuer_curves[j]
+            recovery_rates[j] = issuer_curve._recovery_rate
+            qVector[j] = interpolate(t, issuer_curve._times,
+                                     issuer_curve._values,
+                                     InterpTypes.FLAT_FWD_RATES.value)
+
+        qt1 = tranche_surv_prob_recursion(0.0, k1, num_credits, qVector,
+                                          recovery_rates, beta_vector1,
+                                          num_points)
+        qt2 = tranche_surv_prob_recursion(0.0, k2, num_credits, qVector,
+                                          recovery_rates, beta_vector2,
+                                          num_points)
+
+        trancheSurvivalCurve[i] = kappa * qt2 + (1.0 - kappa) * qt1
+        trancheTimes[i] = t
+
+    trancheCurve = CDSCurve(valuation_date, [],
+                            issuer_curves[0]._libor_curve, 0.0)
+    trancheCurve._times = trancheTimes
+    trancheCurve._values = trancheSurvivalCurve
+
+    protLegPV = tranche._cds_contract.protection_leg_pv(
+        valuation_date, trancheCurve, 0.0)
+    risky_pv01 = tranche._cds_contract.risky_pv01(
+        valuation_date, trancheCurve)['clean_rpv01']
+
+    return protLegPV / risky_pv01
+
+###############################################################################
+
+
+def test_FinCDSTrancheLadderSpeed():
+
+    num_credits = 125
+    num_points = 40
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    tenors = ["1Y", "3Y", "5Y", "7Y", "10Y"]
+    np.random.seed(1919)
+    levels = np.random.lognormal(np.log(0.008), 0.6, num_credits)
+    spreads = np.outer(levels, [0.6, 0.8, 1.0, 1.1, 1.2])
+    issuer_curves = build_cds_curves(valuation_date, step_in_date, tenors,
+                                     spreads, libor_curve, 0.40)
+
+    strikes = [0.0, 0.03, 0.07, 0.10, 0.15, 0.30]
+    maturities = [Date(20, 12, 2020), Date(20, 12, 2021), Date(20, 12, 2023),
+                  Date(20, 12, 2025), Date(20, 12, 2028)]
+
+    method = FinLossDistributionBuilder.RECURSION
+
+    # One base correlation curve for all maturities and then one curve for
+    # each maturity which shares less of the work
+    for label, mat_shift in [("ONE CURVE", 0.0), ("CURVE PER MATURITY", 0.02)]:
+
+        tranches = []
+        corr1s = []
+        corr2s = []
+
+        for iMat, maturity_date in enumerate(maturities):
+            base_corrs = [0.0] + [0.10 + 0.08 * i + mat_shift * iMat
+                                  for i in range(0, 5)]
+            for i in range(0, len(strikes) - 1):
+                tranches.append(CDSTranche(valuation_date, maturity_date,
+                                           strikes[i], strikes[i + 1]))
+                corr1s.append(base_corrs[i])
+                corr2s.append(base_corrs[i + 1])
+
+        # Compile the kernels
+        value_tranches_bc(valuation_date, tranches[0:2], issuer_curves, 0.0,
+                          0.0, corr1s[0:2], corr2s[0:2], num_points, method)
+
+        start = time.time()
+        loop_spreads = []
+        for i, tranche in enumerate(tranches):
+            spd = loop_tranche_spread(tranche, valuation_date, issuer_curves,
+                                      corr1s[i], corr2s[i], num_points)
+            loop_spreads.append(spd)
+        end = time.time()
+        elapsed_loop = end - start
+
+        start = time.time()
+        v = value_tranches_bc(valuation_date, tranches, issuer_curves, 0.0,
+                              0.0, corr1s, corr2s, num_points, method)
+        end = time.time()
+        elapsed_ladder = end - start
+
+        max_diff = np.max(np.abs(v[:, 3] - np.array(loop_spreads)))
+
+        testCases.header("LABEL", "NUM TRANCHES", "MAX DIFF")
+        testCases.print(label, len(tranches), max_diff < 1e-10)
+
+        testCases.header("MATURITY", "K1", "K2", "SPREAD")
+        for i, tranche in enumerate(tranches):
+            testCases.print(tranche._maturity_date, tranche._k1, tranche._k2,
+                            v[i, 3] * 10000.0)
+
+        testCases.header("LABEL", "TIME")
+        testCases.print("TRANCHE BY TRANCHE", elapsed_loop)
+        testCases.print("SHARED LADDER", elapsed_ladder)
+        testCases.print("SPEEDUP", elapsed_loop / elapsed_ladder)
+
+###############################################################################
+
+
+test_FinCDSTrancheLadderSpeed()
+testCases.compareTestCases()
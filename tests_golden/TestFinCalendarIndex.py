@@ -0,0 +1,129 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.date import Date
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def is_business_day_by_rules(calendar, dt):
+    """ The business day test as it was done before the bitmap index, by
+    evaluating the holiday rules of the calendar for each date. """
+
+    if dt.is_weekend():
+        return False
+
+    start_date = Date(1, 1, dt._y)
+    day_in_year = dt._excel_date - start_date._excel_date + 1
+    holiday = calendar._holiday_from_rules(dt._d, dt._m, dt._y,
+                                           day_in_year, dt._weekday)
+    return not holiday
+
+###############################################################################
+
+
+def adjust_by_rules(calendar, dt):
+    """ Modified following adjustment stepping one day at a time. """
+
+    m_start = dt._m
+    start_dt = dt
+
+    while is_business_day_by_rules(calendar, dt) is False:
+        dt = dt.add_days(1)
+
+    if dt._m != m_start:
+        dt = start_dt
+        while is_business_day_by_rules(calendar, dt) is False:
+            dt = dt.add_days(-1)
+
+    return dt
+
+###############################################################################
+
+
+def test_FinCalendarIndexSpeed():
+
+    num_adjustments = 1000000
+    num_dates = 5 * 365
+
+    bus_day_adjust_type = BusDayAdjustTypes.MODIFIED_FOLLOWING
+    start_date = Date(1, 1, 2020)
+    dates = [start_date.add_days(i) for i in range(0, num_dates)]
+
+    for calendar_type in [CalendarTypes.TARGET,
+                          CalendarTypes.UNITED_KINGDOM,
+                          CalendarTypes.UNITED_STATES]:
+
+        calendar = Calendar(calendar_type)
+
+        start = time.time()
+
+        rule_dates = []
+        for i in range(0, num_adjustments):
+            dt = dates[i % num_dates]
+            rule_dates.append(adjust_by_rules(calendar, dt))
+
+        end = time.time()
+        elapsed_rules = end - start
+
+        start = time.time()
+
+        index_dates = []
+        for i in range(0, num_adjustments):
+            dt = dates[i % num_dates]
+            index_dates.append(calendar.adjust(dt, bus_day_adjust_type))
+
+        end = time.time()
+        elapsed_index = end - start
+
+        num_diffs = 0
+        for i in range(0, num_dates):
+            if rule_dates[i] != index_dates[i]:
+                num_diffs += 1
+
+        testCases.header("CALENDAR", "NUM ADJUSTMENTS", "NUM DIFFS")
+        testCases.print(str(calendar), num_adjustments, num_diffs)
+
+        testCases.header("CALENDAR", "LABEL", "TIME")
+        testCases.print(str(calendar), "RULES", elapsed_rules)
+        testCases.print(str(calendar), "INDEX", elapsed_index)
+        testCases.print(str(calendar), "SPEEDUP", elapsed_rules / elapsed_index)
+
+###############################################################################
+
+
+def test_FinCalendarIndexAddBusinessDays():
+
+    calendar = Calendar(CalendarTypes.TARGET)
+    start_date = Date(3, 1, 2020)
+
+    testCases.header("NUM DAYS", "DATE")
+
+    for num_days in [-1000, -250, -1, 0, 1, 10, 250, 2500, 25000]:
+        end_date = calendar.add_business_days(start_date, num_days)
+        testCases.print(num_days, end_date)
+
+    joint_calendar = Calendar((CalendarTypes.UNITED_KINGDOM,
+                               CalendarTypes.UNITED_STATES))
+
+    testCases.header("CALENDAR", "YEAR", "HOLIDAYS")
+    for year in [2021, 2022, 2023]:
+        testCases.print(str(joint_calendar), year,
+                        len(joint_calendar.get_holiday_list(year)))
+
+###############################################################################
+
+
+test_FinCalendarIndexSpeed()
+test_FinCalendarIndexAddBusinessDays()
+testCases.compareTestCases()
@@ -0,0 +1,117 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_fra import IborFRA
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_instruments(valuation_date):
+
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = []
+    for i, tenor in enumerate(["1W", "1M", "2M", "3M", "6M"]):
+        depo = IborDeposit(settlement_date, tenor, 0.010 + 0.001 * i,
+                           DayCountTypes.ACT_360)
+        depos.append(depo)
+
+    fras = []
+    for i, start in enumerate(["4M", "5M", "6M", "7M", "8M"]):
+        fra = IborFRA(settlement_date.add_tenor(start), "6M",
+                      0.013 + 0.0005 * i, DayCountTypes.ACT_360)
+        fras.append(fra)
+
+    swaps = []
+    for years in range(2, 42):
+        swap = IborSwap(settlement_date, str(years) + "Y", SwapTypes.PAY,
+                        0.016 + 0.0003 * years, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+###############################################################################
+
+
+def test_FinCurveBootstrapSpeed():
+    """ Rebuild a curve with 50 instruments after each change in a swap
+    quote using the root search bootstrap and the Jacobian bootstrap. """
+
+    valuation_date = Date(10, 11, 2021)
+    depos, fras, swaps = build_instruments(valuation_date)
+    num_rebuilds = 20
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.LINEAR_FWD_RATES]:
+
+        libor_curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                      interp_type)
+
+        start = time.time()
+        for _ in range(0, num_rebuilds):
+            libor_curve._build_curve_using_1d_solver()
+        end = time.time()
+        elapsed_solver = (end - start) / num_rebuilds
+        dfs_solver = libor_curve._dfs.copy()
+
+        start = time.time()
+        for _ in range(0, num_rebuilds):
+            libor_curve._build_curve_using_jacobian()
+        end = time.time()
+        elapsed_jacobian = (end - start) / num_rebuilds
+        dfs_jacobian = libor_curve._dfs.copy()
+
+        max_diff = np.max(np.abs(dfs_solver - dfs_jacobian))
+
+        testCases.header("INTERP", "NUM PILLARS", "MAX DF DIFF < 1E-9")
+        testCases.print(interp_type, len(dfs_jacobian) - 1, max_diff < 1e-9)
+
+        testCases.header("INTERP", "LABEL", "TIME")
+        testCases.print(interp_type, "SOLVER", elapsed_solver)
+        testCases.print(interp_type, "JACOBIAN", elapsed_jacobian)
+        testCases.print(interp_type, "SPEEDUP",
+                        elapsed_solver / elapsed_jacobian)
+
+###############################################################################
+
+
+def test_FinCurveBootstrapJacobian():
+    """ Show the diagonal of the Jacobian of the instrument values with
+    respect to their own pillar discount factors. """
+
+    valuation_date = Date(10, 11, 2021)
+    depos, fras, swaps = build_instruments(valuation_date)
+
+    libor_curve = IborSingleCurve(valuation_date, depos, fras, swaps)
+    jac = libor_curve.jacobian()
+
+    testCases.header("PILLAR", "TIME", "DF", "DIAGONAL")
+    for i in range(0, len(jac), 5):
+        testCases.print(i + 1, libor_curve._times[i + 1],
+                        libor_curve._dfs[i + 1], jac[i, i])
+
+###############################################################################
+
+
+test_FinCurveBootstrapSpeed()
+test_FinCurveBootstrapJacobian()
+testCases.compareTestCases()
@@ -0,0 +1,111 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import ONE_MILLION
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_curve(valuation_date, interp_type):
+    """ Build a curve from a deposit and 30 swaps. """
+
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = [IborDeposit(settlement_date, "6M", 0.012,
+                         DayCountTypes.ACT_360)]
+
+    swaps = []
+    for years in range(1, 31):
+        swap = IborSwap(settlement_date, str(years) + "Y", SwapTypes.PAY,
+                        0.016 + 0.0003 * years, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return IborSingleCurve(valuation_date, depos, [], swaps, interp_type)
+
+###############################################################################
+
+
+def build_book(valuation_date, num_trades):
+    """ Build a book of forward starting swaps with random terms. """
+
+    settlement_date = valuation_date.add_weekdays(2)
+
+    np.random.seed(1919)
+    start_months = np.random.randint(0, 24, num_trades)
+    years = np.random.randint(1, 30, num_trades)
+    coupons = np.random.uniform(0.01, 0.03, num_trades)
+
+    trades = []
+    for i in range(0, num_trades):
+        swap = IborSwap(settlement_date.add_months(int(start_months[i])),
+                        str(years[i]) + "Y", SwapTypes.PAY, coupons[i],
+                        FrequencyTypes.ANNUAL, DayCountTypes.ACT_360,
+                        notional=ONE_MILLION)
+        trades.append(swap)
+
+    return trades
+
+###############################################################################
+
+
+def value_book(valuation_date, curve, trades, num_revaluations):
+    """ Value the book several times on the same curve as a risk system
+    does when it revalues a portfolio for different reports. """
+
+    values = np.zeros(len(trades))
+
+    for _ in range(0, num_revaluations):
+        for i, trade in enumerate(trades):
+            values[i] = trade.value(valuation_date, curve)
+
+    return values
+
+###############################################################################
+
+
+def test_FinCurveCache():
+
+    num_trades = 1000
+    num_revaluations = 5
+    valuation_date = Date(6, 10, 2021)
+    trades = build_book(valuation_date, num_trades)
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.NATCUBIC_LOG_DISCOUNT]:
+
+        curve = build_curve(valuation_date, interp_type)
+        values = value_book(valuation_date, curve, trades, num_revaluations)
+
+        curve.enable_cache(4 * num_trades)
+        cached_values = value_book(valuation_date, curve, trades,
+                                   num_revaluations)
+
+        info = curve.cache_info()
+        max_diff = np.max(np.abs(cached_values - values)) < 1e-10
+
+        testCases.header("INTERP", "NUM TRADES", "HITS", "MISSES", "MAX DIFF")
+        testCases.print(interp_type, num_trades, info["hits"],
+                        info["misses"], max_diff)
+
+###############################################################################
+
+
+test_FinCurveCache()
+testCases.compareTestCases()
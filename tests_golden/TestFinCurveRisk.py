@@ -0,0 +1,149 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import ONE_MILLION
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_fra import IborFRA
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_curve(valuation_date):
+    """ Build a curve from 40 quotes. """
+
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depos = []
+    for i, tenor in enumerate(["1W", "1M", "2M", "3M", "6M"]):
+        depo = IborDeposit(settlement_date, tenor, 0.010 + 0.001 * i,
+                           DayCountTypes.ACT_360)
+        depos.append(depo)
+
+    fras = []
+    for i, start in enumerate(["4M", "5M", "6M", "7M", "8M"]):
+        fra = IborFRA(settlement_date.add_tenor(start), "6M",
+                      0.013 + 0.0005 * i, DayCountTypes.ACT_360)
+        fras.append(fra)
+
+    swaps = []
+    for years in range(2, 32):
+        swap = IborSwap(settlement_date, str(years) + "Y", SwapTypes.PAY,
+                        0.016 + 0.0003 * years, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return IborSingleCurve(valuation_date, depos, fras, swaps)
+
+###############################################################################
+
+
+def build_book(valuation_date, num_trades):
+    """ Build a book of forward starting swaps with random terms. """
+
+    settlement_date = valuation_date.add_weekdays(2)
+
+    np.random.seed(1919)
+    start_months = np.random.randint(0, 24, num_trades)
+    years = np.random.randint(1, 30, num_trades)
+    coupons = np.random.uniform(0.01, 0.03, num_trades)
+    pay_fixed = np.random.randint(0, 2, num_trades)
+
+    trades = []
+    for i in range(0, num_trades):
+        swap_type = SwapTypes.PAY if pay_fixed[i] else SwapTypes.RECEIVE
+        swap = IborSwap(settlement_date.add_months(int(start_months[i])),
+                        str(years[i]) + "Y", swap_type, coupons[i],
+                        FrequencyTypes.ANNUAL, DayCountTypes.ACT_360,
+                        notional=ONE_MILLION)
+        trades.append(swap)
+
+    return trades
+
+###############################################################################
+
+
+def test_FinCurveRiskSpeed():
+    """ Calculate the sensitivity of a book of swaps to each of the curve
+    quotes using one adjoint pass and compare with bumping each quote,
+    rebuilding the curve and revaluing a part of the book. The bumps are made
+    up and down to remove the second order change in value. The adjoint pass
+    for the book includes generating the swap schedules. """
+
+    valuation_date = Date(10, 11, 2021)
+    libor_curve = build_curve(valuation_date)
+    num_quotes = len(libor_curve._times) - 1
+
+    num_trades = 5000
+    num_bumped_trades = 100
+    trades = build_book(valuation_date, num_trades)
+
+    # Compile the kernels before timing
+    libor_curve.quote_sensitivities(trades[0:1])
+
+    start = time.time()
+    sens = libor_curve.quote_sensitivities(trades)
+    end = time.time()
+    elapsed_adjoint = end - start
+
+    start = time.time()
+    total = libor_curve.quote_sensitivities(trades, aggregate=True)
+    end = time.time()
+    elapsed_aggregate = end - start
+
+    bump = 0.0001
+    bumped_trades = trades[0:num_bumped_trades]
+
+    start = time.time()
+
+    bump_sens = np.zeros((num_bumped_trades, num_quotes))
+
+    for j in range(0, num_quotes):
+        bumps = np.zeros(num_quotes)
+        bumps[j] = bump
+        curve_up = libor_curve.bump_quotes(bumps)
+        curve_down = libor_curve.bump_quotes(-bumps)
+        v_up = np.array([t.value(valuation_date, curve_up)
+                         for t in bumped_trades])
+        v_down = np.array([t.value(valuation_date, curve_down)
+                           for t in bumped_trades])
+        bump_sens[:, j] = (v_up - v_down) / 2.0
+
+    end = time.time()
+    elapsed_bump = end - start
+
+    max_diff = np.max(np.abs(bump_sens - sens[0:num_bumped_trades]))
+
+    testCases.header("NUM TRADES", "NUM QUOTES", "MAX DIFF < 0.01")
+    testCases.print(num_bumped_trades, num_quotes, max_diff < 0.01)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("BUMP 100 TRADES", elapsed_bump)
+    testCases.print("ADJOINT 5000 TRADES", elapsed_adjoint)
+    testCases.print("ADJOINT 5000 TRADES TOTAL", elapsed_aggregate)
+    testCases.print("SPEEDUP PER TRADE", elapsed_bump * num_trades
+                    / num_bumped_trades / elapsed_adjoint)
+
+    testCases.header("QUOTE", "TIME", "BOOK SENSITIVITY")
+    for j in range(0, num_quotes, 5):
+        testCases.print(j + 1, libor_curve._times[j + 1], total[j])
+
+###############################################################################
+
+
+test_FinCurveRiskSpeed()
+testCases.compareTestCases()
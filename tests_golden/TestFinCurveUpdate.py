@@ -0,0 +1,180 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_fra import IborFRA
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ois import OIS
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ois_curve import OISCurve
+from financepy.products.rates.dual_curve import IborDualCurve
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_ibor_instruments(settlement_date):
+
+    depos = []
+    for i, tenor in enumerate(["1M", "3M", "6M"]):
+        depo = IborDeposit(settlement_date, tenor, 0.010 + 0.001 * i,
+                           DayCountTypes.ACT_360)
+        depos.append(depo)
+
+    fras = []
+    for i, start in enumerate(["4M", "5M", "6M"]):
+        fra = IborFRA(settlement_date.add_tenor(start), "6M",
+                      0.013 + 0.0005 * i, DayCountTypes.ACT_360)
+        fras.append(fra)
+
+    swaps = []
+    for years in range(2, 31):
+        swap = IborSwap(settlement_date, str(years) + "Y", SwapTypes.PAY,
+                        0.016 + 0.0003 * years, FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, fras, swaps
+
+###############################################################################
+
+
+def build_ois_instruments(settlement_date):
+
+    depos = [IborDeposit(settlement_date, "1W", 0.008, DayCountTypes.ACT_360)]
+
+    swaps = []
+    for years in range(1, 31):
+        swap = OIS(settlement_date, str(years) + "Y", SwapTypes.PAY,
+                   0.009 + 0.0002 * years, FrequencyTypes.ANNUAL,
+                   DayCountTypes.ACT_360)
+        swaps.append(swap)
+
+    return depos, [], swaps
+
+###############################################################################
+
+
+def apply_updates(curve, build_fn, quotes, num_updates):
+    """ Apply random single quote ticks to the curve using the incremental
+    update and check that a full rebuild of the last state agrees. Returns
+    the largest difference and the average number of pillars changed. """
+
+    np.random.seed(1919)
+    num_quotes = len(quotes)
+    indices = np.random.randint(0, num_quotes, num_updates)
+    ticks = np.random.normal(0.0, 0.00005, num_updates)
+
+    num_changed = 0
+    for i in range(0, num_updates):
+        j = int(indices[i])
+        changed = curve.update_quotes({j: quotes[j] + ticks[i]})
+        num_changed += len(changed)
+
+    if isinstance(curve, CDSCurve):
+        values = curve._values.copy()
+    else:
+        values = curve._dfs.copy()
+
+    max_diff = np.max(np.abs(values - build_fn()))
+    return max_diff, num_changed / num_updates
+
+###############################################################################
+
+
+def test_FinCurveUpdate():
+    """ Apply quote updates incrementally to each type of curve. The full
+    rebuild of the last state should give the same curve. """
+
+    valuation_date = Date(10, 11, 2021)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    testCases.header("CURVE", "MAX DIFF < 1E-12", "AVG PILLARS CHANGED")
+
+    depos, fras, swaps = build_ibor_instruments(settlement_date)
+    libor_curve = IborSingleCurve(valuation_date, depos, fras, swaps)
+    instruments = depos + fras + swaps
+    quotes = [0.010] * len(instruments)
+    for i, instrument in enumerate(instruments):
+        if isinstance(instrument, IborDeposit):
+            quotes[i] = instrument._deposit_rate
+        elif isinstance(instrument, IborFRA):
+            quotes[i] = instrument._fraRate
+        else:
+            quotes[i] = instrument._fixed_leg._coupon
+
+    def build_libor():
+        libor_curve._build_curve()
+        return libor_curve._dfs
+
+    libor_diff, libor_changed = apply_updates(libor_curve, build_libor,
+                                              quotes, 200)
+    testCases.print("IBOR SINGLE", libor_diff < 1e-12, libor_changed)
+
+    depos, fras, swaps = build_ois_instruments(valuation_date)
+    ois_curve = OISCurve(valuation_date, depos, fras, swaps)
+    quotes = [depos[0]._deposit_rate] + [s._fixed_leg._coupon for s in swaps]
+
+    def build_ois():
+        ois_curve._build_curve()
+        return ois_curve._dfs
+
+    ois_diff, ois_changed = apply_updates(ois_curve, build_ois, quotes, 200)
+    testCases.print("OIS", ois_diff < 1e-12, ois_changed)
+
+    depos, fras, swaps = build_ibor_instruments(settlement_date)
+    dual_curve = IborDualCurve(valuation_date, ois_curve, depos, fras,
+                               swaps[0:10])
+    instruments = dual_curve._usedDeposits + dual_curve._usedFRAs \
+        + dual_curve._usedSwaps
+    quotes = [0.010] * len(instruments)
+    for i, instrument in enumerate(instruments):
+        if isinstance(instrument, IborDeposit):
+            quotes[i] = instrument._deposit_rate
+        elif isinstance(instrument, IborFRA):
+            quotes[i] = instrument._fraRate
+        else:
+            quotes[i] = instrument._fixed_leg._coupon
+
+    def build_dual():
+        dual_curve._build_curve()
+        return dual_curve._dfs
+
+    dual_diff, dual_changed = apply_updates(dual_curve, build_dual, quotes,
+                                            20)
+    testCases.print("IBOR DUAL", dual_diff < 1e-12, dual_changed)
+
+    cds_contracts = []
+    for i in range(1, 11):
+        maturity_date = valuation_date.add_months(12 * i)
+        cds = CDS(valuation_date, maturity_date, 0.005 + 0.0005 * i)
+        cds_contracts.append(cds)
+
+    issuer_curve = CDSCurve(valuation_date, cds_contracts, libor_curve, 0.40)
+    quotes = [cds._running_coupon for cds in cds_contracts]
+
+    def build_cds():
+        issuer_curve._build_curve()
+        return issuer_curve._values
+
+    cds_diff, cds_changed = apply_updates(issuer_curve, build_cds, quotes, 20)
+    testCases.print("CDS", cds_diff < 1e-12, cds_changed)
+
+###############################################################################
+
+
+test_FinCurveUpdate()
+testCases.compareTestCases()
@@ -0,0 +1,107 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import time
+
+from financepy.utils.date import Date, DateArray
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import DateGenRuleTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.schedule import Schedule
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_DateArraySwapScheduleSpeed():
+    """ Generate unadjusted semi-annual schedules for a book of 10Y swaps
+    using Schedule objects and then using a DateArray. """
+
+    num_swaps = 10000
+    num_months = 6
+    num_flows = 20
+
+    np.random.seed(1919)
+    start_date = Date(1, 1, 2020)
+    offsets = np.random.randint(0, 5 * 365, num_swaps)
+
+    effective_dates = [start_date.add_days(int(n)) for n in offsets]
+
+    start = time.time()
+
+    schedules = []
+    for effective_date in effective_dates:
+        termination_date = effective_date.add_tenor("10Y")
+        schedule = Schedule(effective_date,
+                            termination_date,
+                            FrequencyTypes.SEMI_ANNUAL,
+                            CalendarTypes.NONE,
+                            BusDayAdjustTypes.NONE,
+                            DateGenRuleTypes.BACKWARD)
+        schedules.append(schedule)
+
+    end = time.time()
+    elapsed_schedule = end - start
+
+    # Compile the kernels before timing
+    DateArray(np.array([40000])).add_tenor("10Y").add_months(-6)
+
+    start = time.time()
+
+    effective_array = DateArray(start_date._excel_date + offsets)
+    termination_array = effective_array.add_tenor("10Y")
+
+    flow_dates = []
+    for i in range(0, num_flows + 1):
+        dates = termination_array.add_months(-num_months * (num_flows - i))
+        flow_dates.append(dates._excel_date)
+
+    flow_dates = np.column_stack(flow_dates)
+    flow_dates[:, 0] = np.maximum(flow_dates[:, 0],
+                                  effective_array._excel_date)
+
+    end = time.time()
+    elapsed_array = end - start
+
+    num_diffs = 0
+    for i in range(0, num_swaps):
+        serials = [int(dt._excel_date) for dt in schedules[i]._adjusted_dates]
+        if serials != list(flow_dates[i]):
+            num_diffs += 1
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("NUM SWAPS", num_swaps)
+    testCases.print("NUM DIFFS", num_diffs)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("SCHEDULE", elapsed_schedule)
+    testCases.print("DATEARRAY", elapsed_array)
+    testCases.print("SPEEDUP", elapsed_schedule / elapsed_array)
+
+###############################################################################
+
+
+def test_DateArrayTenors():
+
+    start_date = Date(29, 2, 2020)
+    dates = DateArray([start_date, start_date.add_days(1)])
+
+    testCases.header("TENOR", "DATE1", "DATE2")
+
+    for tenor in ["1D", "1W", "1M", "-1M", "6M", "1Y", "4Y", "-4Y"]:
+        new_dates = dates.add_tenor(tenor)
+        testCases.print(tenor, new_dates[0], new_dates[1])
+
+###############################################################################
+
+
+test_DateArraySwapScheduleSpeed()
+test_DateArrayTenors()
+testCases.compareTestCases()
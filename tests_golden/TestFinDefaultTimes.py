@@ -0,0 +1,126 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import N, corr_matrix_generator
+from financepy.utils.helpers import uniform_to_default_time
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds_curve import build_cds_curves
+from financepy.models.gauss_copula import default_times_gc
+from financepy.models.gauss_copula import default_times_gc_chunks
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def loop_default_times(issuer_curves, y):
+    """ Default times calculated one credit and trial at a time. """
+
+    num_credits = y.shape[0]
+    num_trials = y.shape[1]
+    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+
+    for iCredit in range(0, num_credits):
+        issuer_curve = issuer_curves[iCredit]
+        for iTrial in range(0, num_trials):
+            u1 = 1.0 - N(y[iCredit, iTrial])
+            u2 = 1.0 - u1
+            times = issuer_curve._times
+            values = issuer_curve._values
+            corrTimes[iCredit, iTrial] = \
+                uniform_to_default_time(u1, times, values)
+            corrTimes[iCredit, num_trials + iTrial] = \
+                uniform_to_default_time(u2, times, values)
+
+    return corrTimes
+
+###############################################################################
+
+
+def test_FinDefaultTimesSpeed():
+
+    num_credits = 125
+    num_checked = 2000
+    num_trials = 1000000
+    chunk_size = 50000
+    seed = 1967
+
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    tenors = ["1Y", "3Y", "5Y", "7Y", "10Y"]
+    np.random.seed(1919)
+    levels = np.random.lognormal(np.log(0.01), 0.8, num_credits)
+    spreads = np.outer(levels, [0.6, 0.8, 1.0, 1.1, 1.2])
+    issuer_curves = build_cds_curves(valuation_date, step_in_date, tenors,
+                                     spreads, libor_curve, 0.40)
+
+    corr_matrix = corr_matrix_generator(0.3, num_credits)
+
+    # Compile the kernels
+    default_times_gc(issuer_curves, corr_matrix, 10, seed)
+
+    np.random.seed(seed)
+    x = np.random.normal(0.0, 1.0, size=(num_credits, num_checked))
+    y = np.dot(np.linalg.cholesky(corr_matrix), x)
+
+    start = time.time()
+    loop_times = loop_default_times(issuer_curves, y)
+    end = time.time()
+    elapsed_loop = (end - start) * num_trials / num_checked
+
+    kernel_times = default_times_gc(issuer_curves, corr_matrix, num_checked,
+                                    seed)
+
+    max_diff = np.max(np.abs(kernel_times - loop_times) / loop_times)
+
+    testCases.header("NUM CREDITS", "NUM TRIALS", "MAX REL DIFF")
+    testCases.print(num_credits, num_checked, max_diff < 1e-10)
+
+    labels = ["PSEUDO", "SOBOL"]
+
+    testCases.header("LABEL", "TIME", "MEAN 5Y DEFAULTS")
+    testCases.print("LOOP", elapsed_loop, "-")
+
+    for label, use_sobol in zip(labels, [False, True]):
+
+        num_defaults = 0.0
+        num_draws = 0
+
+        start = time.time()
+        for tau in default_times_gc_chunks(issuer_curves, corr_matrix,
+                                           num_trials, seed, chunk_size,
+                                           use_sobol):
+            num_defaults += np.sum(tau < 5.0)
+            num_draws += tau.shape[1]
+        end = time.time()
+        elapsed = end - start
+
+        testCases.print(label, elapsed, round(num_defaults / num_draws, 2))
+
+###############################################################################
+
+
+test_FinDefaultTimesSpeed()
+testCases.compareTestCases()
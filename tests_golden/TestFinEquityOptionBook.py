@@ -0,0 +1,92 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import OptionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import BlackScholes
+from financepy.products.equity.equity_vanilla_option import EquityVanillaOption
+from financepy.products.equity.equity_option_book import EquityOptionBook
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinEquityOptionBook():
+
+    valuation_date = Date(1, 1, 2015)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.04)
+
+    num_underlyings = 500
+    num_loop = 2000
+
+    np.random.seed(1919)
+    dividend_curves = [DiscountCurveFlat(valuation_date, q)
+                       for q in np.random.uniform(0.0, 0.04, num_underlyings)]
+    stock_prices = np.random.uniform(50.0, 150.0, num_underlyings)
+
+    # Listed options on monthly expiries
+    listed_expiries = [valuation_date.add_months(m) for m in range(1, 25)]
+
+    testCases.header("NUM OPTIONS", "SAME AS ONE AT A TIME")
+
+    for num_options in [10000, 250000]:
+
+        expiry_indices = np.random.randint(0, 24, num_options)
+        expiry_dates = [listed_expiries[i] for i in expiry_indices]
+        underlying_indices = np.random.randint(0, num_underlyings,
+                                               num_options)
+        moneyness = np.random.uniform(0.6, 1.4, num_options)
+        strikes = np.round(stock_prices[underlying_indices] * moneyness)
+        option_types = np.where(np.random.uniform(size=num_options) < 0.5,
+                                OptionTypes.EUROPEAN_CALL.value,
+                                OptionTypes.EUROPEAN_PUT.value)
+        sizes = np.random.randint(-50, 50, num_options).astype(float)
+        vols = 0.20 + 0.3 * (moneyness - 1.0)**2
+
+        book = EquityOptionBook(expiry_dates, strikes, option_types, sizes,
+                                underlying_indices)
+
+        loop_values = np.zeros(num_loop)
+        for i in range(0, num_loop):
+            j = underlying_indices[i]
+            option = EquityVanillaOption(expiry_dates[i], strikes[i],
+                                         OptionTypes(option_types[i]),
+                                         sizes[i])
+            loop_values[i] = option.value(valuation_date, stock_prices[j],
+                                          discount_curve, dividend_curves[j],
+                                          BlackScholes(vols[i]))
+
+        values = book.value(valuation_date, stock_prices, discount_curve,
+                            dividend_curves, vols)
+
+        greeks = book.value_and_greeks(valuation_date, stock_prices,
+                                       discount_curve, dividend_curves, vols)
+
+        same = np.max(np.abs(values[0:num_loop] - loop_values)) < 1e-9
+        same = same and np.max(np.abs(greeks['value'] - values)) < 1e-9
+
+        testCases.print(num_options, same)
+
+    testCases.header("NUM OPTIONS", "VALUE", "DELTA", "GAMMA", "VEGA",
+                     "THETA", "RHO")
+    testCases.print(num_options,
+                    np.sum(greeks['value']),
+                    np.sum(greeks['delta']),
+                    np.sum(greeks['gamma']),
+                    np.sum(greeks['vega']),
+                    np.sum(greeks['theta']),
+                    np.sum(greeks['rho']))
+
+###############################################################################
+
+
+test_FinEquityOptionBook()
+testCases.compareTestCases()
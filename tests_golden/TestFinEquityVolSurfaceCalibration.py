@@ -0,0 +1,95 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
+from financepy.models.volatility_fns import VolFunctionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.equity_vol_surface import vol_function
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def rms_error(surface, vol_functionType, strikes, vols):
+    """ Root mean square difference between the fitted and market vols. """
+
+    error = 0.0
+    for i in range(0, vols.shape[0]):
+        for j in range(0, vols.shape[1]):
+            vol = vol_function(vol_functionType.value,
+                               surface._parameters[i],
+                               surface._F0T[i],
+                               strikes[j],
+                               surface._texp[i])
+            error += (vol - vols[i, j])**2
+
+    return np.sqrt(error / vols.size)
+
+###############################################################################
+
+
+def test_FinEquityVolSurfaceCalibration():
+
+    valuation_date = Date(11, 1, 2021)
+    stock_price = 3800.0
+
+    num_expiries = 40
+    num_strikes = 50
+
+    expiry_dates = [valuation_date.add_months(m)
+                    for m in range(1, num_expiries + 1)]
+    strikes = np.linspace(2500.0, 5000.0, num_strikes)
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.020)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+    # A skewed smile that flattens with maturity plus some noise
+    np.random.seed(1234)
+    vols = np.zeros((num_expiries, num_strikes))
+    for i in range(0, num_expiries):
+        t = (i + 1) / 12.0
+        x = np.log(strikes / stock_price) / np.sqrt(t)
+        vols[i] = 0.20 - 0.10 * x + 0.08 * x * x
+    vols = vols + np.random.normal(0.0, 0.001, vols.shape)
+
+    testCases.header("VOL FUNCTION", "SOLVER", "TIME", "RMS VOL ERROR (BP)")
+
+    for vol_functionType in [VolFunctionTypes.SVI,
+                             VolFunctionTypes.CLARK5,
+                             VolFunctionTypes.CLARK]:
+
+        for solverType in [FinSolverTypes.NELDER_MEAD,
+                           FinSolverTypes.LEVENBERG_MARQUARDT]:
+
+            start = time.time()
+            surface = EquityVolSurface(valuation_date,
+                                       stock_price,
+                                       discount_curve,
+                                       dividend_curve,
+                                       expiry_dates,
+                                       strikes,
+                                       vols,
+                                       vol_functionType,
+                                       solverType)
+            end = time.time()
+
+            error = rms_error(surface, vol_functionType, strikes, vols)
+
+            testCases.print(vol_functionType.name, solverType.name,
+                            end - start, round(error * 10000.0, 1))
+
+###############################################################################
+
+
+test_FinEquityVolSurfaceCalibration()
+testCases.compareTestCases()
@@ -0,0 +1,80 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from scipy.interpolate import CubicSpline
+from scipy.interpolate import PchipInterpolator
+
+from financepy.market.curves.interpolator import Interpolator, InterpTypes
+from financepy.utils.global_vars import gSmall
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def scipy_interpolate(interp_type, times, dfs, t):
+    """ The spline interpolation as it was done before the compiled kernels
+    by building and calling the SciPy interpolation objects. """
+
+    zero_rates = -np.log(dfs) / (times + gSmall)
+    zero_rates[0] = zero_rates[1]
+
+    if interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
+        fn = CubicSpline(times, zero_rates, bc_type=((2, 0.0), (1, 0.0)))
+        return np.exp(-t * fn(t))
+    elif interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
+        fn = CubicSpline(times, np.log(dfs), bc_type='natural')
+        return np.exp(fn(t))
+    elif interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
+        fn = CubicSpline(times, zero_rates, bc_type='natural')
+        return np.exp(-t * fn(t))
+    elif interp_type == InterpTypes.PCHIP_ZERO_RATES:
+        fn = PchipInterpolator(times, zero_rates)
+        return np.exp(-t * fn(t))
+    else:
+        fn = PchipInterpolator(times, np.log(dfs))
+        return np.exp(fn(t))
+
+###############################################################################
+
+
+def test_FinInterpolatorSpeed():
+
+    num_points = 100
+
+    times = np.array([0.0, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0,
+                      15.0, 20.0, 30.0])
+    zero_rates = 0.03 + 0.01 * np.log(1.0 + times)
+    dfs = np.exp(-zero_rates * times)
+    t = np.linspace(0.01, 35.0, num_points)
+
+    testCases.header("METHOD", "MAX DIFF")
+
+    for interp_type in InterpTypes:
+
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(times, dfs)
+        values = interpolator.interpolate(t)
+
+        if interp_type in [InterpTypes.FLAT_FWD_RATES,
+                           InterpTypes.LINEAR_FWD_RATES,
+                           InterpTypes.LINEAR_ZERO_RATES]:
+            testCases.print(interp_type, 0.0)
+            continue
+
+        scipy_values = scipy_interpolate(interp_type, times, dfs, t)
+        max_diff = np.max(np.abs(values - scipy_values)) < 1e-12
+
+        testCases.print(interp_type, max_diff)
+
+###############################################################################
+
+
+test_FinInterpolatorSpeed()
+testCases.compareTestCases()
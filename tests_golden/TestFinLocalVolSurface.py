@@ -0,0 +1,187 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
+from financepy.models.volatility_fns import VolFunctionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.fx_vol_surface import FXVolSurface
+from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
+from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
+from financepy.market.volatility.fx_vol_surface_plus import FXVolSurfacePlus
+from financepy.market.volatility.local_vol_surface import LocalVolSurface
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import ProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.models.implied_volatility import bs_implied_volatilities
+from financepy.products.equity.equity_barrier_option import \
+    EquityBarrierOption, EquityBarrierTypes
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_equity_surface():
+
+    valuation_date = Date(11, 1, 2021)
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    vols = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+            [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+            [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+            [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+            [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+            [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+            [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    vols = np.array(vols) / 100.0
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.020)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+    surface = EquityVolSurface(valuation_date, 3800.0, discount_curve,
+                               dividend_curve, expiry_dates, strikes, vols,
+                               VolFunctionTypes.SVI,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    return surface, 0.020, 0.010
+
+###############################################################################
+
+
+def build_fx_surfaces():
+
+    valuation_date = Date(10, 4, 2020)
+
+    rd = 0.02940
+    rf = 0.03460
+    dom_discount_curve = DiscountCurveFlat(valuation_date, rd)
+    for_discount_curve = DiscountCurveFlat(valuation_date, rf)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    ms25 = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    rr25 = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+    ms10 = [2.433, 2.83, 3.228, 3.485, 3.806, 3.208]
+    rr10 = [-1.258, -1.297, -1.332, -1.408, -1.359, -1.208]
+
+    atmMethod = FinFXATMMethod.FWD_DELTA_NEUTRAL
+    deltaMethod = FinFXDeltaMethod.SPOT_DELTA
+
+    surface = FXVolSurface(valuation_date, 1.3465, "EURUSD", "EUR",
+                           dom_discount_curve, for_discount_curve, tenors,
+                           atm_vols, ms25, rr25, atmMethod, deltaMethod,
+                           VolFunctionTypes.CLARK)
+
+    surface_plus = FXVolSurfacePlus(valuation_date, 1.3465, "EURUSD", "EUR",
+                                    dom_discount_curve, for_discount_curve,
+                                    tenors, atm_vols, ms25, rr25, ms10, rr10,
+                                    0.50, atmMethod, deltaMethod,
+                                    VolFunctionTypes.CLARK)
+
+    return (surface, rd, rf), (surface_plus, rd, rf)
+
+###############################################################################
+
+
+def test_FinLocalVolSurface():
+
+    num_paths = 50000
+    num_ann_steps = 252
+    seed = 1919
+
+    fx_surface, fx_plus_surface = build_fx_surfaces()
+
+    surfaces = [("EQUITY SVI", build_equity_surface(), 3800.0),
+                ("FX CLARK", fx_surface, 1.3465),
+                ("FX PLUS CLARK", fx_plus_surface, 1.3465)]
+
+    process = FinProcessSimulator()
+    scheme = FinGBMNumericalScheme.ANTITHETIC
+
+    for label, (surface, r, q), spot in surfaces:
+
+        local_vol_surface = LocalVolSurface(surface, 200, 200)
+
+        testCases.header("SURFACE", "MIN LOCAL VOL", "MAX LOCAL VOL")
+        testCases.print(label, np.min(local_vol_surface._vols),
+                        np.max(local_vol_surface._vols))
+
+        # Vanillas priced on the local vol paths are on the smile
+        expiry_index = len(surface._texp) - 2
+        texp = surface._texp[expiry_index]
+
+        model_params = (spot, local_vol_surface, scheme)
+
+        paths = process.get_process(ProcessTypes.LOCAL_VOL, texp,
+                                    model_params, num_ann_steps, num_paths,
+                                    seed)
+
+        t = (paths.shape[1] - 1) / num_ann_steps
+        fwd = surface._F0T[expiry_index] * np.exp((r - q) * (t - texp))
+
+        testCases.header("SURFACE", "NUM PATHS", "TEXP", "MC FORWARD",
+                         "FORWARD")
+        testCases.print(label, paths.shape[0], t,
+                        np.mean(paths[:, -1]), fwd)
+
+        ks = fwd * np.exp(np.linspace(-0.2, 0.2, 5))
+        values = np.array([np.mean(np.maximum(paths[:, -1] - k, 0.0))
+                           for k in ks]) * np.exp(-r * t)
+
+        mc_vols, _ = bs_implied_volatilities(values, spot, ks, t, r, q, 1)
+        if isinstance(surface, FXVolSurface):
+            vols = surface.volatility(ks, surface._expiry_dates[expiry_index])
+        else:
+            vols = surface.volatility_from_strike_date(
+                ks, surface._expiry_dates[expiry_index])
+
+        testCases.header("SURFACE", "STRIKE", "SURFACE VOL", "MC VOL")
+        for k, vol, mc_vol in zip(ks, vols, mc_vols):
+            testCases.print(label, k, vol, mc_vol)
+
+    # A one year down and out call with the smile against a flat vol
+    surface, r, q = build_equity_surface()
+    local_vol_surface = LocalVolSurface(surface, 200, 200)
+
+    valuation_date = surface._valuation_date
+    expiry_date = valuation_date.add_years(1)
+    K = 3800.0
+    atm_vol = surface.volatility_from_strike_date(K, expiry_date)
+
+    option_type = EquityBarrierTypes.DOWN_AND_OUT_CALL
+    option = EquityBarrierOption(expiry_date, K, option_type, 3400.0, 252)
+
+    testCases.header("MODEL", "BARRIER", "VALUE")
+
+    for label, process_type, model_params in \
+        [("GBM", ProcessTypes.GBM, (3800.0, r - q, atm_vol, scheme)),
+         ("LOCAL VOL", ProcessTypes.LOCAL_VOL,
+          (3800.0, local_vol_surface, scheme))]:
+
+        for barrier in [3000.0, 3400.0, 3600.0]:
+            v = option.value_mc(expiry_date, K, option_type.value, barrier,
+                                1.0, valuation_date, 3800.0, r,
+                                process_type, model_params, 252, 20000, seed)
+            testCases.print(label, barrier, v)
+
+###############################################################################
+
+
+test_FinLocalVolSurface()
+testCases.compareTestCases()
@@ -0,0 +1,87 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+
+from financepy.models.gauss_copula_onefactor import loss_dbn_recursion_gcd
+from financepy.models.gauss_copula_onefactor import \
+    loss_dbn_recursion_gcd_parallel
+from financepy.models.gauss_copula_onefactor import loss_dbn_fft
+from financepy.models.gauss_copula_onefactor import loss_cdf_saddle_point
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinLossDbnLargePools():
+
+    num_steps = 40
+    strikes = np.array([0.03, 0.07, 0.10, 0.15, 0.30])
+
+    # Compile the kernels
+    loss_dbn_recursion_gcd(2, np.array([0.1, 0.1]), np.ones(2), np.ones(2)
+                           * 0.5, num_steps)
+    loss_dbn_recursion_gcd_parallel(2, np.array([0.1, 0.1]), np.ones(2),
+                                    np.ones(2) * 0.5, num_steps)
+    loss_cdf_saddle_point(np.array([1.0]), np.array([0.1, 0.1]), np.ones(2),
+                          np.ones(2) * 0.5, num_steps)
+
+    testCases.header("NUM CREDITS", "BUILDER", "TIME", "MAX ERROR")
+
+    for num_credits in [125, 1000, 10000]:
+
+        np.random.seed(1919)
+        default_probs = np.random.uniform(0.01, 0.20, num_credits)
+        beta_vector = np.random.uniform(0.2, 0.6, num_credits)
+        lossUnits = np.random.randint(1, 4, num_credits) / 1.0
+
+        start = time.time()
+        dbn1 = loss_dbn_recursion_gcd(num_credits, default_probs, lossUnits,
+                                      beta_vector, num_steps)
+        end = time.time()
+        elapsed_recursion = end - start
+
+        testCases.print(num_credits, "RECURSION", elapsed_recursion, 0.0)
+
+        start = time.time()
+        dbn2 = loss_dbn_recursion_gcd_parallel(num_credits, default_probs,
+                                               lossUnits, beta_vector,
+                                               num_steps)
+        end = time.time()
+        elapsed = end - start
+
+        error = np.max(np.abs(dbn2 - dbn1))
+        testCases.print(num_credits, "PARALLEL RECURSION", elapsed, error)
+
+        start = time.time()
+        dbn3 = loss_dbn_fft(num_credits, default_probs, lossUnits,
+                            beta_vector, num_steps)
+        end = time.time()
+        elapsed = end - start
+
+        error = np.max(np.abs(dbn3 - dbn1))
+        testCases.print(num_credits, "FFT", elapsed, error)
+
+        loss_levels = np.floor(strikes * (len(dbn1) - 1))
+
+        start = time.time()
+        cdf = loss_cdf_saddle_point(loss_levels, default_probs, lossUnits,
+                                    beta_vector, num_steps)
+        end = time.time()
+        elapsed = end - start
+
+        cdf1 = np.cumsum(dbn1)[loss_levels.astype(int)]
+        error = np.max(np.abs(cdf - cdf1))
+        testCases.print(num_credits, "SADDLE POINT", elapsed, error)
+
+###############################################################################
+
+
+test_FinLossDbnLargePools()
+testCases.compareTestCases()
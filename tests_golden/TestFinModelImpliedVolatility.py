@@ -0,0 +1,133 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from scipy.stats import norm
+
+from financepy.utils.error import FinError
+from financepy.utils.global_types import OptionTypes
+from financepy.models.black_scholes_analytic import bs_value, bs_vega
+from financepy.models.black_scholes_analytic import bs_implied_volatility
+from financepy.models.implied_volatility import ImpliedVolStatus
+from financepy.models.implied_volatility import bs_implied_volatilities
+from financepy.models.implied_volatility import black_implied_volatilities
+from financepy.models.implied_volatility import \
+    bachelier_implied_volatilities
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinModelImpliedVolatility():
+
+    np.random.seed(1919)
+
+    num_quotes = 500000
+    num_loop = 2000
+
+    s = 100.0
+    r = 0.03
+    q = 0.01
+    texps = np.random.uniform(0.02, 5.0, num_quotes)
+    strikes = s * np.exp(np.random.uniform(-0.5, 0.5, num_quotes) *
+                         np.sqrt(texps))
+    vols = np.random.uniform(0.05, 0.80, num_quotes)
+    option_types = np.where(np.random.uniform(size=num_quotes) < 0.5,
+                            OptionTypes.EUROPEAN_CALL.value,
+                            OptionTypes.EUROPEAN_PUT.value)
+
+    prices = bs_value(s, texps, strikes, r, q, vols, option_types)
+
+    loop_sigmas = np.full(num_loop, np.nan)
+    num_loop_fails = 0
+    for i in range(0, num_loop):
+        try:
+            loop_sigmas[i] = bs_implied_volatility(s, texps[i], strikes[i],
+                                                   r, q, prices[i],
+                                                   option_types[i])
+        except FinError:
+            num_loop_fails += 1
+
+    sigmas, status = bs_implied_volatilities(prices, s, strikes, texps, r, q,
+                                             option_types)
+
+    # The prices use an approximation to the normal CDF accurate to 6dp so
+    # the volatilities are only compared where the vega is not small
+    converged = status == ImpliedVolStatus.CONVERGED.value
+    solvable = bs_vega(s, texps, strikes, r, q, vols, option_types) > 1.0
+    solved = (np.isnan(loop_sigmas) == False) & solvable[0:num_loop]
+    max_diff = np.max(np.abs(sigmas[0:num_loop] - loop_sigmas)[solved])
+    max_error = np.max(np.abs(sigmas - vols)[solvable])
+
+    testCases.header("NUM LOOP", "NUM LOOP ERRORS", "NUM NOT SOLVED")
+    testCases.print(num_loop, num_loop_fails,
+                    np.sum(converged[0:num_loop] == False))
+
+    testCases.header("MODEL", "NUM CONVERGED", "MAX VOL ERROR")
+    testCases.print("BLACK SCHOLES", np.sum(converged),
+                    max_diff < 1e-4 and max_error < 1e-4)
+
+    # Black and Bachelier prices with an exact normal CDF
+    fwds = s * np.exp((r - q) * texps)
+    dfs = np.exp(-r * texps)
+    phi = np.where(option_types == OptionTypes.EUROPEAN_CALL.value, 1.0, -1.0)
+
+    sd = vols * np.sqrt(texps)
+    d1 = np.log(fwds / strikes) / sd + sd / 2.0
+    d2 = d1 - sd
+    prices = dfs * phi * (fwds * norm.cdf(phi * d1) -
+                          strikes * norm.cdf(phi * d2))
+
+    sigmas, status = black_implied_volatilities(prices, fwds, strikes, texps,
+                                                dfs, option_types)
+
+    vega = fwds * norm.pdf(d1) * sd
+    solvable = vega > 1e-4 * fwds
+    max_error = np.max(np.abs(sigmas - vols)[solvable])
+
+    testCases.print("BLACK",
+                    np.sum(status == ImpliedVolStatus.CONVERGED.value),
+                    max_error < 1e-10)
+
+    normal_vols = vols * 0.02
+    fwds = np.random.uniform(-0.01, 0.05, num_quotes)
+    strikes = fwds + np.random.uniform(-2.0, 2.0, num_quotes) * normal_vols \
+        * np.sqrt(texps)
+    sd = normal_vols * np.sqrt(texps)
+    d = (fwds - strikes) / sd
+    prices = dfs * (phi * (fwds - strikes) * norm.cdf(phi * d) +
+                    sd * norm.pdf(d))
+
+    sigmas, status = bachelier_implied_volatilities(prices, fwds, strikes,
+                                                    texps, dfs, option_types)
+
+    max_error = np.max(np.abs(sigmas - normal_vols) / normal_vols)
+
+    testCases.print("BACHELIER",
+                    np.sum(status == ImpliedVolStatus.CONVERGED.value),
+                    max_error < 1e-10)
+
+    # Quotes which cannot be inverted
+    prices = np.array([5.0, 0.5, 120.0, 10.0])
+    strikes = np.array([100.0, 80.0, 100.0, 100.0])
+    texps = np.array([1.0, 1.0, 1.0, -1.0])
+
+    sigmas, status = black_implied_volatilities(prices, 100.0, strikes,
+                                                texps, 1.0,
+                                                OptionTypes.EUROPEAN_PUT)
+
+    testCases.header("PRICE", "STRIKE", "TEXP", "VOL", "STATUS")
+    for i in range(0, len(prices)):
+        testCases.print(prices[i], strikes[i], texps[i], sigmas[i],
+                        ImpliedVolStatus(status[i]).name)
+
+###############################################################################
+
+
+test_FinModelImpliedVolatility()
+testCases.compareTestCases()
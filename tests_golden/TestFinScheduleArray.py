@@ -0,0 +1,120 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import time
+
+from financepy.utils.date import Date
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import DateGenRuleTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.schedule import Schedule, ScheduleArray
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_ScheduleArraySpeed():
+    """ Generate the adjusted schedules of a book of swaps with a mix of
+    conventions one at a time and then all together in a ScheduleArray. """
+
+    num_schedules = 20000
+
+    np.random.seed(1919)
+    start_date = Date(1, 1, 2020)
+    offsets = np.random.randint(0, 5 * 365, num_schedules)
+    tenors = np.random.choice(["2Y", "5Y", "10Y", "30Y"], num_schedules)
+
+    effective_dates = [start_date.add_days(int(n)) for n in offsets]
+    termination_dates = [dt.add_tenor(str(tenor))
+                         for dt, tenor in zip(effective_dates, tenors)]
+
+    freq_types = [FrequencyTypes.SEMI_ANNUAL, FrequencyTypes.QUARTERLY,
+                  FrequencyTypes.ANNUAL]
+    calendar_types = [CalendarTypes.TARGET, CalendarTypes.UNITED_STATES,
+                      CalendarTypes.UNITED_KINGDOM]
+
+    freq_types = [freq_types[i % 3] for i in range(0, num_schedules)]
+    calendar_types = [calendar_types[(i // 3) % 3]
+                      for i in range(0, num_schedules)]
+
+    bus_day_adjust_type = BusDayAdjustTypes.MODIFIED_FOLLOWING
+    date_gen_rule_type = DateGenRuleTypes.BACKWARD
+
+    start = time.time()
+
+    schedules = []
+    for i in range(0, num_schedules):
+        schedule = Schedule(effective_dates[i],
+                            termination_dates[i],
+                            freq_types[i],
+                            calendar_types[i],
+                            bus_day_adjust_type,
+                            date_gen_rule_type)
+        schedules.append(schedule)
+
+    end = time.time()
+    elapsed_schedule = end - start
+
+    # Compile the kernels before timing
+    ScheduleArray(effective_dates[0:1], termination_dates[0:1])
+
+    start = time.time()
+
+    schedule_array = ScheduleArray(effective_dates,
+                                   termination_dates,
+                                   freq_types,
+                                   calendar_types,
+                                   bus_day_adjust_type,
+                                   date_gen_rule_type)
+
+    end = time.time()
+    elapsed_array = end - start
+
+    num_diffs = 0
+    for i in range(0, num_schedules):
+        serials = [int(dt._excel_date) for dt in schedules[i]._adjusted_dates]
+        i1 = schedule_array._offsets[i]
+        i2 = schedule_array._offsets[i + 1]
+        if serials != list(schedule_array._serials[i1:i2]):
+            num_diffs += 1
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("NUM SCHEDULES", num_schedules)
+    testCases.print("NUM DATES", len(schedule_array._serials))
+    testCases.print("NUM DIFFS", num_diffs)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("SCHEDULE", elapsed_schedule)
+    testCases.print("SCHEDULEARRAY", elapsed_array)
+    testCases.print("SPEEDUP", elapsed_schedule / elapsed_array)
+
+###############################################################################
+
+
+def test_ScheduleArrayCDS():
+
+    step_in_date = Date(20, 12, 2019)
+    maturity_dates = [Date(20, 6, 2022), Date(20, 12, 2024)]
+
+    schedules = ScheduleArray.from_cds([step_in_date, step_in_date],
+                                       maturity_dates)
+
+    testCases.header("SCHEDULE", "DATE")
+
+    for i in range(0, len(schedules)):
+        for dt in schedules.schedule_dates(i):
+            testCases.print(i, dt)
+
+###############################################################################
+
+
+test_ScheduleArraySpeed()
+test_ScheduleArrayCDS()
+testCases.compareTestCases()
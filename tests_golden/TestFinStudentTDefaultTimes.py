@@ -0,0 +1,192 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import numpy as np
+from scipy.stats import t as student
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.math import corr_matrix_generator
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.credit.cds_curve import build_cds_curves
+from financepy.products.credit.cds_basket import CDSBasket
+from financepy.models.student_t_copula import StudentTCopula
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def numpy_default_times(issuer_curves, correlationMatrix, degreesOfFreedom,
+                        num_trials, seed):
+    """ Default times with the Student-t distribution function evaluated by
+    SciPy on the whole matrix of draws. """
+
+    np.random.seed(seed)
+    num_credits = len(issuer_curves)
+    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
+    c = np.linalg.cholesky(correlationMatrix)
+    y = np.dot(c, x)
+
+    chi2 = np.random.chisquare(degreesOfFreedom, size=num_trials)
+    c = np.sqrt(chi2 / degreesOfFreedom)
+    u = student.cdf(y / c, degreesOfFreedom)
+
+    tau = np.empty((num_credits, 2 * num_trials))
+    for iCredit in range(0, num_credits):
+        curve = issuer_curves[iCredit]
+        tau[iCredit, 0:num_trials] = numpy_uniform_to_default_time(
+            u[iCredit], curve._times, curve._values)
+        tau[iCredit, num_trials:] = numpy_uniform_to_default_time(
+            1.0 - u[iCredit], curve._times, curve._values)
+
+    return tau
+
+###############################################################################
+
+
+def numpy_uniform_to_default_time(u, times, values):
+    """ Map a vector of uniforms to default times by interpolating linearly
+    in the log of the survival probability. Beyond the last point the first
+    and last points of the curve are used as in uniform_to_default_time. """
+
+    log_u = np.log(u)
+    log_v = np.log(values)
+
+    tau = np.interp(-log_u, -log_v, times)
+
+    beyond = log_u <= log_v[-1]
+    tau[beyond] = (times[-1] * (log_v[0] - log_u[beyond])
+                   + times[0] * (log_u[beyond] - log_v[-1])) \
+        / (log_v[0] - log_v[-1])
+
+    tau[u == 0.0] = 99999.0
+    tau[u == 1.0] = 0.0
+    return tau
+
+###############################################################################
+
+
+def test_FinStudentTDefaultTimesSpeed():
+
+    num_credits = 125
+    num_trials = 200000
+    chunk_size = 20000
+    doF = 4
+    seed = 1967
+
+    valuation_date = Date(20, 12, 2018)
+    step_in_date = valuation_date.add_days(1)
+
+    swaps = []
+    for i in range(1, 11):
+        swap = IborSwap(valuation_date, valuation_date.add_months(12 * i),
+                        SwapTypes.PAY, 0.03 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [], [], swaps)
+
+    tenors = ["1Y", "3Y", "5Y", "7Y", "10Y"]
+    np.random.seed(1919)
+    levels = np.random.lognormal(np.log(0.01), 0.8, num_credits)
+    spreads = np.outer(levels, [0.6, 0.8, 1.0, 1.1, 1.2])
+    issuer_curves = build_cds_curves(valuation_date, step_in_date, tenors,
+                                     spreads, libor_curve, 0.40)
+
+    corr_matrix = corr_matrix_generator(0.3, num_credits)
+    model = StudentTCopula()
+
+    # Compile the kernels
+    model.default_times(issuer_curves, corr_matrix, doF, 10, seed)
+    numpy_default_times(issuer_curves, corr_matrix, doF, 10, seed)
+
+    start = time.time()
+    numpy_times = numpy_default_times(issuer_curves, corr_matrix, doF,
+                                      num_trials, seed)
+    end = time.time()
+    elapsed_numpy = end - start
+
+    start = time.time()
+    kernel_times = model.default_times(issuer_curves, corr_matrix, doF,
+                                       num_trials, seed)
+    end = time.time()
+    elapsed_kernel = end - start
+
+    max_diff = np.max(np.abs(kernel_times - numpy_times) / numpy_times)
+
+    testCases.header("NUM CREDITS", "NUM TRIALS", "MAX REL DIFF")
+    testCases.print(num_credits, num_trials, max_diff < 1e-8)
+
+    testCases.header("LABEL", "TIME", "MEAN 5Y DEFAULTS")
+    testCases.print("NUMPY", elapsed_numpy,
+                    round(np.mean(numpy_times < 5.0), 2))
+    testCases.print("KERNEL", elapsed_kernel,
+                    round(np.mean(kernel_times < 5.0), 2))
+
+    for label, seed_per_chunk in zip(["STREAM", "PER CHUNK"], [False, True]):
+
+        num_defaults = 0.0
+        num_draws = 0
+
+        start = time.time()
+        for tau in model.default_times_chunks(issuer_curves, corr_matrix, doF,
+                                              num_trials, seed, chunk_size,
+                                              True, seed_per_chunk):
+            num_defaults += np.sum(tau < 5.0)
+            num_draws += tau.size
+        end = time.time()
+        elapsed = end - start
+
+        testCases.print(label, elapsed, round(num_defaults / num_draws, 2))
+
+    # Chunks generated out of order by separate calls are the same
+    num_chunks = num_trials // chunk_size
+    chunks = list(model.default_times_chunks(issuer_curves, corr_matrix, doF,
+                                             num_trials, seed, chunk_size,
+                                             True, True))
+    same = True
+    for chunk_index in reversed(range(0, num_chunks)):
+        chunk = model.default_times_chunk(issuer_curves, corr_matrix, doF,
+                                          num_trials, seed, chunk_index,
+                                          chunk_size)
+        same = same and np.array_equal(chunk, chunks[chunk_index])
+
+    testCases.header("NUM CHUNKS", "SAME IN ANY ORDER")
+    testCases.print(num_chunks, same)
+
+    # A first to fifth to default basket on the first ten names
+    basket = CDSBasket(valuation_date, Date(20, 12, 2023))
+    ntds = [1, 2, 3, 4, 5]
+
+    start = time.time()
+    v = basket.value_student_t_mc_levels(valuation_date,
+                                         ntds,
+                                         issuer_curves[0:10],
+                                         corr_matrix[0:10, 0:10],
+                                         doF,
+                                         libor_curve,
+                                         num_trials,
+                                         seed,
+                                         chunk_size,
+                                         True)
+    end = time.time()
+
+    testCases.header("NTD", "TIME", "SPREAD", "SPREAD STDERR")
+    for i, ntd in enumerate(ntds):
+        testCases.print(ntd, end - start, v["spread"][i] * 10000.0,
+                        v["spread_stderr"][i] * 10000.0)
+
+###############################################################################
+
+
+test_FinStudentTDefaultTimesSpeed()
+testCases.compareTestCases()
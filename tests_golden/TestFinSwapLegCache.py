@@ -0,0 +1,89 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.schedule import clear_accrual_schedule_cache
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.rates.ibor_swap import IborSwap
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_and_value_swaps(valuation_date, discount_curve, tenors, coupons,
+                          share_schedules):
+
+    values = []
+
+    for tenor in tenors:
+        for coupon in coupons:
+
+            if share_schedules is False:
+                clear_accrual_schedule_cache()
+
+            swap = IborSwap(valuation_date,
+                            tenor,
+                            SwapTypes.PAY,
+                            coupon,
+                            FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360,
+                            calendar_type=CalendarTypes.TARGET)
+
+            values.append(swap.value(valuation_date, discount_curve))
+
+    return values
+
+###############################################################################
+
+
+def test_FinSwapLegCacheSpeed():
+    """ Value a book of swaps which all have one of a small set of standard
+    tenors with and without sharing the accrual schedules of the legs. """
+
+    valuation_date = Date(30, 11, 2021)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.02)
+
+    tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y", "15Y", "20Y", "30Y"]
+    coupons = [0.01 + 0.0001 * i for i in range(0, 100)]
+
+    start = time.time()
+    values1 = build_and_value_swaps(valuation_date, discount_curve,
+                                    tenors, coupons, False)
+    end = time.time()
+    elapsed_unshared = end - start
+
+    clear_accrual_schedule_cache()
+
+    start = time.time()
+    values2 = build_and_value_swaps(valuation_date, discount_curve,
+                                    tenors, coupons, True)
+    end = time.time()
+    elapsed_shared = end - start
+
+    max_diff = max([abs(v1 - v2) for v1, v2 in zip(values1, values2)])
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("NUM SWAPS", len(values1))
+    testCases.print("MAX DIFF", max_diff)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("UNSHARED", elapsed_unshared)
+    testCases.print("SHARED", elapsed_shared)
+    testCases.print("SPEEDUP", elapsed_unshared / elapsed_shared)
+
+###############################################################################
+
+
+test_FinSwapLegCacheSpeed()
+testCases.compareTestCases()
@@ -0,0 +1,129 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCount, DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.calendar import CalendarTypes
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def value_swap_by_flows(swap, valuation_date, discount_curve, index_curve):
+    """ Value the swap one flow at a time with a curve call for each date as
+    was done before the legs were valued using arrays. """
+
+    fixed_leg = swap._fixed_leg
+    float_leg = swap._float_leg
+
+    dfValue = discount_curve.df(valuation_date)
+
+    fixed_pv = 0.0
+    for iPmnt in range(0, len(fixed_leg._payment_dates)):
+        pmntDate = fixed_leg._payment_dates[iPmnt]
+        if pmntDate > valuation_date:
+            dfPmnt = discount_curve.df(pmntDate) / dfValue
+            fixed_pv += fixed_leg._payments[iPmnt] * dfPmnt
+
+    index_day_counter = DayCount(index_curve._day_count_type)
+
+    float_pv = 0.0
+    for iPmnt in range(0, len(float_leg._payment_dates)):
+        pmntDate = float_leg._payment_dates[iPmnt]
+        if pmntDate > valuation_date:
+            startAccruedDt = float_leg._startAccruedDates[iPmnt]
+            endAccruedDt = float_leg._endAccruedDates[iPmnt]
+            index_alpha = index_day_counter.year_frac(startAccruedDt,
+                                                      endAccruedDt)[0]
+            dfStart = index_curve.df(startAccruedDt)
+            dfEnd = index_curve.df(endAccruedDt)
+            fwd_rate = (dfStart / dfEnd - 1.0) / index_alpha
+            pmntAmount = fwd_rate * float_leg._year_fracs[iPmnt] * \
+                float_leg._notional
+            dfPmnt = discount_curve.df(pmntDate) / dfValue
+            float_pv += pmntAmount * dfPmnt
+
+    return float_pv - fixed_pv
+
+###############################################################################
+
+
+def test_FinSwapLegValuationSpeed():
+    """ Value a book of payer swaps flow by flow and then with the legs
+    discounting all of their payment dates with one curve call. """
+
+    valuation_date = Date(30, 11, 2021)
+    settlement_date = valuation_date.add_weekdays(2)
+
+    depo = IborDeposit(settlement_date, "6M", 0.01, DayCountTypes.ACT_360)
+
+    curve_swaps = []
+    tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y", "15Y", "20Y", "30Y"]
+    for i, tenor in enumerate(tenors):
+        swap = IborSwap(settlement_date,
+                        tenor,
+                        SwapTypes.PAY,
+                        0.012 + 0.001 * i,
+                        FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360)
+        curve_swaps.append(swap)
+
+    libor_curve = IborSingleCurve(valuation_date, [depo], [], curve_swaps)
+
+    swaps = []
+    for tenor in ["10Y", "20Y", "30Y"]:
+        for i in range(0, 100):
+            swap = IborSwap(settlement_date,
+                            tenor,
+                            SwapTypes.PAY,
+                            0.01 + 0.0002 * i,
+                            FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360,
+                            float_freq_type=FrequencyTypes.QUARTERLY,
+                            float_day_count_type=DayCountTypes.ACT_360,
+                            calendar_type=CalendarTypes.TARGET)
+            swaps.append(swap)
+
+    # Generate the schedules before timing
+    for swap in swaps:
+        swap.value(settlement_date, libor_curve)
+
+    start = time.time()
+    values1 = [value_swap_by_flows(swap, settlement_date, libor_curve,
+                                   libor_curve) for swap in swaps]
+    end = time.time()
+    elapsed_flows = end - start
+
+    start = time.time()
+    values2 = [swap.value(settlement_date, libor_curve) for swap in swaps]
+    end = time.time()
+    elapsed_arrays = end - start
+
+    max_diff = max([abs(v1 - v2) for v1, v2 in zip(values1, values2)])
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("NUM SWAPS", len(swaps))
+    testCases.print("MAX DIFF < 1E-6", max_diff < 1e-6)
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("FLOWS", elapsed_flows)
+    testCases.print("ARRAYS", elapsed_arrays)
+    testCases.print("SPEEDUP", elapsed_flows / elapsed_arrays)
+
+###############################################################################
+
+
+test_FinSwapLegValuationSpeed()
+testCases.compareTestCases()
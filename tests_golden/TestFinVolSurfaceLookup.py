@@ -0,0 +1,172 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date, DateArray
+from financepy.models.volatility_fns import VolFunctionTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.volatility.equity_vol_surface import EquityVolSurface
+from financepy.market.volatility.swaption_vol_surface import \
+    SwaptionVolSurface
+from financepy.market.volatility.fx_vol_surface import FXVolSurface
+from financepy.market.volatility.fx_vol_surface import FinFXATMMethod
+from financepy.market.volatility.fx_vol_surface import FinFXDeltaMethod
+from financepy.market.volatility.fx_vol_surface_plus import FXVolSurfacePlus
+from FinTestCases import FinTestCases, globalTestCaseMode
+import sys
+sys.path.append("..")
+
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def build_equity_surface():
+
+    valuation_date = Date(11, 1, 2021)
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 3, 2021),
+                    Date(11, 4, 2021), Date(11, 7, 2021),
+                    Date(11, 10, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2023)]
+
+    strikes = np.array([3037, 3418, 3608, 3703, 3798,
+                        3893, 3988, 4178, 4557])
+
+    vols = [[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54, 25.67],
+            [37.01, 28.25, 24.19, 21.93, 19.57, 17.45, 15.89, 15.34, 21.15],
+            [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31, 18.94],
+            [31.41, 26.25, 23.51, 22.05, 20.61, 19.25, 18.03, 16.01, 15.90],
+            [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63, 14.94],
+            [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76, 14.63],
+            [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36, 16.26]]
+
+    vols = np.array(vols) / 100.0
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.020)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.010)
+
+    surface = EquityVolSurface(valuation_date, 3800.0, discount_curve,
+                               dividend_curve, expiry_dates, strikes, vols,
+                               VolFunctionTypes.SVI)
+
+    return surface, 3000.0, 4600.0
+
+###############################################################################
+
+
+def build_swaption_surface():
+
+    valuation_date = Date(12, 6, 2013)
+
+    exercise_dates = [Date(12, 9, 2013), Date(12, 6, 2014),
+                      Date(12, 6, 2015), Date(12, 6, 2016),
+                      Date(12, 6, 2017), Date(12, 6, 2018),
+                      Date(12, 6, 2020), Date(12, 6, 2023)]
+
+    vols = [[57.6, 53.7, 49.4, 45.6, 44.1, 41.1, 35.2, 32.0],
+            [46.6, 46.9, 44.8, 41.6, 39.8, 37.4, 33.4, 31.0],
+            [35.9, 39.3, 39.6, 37.9, 37.2, 34.7, 30.5, 28.9],
+            [34.1, 36.5, 37.8, 36.6, 35.0, 31.9, 28.1, 26.6],
+            [41.0, 41.3, 39.5, 37.8, 36.0, 32.6, 29.0, 26.0],
+            [45.8, 43.4, 41.9, 39.2, 36.9, 33.2, 29.6, 26.3],
+            [50.3, 46.9, 44.0, 40.0, 37.5, 33.8, 30.2, 27.3]]
+
+    vols = np.array(vols) / 100.0
+
+    strikes = [[1.00, 1.25, 1.68, 2.00, 2.26, 2.41, 2.58, 2.62],
+               [1.50, 1.75, 2.18, 2.50, 2.76, 2.91, 3.08, 3.12],
+               [2.00, 2.25, 2.68, 3.00, 3.26, 3.41, 3.58, 3.62],
+               [2.50, 2.75, 3.18, 3.50, 3.76, 3.91, 4.08, 4.12],
+               [3.00, 3.25, 3.68, 4.00, 4.26, 4.41, 4.58, 4.62],
+               [3.50, 3.75, 4.18, 4.50, 4.76, 4.91, 5.08, 5.12],
+               [4.00, 4.25, 4.68, 5.00, 5.26, 5.41, 5.58, 5.62]]
+
+    strikes = np.array(strikes) / 100.0
+
+    surface = SwaptionVolSurface(valuation_date, exercise_dates, strikes[3],
+                                 strikes, vols,
+                                 VolFunctionTypes.SABR_BETA_HALF)
+
+    return surface, 0.015, 0.050
+
+###############################################################################
+
+
+def build_fx_surfaces():
+
+    valuation_date = Date(10, 4, 2020)
+
+    dom_discount_curve = DiscountCurveFlat(valuation_date, 0.02940)
+    for_discount_curve = DiscountCurveFlat(valuation_date, 0.03460)
+
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atm_vols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    ms25 = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    rr25 = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+    ms10 = [2.433, 2.83, 3.228, 3.485, 3.806, 3.208]
+    rr10 = [-1.258, -1.297, -1.332, -1.408, -1.359, -1.208]
+
+    atmMethod = FinFXATMMethod.FWD_DELTA_NEUTRAL
+    deltaMethod = FinFXDeltaMethod.SPOT_DELTA
+
+    surface = FXVolSurface(valuation_date, 1.3465, "EURUSD", "EUR",
+                           dom_discount_curve, for_discount_curve, tenors,
+                           atm_vols, ms25, rr25, atmMethod, deltaMethod,
+                           VolFunctionTypes.CLARK)
+
+    surface_plus = FXVolSurfacePlus(valuation_date, 1.3465, "EURUSD", "EUR",
+                                    dom_discount_curve, for_discount_curve,
+                                    tenors, atm_vols, ms25, rr25, ms10, rr10,
+                                    0.50, atmMethod, deltaMethod,
+                                    VolFunctionTypes.CLARK)
+
+    return (surface, 1.10, 1.60), (surface_plus, 1.10, 1.60)
+
+###############################################################################
+
+
+def test_FinVolSurfaceLookup():
+
+    num_points = 200000
+    num_loop = 2000
+
+    fx_surface, fx_plus_surface = build_fx_surfaces()
+
+    surfaces = [("EQUITY", build_equity_surface(),
+                 "volatility_from_strike_date"),
+                ("SWAPTION", build_swaption_surface(),
+                 "volatility_from_strike_date"),
+                ("FX", fx_surface, "volatility"),
+                ("FX PLUS", fx_plus_surface, "volatility_from_strike_date")]
+
+    testCases.header("SURFACE", "SAME AS LOOP")
+
+    for label, (surface, min_strike, max_strike), method in surfaces:
+
+        np.random.seed(1919)
+        strikes = np.random.uniform(min_strike, max_strike, num_points)
+        days = np.random.randint(1, 4000, num_points)
+        serials = surface._valuation_date._excel_date + days
+        expiry_dates = DateArray(serials)
+
+        lookup = getattr(surface, method)
+
+        loop_vols = np.zeros(num_loop)
+        for i in range(0, num_loop):
+            expiry_date = Date.from_excel_date(int(serials[i]))
+            loop_vols[i] = lookup(strikes[i], expiry_date)
+
+        vols = lookup(strikes, expiry_dates)
+
+        same = np.max(np.abs(vols[0:num_loop] - loop_vols)) < 1e-12
+
+        testCases.print(label, same)
+
+###############################################################################
+
+
+test_FinVolSurfaceLookup()
+testCases.compareTestCases()